@@ -0,0 +1,260 @@
+"""Alertas de existencias bajas que reaccionan a cada cambio de inventario, sin recorrer la tabla.
+
+Los puntos de reorden (PuntoReorden) se guardan en memoria en cada proceso, indexados por el
+objeto que vigilan y junto con su versión (ver opciones.version). La versión está en la base de
+datos, así que un punto creado en cualquier proceso se ve en todos, y revisar un lote de cambios
+de existencias cuesta una consulta por la versión y una búsqueda en un diccionario por llave
+cambiada. Sólo si la llave tiene un punto se leen sus existencias nuevas, con una consulta por
+tipo de objeto y por lote.
+
+Hay dos entradas:
+
+- stock.existencias_cambiadas: registrar_movimientos envía las variaciones de un lote dentro de su
+  transacción; las existencias anteriores son las nuevas menos la variación.
+- post_save de ProductoHojalateria y Sobrante: para los cambios hechos guardando el objeto, se
+  compara con el valor que tenía al leerse de la base de datos.
+
+Cuando las existencias pasan de al menos el mínimo a menos del mínimo se crea una AlertaStock en la
+misma transacción. Al confirmarse se encola, si no hay uno pendiente, el trabajo notificar_alertas
+con un retraso de VENTANA_NOTIFICACION segundos, que notifica juntas todas las alertas acumuladas.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_init, post_save
+from django.utils import timezone
+
+from .models import (
+    AlertaStock,
+    ProductoHojalateria,
+    PuntoReorden,
+    Sobrante,
+    StockSnapshot,
+    Trabajo,
+)
+from .opciones import invalidar, version
+from .stock import existencias_cambiadas
+
+logger = logging.getLogger("inventario_app.alertas")
+
+# Segundos que se acumulan las alertas antes de notificarlas juntas
+VENTANA_NOTIFICACION = 60
+
+# Alertas por notificación como máximo; las demás quedan para el trabajo siguiente
+MAXIMO_POR_NOTIFICACION = 500
+
+# Tipos de objeto vigilado, que son la primera parte de la llave de un punto
+PRODUCTO = "producto"
+SOBRANTE = "sobrante"
+TOTAL = "total"
+
+# Atributo en el que se guardan las existencias leídas de la base de datos
+_ATRIBUTO_CARGADAS = "_existencias_cargadas"
+
+# Puntos en memoria con la versión con la que se leyeron: (versión, {llave: [(id, mínimo)]})
+_puntos = None
+
+
+def _llave(punto):
+    if punto.producto_id is not None:
+        return (PRODUCTO, punto.producto_id)
+    if punto.sobrante_id is not None:
+        return (SOBRANTE, punto.sobrante_id)
+    return (TOTAL, (punto.sucursal_id, punto.material_id, punto.categoria))
+
+
+def puntos():
+    """Puntos de reorden vigentes por llave, leídos de la base de datos sólo si cambiaron.
+
+    La versión se lee antes que los puntos: si cambia entre ambas lecturas, la llamada siguiente
+    vuelve a leerlos en lugar de quedarse con un índice viejo.
+    """
+    global _puntos
+    actual_version = version(PuntoReorden)
+    actual = _puntos
+    if actual is None or actual[0] != actual_version:
+        indice = defaultdict(list)
+        for punto in PuntoReorden.objects.only(
+            "producto", "sobrante", "sucursal", "material", "categoria", "minimo"
+        ):
+            indice[_llave(punto)].append((punto.pk, punto.minimo))
+        actual = _puntos = (actual_version, dict(indice))
+    return actual[1]
+
+
+def _cruces(vigilados, existencias, variaciones):
+    """Alertas de los puntos cuyo mínimo queda entre las existencias anteriores y las nuevas."""
+    alertas = []
+    for llave, nuevas in existencias.items():
+        anteriores = nuevas - variaciones[llave]
+        for punto_id, minimo in vigilados[llave]:
+            if anteriores >= minimo > nuevas:
+                alertas.append(
+                    AlertaStock(
+                        punto_id=punto_id, anterior=anteriores, existencias=nuevas, minimo=minimo
+                    )
+                )
+    return alertas
+
+
+def registrar(alertas):
+    """Guarda las alertas y programa su notificación para cuando se confirme la transacción."""
+    if not alertas:
+        return
+    AlertaStock.objects.bulk_create(alertas)
+    transaction.on_commit(programar_notificacion)
+
+
+def revisar(productos=None, sobrantes=None, totales=None, **kwargs):
+    """Registra las alertas de un lote de variaciones de existencias ya aplicadas.
+
+    Args:
+        productos (dict): {id de producto: variación}
+        sobrantes (dict): {id de sobrante: variación}
+        totales (dict): {(sucursal_id, material_id, categoria): variación}
+
+    Returns:
+        list: Las AlertaStock creadas.
+    """
+    indice = puntos()
+    if not indice:
+        return []
+
+    variaciones = {}
+    for tipo, cambios in ((PRODUCTO, productos), (SOBRANTE, sobrantes), (TOTAL, totales)):
+        for clave, variacion in (cambios or {}).items():
+            if variacion and (tipo, clave) in indice:
+                variaciones[(tipo, clave)] = variacion
+    if not variaciones:
+        return []
+
+    existencias = {}
+    por_tipo = defaultdict(list)
+    for tipo, clave in variaciones:
+        por_tipo[tipo].append(clave)
+    for tipo, modelo in ((PRODUCTO, ProductoHojalateria), (SOBRANTE, Sobrante)):
+        if por_tipo[tipo]:
+            existencias.update(
+                ((tipo, pk), total)
+                for pk, total in modelo.objects.filter(pk__in=por_tipo[tipo]).values_list(
+                    "pk", "existencias"
+                )
+            )
+    if por_tipo[TOTAL]:
+        filtro = reduce(
+            or_,
+            (
+                Q(sucursal_id=sucursal, material_id=material, categoria=categoria)
+                for sucursal, material, categoria in por_tipo[TOTAL]
+            ),
+        )
+        existencias.update(
+            ((TOTAL, (sucursal, material, categoria)), total)
+            for sucursal, material, categoria, total in StockSnapshot.objects.filter(
+                filtro
+            ).values_list("sucursal_id", "material_id", "categoria", "existencias")
+        )
+
+    alertas = _cruces(indice, existencias, variaciones)
+    registrar(alertas)
+    return alertas
+
+
+def programar_notificacion():
+    """Encola notificar_alertas tras VENTANA_NOTIFICACION segundos si no hay uno pendiente."""
+    from .trabajos import encolar
+
+    if Trabajo.objects.filter(tipo="notificar_alertas", estado=Trabajo.PENDIENTE).exists():
+        return
+    encolar(
+        "notificar_alertas",
+        disponible_desde=timezone.now() + timedelta(seconds=VENTANA_NOTIFICACION),
+    )
+
+
+def _describir(alerta):
+    punto = alerta.punto
+    if punto.producto_id is not None:
+        objeto = f"Producto {punto.producto_id}"
+    elif punto.sobrante_id is not None:
+        objeto = f"Sobrante {punto.sobrante_id}"
+    else:
+        objeto = (
+            f"Sucursal {punto.sucursal_id}, material {punto.material_id}, "
+            f"categoría {punto.categoria or '-'}"
+        )
+    return f"{objeto}: {alerta.existencias} existencias (mínimo {alerta.minimo})"
+
+
+def notificar(limite=MAXIMO_POR_NOTIFICACION):
+    """Notifica juntas las alertas pendientes y las marca como notificadas.
+
+    Se escriben en el registro "inventario_app.alertas" y, si settings.TECTUM_ALERTAS_STOCK tiene
+    destinatarios, se envían en un solo correo.
+
+    Returns:
+        int: Número de alertas notificadas.
+    """
+    with transaction.atomic():
+        pendientes = list(
+            AlertaStock.objects.select_for_update()
+            .filter(notificada=None)
+            .select_related("punto")
+            .order_by("id")[:limite]
+        )
+        if not pendientes:
+            return 0
+        lineas = [_describir(alerta) for alerta in pendientes]
+        for linea in lineas:
+            logger.warning("Existencias bajo el mínimo: %s", linea)
+        destinatarios = getattr(settings, "TECTUM_ALERTAS_STOCK", ())
+        if destinatarios:
+            send_mail(
+                f"{len(lineas)} alertas de existencias bajas",
+                "\n".join(lineas),
+                None,
+                destinatarios,
+            )
+        AlertaStock.objects.filter(pk__in=[alerta.pk for alerta in pendientes]).update(
+            notificada=timezone.now()
+        )
+    if len(pendientes) == limite:
+        transaction.on_commit(programar_notificacion)
+    return len(pendientes)
+
+
+def _recordar_existencias(sender, instance, **kwargs):
+    # Sin leer los campos diferidos, que harían una consulta por objeto
+    setattr(instance, _ATRIBUTO_CARGADAS, instance.__dict__.get("existencias"))
+
+
+def _revisar_guardado(sender, instance, created, **kwargs):
+    anteriores = getattr(instance, _ATRIBUTO_CARGADAS, None)
+    nuevas = instance.__dict__.get("existencias")
+    setattr(instance, _ATRIBUTO_CARGADAS, nuevas)
+    if created or anteriores is None or nuevas is None or nuevas == anteriores:
+        return
+    llave = (PRODUCTO if sender is ProductoHojalateria else SOBRANTE, instance.pk)
+    vigilados = puntos().get(llave)
+    if vigilados:
+        registrar(_cruces({llave: vigilados}, {llave: nuevas}, {llave: nuevas - anteriores}))
+
+
+def _invalidar_puntos(sender, **kwargs):
+    invalidar(PuntoReorden)
+
+
+existencias_cambiadas.connect(revisar, dispatch_uid="inventario_app.alertas")
+for modelo in (ProductoHojalateria, Sobrante):
+    post_init.connect(_recordar_existencias, sender=modelo, dispatch_uid="inventario_app.alertas")
+    post_save.connect(_revisar_guardado, sender=modelo, dispatch_uid="inventario_app.alertas")
+post_save.connect(_invalidar_puntos, sender=PuntoReorden, dispatch_uid="inventario_app.alertas")
+post_delete.connect(_invalidar_puntos, sender=PuntoReorden, dispatch_uid="inventario_app.alertas")
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
 
 
-class TestAppConfig(AppConfig):
+class InventarioAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'test_app'
+    name = 'inventario_app'
+
+    def ready(self):
+        # Conecta los receptores que registran las alertas de existencias bajas, que publican
+        # las variaciones en el tablero en vivo y que cambian la versión de las opciones y de
+        # las tarifas, también en los procesos que no cargan las vistas (shell, run_workers)
+        from . import alertas, cotizacion, opciones, tablero  # noqa: F401
+
+        # Conecta la invalidación del usuario en caché y registra la revisión de la caché en todos
+        # los procesos, no sólo en los que cargan el backend de autenticación
+        from tectum import autenticacion  # noqa: F401
@@ -0,0 +1,45 @@
+"""Mediciones de rendimiento de la aplicación de inventario.
+
+Cada módulo expone una función run() que devuelve un diccionario con los resultados y puede
+ejecutarse directamente con "python -m inventario_app.benchmarks.<modulo>".
+"""
+
+import os
+from contextlib import contextmanager
+
+
+def preparar_django():
+    """Configura Django con tectum.settings cuando un benchmark se ejecuta como script."""
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tectum.settings")
+    django.setup()
+
+
+@contextmanager
+def datos_temporales():
+    """Ejecuta el bloque en una transacción que se revierte al salir, para no dejar datos sintéticos."""
+    from django.db import transaction
+
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def percentiles(tiempos, cortes=(50, 95, 99)):
+    """Percentiles en milisegundos de una lista de duraciones en segundos.
+
+    Args:
+        tiempos (list): Duraciones en segundos.
+        cortes (tuple): Percentiles a calcular.
+
+    Returns:
+        dict: {"p50": ms, "p95": ms, ...}
+    """
+    ordenados = sorted(tiempos)
+    if not ordenados:
+        return {f"p{corte}": None for corte in cortes}
+    return {
+        f"p{corte}": round(ordenados[min(len(ordenados) - 1, len(ordenados) * corte // 100)] * 1000, 3)
+        for corte in cortes
+    }
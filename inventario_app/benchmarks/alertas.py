@@ -0,0 +1,99 @@
+"""Costo por movimiento de inventario de la revisión de puntos de reorden.
+
+Registra movimientos de productos al azar sin puntos de reorden y con un punto por producto, y
+compara la latencia y las consultas por movimiento. El costo de la revisión no depende del número
+de productos: sólo se leen las existencias de los productos movidos que tienen un punto.
+"""
+
+import argparse
+import json
+import random
+import time
+
+from inventario_app.benchmarks import datos_temporales, percentiles, preparar_django
+
+
+def _medir(movimientos, productos, sucursal, material, azar):
+    from django.db import connection
+
+    from inventario_app.stock import registrar_movimiento_producto
+
+    consultas = []
+
+    def contar(ejecutar, sql, *args):
+        consultas.append(sql)
+        return ejecutar(sql, *args)
+
+    tiempos = []
+    with connection.execute_wrapper(contar):
+        for _ in range(movimientos):
+            producto = azar.choice(productos)
+            inicio = time.perf_counter()
+            registrar_movimiento_producto(producto, sucursal, material, azar.randint(-5, 4))
+            tiempos.append(time.perf_counter() - inicio)
+    return {
+        "ms": percentiles(tiempos),
+        "consultas_por_movimiento": round(len(consultas) / movimientos, 2),
+    }
+
+
+def run(productos=10_000, movimientos=2000, semilla=0):
+    """Mide registrar_movimiento_producto sin puntos de reorden y con un punto por producto.
+
+    Los datos se crean dentro de una transacción que se revierte al terminar.
+
+    Args:
+        productos (int): Productos del inventario.
+        movimientos (int): Movimientos registrados en cada variante.
+        semilla (int): Semilla del generador aleatorio.
+
+    Returns:
+        dict: Percentiles en milisegundos y consultas por movimiento de cada variante, y las
+        alertas registradas.
+    """
+    from inventario_app.models import (
+        AlertaStock,
+        Material,
+        ProductoHojalateria,
+        PuntoReorden,
+        Sucursal,
+    )
+    from inventario_app.opciones import invalidar
+
+    azar = random.Random(semilla)
+    with datos_temporales():
+        material = Material.objects.create(composicion="Zinc", espesor=5000, prepintado=False)
+        sucursal = Sucursal.objects.create(direccion="Sucursal de prueba", telefono="0")
+        creados = ProductoHojalateria.objects.bulk_create(
+            (ProductoHojalateria(categoria="canal", existencias=12) for _ in range(productos)),
+            batch_size=5000,
+        )
+        invalidar(PuntoReorden)
+        sin_puntos = _medir(movimientos, creados, sucursal, material, azar)
+
+        PuntoReorden.objects.bulk_create(
+            (PuntoReorden(producto=producto, minimo=10) for producto in creados),
+            batch_size=5000,
+        )
+        # bulk_create no envía señales, así que los puntos en memoria se invalidan a mano
+        invalidar(PuntoReorden)
+        con_puntos = _medir(movimientos, creados, sucursal, material, azar)
+        alertas = AlertaStock.objects.count()
+
+    return {
+        "productos": productos,
+        "movimientos": movimientos,
+        "sin_puntos": sin_puntos,
+        "con_puntos": con_puntos,
+        "alertas": alertas,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--productos", type=int, default=10_000)
+    parser.add_argument("--movimientos", type=int, default=2000)
+    parser.add_argument("--semilla", type=int, default=0)
+    argumentos = parser.parse_args()
+    preparar_django()
+    print(json.dumps(run(argumentos.productos, argumentos.movimientos, argumentos.semilla), indent=2))
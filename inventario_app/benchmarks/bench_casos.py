@@ -0,0 +1,84 @@
+"""Casos de pytest-benchmark para los escenarios de carga y los componentes de inventario.
+
+Requieren pytest-django y pytest-benchmark, y se ejecutan sobre una base de datos de prueba
+poblada una sola vez con datos sintéticos. No entran en la colección por defecto de pytest
+(pytest.ini), así que se pasa el archivo:
+
+    TECTUM_SQLITE=db.sqlite3 python -m pytest inventario_app/benchmarks/bench_casos.py --benchmark-json bench.json
+
+La escala se cambia con la variable de entorno TECTUM_BENCH_ESCALA (por defecto, 1000).
+"""
+
+import os
+from itertools import count
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("pytest_django")
+
+from django.core.management import call_command  # noqa: E402
+
+from inventario_app.benchmarks import carga  # noqa: E402
+from inventario_app.benchmarks.datos import generar_datos  # noqa: E402
+
+# Número de usuarios, productos y sobrantes sintéticos
+ESCALA = int(os.environ.get("TECTUM_BENCH_ESCALA", 1000))
+
+# Cada caso corre en una transacción que se revierte, así que los registros que crea no se acumulan
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(scope="module")
+def datos(django_db_setup, django_db_blocker):
+    """Datos sintéticos compartidos por los casos del módulo, borrados al terminar."""
+    with django_db_blocker.unblock():
+        filas = generar_datos(ESCALA, 0)
+        yield filas
+        call_command("flush", interactive=False, verbosity=0)
+
+
+@pytest.fixture(autouse=True)
+def depuracion(settings):
+    """Mide con DEBUG como manage.py bench: pytest-django lo desactiva y, fuera de DEBUG, el
+    almacenamiento de estáticos exige el manifiesto de collectstatic."""
+    settings.DEBUG = True
+
+
+@pytest.mark.parametrize("nombre", sorted(carga.ESCENARIOS))
+def test_escenario(benchmark, datos, nombre):
+    escenario = carga.ESCENARIOS[nombre]
+    url = carga._url(escenario)
+    cliente = carga._cliente_con_sesion(escenario)
+    metodo = getattr(cliente, escenario.metodo)
+    turnos = count()
+
+    def peticion():
+        datos = escenario.datos("pytest", next(turnos)) if escenario.datos else None
+        respuesta = metodo(url, datos) if datos else metodo(url)
+        if respuesta.streaming:
+            b"".join(respuesta.streaming_content)
+        return respuesta
+
+    respuesta = benchmark(peticion)
+    assert carga._exitosa(escenario, respuesta), respuesta.status_code
+
+
+def test_busqueda_productos(benchmark, datos):
+    from django.http import QueryDict
+
+    from inventario_app.busqueda import buscar_productos
+
+    parametros = QueryDict("categoria=canal&largo_min=0.2&tamano=50")
+    resultado = benchmark(buscar_productos, parametros)
+    assert "resultados" in resultado
+
+
+def test_cotizacion(benchmark, datos):
+    from inventario_app.benchmarks.cotizacion import generar_pedido
+    from inventario_app.cotizacion import cotizar
+    from inventario_app.models import Material
+
+    lineas = generar_pedido(list(Material.objects.values_list("pk", flat=True)), 1000)
+    resultado = benchmark(cotizar, lineas)
+    assert len(resultado["lineas"]) + len(resultado["errores"]) == len(lineas)
@@ -0,0 +1,117 @@
+"""Percentiles de latencia del buscador de productos sobre un catálogo sintético."""
+
+import argparse
+import json
+import random
+import time
+
+from inventario_app.benchmarks import datos_temporales, percentiles, preparar_django
+
+# Consultas representativas del buscador
+CONSULTAS = (
+    "categoria=canal",
+    "composicion=Zinc+prepintado&color=rojo",
+    "prepintado=false&largo_min=0.2&largo_max=0.5",
+    "q=ba&existencias_min=1",
+    "sucursal={sucursal}&categoria=bajada",
+    "ancho_min=0.1&ancho_max=0.3&alto_max=0.5",
+)
+
+
+def run(productos=100_000, consultas=300, semilla=0):
+    """Carga un catálogo sintético y mide las consultas del buscador.
+
+    Args:
+        productos (int): Número de productos del catálogo.
+        consultas (int): Número de búsquedas a medir.
+        semilla (int): Semilla del generador aleatorio.
+
+    Returns:
+        dict: Percentiles en milisegundos y número de consultas SQL por búsqueda.
+    """
+    from django.db import connection
+    from django.http import QueryDict
+    from django.test.utils import CaptureQueriesContext
+
+    from inventario_app.busqueda import buscar_productos
+    from inventario_app.models import Material, ProductoHojalateria, StockMovement, Sucursal
+
+    azar = random.Random(semilla)
+    categorias = ["canal", "bajada", "caballete", "ducto", "tubo", "chino", "abrazadera"]
+    with datos_temporales():
+        materiales = Material.objects.bulk_create(
+            Material(composicion=composicion, espesor=5000, prepintado=bool(color), color=color)
+            for composicion, color in [
+                ("Zinc galvanizado", None),
+                ("Zinc-aluminio", None),
+                ("Zinc prepintado", "rojo"),
+                ("Zinc prepintado", "verde"),
+                ("Laminado en frío", None),
+            ]
+        )
+        sucursal = Sucursal.objects.create(direccion="Sucursal de prueba", telefono="0")
+
+        def medida():
+            return azar.randint(1, 999)
+
+        creados = ProductoHojalateria.objects.bulk_create(
+            (
+                ProductoHojalateria(
+                    categoria=azar.choice(categorias),
+                    existencias=azar.randint(0, 50),
+                    largo=medida(),
+                    ancho=medida(),
+                    alto=medida(),
+                    radio=medida(),
+                )
+                for _ in range(productos)
+            ),
+            batch_size=5000,
+        )
+        intermedia = ProductoHojalateria.material.through
+        intermedia.objects.bulk_create(
+            (
+                intermedia(productohojalateria_id=producto.pk, material_id=azar.choice(materiales).pk)
+                for producto in creados
+            ),
+            batch_size=5000,
+        )
+        StockMovement.objects.bulk_create(
+            (
+                StockMovement(
+                    sucursal=sucursal,
+                    material=materiales[0],
+                    categoria=producto.categoria,
+                    producto_id=producto.pk,
+                    cantidad=1,
+                )
+                for producto in azar.sample(creados, min(len(creados), productos // 10))
+            ),
+            batch_size=5000,
+        )
+
+        tiempos = []
+        numero_consultas = set()
+        for indice in range(consultas):
+            parametros = QueryDict(CONSULTAS[indice % len(CONSULTAS)].format(sucursal=sucursal.pk))
+            with CaptureQueriesContext(connection) as capturadas:
+                inicio = time.perf_counter()
+                buscar_productos(parametros)
+                tiempos.append(time.perf_counter() - inicio)
+            numero_consultas.add(len(capturadas))
+
+    return {
+        "productos": productos,
+        "busqueda_ms": percentiles(tiempos),
+        "consultas_sql": sorted(numero_consultas),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--productos", type=int, default=100_000)
+    parser.add_argument("--consultas", type=int, default=300)
+    parser.add_argument("--semilla", type=int, default=0)
+    argumentos = parser.parse_args()
+    preparar_django()
+    print(json.dumps(run(argumentos.productos, argumentos.consultas, argumentos.semilla), indent=2))
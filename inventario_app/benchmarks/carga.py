@@ -0,0 +1,256 @@
+"""Generador de carga en el mismo proceso para las vistas de autenticación e inventario.
+
+Cada escenario se ejecuta con el cliente de pruebas de Django, que recorre la pila WSGI completa
+(middleware, sesión, vista y plantilla) sin sockets, o con el cliente asíncrono, que atiende las
+peticiones con el manejador ASGI sobre un bucle de asyncio, con las vistas síncronas o con las
+asíncronas de vistas_async. Se informan peticiones por segundo y percentiles de latencia por
+escenario.
+"""
+
+import asyncio
+import threading
+import time
+from collections import namedtuple
+from contextlib import nullcontext
+from functools import partial
+from itertools import count
+
+from inventario_app.benchmarks import percentiles
+from inventario_app.benchmarks.datos import CONTRASENA, PREFIJO_USUARIO
+
+# Escenario de carga: una URL con nombre, su método y si requiere una sesión iniciada.
+# datos es una función que recibe el manejador y el número de petición y devuelve el cuerpo del
+# POST. estados son los códigos de respuesta que cuentan como éxito (por defecto, menos de 400).
+Escenario = namedtuple(
+    "Escenario",
+    ["nombre", "metodo", "url", "argumentos", "consulta", "autenticado", "datos", "estados"],
+    defaults=((), "", False, None, ()),
+)
+
+# Rutas del despliegue ASGI con las vistas de lectura asíncronas
+URLCONF_ASINCRONO = "tectum.urls_async"
+
+# Usuario sintético con el que se inicia sesión en los escenarios autenticados
+USUARIO_CARGA = f"{PREFIJO_USUARIO}0"
+
+# Identificador de esta ejecución, para que los registros no choquen con los de corridas anteriores
+_corrida = int(time.time())
+
+
+def _datos_login(manejador, indice):
+    return {"username": USUARIO_CARGA, "password": CONTRASENA}
+
+
+def _datos_registro(manejador, indice):
+    # Los manejadores de una misma corrida registran usuarios distintos
+    usuario = f"carga_{_corrida}_{manejador}_{indice}"
+    return {
+        "username": usuario,
+        "first_name": "Carga",
+        "last_name": "Sintética",
+        "email": f"{usuario}@example.com",
+        "password": CONTRASENA,
+        "confirm_password": CONTRASENA,
+    }
+
+
+ESCENARIOS = {
+    escenario.nombre: escenario
+    for escenario in (
+        Escenario("landing", "get", "landing"),
+        # El inicio de sesión y el registro redirigen al tener éxito; con errores de formulario
+        # responden 200
+        Escenario("login", "post", "login", datos=_datos_login, estados=(302,)),
+        Escenario("registro", "post", "registration", datos=_datos_registro, estados=(302,)),
+        Escenario("bienvenida", "get", "welcome", autenticado=True),
+        Escenario("usuarios", "get", "user_list", autenticado=True),
+        Escenario("exportar_usuarios", "get", "user_export", ("csv",), autenticado=True),
+        Escenario(
+            "buscar_productos",
+            "get",
+            "product_search",
+            consulta="categoria=canal&largo_min=0.2",
+            autenticado=True,
+        ),
+    )
+}
+
+
+def _url(escenario):
+    from django.urls import reverse
+
+    url = reverse(escenario.url, args=escenario.argumentos)
+    return f"{url}?{escenario.consulta}" if escenario.consulta else url
+
+
+def _exitosa(escenario, respuesta):
+    if escenario.estados:
+        return respuesta.status_code in escenario.estados
+    return respuesta.status_code < 400
+
+
+def _resumen(tiempos, errores, duracion):
+    return {
+        "peticiones": len(tiempos),
+        "errores": errores,
+        "peticiones_por_segundo": round((len(tiempos) - errores) / duracion, 1) if duracion else None,
+        "latencia_ms": percentiles(tiempos),
+    }
+
+
+def _cliente_con_sesion(escenario):
+    """Cliente de pruebas que no relanza las excepciones de las vistas, con sesión si se requiere."""
+    from django.contrib.auth.models import User
+    from django.test import Client
+
+    cliente = Client(raise_request_exception=False)
+    if escenario.autenticado:
+        cliente.force_login(User.objects.get(username=USUARIO_CARGA))
+    return cliente
+
+
+def cargar_wsgi(escenario, peticiones=200, concurrencia=1, manejador="wsgi"):
+    """Ejecuta un escenario con el cliente de pruebas, repartido en hilos.
+
+    Args:
+        escenario (Escenario): Escenario a ejecutar.
+        peticiones (int): Número total de peticiones.
+        concurrencia (int): Hilos que envían peticiones a la vez, cada uno con su cliente.
+        manejador (str): Nombre del manejador con el que se generan los datos de las peticiones.
+
+    Returns:
+        dict: Peticiones, errores, peticiones por segundo y percentiles de latencia en ms.
+    """
+    from django.db import connection
+
+    url = _url(escenario)
+    turnos = count()
+    lock = threading.Lock()
+    tiempos = []
+    errores = [0]
+
+    def trabajador():
+        cliente = _cliente_con_sesion(escenario)
+        metodo = getattr(cliente, escenario.metodo)
+        try:
+            while True:
+                with lock:
+                    indice = next(turnos)
+                if indice >= peticiones:
+                    return
+                datos = escenario.datos(manejador, indice) if escenario.datos else None
+                inicio = time.perf_counter()
+                respuesta = metodo(url, datos) if datos else metodo(url)
+                if respuesta.streaming:
+                    b"".join(respuesta.streaming_content)
+                duracion = time.perf_counter() - inicio
+                with lock:
+                    tiempos.append(duracion)
+                    errores[0] += not _exitosa(escenario, respuesta)
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connection.close()
+
+    inicio = time.perf_counter()
+    if concurrencia <= 1:
+        trabajador()
+    else:
+        hilos = [threading.Thread(target=trabajador) for _ in range(concurrencia)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+    return _resumen(tiempos, errores[0], time.perf_counter() - inicio)
+
+
+async def _consumir(respuesta):
+    from asgiref.sync import sync_to_async
+
+    if not respuesta.streaming:
+        return
+    if respuesta.is_async:
+        async for _ in respuesta.streaming_content:
+            pass
+    else:
+        await sync_to_async(b"".join, thread_sensitive=True)(respuesta.streaming_content)
+
+
+async def _cargar_asgi(escenario, url, cookies, peticiones, concurrencia, manejador):
+    from django.test import AsyncClient
+
+    turnos = count()
+    tiempos = []
+    errores = 0
+
+    async def trabajador():
+        nonlocal errores
+        cliente = AsyncClient(raise_request_exception=False)
+        cliente.cookies = cookies
+        metodo = getattr(cliente, escenario.metodo)
+        while (indice := next(turnos)) < peticiones:
+            datos = escenario.datos(manejador, indice) if escenario.datos else None
+            inicio = time.perf_counter()
+            respuesta = await (metodo(url, datos) if datos else metodo(url))
+            await _consumir(respuesta)
+            tiempos.append(time.perf_counter() - inicio)
+            errores += not _exitosa(escenario, respuesta)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+    return _resumen(tiempos, errores, time.perf_counter() - inicio)
+
+
+def cargar_asgi(escenario, peticiones=200, concurrencia=1, urlconf=None, manejador="asgi"):
+    """Ejecuta un escenario con el cliente asíncrono sobre el manejador ASGI de Django.
+
+    Las corrutinas comparten un bucle de asyncio, así que la concurrencia no necesita hilos. La
+    sesión se crea antes de iniciar el bucle porque el inicio de sesión forzado usa el ORM síncrono.
+
+    Args:
+        escenario (Escenario): Escenario a ejecutar.
+        peticiones (int): Número total de peticiones.
+        concurrencia (int): Peticiones en curso a la vez.
+        urlconf (str): ROOT_URLCONF con el que se atienden las peticiones (por defecto, el actual).
+        manejador (str): Nombre del manejador con el que se generan los datos de las peticiones.
+
+    Returns:
+        dict: Peticiones, errores, peticiones por segundo y percentiles de latencia en ms.
+    """
+    from django.test import override_settings
+
+    with override_settings(ROOT_URLCONF=urlconf) if urlconf else nullcontext():
+        url = _url(escenario)
+        cookies = _cliente_con_sesion(escenario).cookies
+        return asyncio.run(
+            _cargar_asgi(escenario, url, cookies, peticiones, concurrencia, manejador)
+        )
+
+
+# Manejadores disponibles para el generador de carga
+MANEJADORES = {
+    "wsgi": cargar_wsgi,
+    "asgi": cargar_asgi,
+    "asgi_async": partial(cargar_asgi, urlconf=URLCONF_ASINCRONO, manejador="asgi_async"),
+}
+
+
+def run(escenarios=None, manejadores=("wsgi",), peticiones=200, concurrencia=1):
+    """Ejecuta los escenarios con cada manejador sobre los datos ya cargados.
+
+    Args:
+        escenarios (list): Nombres de los escenarios (por defecto, todos).
+        manejadores (tuple): Claves de MANEJADORES.
+        peticiones (int): Peticiones por escenario.
+        concurrencia (int): Peticiones simultáneas.
+
+    Returns:
+        dict: {manejador: {escenario: resumen}}
+    """
+    nombres = escenarios or list(ESCENARIOS)
+    return {
+        manejador: {
+            nombre: MANEJADORES[manejador](ESCENARIOS[nombre], peticiones, concurrencia)
+            for nombre in nombres
+        }
+        for manejador in manejadores
+    }
@@ -0,0 +1,69 @@
+"""Latencia por petición según cómo se obtiene la conexión a la base de datos.
+
+Simula el ciclo de una petición (revisión de la conexión al comenzar, una consulta y cierre al
+terminar) con una conexión nueva por petición, con conexiones persistentes (CONN_MAX_AGE) y, en
+PostgreSQL, con el pool de tectum.postgresql_pool.
+"""
+
+import argparse
+import json
+import time
+
+from inventario_app.benchmarks import percentiles, preparar_django
+
+# Ajustes de la conexión que se comparan: modo -> cambios sobre DATABASES["default"]
+MODOS = {
+    "nueva": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False},
+    "persistente": {"CONN_MAX_AGE": 60, "CONN_HEALTH_CHECKS": True},
+    "pool": {"ENGINE": "tectum.postgresql_pool", "CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False},
+}
+
+
+def _peticiones(conexion, peticiones):
+    tiempos = []
+    for _ in range(peticiones):
+        inicio = time.perf_counter()
+        # Lo mismo que hacen las señales request_started y request_finished
+        conexion.close_if_unusable_or_obsolete()
+        with conexion.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        conexion.close_if_unusable_or_obsolete()
+        tiempos.append(time.perf_counter() - inicio)
+    conexion.close()
+    return tiempos
+
+
+def run(peticiones=2000, alias="default"):
+    """Mide cada modo con una conexión independiente de las que usa Django.
+
+    Args:
+        peticiones (int): Peticiones simuladas por modo.
+        alias (str): Base de datos de settings.DATABASES sobre la que se mide.
+
+    Returns:
+        dict: Percentiles en milisegundos por modo. El modo pool sólo se mide con PostgreSQL.
+    """
+    from django.db import connections
+    from django.db.utils import load_backend
+
+    base = connections.settings[alias]
+    resultados = {"motor": base["ENGINE"]}
+    for modo, cambios in MODOS.items():
+        if modo == "pool" and connections[alias].vendor != "postgresql":
+            continue
+        ajustes = {**base, **cambios}
+        if modo != "pool" and ajustes["ENGINE"] == "tectum.postgresql_pool":
+            ajustes["ENGINE"] = "django.db.backends.postgresql"
+        conexion = load_backend(ajustes["ENGINE"]).DatabaseWrapper(ajustes, f"bench_{modo}")
+        resultados[modo] = percentiles(_peticiones(conexion, peticiones))
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--peticiones", type=int, default=2000)
+    parser.add_argument("--alias", default="default")
+    argumentos = parser.parse_args()
+    preparar_django()
+    print(json.dumps(run(argumentos.peticiones, argumentos.alias), indent=2))
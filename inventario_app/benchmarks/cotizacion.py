@@ -0,0 +1,108 @@
+"""Tiempo de cotización de pedidos grandes con el motor vectorizado y con la vista JSON."""
+
+import argparse
+import json
+import random
+import time
+
+from inventario_app.benchmarks import datos_temporales, percentiles, preparar_django
+
+# Categorías de los pedidos sintéticos: las de obras de aguas lluvia y ventilación
+CATEGORIAS = ("canal", "bajada", "caballete", "ducto", "tubo", "abrazadera")
+
+
+def generar_pedido(materiales, lineas, semilla=0):
+    """Genera líneas de pedido con medidas en metros; los ductos y tubos llevan radio en vez de ancho."""
+    azar = random.Random(semilla)
+    pedido = []
+    for _ in range(lineas):
+        categoria = azar.choice(CATEGORIAS)
+        linea = {
+            "material": azar.choice(materiales),
+            "categoria": categoria,
+            "largo": azar.randint(50, 600) / 100,
+            "cantidad": azar.randint(1, 40),
+        }
+        if categoria in ("ducto", "tubo"):
+            linea["radio"] = azar.randint(50, 300) / 1000
+        else:
+            linea["ancho"] = azar.randint(100, 1000) / 1000
+        pedido.append(linea)
+    return pedido
+
+
+def run(lineas=10_000, repeticiones=20, semilla=0):
+    """Cotiza un pedido sintético varias veces directamente y a través de la vista quote.
+
+    Los datos se crean dentro de una transacción que se revierte al terminar.
+
+    Args:
+        lineas (int): Líneas del pedido.
+        repeticiones (int): Veces que se cotiza el pedido en cada variante.
+        semilla (int): Semilla del generador aleatorio.
+
+    Returns:
+        dict: Percentiles en milisegundos de cotizar() y de la vista, incluida la serialización.
+    """
+    from django.contrib.auth.models import User
+    from django.test import Client
+    from django.urls import reverse
+
+    from inventario_app.cotizacion import cotizar
+    from inventario_app.models import Material, TarifaMaterial
+    from inventario_app.opciones import invalidar
+
+    with datos_temporales():
+        materiales = Material.objects.bulk_create(
+            Material(composicion=f"Material {i}", espesor=4000 + 1000 * i, prepintado=False)
+            for i in range(6)
+        )
+        TarifaMaterial.objects.bulk_create(
+            TarifaMaterial(material=material, categoria=categoria, precio_m2=8000 + 500 * i)
+            for i, material in enumerate(materiales)
+            for categoria in ("", "canal", "ducto")
+        )
+        # bulk_create no envía señales, así que las tarifas en memoria se invalidan a mano
+        invalidar(Material)
+        invalidar(TarifaMaterial)
+        pedido = generar_pedido([material.pk for material in materiales], lineas, semilla)
+        cuerpo = json.dumps({"lineas": pedido})
+
+        # La primera cotización lee las tarifas; las siguientes las toman de la memoria
+        inicio = time.perf_counter()
+        resultado = cotizar(pedido)
+        primera = time.perf_counter() - inicio
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            cotizar(pedido)
+            tiempos.append(time.perf_counter() - inicio)
+
+        usuario = User.objects.create_user("bench_cotizacion")
+        cliente = Client()
+        cliente.force_login(usuario)
+        tiempos_vista = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            respuesta = cliente.post(reverse("quote"), cuerpo, content_type="application/json")
+            tiempos_vista.append(time.perf_counter() - inicio)
+        if respuesta.status_code != 200:
+            raise AssertionError(f"La vista quote respondió {respuesta.status_code}")
+
+    return {
+        "lineas": lineas,
+        "errores": len(resultado["errores"]),
+        "primera_ms": round(primera * 1000, 3),
+        "cotizar_ms": percentiles(tiempos),
+        "vista_ms": percentiles(tiempos_vista),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lineas", type=int, default=10_000)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--semilla", type=int, default=0)
+    argumentos = parser.parse_args()
+    preparar_django()
+    print(json.dumps(run(argumentos.lineas, argumentos.repeticiones, argumentos.semilla), indent=2))
@@ -0,0 +1,225 @@
+"""Generadores de datos sintéticos para los benchmarks, desde mil hasta un millón de filas.
+
+Las filas se insertan por bloques con bulk_create, por lo que la memoria usada depende del tamaño
+del bloque y no de la escala. Todos los usuarios comparten una contraseña cifrada una sola vez.
+"""
+
+import random
+
+from inventario_app.importacion import en_bloques
+
+# Contraseña de todos los usuarios sintéticos
+CONTRASENA = "tectum-benchmark"
+
+# Prefijo de los nombres de usuario sintéticos
+PREFIJO_USUARIO = "bench_"
+
+# Número del RUT del primer trabajador sintético; cada trabajador usa este número más el id de
+# su usuario, así que los RUTs no se repiten
+RUT_BASE = 5_000_000
+
+# Filas por bulk_create
+TAMANO_BLOQUE = 5000
+
+# Composiciones y colores de los materiales sintéticos
+COMPOSICIONES = ("Zinc galvanizado", "Zinc-aluminio", "Zinc prepintado", "Laminado en frío")
+COLORES = ("rojo", "verde", "azul", "gris")
+
+# Categorías de los productos sintéticos
+CATEGORIAS = ("canal", "bajada", "caballete", "ducto", "tubo", "chino", "abrazadera")
+
+NOMBRES = ("Ana", "Benito", "Camila", "Diego", "Elena", "Felipe", "Gabriela", "Hugo")
+APELLIDOS = ("Araya", "Bravo", "Contreras", "Díaz", "Espinoza", "Fuentes", "González", "Muñoz")
+
+
+def _medida(azar):
+    return azar.randint(1, 999)
+
+
+def cantidades(escala):
+    """Número de filas de cada modelo para una escala dada.
+
+    Usuarios, productos y sobrantes crecen con la escala; trabajadores y sucursales en proporción.
+
+    Args:
+        escala (int): Número de usuarios, productos y sobrantes.
+
+    Returns:
+        dict: {modelo: número de filas}
+    """
+    return {
+        "usuarios": escala,
+        "sucursales": max(1, escala // 1000),
+        "materiales": len(COMPOSICIONES) * len(COLORES),
+        "trabajadores": max(1, escala // 10),
+        "productos": escala,
+        "sobrantes": escala,
+    }
+
+
+def generar_usuarios(cantidad, azar, tamano_bloque=TAMANO_BLOQUE):
+    """Crea usuarios sin privilegios con la contraseña CONTRASENA.
+
+    Returns:
+        list: Ids de los usuarios creados.
+    """
+    from django.contrib.auth.hashers import make_password
+    from django.contrib.auth.models import User
+
+    cifrada = make_password(CONTRASENA)
+    ids = []
+    for bloque in en_bloques(range(cantidad), tamano_bloque):
+        creados = User.objects.bulk_create(
+            User(
+                username=f"{PREFIJO_USUARIO}{indice}",
+                first_name=azar.choice(NOMBRES),
+                last_name=azar.choice(APELLIDOS),
+                email=f"{PREFIJO_USUARIO}{indice}@example.com",
+                password=cifrada,
+            )
+            for indice in bloque
+        )
+        ids.extend(usuario.pk for usuario in creados)
+    return ids
+
+
+def generar_sucursales(cantidad):
+    """Crea sucursales con dirección y teléfono correlativos.
+
+    Returns:
+        list: Ids de las sucursales creadas.
+    """
+    from inventario_app.models import Sucursal
+
+    creadas = Sucursal.objects.bulk_create(
+        Sucursal(direccion=f"Sucursal {indice}", telefono=f"+5622{indice:07d}")
+        for indice in range(cantidad)
+    )
+    return [sucursal.pk for sucursal in creadas]
+
+
+def generar_materiales():
+    """Crea un material por cada combinación de composición y color.
+
+    Returns:
+        list: Ids de los materiales creados.
+    """
+    from inventario_app.models import Material
+
+    creados = Material.objects.bulk_create(
+        Material(
+            composicion=composicion,
+            espesor=5000,
+            prepintado=composicion == "Zinc prepintado",
+            color=color if composicion == "Zinc prepintado" else None,
+        )
+        for composicion in COMPOSICIONES
+        for color in COLORES
+    )
+    return [material.pk for material in creados]
+
+
+def generar_trabajadores(usuarios, sucursales, azar, tamano_bloque=TAMANO_BLOQUE):
+    """Crea un trabajador por cada usuario de la lista y lo asocia a una sucursal al azar.
+
+    Returns:
+        list: Ids de los trabajadores creados.
+    """
+    from inventario_app.models import Sucursal, Trabajador
+
+    intermedia = Sucursal.trabajadores.through
+    ids = []
+    for bloque in en_bloques(usuarios, tamano_bloque):
+        creados = Trabajador.objects.bulk_create(
+            Trabajador(
+                user_id=usuario,
+                sucursal_id=azar.choice(sucursales),
+                rut=RUT_BASE + usuario,
+                direccion=f"Calle {azar.randint(1, 9999)}",
+                telefono=f"+569{azar.randint(10_000_000, 99_999_999)}",
+            )
+            for usuario in bloque
+        )
+        intermedia.objects.bulk_create(
+            intermedia(sucursal_id=trabajador.sucursal_id, trabajador_id=trabajador.pk)
+            for trabajador in creados
+        )
+        ids.extend(trabajador.pk for trabajador in creados)
+    return ids
+
+
+def generar_productos(cantidad, materiales, trabajadores, azar, tamano_bloque=TAMANO_BLOQUE):
+    """Crea productos con un material y un trabajador al azar.
+
+    Returns:
+        int: Número de productos creados.
+    """
+    from inventario_app.models import ProductoHojalateria
+
+    por_material = ProductoHojalateria.material.through
+    por_trabajador = ProductoHojalateria.Trabajador.through
+    for bloque in en_bloques(range(cantidad), tamano_bloque):
+        creados = ProductoHojalateria.objects.bulk_create(
+            ProductoHojalateria(
+                categoria=azar.choice(CATEGORIAS),
+                existencias=azar.randint(0, 50),
+                largo=_medida(azar),
+                ancho=_medida(azar),
+                alto=_medida(azar),
+                radio=_medida(azar),
+            )
+            for _ in bloque
+        )
+        por_material.objects.bulk_create(
+            por_material(productohojalateria_id=producto.pk, material_id=azar.choice(materiales))
+            for producto in creados
+        )
+        por_trabajador.objects.bulk_create(
+            por_trabajador(productohojalateria_id=producto.pk, trabajador_id=azar.choice(trabajadores))
+            for producto in creados
+        )
+    return cantidad
+
+
+def generar_sobrantes(cantidad, materiales, sucursales, azar, tamano_bloque=TAMANO_BLOQUE):
+    """Crea sobrantes de material al azar en las sucursales.
+
+    Returns:
+        int: Número de sobrantes creados.
+    """
+    from inventario_app.models import Sobrante
+
+    for bloque in en_bloques(range(cantidad), tamano_bloque):
+        Sobrante.objects.bulk_create(
+            Sobrante(
+                material_id=azar.choice(materiales),
+                sucursal_id=azar.choice(sucursales),
+                existencias=azar.randint(0, 3),
+                largo=azar.randint(100, 3000),
+                ancho=azar.randint(100, 1200),
+            )
+            for _ in bloque
+        )
+    return cantidad
+
+
+def generar_datos(escala=1000, semilla=0, tamano_bloque=TAMANO_BLOQUE):
+    """Puebla la base de datos con usuarios, sucursales, materiales, trabajadores, productos y sobrantes.
+
+    Args:
+        escala (int): Número de usuarios, productos y sobrantes (ver cantidades).
+        semilla (int): Semilla del generador aleatorio para obtener datos reproducibles.
+        tamano_bloque (int): Filas por bulk_create.
+
+    Returns:
+        dict: Número de filas creadas por modelo.
+    """
+    azar = random.Random(semilla)
+    numero = cantidades(escala)
+    usuarios = generar_usuarios(numero["usuarios"], azar, tamano_bloque)
+    sucursales = generar_sucursales(numero["sucursales"])
+    materiales = generar_materiales()
+    trabajadores = generar_trabajadores(usuarios[: numero["trabajadores"]], sucursales, azar, tamano_bloque)
+    generar_productos(numero["productos"], materiales, trabajadores, azar, tamano_bloque)
+    generar_sobrantes(numero["sobrantes"], materiales, sucursales, azar, tamano_bloque)
+    return numero
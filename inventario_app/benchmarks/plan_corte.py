@@ -0,0 +1,73 @@
+"""Tiempo de planificación de cortes con el motor de referencia, el motor NumPy y el pool de procesos."""
+
+import argparse
+import json
+import random
+import time
+
+from inventario_app.plan_corte import empaquetar_numpy, empaquetar_python, planificar_cortes
+
+
+def generar_medidas(cantidad, semilla=0):
+    """Genera medidas (largo, ancho) en milímetros parecidas a las de canales, bajadas y ductos."""
+    azar = random.Random(semilla)
+    return [
+        (azar.randint(20, 300) * 10, azar.randint(5, 100) * 10)
+        for _ in range(cantidad)
+    ]
+
+
+def _medir(funcion, *args, **kwargs):
+    inicio = time.perf_counter()
+    resultado = funcion(*args, **kwargs)
+    return resultado, time.perf_counter() - inicio
+
+
+def run(piezas=3000, piezas_pool=50_000, procesos=None, semilla=0):
+    """Compara los motores sobre el mismo pedido y mide un pedido grande con el pool de procesos.
+
+    Args:
+        piezas (int): Piezas del pedido con el que se comparan los dos motores.
+        piezas_pool (int): Piezas del pedido grande resuelto en paralelo.
+        procesos (int): Procesos del pool (por defecto, uno por CPU).
+        semilla (int): Semilla del generador aleatorio.
+
+    Returns:
+        dict: Segundos, planchas y aprovechamiento de cada variante.
+    """
+    medidas = generar_medidas(piezas, semilla)
+    lista = [(indice, largo, ancho) for indice, (largo, ancho) in enumerate(medidas)]
+
+    referencia, tiempo_python = _medir(empaquetar_python, lista)
+    vectorizado, tiempo_numpy = _medir(empaquetar_numpy, lista)
+    if referencia != vectorizado:
+        raise AssertionError("El motor NumPy no coincide con el motor de referencia")
+
+    grande = generar_medidas(piezas_pool, semilla + 1)
+    en_serie, tiempo_serie = _medir(planificar_cortes, grande, procesos=1)
+    en_paralelo, tiempo_paralelo = _medir(planificar_cortes, grande, procesos=procesos)
+
+    return {
+        "piezas": piezas,
+        "python_s": round(tiempo_python, 3),
+        "numpy_s": round(tiempo_numpy, 3),
+        "planchas": referencia.planchas,
+        "aprovechamiento": round(referencia.aprovechamiento, 4),
+        "piezas_pool": piezas_pool,
+        "serie_s": round(tiempo_serie, 3),
+        "serie_planchas": en_serie.planchas,
+        "serie_aprovechamiento": round(en_serie.aprovechamiento, 4),
+        "pool_s": round(tiempo_paralelo, 3),
+        "pool_planchas": en_paralelo.planchas,
+        "pool_aprovechamiento": round(en_paralelo.aprovechamiento, 4),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--piezas", type=int, default=3000)
+    parser.add_argument("--piezas-pool", type=int, default=50_000)
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--semilla", type=int, default=0)
+    argumentos = parser.parse_args()
+    print(json.dumps(run(argumentos.piezas, argumentos.piezas_pool, argumentos.procesos, argumentos.semilla), indent=2))
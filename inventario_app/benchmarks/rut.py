@@ -0,0 +1,247 @@
+"""Comparación de filas por segundo entre las rutas de validación de RUTs y búsqueda por RUT.
+
+Mide la validación individual, la validación en bloque con NumPy y la ruta rápida con caché
+frente a la implementación original de RutValidator, que se conserva aquí como referencia.
+medir_busqueda mide la búsqueda de trabajadores por RUT sobre la columna indexada.
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+
+from inventario_app.benchmarks import datos_temporales, percentiles, preparar_django
+from inventario_app.rut_field import RutValidator, normalizar_rut
+
+
+def generar_ruts(cantidad, semilla=0):
+    """Genera una mezcla de RUTs válidos e inválidos en formato "12345678-9".
+
+    Args:
+        cantidad (int): Número de RUTs a generar.
+        semilla (int): Semilla del generador aleatorio para obtener resultados reproducibles.
+
+    Returns:
+        list: RUTs generados.
+    """
+    azar = random.Random(semilla)
+    numeros = [azar.randint(1_000_000, 99_999_999) for _ in range(cantidad)]
+    verificadores = RutValidator.compute_check_digits(numeros)
+    ruts = []
+    for numero, verificador in zip(numeros, verificadores):
+        # Aproximadamente uno de cada diez RUTs lleva un dígito verificador al azar
+        if azar.random() < 0.1:
+            verificador = azar.choice("0123456789kK")
+        ruts.append(f"{numero}-{verificador}")
+    return ruts
+
+
+def validar_original(rut):
+    """Implementación original de RutValidator.__call__ (patrón sin compilar y diccionario por llamada)."""
+    if not re.match(r"^\d{7,8}-[0-9kK]$", rut):
+        return False
+    lista_rut = rut.split("-", 1)
+    numero_rut = lista_rut[0]
+    digito_rut = lista_rut[1]
+    factor = 2
+    total = 0
+    for digit in reversed(numero_rut):
+        total += int(digit) * factor
+        factor = (factor + 1) % 8 or 2
+    modulo_rut = total % 11
+    verificaciones = {
+        "0": 0,
+        "1": 10,
+        "2": 9,
+        "3": 8,
+        "4": 7,
+        "5": 6,
+        "6": 5,
+        "7": 4,
+        "8": 3,
+        "9": 2,
+        "k": 1,
+    }
+    return verificaciones.get(digito_rut.lower()) == modulo_rut
+
+
+def medir_ruta_rapida(ruts, repeticiones=5):
+    """Compara la implementación original con la ruta rápida, sin caché y con caché.
+
+    Args:
+        ruts (list): RUTs en formato "12345678-9".
+        repeticiones (int): Veces que se valida el lote, simulando reenvíos de formularios.
+
+    Returns:
+        dict: Validaciones por segundo de cada variante.
+    """
+    validador = RutValidator()
+    total = len(ruts) * repeticiones
+
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        originales = [validar_original(rut) for rut in ruts]
+    tiempo_original = time.perf_counter() - inicio
+
+    sin_cache = normalizar_rut.__wrapped__
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        rapidos = [sin_cache(rut) is not None for rut in ruts]
+    tiempo_rapido = time.perf_counter() - inicio
+
+    normalizar_rut.cache_clear()
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        cacheados = [validador.normalize(rut) is not None for rut in ruts]
+    tiempo_cache = time.perf_counter() - inicio
+
+    if not originales == rapidos == cacheados:
+        raise AssertionError("La ruta rápida no coincide con la implementación original")
+
+    return {
+        "original_por_segundo": round(total / tiempo_original),
+        "rapida_por_segundo": round(total / tiempo_rapido),
+        "rapida_con_cache_por_segundo": round(total / tiempo_cache),
+        "cache": normalizar_rut.cache_info()._asdict(),
+    }
+
+
+def run(cantidad=100_000, semilla=0):
+    """Mide ambas rutas de validación sobre el mismo lote y comprueba que coincidan.
+
+    Args:
+        cantidad (int): Número de RUTs del lote.
+        semilla (int): Semilla para generar el lote.
+
+    Returns:
+        dict: Filas por segundo de cada ruta y la aceleración obtenida.
+    """
+    ruts = generar_ruts(cantidad, semilla)
+    validador = RutValidator()
+
+    inicio = time.perf_counter()
+    individuales = [validador.is_valid_rut(rut) and validador.modulo_11(rut) for rut in ruts]
+    tiempo_individual = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    validos, _ = RutValidator.validate_many(ruts)
+    tiempo_bloque = time.perf_counter() - inicio
+
+    if validos.tolist() != individuales:
+        raise AssertionError("La validación en bloque no coincide con la validación individual")
+
+    # La caché sólo ayuda con valores repetidos, por lo que se mide sobre un lote que cabe en ella
+    repetidos = ruts[: normalizar_rut.cache_info().maxsize]
+
+    return {
+        "filas": cantidad,
+        "individual_filas_por_segundo": round(cantidad / tiempo_individual),
+        "bloque_filas_por_segundo": round(cantidad / tiempo_bloque),
+        "aceleracion": round(tiempo_individual / tiempo_bloque, 1),
+        "ruta_individual": medir_ruta_rapida(repetidos),
+    }
+
+
+def _formatear(numero, azar):
+    """RUT en uno de los formatos que se ingresan: con puntos, con guión o sin separadores."""
+    digito = RutValidator.compute_check_digits([numero])[0]
+    formato = azar.randrange(3)
+    if formato == 0:
+        return f"{numero:,}".replace(",", ".") + f"-{digito}"
+    return f"{numero}-{digito}" if formato == 1 else f"{numero}{digito}"
+
+
+def medir_busqueda(trabajadores=1_000_000, consultas=1000, lote=10_000, semilla=0):
+    """Mide la búsqueda de trabajadores por RUT sobre el índice único de Trabajador.rut.
+
+    Los datos se crean dentro de una transacción que se revierte al terminar. Como referencia se
+    mide también una búsqueda por texto exacto sobre una columna sin índice (el teléfono), que es
+    lo que costaba buscar un RUT guardado como texto libre.
+
+    Args:
+        trabajadores (int): Número de trabajadores (y de usuarios) sintéticos.
+        consultas (int): Búsquedas individuales con by_rut.
+        lote (int): RUTs que se resuelven con in_bulk_by_rut, la mitad de ellos inexistentes.
+        semilla (int): Semilla del generador aleatorio.
+
+    Returns:
+        dict: Percentiles en milisegundos de by_rut y de la búsqueda sin índice, y tiempos de
+        in_bulk_by_rut con y sin los datos del usuario y la sucursal (join).
+    """
+    from inventario_app.benchmarks.datos import (
+        RUT_BASE,
+        generar_sucursales,
+        generar_trabajadores,
+        generar_usuarios,
+    )
+    from inventario_app.models import Trabajador
+
+    azar = random.Random(semilla)
+    with datos_temporales():
+        usuarios = generar_usuarios(trabajadores, azar)
+        sucursales = generar_sucursales(max(1, trabajadores // 1000))
+        generar_trabajadores(usuarios, sucursales, azar)
+
+        muestra = azar.sample(usuarios, min(consultas, len(usuarios)))
+        tiempos = []
+        for usuario in muestra:
+            rut = _formatear(RUT_BASE + usuario, azar)
+            inicio = time.perf_counter()
+            Trabajador.objects.by_rut(rut)
+            tiempos.append(time.perf_counter() - inicio)
+
+        telefonos = list(
+            Trabajador.objects.filter(user_id__in=muestra[:20]).values_list("telefono", flat=True)
+        )
+        tiempos_sin_indice = []
+        for telefono in telefonos:
+            inicio = time.perf_counter()
+            Trabajador.objects.filter(telefono=telefono).first()
+            tiempos_sin_indice.append(time.perf_counter() - inicio)
+
+        # La mitad del lote son RUTs registrados y la otra mitad RUTs válidos que no existen
+        registrados = azar.sample(usuarios, min(lote // 2, len(usuarios)))
+        ruts = [_formatear(RUT_BASE + usuario, azar) for usuario in registrados]
+        ruts += [_formatear(RUT_BASE - 1 - indice, azar) for indice in range(lote - len(ruts))]
+        azar.shuffle(ruts)
+
+        inicio = time.perf_counter()
+        encontrados = Trabajador.objects.in_bulk_by_rut(ruts)
+        tiempo_lote = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        Trabajador.objects.select_related("user", "sucursal").in_bulk_by_rut(ruts)
+        tiempo_join = time.perf_counter() - inicio
+
+    if len(encontrados) != len(registrados):
+        raise AssertionError("in_bulk_by_rut no encontró todos los RUTs registrados")
+    return {
+        "trabajadores": trabajadores,
+        "by_rut": percentiles(tiempos),
+        "texto_sin_indice": percentiles(tiempos_sin_indice),
+        "in_bulk_by_rut": {
+            "ruts": len(ruts),
+            "encontrados": len(encontrados),
+            "ms": round(tiempo_lote * 1000, 1),
+            "con_usuario_y_sucursal_ms": round(tiempo_join * 1000, 1),
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--filas", type=int, default=100_000)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument(
+        "--trabajadores",
+        type=int,
+        help="Mide la búsqueda por RUT con este número de trabajadores en lugar de la validación",
+    )
+    argumentos = parser.parse_args()
+    if argumentos.trabajadores:
+        preparar_django()
+        resultado = medir_busqueda(argumentos.trabajadores, semilla=argumentos.semilla)
+    else:
+        resultado = run(argumentos.filas, argumentos.semilla)
+    print(json.dumps(resultado, indent=2))
@@ -0,0 +1,87 @@
+"""Latencia de la búsqueda de sobrantes y de la asignación de listas de cortes sobre un inventario grande."""
+
+import argparse
+import json
+import random
+import time
+
+from inventario_app.benchmarks import datos_temporales, percentiles, preparar_django
+
+
+def _medida(azar, minimo, maximo):
+    """Medida en milímetros, en centímetros enteros entre minimo y maximo."""
+    return azar.randint(minimo, maximo) * 10
+
+
+def run(sobrantes=100_000, consultas=500, cortes=200, semilla=0):
+    """Carga sobrantes sintéticos y mide la búsqueda individual y la asignación en lote.
+
+    Los datos se crean dentro de una transacción que se revierte al terminar.
+
+    Args:
+        sobrantes (int): Número de sobrantes en el inventario.
+        consultas (int): Número de búsquedas individuales a medir.
+        cortes (int): Largo de la lista de cortes de la asignación en lote.
+        semilla (int): Semilla del generador aleatorio.
+
+    Returns:
+        dict: Percentiles en milisegundos de la búsqueda y tiempo de la asignación en lote.
+    """
+    from inventario_app.models import Material, Sobrante, Sucursal
+    from inventario_app.sobrantes import asignar_cortes, buscar_sobrantes
+
+    azar = random.Random(semilla)
+    with datos_temporales():
+        materiales = Material.objects.bulk_create(
+            Material(composicion=f"Material {i}", espesor=5000, prepintado=False)
+            for i in range(4)
+        )
+        sucursales = Sucursal.objects.bulk_create(
+            Sucursal(direccion=f"Sucursal {i}", telefono="0") for i in range(5)
+        )
+        Sobrante.objects.bulk_create(
+            (
+                Sobrante(
+                    material=azar.choice(materiales),
+                    sucursal=azar.choice(sucursales),
+                    existencias=azar.randint(0, 3),
+                    largo=_medida(azar, 10, 300),
+                    ancho=_medida(azar, 10, 120),
+                )
+                for _ in range(sobrantes)
+            ),
+            batch_size=5000,
+        )
+
+        tiempos = []
+        for _ in range(consultas):
+            material = azar.choice(materiales)
+            sucursal = azar.choice(sucursales)
+            largo, ancho = _medida(azar, 10, 250), _medida(azar, 10, 100)
+            inicio = time.perf_counter()
+            buscar_sobrantes(material, sucursal, largo, ancho)
+            tiempos.append(time.perf_counter() - inicio)
+
+        lista = [(_medida(azar, 10, 200), _medida(azar, 10, 80)) for _ in range(cortes)]
+        inicio = time.perf_counter()
+        resultado = asignar_cortes(materiales[0], sucursales[0], lista)
+        tiempo_lote = time.perf_counter() - inicio
+
+    return {
+        "sobrantes": sobrantes,
+        "busqueda_ms": percentiles(tiempos),
+        "lote_cortes": cortes,
+        "lote_asignados": len(resultado.asignaciones),
+        "lote_ms": round(tiempo_lote * 1000, 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sobrantes", type=int, default=100_000)
+    parser.add_argument("--consultas", type=int, default=500)
+    parser.add_argument("--cortes", type=int, default=200)
+    parser.add_argument("--semilla", type=int, default=0)
+    argumentos = parser.parse_args()
+    preparar_django()
+    print(json.dumps(run(argumentos.sobrantes, argumentos.consultas, argumentos.cortes, argumentos.semilla), indent=2))
@@ -0,0 +1,119 @@
+"""Suscriptores concurrentes del tablero de existencias en vivo que atiende un worker.
+
+Abre miles de suscripciones a una sucursal en un event loop, cada una leída por su propia tarea a
+través del flujo SSE (sin HTTP), y publica eventos desde otro hilo, como lo hace el on_commit de
+una vista síncrona. Mide cuánto tarda cada evento en llegar a todos los suscriptores, la memoria
+por suscripción y cuántos suscriptores lentos (que dejan de leer) se descartan.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import tracemalloc
+
+from inventario_app.benchmarks import percentiles, preparar_django
+
+
+async def _leer(difusor, suscripcion, lento, recibidos):
+    async for mensaje in difusor.flujo(suscripcion):
+        if lento:
+            # Deja de leer después del primer mensaje hasta que se le descarta
+            await asyncio.sleep(3600)
+        # Un mensaje puede llevar varios eventos si el suscriptor se atrasó
+        recibidos(mensaje.count(b"event: existencias"))
+
+
+async def _medir(suscriptores, eventos, lentos, azar):
+    from inventario_app.tablero import Difusor, preparar
+
+    difusor = Difusor()
+    loop = asyncio.get_running_loop()
+    esperados = 0
+    pendientes = {"faltan": 0, "listo": None}
+
+    def recibidos(cantidad):
+        if not cantidad:
+            return
+        pendientes["faltan"] -= cantidad
+        if pendientes["faltan"] == 0:
+            pendientes["listo"].set_result(time.perf_counter())
+
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    inicio = time.perf_counter()
+    tareas = []
+    for _ in range(suscriptores):
+        lento = azar.random() < lentos
+        esperados += not lento
+        tareas.append(loop.create_task(_leer(difusor, difusor.suscribir(1), lento, recibidos)))
+    await asyncio.sleep(0)
+    suscripcion_s = time.perf_counter() - inicio
+    memoria = tracemalloc.get_traced_memory()[0] - antes
+    tracemalloc.stop()
+
+    tiempos = []
+    inicio_total = time.perf_counter()
+    for numero in range(1, eventos + 1):
+        evento = preparar(
+            {"sucursal": 1, "id": numero, "productos": {"1": -1}, "sobrantes": {}}
+        )
+        pendientes["faltan"] = esperados
+        pendientes["listo"] = loop.create_future()
+        inicio = time.perf_counter()
+        await loop.run_in_executor(None, difusor.publicar, 1, evento)
+        fin = await pendientes["listo"]
+        tiempos.append(fin - inicio)
+    total_s = time.perf_counter() - inicio_total
+
+    for tarea in tareas:
+        tarea.cancel()
+    await asyncio.gather(*tareas, return_exceptions=True)
+    return {
+        "suscriptores": suscriptores,
+        "suscripcion_s": round(suscripcion_s, 3),
+        "kb_por_suscriptor": round(memoria / suscriptores / 1024, 2),
+        "reparto_ms": percentiles(tiempos),
+        "entregas_por_segundo": round(esperados * eventos / total_s),
+        "descartadas": difusor.descartadas,
+    }
+
+
+def run(suscriptores=(1000, 5000, 10_000), eventos=200, lentos=0.01, semilla=0):
+    """Mide el reparto de eventos con distintas cantidades de suscriptores en un event loop.
+
+    Args:
+        suscriptores (tuple): Cantidades de suscriptores a medir.
+        eventos (int): Eventos publicados en cada medición; con más eventos que el tamaño de la
+            cola (TECTUM_TABLERO["COLA"]) los suscriptores lentos se descartan.
+        lentos (float): Fracción de suscriptores que deja de leer.
+        semilla (int): Semilla del generador aleatorio.
+
+    Returns:
+        dict: Por cantidad de suscriptores, el tiempo de suscripción, la memoria por suscriptor,
+        los percentiles en milisegundos del reparto de un evento a todos los suscriptores que
+        leen, las entregas por segundo y los suscriptores descartados.
+    """
+    azar = random.Random(semilla)
+    return {
+        "eventos": eventos,
+        "lentos": lentos,
+        "mediciones": [asyncio.run(_medir(n, eventos, lentos, azar)) for n in suscriptores],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--suscriptores", type=int, nargs="+", default=[1000, 5000, 10_000])
+    parser.add_argument("--eventos", type=int, default=200)
+    parser.add_argument("--lentos", type=float, default=0.01)
+    parser.add_argument("--semilla", type=int, default=0)
+    argumentos = parser.parse_args()
+    preparar_django()
+    print(
+        json.dumps(
+            run(argumentos.suscriptores, argumentos.eventos, argumentos.lentos, argumentos.semilla),
+            indent=2,
+        )
+    )
@@ -0,0 +1,65 @@
+"""Rendimiento de la cola de trabajos: trabajos encolados y ejecutados por segundo.
+
+Encola trabajos "eco" (que no hacen nada) para medir sólo el costo de la cola: tomar cada lote,
+marcarlo en curso y guardar los completados. Los workers cierran su conexión entre tareas, así que
+los trabajos no se crean dentro de datos_temporales sino que se eliminan al terminar.
+"""
+
+import argparse
+import json
+import time
+
+from inventario_app.benchmarks import preparar_django
+
+
+def run(trabajos=5000, hilos=4, lote=None):
+    """Encola trabajos sintéticos y los ejecuta con un worker hasta vaciar la cola.
+
+    Args:
+        trabajos (int): Número de trabajos a encolar.
+        hilos (int): Hilos del worker.
+        lote (int): Trabajos que el worker toma por consulta (por defecto, ocho por hilo).
+
+    Returns:
+        dict: Trabajos por segundo al encolar y al ejecutar, y los que quedaron sin completar.
+    """
+    from inventario_app.models import Trabajo
+    from inventario_app.trabajos import Worker, encolar_muchos
+
+    inicio = time.perf_counter()
+    creados = encolar_muchos("eco", ({"numero": numero} for numero in range(trabajos)))
+    tiempo_encolar = time.perf_counter() - inicio
+    ids = [trabajo.pk for trabajo in creados]
+    if None in ids:
+        # Motores sin RETURNING en bulk_create
+        ids = list(Trabajo.objects.filter(tipo="eco").values_list("pk", flat=True))
+
+    try:
+        worker = Worker(hilos=hilos, lote=lote, tipos=["eco"])
+        inicio = time.perf_counter()
+        worker.run(una_vez=True)
+        tiempo_ejecutar = time.perf_counter() - inicio
+        sin_completar = (
+            Trabajo.objects.filter(pk__in=ids).exclude(estado=Trabajo.COMPLETADO).count()
+        )
+    finally:
+        Trabajo.objects.filter(pk__in=ids).delete()
+
+    return {
+        "trabajos": trabajos,
+        "hilos": hilos,
+        "lote": worker.lote,
+        "encolados_por_segundo": round(trabajos / tiempo_encolar),
+        "ejecutados_por_segundo": round(trabajos / tiempo_ejecutar),
+        "sin_completar": sin_completar,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trabajos", type=int, default=5000)
+    parser.add_argument("--hilos", type=int, default=4)
+    parser.add_argument("--lote", type=int, default=None)
+    argumentos = parser.parse_args()
+    preparar_django()
+    print(json.dumps(run(argumentos.trabajos, argumentos.hilos, argumentos.lote), indent=2))
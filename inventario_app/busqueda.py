@@ -0,0 +1,235 @@
+"""Búsqueda de productos de hojalatería con filtros, facetas y paginación por cursor.
+
+Los filtros sobre relaciones muchos a muchos (materiales) y sobre la sucursal (libro de movimientos
+de inventario) se expresan con subconsultas EXISTS para no duplicar filas ni necesitar DISTINCT.
+Cada página cuesta un número fijo de consultas: la página, dos prefetch y una por cada faceta.
+
+Las medidas se reciben y se devuelven en metros, pero se filtran como milímetros enteros sobre los
+índices compuestos de ProductoHojalateria.
+"""
+
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Exists, OuterRef, Q
+
+from . import categorias
+from .medidas import a_metros, a_milimetros
+from .models import Material, ProductoHojalateria, StockMovement
+
+# Número de productos por página por defecto y máximo
+TAMANO_PAGINA = 50
+TAMANO_PAGINA_MAXIMO = 200
+
+# Dimensiones que aceptan filtros de rango con los parámetros <dimension>_min y <dimension>_max
+DIMENSIONES = ("largo", "ancho", "alto", "radio", "existencias")
+
+# Dimensiones que se reciben en metros y se guardan en milímetros
+MEDIDAS = ("largo", "ancho", "alto", "radio")
+
+# Límites de las columnas enteras (milímetros y existencias); los rangos se recortan a ellos para
+# que un valor enorme no desborde el entero de la consulta
+ENTERO_MINIMO = -(2**31)
+ENTERO_MAXIMO = 2**31 - 1
+
+# Valores aceptados para los parámetros booleanos
+VERDADEROS = {"1", "true", "si", "sí"}
+FALSOS = {"0", "false", "no"}
+
+MaterialDeProducto = ProductoHojalateria.material.through
+
+
+def _decimal(parametros, nombre):
+    valor = parametros.get(nombre)
+    if valor in (None, ""):
+        return None
+    try:
+        numero = Decimal(valor)
+    except InvalidOperation:
+        raise ValidationError(f"{nombre}: se esperaba un número")
+    # Decimal acepta "nan" e "Infinity", que no se pueden comparar ni convertir a milímetros
+    if not numero.is_finite():
+        raise ValidationError(f"{nombre}: se esperaba un número finito")
+    return numero
+
+
+def _entero(parametros, nombre):
+    valor = parametros.get(nombre)
+    if valor in (None, ""):
+        return None
+    if not valor.isdigit():
+        raise ValidationError(f"{nombre}: se esperaba un número entero")
+    return int(valor)
+
+
+def filtrar_productos(parametros):
+    """Aplica los filtros de la búsqueda a los productos.
+
+    Args:
+        parametros (QueryDict): Parámetros GET. Acepta categoria, grupo (grupo o subgrupo de
+            categorías de categorias.ARBOL), composicion, prepintado, color, sucursal, q (prefijo de categoría, composición o color) y <dimension>_min/_max (las medidas en metros).
+
+    Returns:
+        QuerySet: Productos filtrados.
+
+    Raises:
+        ValidationError: Si algún parámetro no tiene un formato válido.
+    """
+    productos = ProductoHojalateria.objects.all()
+
+    categoria = parametros.get("categoria")
+    if categoria:
+        productos = productos.filter(categoria=categoria)
+    grupo = parametros.get("grupo")
+    if grupo:
+        if grupo not in categorias.GRUPOS:
+            raise ValidationError(f"grupo: no existe el grupo de categorías {grupo}")
+        productos = productos.filter(categoria__in=categorias.codigos(grupo))
+
+    materiales = Q()
+    composicion = parametros.get("composicion")
+    if composicion:
+        materiales &= Q(material__composicion=composicion)
+    prepintado = (parametros.get("prepintado") or "").lower()
+    if prepintado in VERDADEROS:
+        materiales &= Q(material__prepintado=True)
+    elif prepintado in FALSOS:
+        materiales &= Q(material__prepintado=False)
+    elif prepintado:
+        raise ValidationError("prepintado: se esperaba true o false")
+    color = parametros.get("color")
+    if color:
+        materiales &= Q(material__color=color)
+    if materiales:
+        productos = productos.filter(
+            Exists(
+                MaterialDeProducto.objects.filter(materiales, productohojalateria=OuterRef("pk"))
+            )
+        )
+
+    sucursal = _entero(parametros, "sucursal")
+    if sucursal is not None:
+        productos = productos.filter(
+            Exists(StockMovement.objects.filter(producto=OuterRef("pk"), sucursal_id=sucursal))
+        )
+
+    for dimension in DIMENSIONES:
+        minimo = _decimal(parametros, f"{dimension}_min")
+        maximo = _decimal(parametros, f"{dimension}_max")
+        if dimension in MEDIDAS:
+            minimo = None if minimo is None else a_milimetros(minimo)
+            maximo = None if maximo is None else a_milimetros(maximo)
+        if minimo is not None:
+            minimo = min(max(minimo, ENTERO_MINIMO), ENTERO_MAXIMO)
+        if maximo is not None:
+            maximo = min(max(maximo, ENTERO_MINIMO), ENTERO_MAXIMO)
+        if minimo is not None:
+            productos = productos.filter(**{f"{dimension}__gte": minimo})
+        if maximo is not None:
+            productos = productos.filter(**{f"{dimension}__lte": maximo})
+
+    texto = (parametros.get("q") or "").strip()
+    if texto:
+        coincidentes = Material.objects.filter(
+            Q(composicion__startswith=texto) | Q(color__startswith=texto)
+        )
+        productos = productos.filter(
+            Q(categoria__startswith=texto.lower())
+            | Exists(
+                MaterialDeProducto.objects.filter(
+                    productohojalateria=OuterRef("pk"), material__in=coincidentes
+                )
+            )
+        )
+    return productos
+
+
+def facetas(productos):
+    """Cuenta los productos filtrados por cada valor de las facetas.
+
+    Args:
+        productos (QuerySet): Productos ya filtrados.
+
+    Returns:
+        dict: {faceta: {valor: número de productos}}
+    """
+    ids = productos.values("pk")
+    por_material = MaterialDeProducto.objects.filter(productohojalateria__in=ids)
+
+    def contar(consulta, campo, contado):
+        return {
+            str(fila[campo]): fila["total"]
+            for fila in consulta.values(campo)
+            .annotate(total=Count(contado, distinct=True))
+            .order_by(campo)
+        }
+
+    return {
+        "categoria": contar(productos, "categoria", "pk"),
+        "composicion": contar(por_material, "material__composicion", "productohojalateria"),
+        "prepintado": contar(por_material, "material__prepintado", "productohojalateria"),
+        "color": contar(
+            por_material.exclude(material__color=None), "material__color", "productohojalateria"
+        ),
+        "sucursal": contar(
+            StockMovement.objects.filter(producto__in=ids), "sucursal", "producto"
+        ),
+    }
+
+
+def buscar_productos(parametros):
+    """Ejecuta una búsqueda completa: filtros, una página de resultados y facetas.
+
+    La página se ordena por id y continúa desde el parámetro "despues" (id del último producto de
+    la página anterior).
+
+    Args:
+        parametros (QueryDict): Parámetros GET de la búsqueda.
+
+    Returns:
+        dict: Resultados serializables a JSON con las claves resultados, siguiente y facetas.
+
+    Raises:
+        ValidationError: Si algún parámetro no tiene un formato válido.
+    """
+    productos = filtrar_productos(parametros)
+    tamano = min(_entero(parametros, "tamano") or TAMANO_PAGINA, TAMANO_PAGINA_MAXIMO)
+
+    pagina = productos.order_by("pk")
+    despues = _entero(parametros, "despues")
+    if despues is not None:
+        pagina = pagina.filter(pk__gt=despues)
+    pagina = list(pagina.prefetch_related("material", "Trabajador")[: tamano + 1])
+
+    siguiente = None
+    if len(pagina) > tamano:
+        pagina = pagina[:tamano]
+        siguiente = pagina[-1].pk
+
+    return {
+        "resultados": [
+            {
+                "id": producto.pk,
+                "categoria": producto.categoria,
+                "grupo": categorias.grupo(producto.categoria),
+                "existencias": producto.existencias,
+                "largo": a_metros(producto.largo),
+                "ancho": a_metros(producto.ancho),
+                "alto": a_metros(producto.alto),
+                "radio": a_metros(producto.radio),
+                "materiales": [
+                    {
+                        "id": material.pk,
+                        "composicion": material.composicion,
+                        "prepintado": material.prepintado,
+                        "color": material.color,
+                    }
+                    for material in producto.material.all()
+                ],
+                "trabajadores": [trabajador.pk for trabajador in producto.Trabajador.all()],
+            }
+            for producto in pagina
+        ],
+        "siguiente": siguiente,
+        "facetas": facetas(productos),
+    }
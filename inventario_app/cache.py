@@ -0,0 +1,98 @@
+"""Caché de las páginas públicas y validación condicional (ETag / Last-Modified).
+
+Las páginas públicas son iguales para todos los visitantes anónimos, por lo que su respuesta
+completa se guarda en la caché y se entrega sin volver a ejecutar el motor de plantillas. Los
+usuarios autenticados siempre reciben una página generada para ellos.
+"""
+
+import hashlib
+import os
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.conf import settings
+from django.template.loader import get_template
+from django.views.decorators.cache import cache_page
+from django.views.decorators.http import condition
+
+# Segundos que se guarda una página pública para los visitantes anónimos
+CACHE_PAGINAS_PUBLICAS = 600
+
+# Prefijo de las llaves de caché de las páginas públicas
+PREFIJO_PAGINAS_PUBLICAS = "anonimo"
+
+# Fecha de modificación de cada grupo de plantillas, calculada una sola vez fuera de DEBUG
+_modificaciones = {}
+
+
+def modificacion_plantillas(nombres):
+    """Fecha de la última modificación de un grupo de plantillas.
+
+    Args:
+        nombres (tuple): Nombres de las plantillas, incluyendo las que extienden.
+
+    Returns:
+        datetime: Fecha de modificación más reciente.
+    """
+    if nombres not in _modificaciones or settings.DEBUG:
+        segundos = max(os.path.getmtime(get_template(nombre).origin.name) for nombre in nombres)
+        _modificaciones[nombres] = datetime.fromtimestamp(int(segundos), tz=timezone.utc)
+    return _modificaciones[nombres]
+
+
+def cache_anonimo(timeout=CACHE_PAGINAS_PUBLICAS):
+    """Guarda en caché la respuesta de una vista sólo para los visitantes anónimos.
+
+    La llave de cache_page incluye el idioma activo y las cabeceras de Vary de la respuesta
+    (Cookie, cuando la página usa la sesión o el token CSRF), así que un visitante nunca recibe la
+    página de otra sesión.
+
+    Args:
+        timeout (int): Segundos que se guarda la respuesta.
+    """
+
+    def decorador(vista):
+        cacheada = cache_page(timeout, key_prefix=PREFIJO_PAGINAS_PUBLICAS)(vista)
+
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            if request.user.is_authenticated:
+                return vista(request, *args, **kwargs)
+            return cacheada(request, *args, **kwargs)
+
+        return envoltura
+
+    return decorador
+
+
+def condicional_plantillas(*nombres):
+    """Responde 304 Not Modified a las peticiones GET condicionales de páginas estáticas.
+
+    El ETag combina la fecha de las plantillas con el usuario, porque la barra de navegación cambia
+    al iniciar sesión. Last-Modified sólo se envía a los visitantes anónimos.
+
+    Args:
+        nombres (str): Plantillas con las que se genera la página.
+    """
+    nombres = tuple(nombres)
+
+    def etag(request, *args, **kwargs):
+        fecha = modificacion_plantillas(nombres).isoformat()
+        usuario = request.user.pk if request.user.is_authenticated else "anonimo"
+        return hashlib.md5(f"{fecha}:{usuario}".encode(), usedforsecurity=False).hexdigest()
+
+    def ultima_modificacion(request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return None
+        return modificacion_plantillas(nombres)
+
+    return condition(etag_func=etag, last_modified_func=ultima_modificacion)
+
+
+def pagina_publica(*plantillas, timeout=CACHE_PAGINAS_PUBLICAS):
+    """Combina la validación condicional y la caché anónima para una página pública."""
+
+    def decorador(vista):
+        return wraps(vista)(condicional_plantillas(*plantillas)(cache_anonimo(timeout)(vista)))
+
+    return decorador
@@ -0,0 +1,122 @@
+"""Categorías de los productos de hojalatería y su índice plano.
+
+ARBOL es la fuente de las categorías: grupos con subgrupos opcionales y categorías hoja, que son
+los códigos que se guardan en ProductoHojalateria.categoria. El índice se calcula una sola vez al
+importar el módulo, así que obtener la etiqueta o el grupo de un código cuesta una búsqueda en un
+diccionario, y OPCIONES tiene los dos niveles que admiten los campos de elección de Django.
+"""
+
+from collections import namedtuple
+
+# Árbol de categorías: (código, etiqueta, hijos) para grupos y subgrupos, (código, etiqueta) para
+# las categorías. Los códigos de las categorías son únicos en todo el árbol.
+ARBOL = (
+    (
+        "lluvia",
+        "Aguas lluvia",
+        (
+            ("canal", "Canal"),
+            ("bajada", "Bajada"),
+            ("caballete", "Caballete"),
+            (
+                "cubierta",
+                "Cubierta",
+                (
+                    ("americana", "Cubierta Americana"),
+                    ("acanalada", "Cubierta Acanalada"),
+                    ("pizarreño", "Cubierta Pizarreño"),
+                    ("otra", "Cubierta Otros"),
+                ),
+            ),
+            ("otros_lluvia", "Otros"),
+        ),
+    ),
+    (
+        "ventilacion",
+        "Ventilación",
+        (
+            (
+                "gorro",
+                "Gorro",
+                (
+                    ("chino", "Gorro Chino"),
+                    ("cometa", "Gorro Cometa"),
+                    ("eolico", "Gorro Eólico"),
+                ),
+            ),
+            ("tubo", "Tubo"),
+            ("ducto", "Ducto"),
+            ("anillo", "Anillo"),
+            ("conector_t", "Conector T"),
+            ("campana", "Campana"),
+            ("otros_ventilacion", "Otros"),
+        ),
+    ),
+    (
+        "accesorios",
+        "Accesorios",
+        (
+            ("abrazadera", "Abrazadera"),
+            ("gancho", "Gancho"),
+            ("boquilla", "Boquilla"),
+            ("cubeta", "Cubeta"),
+            ("remache", "Remache"),
+            ("silicona", "Silicona"),
+            ("reduccion", "Reducción"),
+            ("otros_accesorios", "Otros"),
+        ),
+    ),
+)
+
+# Categoría del índice plano; subgrupo es None para las categorías que cuelgan del grupo
+Categoria = namedtuple("Categoria", ["codigo", "etiqueta", "grupo", "subgrupo"])
+
+
+def _indexar(arbol):
+    """Recorre el árbol y arma el índice por código, los grupos, sus miembros y las opciones."""
+    indice = {}
+    grupos = {}
+    miembros = {}
+    opciones = []
+
+    def hojas(nodos, grupo, subgrupo):
+        for nodo in nodos:
+            if len(nodo) == 3:
+                grupos[nodo[0]] = nodo[1]
+                yield from hojas(nodo[2], grupo, nodo[0])
+                continue
+            codigo, etiqueta = nodo
+            if codigo in indice:
+                raise ValueError(f"Código de categoría repetido: {codigo}")
+            indice[codigo] = Categoria(codigo, etiqueta, grupo, subgrupo)
+            miembros.setdefault(grupo, []).append(codigo)
+            if subgrupo:
+                miembros.setdefault(subgrupo, []).append(codigo)
+            yield codigo, etiqueta
+
+    for grupo, etiqueta_grupo, hijos in arbol:
+        grupos[grupo] = etiqueta_grupo
+        opciones.append((etiqueta_grupo, tuple(hojas(hijos, grupo, None))))
+    return indice, grupos, miembros, tuple(opciones)
+
+
+# Índice por código de categoría, etiquetas de grupos y subgrupos, códigos de cada grupo y
+# subgrupo, y opciones agrupadas por grupo
+INDICE, GRUPOS, MIEMBROS, OPCIONES = _indexar(ARBOL)
+
+
+def etiqueta(codigo):
+    """Etiqueta de una categoría, o el mismo código si no existe."""
+    categoria = INDICE.get(codigo)
+    return categoria.etiqueta if categoria else codigo
+
+
+def grupo(codigo):
+    """Código del grupo de una categoría, o None si no existe."""
+    categoria = INDICE.get(codigo)
+    return categoria.grupo if categoria else None
+
+
+def codigos(grupo_o_subgrupo):
+    """Códigos de las categorías de un grupo o subgrupo, en el orden del árbol."""
+    return MIEMBROS.get(grupo_o_subgrupo, [])
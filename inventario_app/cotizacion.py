@@ -0,0 +1,269 @@
+"""Cotización de pedidos de productos de hojalatería a partir de las tarifas por material.
+
+Cada línea de un pedido indica el material, la categoría, las medidas en metros y la cantidad. El
+área de plancha de una pieza es largo × ancho (el ancho es el desarrollo de la plancha) o, si la
+pieza sólo tiene radio, el manto de un cilindro de ese radio y ese largo. De ella salen el costo
+del material, el peso según el espesor del material y la mano de obra por pieza y por metro.
+
+Sólo la lectura de las líneas recorre el pedido en Python: las tarifas se buscan con
+np.searchsorted sobre arreglos ordenados y todos los montos se calculan para el pedido completo
+con arreglos de NumPy, en milímetros y pesos enteros. Las tarifas se guardan en memoria en cada
+proceso junto con las versiones de TarifaMaterial y Material (ver opciones.version), que están en
+la base de datos y cambian al guardar o eliminar una fila, así que un cambio en cualquier proceso
+obliga a los demás a leerlas de nuevo. Las escrituras en bloque (bulk_create, update) no envían
+señales y deben llamar a opciones.invalidar.
+"""
+
+import math
+from collections import namedtuple
+
+import numpy as np
+from django.core.exceptions import ValidationError
+from django.db.models.signals import post_delete, post_save
+
+from . import categorias
+from .medidas import MILIMETROS_POR_METRO
+from .models import Material, TarifaMaterial
+from .opciones import invalidar, versiones
+
+# Número máximo de líneas de un pedido
+MAXIMO_LINEAS = 20_000
+
+# Límites de cada línea: medidas en metros, piezas e id de material. Con ellos y tarifas de a lo
+# más 2^31 pesos (PositiveIntegerField), los montos de una línea caben en enteros de 64 bits: el
+# manto más grande, 2π · 50 m · 50 m por 100.000 piezas, cuesta menos de 3,4 · 10^18 pesos
+MAXIMO_MEDIDA = 50
+MAXIMO_CANTIDAD = 100_000
+MAXIMO_ID_MATERIAL = 2**53
+
+# Densidad en kg/m³ de las planchas: todas las composiciones son acero con recubrimiento
+DENSIDAD_PLANCHA = 7850
+
+# Índice de cada categoría en la clave de las tarifas; 0 es la tarifa de todas las categorías
+INDICE_CATEGORIAS = {"": 0, **{codigo: numero for numero, codigo in enumerate(categorias.INDICE, 1)}}
+
+# Milímetros cuadrados por metro cuadrado y micrones por metro, para los montos y el peso
+_MM2_POR_M2 = MILIMETROS_POR_METRO**2
+_UM_POR_M = 1_000_000
+
+# Tarifas en arreglos ordenados por clave (material * len(INDICE_CATEGORIAS) + categoría) y
+# espesores en micrones ordenados por id de material
+Tabla = namedtuple(
+    "Tabla",
+    ["claves", "precio_m2", "mano_obra_unidad", "mano_obra_metro", "materiales", "espesores"],
+)
+
+# Tabla en memoria con las versiones con las que se leyó: (versiones, Tabla)
+_tabla = None
+
+
+def _clave(material, categoria):
+    return material * len(INDICE_CATEGORIAS) + categoria
+
+
+def _leer_tabla():
+    """Lee las tarifas y los espesores de los materiales con dos consultas."""
+    filas = list(
+        TarifaMaterial.objects.values_list(
+            "material_id", "categoria", "precio_m2", "mano_obra_unidad", "mano_obra_metro"
+        )
+    )
+    filas = [
+        (_clave(material, INDICE_CATEGORIAS[categoria]), *montos)
+        for material, categoria, *montos in filas
+        if categoria in INDICE_CATEGORIAS
+    ]
+    tarifas = np.array(sorted(filas), dtype=np.int64).reshape(-1, 4)
+    materiales = np.array(
+        Material.objects.order_by("pk").values_list("pk", "espesor"), dtype=np.int64
+    ).reshape(-1, 2)
+    return Tabla(*tarifas.T, *materiales.T)
+
+
+def tabla():
+    """Tarifas vigentes, leídas de la base de datos sólo si cambiaron desde la última lectura.
+
+    Las versiones se leen antes que las tarifas: si cambian entre ambas lecturas, la llamada
+    siguiente vuelve a leerlas en lugar de quedarse con tarifas viejas.
+    """
+    global _tabla
+    vigentes = versiones(TarifaMaterial, Material)
+    actual = _tabla
+    if actual is None or actual[0] != vigentes:
+        actual = _tabla = (vigentes, _leer_tabla())
+    return actual[1]
+
+
+def _leer_linea(linea):
+    """Valores de una línea del pedido: (material, categoría, largo, ancho, radio, cantidad)."""
+    if not isinstance(linea, dict):
+        raise ValidationError("se esperaba un objeto")
+    try:
+        material = int(linea["material"])
+        largo = float(linea["largo"])
+        ancho = float(linea.get("ancho") or 0)
+        radio = float(linea.get("radio") or 0)
+        cantidad = int(linea.get("cantidad", 1))
+    except KeyError as exc:
+        raise ValidationError(f"falta {exc.args[0]}")
+    except (TypeError, ValueError, OverflowError):
+        raise ValidationError("material, largo, ancho, radio y cantidad deben ser números")
+    # Los límites evitan que los cálculos en enteros de 64 bits se desborden. Las comparaciones con
+    # NaN son falsas, así que una sola condición descarta también los valores no finitos
+    if not (
+        -MAXIMO_MEDIDA <= largo <= MAXIMO_MEDIDA
+        and -MAXIMO_MEDIDA <= ancho <= MAXIMO_MEDIDA
+        and -MAXIMO_MEDIDA <= radio <= MAXIMO_MEDIDA
+    ):
+        if not all(map(math.isfinite, (largo, ancho, radio))):
+            raise ValidationError("largo, ancho y radio deben ser números finitos")
+        raise ValidationError(f"las medidas no pueden superar {MAXIMO_MEDIDA} m")
+    if not -MAXIMO_CANTIDAD <= cantidad <= MAXIMO_CANTIDAD:
+        raise ValidationError(f"la cantidad no puede superar {MAXIMO_CANTIDAD}")
+    if not -MAXIMO_ID_MATERIAL <= material <= MAXIMO_ID_MATERIAL:
+        raise ValidationError("material desconocido")
+    return material, str(linea.get("categoria") or ""), largo, ancho, radio, cantidad
+
+
+def _a_milimetros(metros):
+    return np.rint(np.asarray(metros, dtype=np.float64) * MILIMETROS_POR_METRO).astype(np.int64)
+
+
+def _por_tarifa(cantidades, tarifas, unidad):
+    """Redondeo de cantidades * tarifas / unidad, sin formar el producto completo.
+
+    Se multiplica por separado la parte entera y el resto de cantidades / unidad, de modo que
+    ningún producto intermedio supere el mayor de los dos términos.
+    """
+    enteras, restos = np.divmod(cantidades, unidad)
+    return enteras * tarifas + (restos * tarifas + unidad // 2) // unidad
+
+
+def _buscar(ordenados, valores):
+    """Posición de cada valor en el arreglo ordenado y si está."""
+    if not len(ordenados):
+        return np.zeros(len(valores), dtype=np.int64), np.zeros(len(valores), dtype=bool)
+    posiciones = np.minimum(np.searchsorted(ordenados, valores), len(ordenados) - 1)
+    return posiciones, ordenados[posiciones] == valores
+
+
+def cotizar(lineas):
+    """Cotiza un pedido completo.
+
+    Args:
+        lineas (list): Diccionarios con material (id), categoria (código de categorias.ARBOL),
+            largo, ancho o radio en metros y cantidad (1 por defecto).
+
+    Returns:
+        dict: lineas (área en m², peso en kg, costo del material, mano de obra y total de cada
+        línea válida, con su índice), totales del pedido y errores por índice de línea.
+
+    Raises:
+        ValidationError: Si el pedido no es una lista o tiene más de MAXIMO_LINEAS líneas.
+    """
+    if not isinstance(lineas, list):
+        raise ValidationError("lineas: se esperaba una lista")
+    if len(lineas) > MAXIMO_LINEAS:
+        raise ValidationError(f"lineas: el máximo es {MAXIMO_LINEAS}")
+
+    errores = {}
+    valores = []
+    for numero, linea in enumerate(lineas):
+        try:
+            valores.append(_leer_linea(linea))
+        except ValidationError as error:
+            errores[numero] = error.messages[0]
+            valores.append((0, "", 0.0, 0.0, 0.0, 0))
+    material, categoria, largo, ancho, radio, cantidad = list(zip(*valores)) or [()] * 6
+
+    material = np.asarray(material, dtype=np.int64)
+    cantidad = np.asarray(cantidad, dtype=np.int64)
+    largo, ancho, radio = _a_milimetros(largo), _a_milimetros(ancho), _a_milimetros(radio)
+    # Las categorías distintas de un pedido son pocas: se traducen una vez y se reparten
+    distintas, inversa = np.unique(np.asarray(categoria, dtype=object), return_inverse=True)
+    indice = np.array(
+        [INDICE_CATEGORIAS.get(codigo, -1) for codigo in distintas], dtype=np.int64
+    )[inversa]
+
+    tarifas = tabla()
+    exacta, con_exacta = _buscar(tarifas.claves, _clave(material, indice))
+    general, con_general = _buscar(tarifas.claves, _clave(material, 0))
+    posicion = np.where(con_exacta, exacta, general)
+    espesor, con_material = _buscar(tarifas.materiales, material)
+
+    problemas = (
+        (indice < 0, "categoría desconocida"),
+        (~con_material, "material desconocido"),
+        (~(con_exacta | con_general) & con_material, "el material no tiene tarifa"),
+        (largo <= 0, "el largo debe ser positivo"),
+        ((ancho <= 0) & (radio <= 0), "se requiere ancho o radio"),
+        ((ancho < 0) | (radio < 0), "las medidas deben ser positivas"),
+        (cantidad <= 0, "la cantidad debe ser positiva"),
+    )
+    validas = np.ones(len(lineas), dtype=bool)
+    for numero in errores:
+        validas[numero] = False
+    for condicion, mensaje in problemas:
+        for numero in np.flatnonzero(condicion & validas).tolist():
+            errores[numero] = mensaje
+        validas &= ~condicion
+
+    seleccion = np.flatnonzero(validas)
+    largo, ancho, radio = largo[seleccion], ancho[seleccion], radio[seleccion]
+    cantidad, posicion = cantidad[seleccion], posicion[seleccion]
+
+    # Área en mm² de una pieza: rectángulo de plancha o manto del cilindro
+    area = np.where(ancho > 0, largo * ancho, np.rint(2 * np.pi * radio * largo).astype(np.int64))
+    area_total = area * cantidad
+    material_pesos = _por_tarifa(area_total, tarifas.precio_m2[posicion], _MM2_POR_M2)
+    mano_obra = tarifas.mano_obra_unidad[posicion] * cantidad + _por_tarifa(
+        largo * cantidad, tarifas.mano_obra_metro[posicion], MILIMETROS_POR_METRO
+    )
+    total = material_pesos + mano_obra
+    peso = (
+        area_total
+        * tarifas.espesores[espesor[seleccion]]
+        * (DENSIDAD_PLANCHA / (_MM2_POR_M2 * _UM_POR_M))
+    )
+
+    # Los totales del pedido se suman como enteros de Python, que no se desbordan
+    material_pesos, mano_obra, total = material_pesos.tolist(), mano_obra.tolist(), total.tolist()
+    resultado = [
+        {
+            "linea": numero,
+            "area_m2": area_linea,
+            "peso_kg": peso_linea,
+            "material": material_linea,
+            "mano_obra": mano_obra_linea,
+            "total": total_linea,
+        }
+        for numero, area_linea, peso_linea, material_linea, mano_obra_linea, total_linea in zip(
+            seleccion.tolist(),
+            np.round(area_total / _MM2_POR_M2, 4).tolist(),
+            np.round(peso, 3).tolist(),
+            material_pesos,
+            mano_obra,
+            total,
+        )
+    ]
+    return {
+        "lineas": resultado,
+        "totales": {
+            "area_m2": round(sum(area_total.tolist()) / _MM2_POR_M2, 4),
+            "peso_kg": round(float(peso.sum()), 3),
+            "material": sum(material_pesos),
+            "mano_obra": sum(mano_obra),
+            "total": sum(total),
+        },
+        "errores": [
+            {"linea": numero, "error": mensaje} for numero, mensaje in sorted(errores.items())
+        ],
+    }
+
+
+def _invalidar_tarifas(sender, **kwargs):
+    invalidar(TarifaMaterial)
+
+
+post_save.connect(_invalidar_tarifas, sender=TarifaMaterial, dispatch_uid="inventario_app.cotizacion")
+post_delete.connect(_invalidar_tarifas, sender=TarifaMaterial, dispatch_uid="inventario_app.cotizacion")
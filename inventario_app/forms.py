@@ -1,6 +1,10 @@
 from django import forms
 from django.contrib.auth.password_validation import validate_password
-from .models import Trabajador, Material, Sucursal
+from . import categorias
+from .medidas import MICRONES_POR_CENTIMETRO, MedidaField
+from .models import Sucursal
+from .opciones import OpcionesCacheadasField, autocompletar_field, etiqueta_sucursal
+from .rut_field import RutField
 from django.contrib.auth.models import User
 
 class RegistroMaterialForm(forms.ModelForm):
@@ -13,10 +17,10 @@ class RegistroMaterialForm(forms.ModelForm):
 
     # Opciones para el tipo de composición del material de hojalata.
     COMPOSICION_CHOICES = (
-        "Zinc galvanizado",
-        "Zinc-aluminio",
-        "Zinc prepintado",
-        "Laminado en frío",
+        ("Zinc galvanizado", "Zinc galvanizado"),
+        ("Zinc-aluminio", "Zinc-aluminio"),
+        ("Zinc prepintado", "Zinc prepintado"),
+        ("Laminado en frío", "Laminado en frío"),
     )
 
     # Campo de elección para la composición del material.
@@ -26,16 +30,14 @@ class RegistroMaterialForm(forms.ModelForm):
         required=True,
     )
 
-    # Campo decimal para el espesor de la plancha en centímetros.
-    espesor_input = forms.DecimalField(
-        label="Espesor de la plancha en centímetros",
-        max_digits=1,
-        decimal_places=3,
+    # Campo para el espesor de la plancha en centímetros, que se guarda en micrones.
+    espesor_input = MedidaField(
+        label="Espesor de la plancha en centímetros", escala=MICRONES_POR_CENTIMETRO
     )
 
     # Campo booleano para indicar si la plancha tiene o no prepintado.
     prepintado_input = forms.BooleanField(
-        label="Plancha con o sin prepintado", required=True
+        label="Plancha con o sin prepintado", required=False
     )
 
     # Campo de texto para especificar el color de la plancha.
@@ -43,8 +45,6 @@ class RegistroMaterialForm(forms.ModelForm):
         label="Color de la plancha",
         max_length=50,
         required=False,
-        null=True,
-        blank=True,
     )
 
 
@@ -55,90 +55,34 @@ class RegistroProductoForm(forms.ModelForm):
         forms (module): Módulo que contiene clases para la creación de formularios en Django.
     """
 
-    # Elecciones: Define las opciones de categorías como una lista de elecciones (choices)
-
-    CATEGORIA_CHOICES = (
-        (
-            "lluvia",
-            (
-                ("canal", "Canal"),
-                ("bajada", "Bajada"),
-                ("caballete", "Caballete"),
-                (
-                    "cubierta",
-                    (
-                        ("americana", "Cubierta Americana"),
-                        ("acanalada", "Cubierta Acanalada"),
-                        ("pizarreño", "Cubierta Pizarreño"),
-                        ("otra", "Cubierta Otros"),
-                    ),
-                ),
-                ("otros", "Otros"),
-            ),
-        ),
-        (
-            "ventilacion",
-            (
-                (
-                    "gorro",
-                    (
-                        ("chino", "Gorro Chino"),
-                        ("cometa", "Gorro Cometa"),
-                        ("eolico", "Gorro Eólico"),
-                    ),
-                ),
-                ("tubo", "Tubo"),
-                ("ducto", "Ducto"),
-                ("anillo", "Anillo"),
-                ("conector_t", "Conector T"),
-                ("campana", "Campana"),
-                ("otros", "Otros"),
-            ),
-        ),
-        (
-            "accesorios",
-            (
-                ("abrazadera", "Abrazadera"),
-                ("gancho", "Gancho"),
-                ("boquilla", "Boquilla"),
-                ("cubeta", "Cubeta"),
-                ("remache", "Remache"),
-                ("silicona", "Silicona"),
-                ("reduccion", "Reducción"),
-                ("otros", "Otros"),
-            ),
-        ),
-    )
+    # Elecciones: categorías agrupadas en los dos niveles que admite ChoiceField; el árbol
+    # completo y el índice por código están en categorias.py
+    CATEGORIA_CHOICES = categorias.OPCIONES
 
     # Campo para el tipo de producto
     categoria_input = forms.ChoiceField(
-        "Tipo de producto", choices=CATEGORIA_CHOICES, required=True
+        label="Tipo de producto", choices=CATEGORIA_CHOICES, required=True
     )
     # Campo para el tipo de material del producto
-    material_input = forms.ModelMultipleChoiceField(
-        "Material del que está hecho el producto",
-        queryset=Material.objects.all(),
+    material_input = autocompletar_field(
+        "materiales",
+        multiple=True,
+        label="Material del que está hecho el producto",
         required=True,
     )
     # Campo para el número en inventario
     existencias_input = forms.IntegerField(
-        "Número de productos en inventario", required=False
+        label="Número de productos en inventario", required=False
     )
     # Campo para los trabajadores responsables del producto
-    trabajador_input = forms.ModelMultipleChoiceField(
-        "Trabajadores que manufacturaron el producto", queryset=Trabajador.objects.all()
-    )
-    # Campo para las dimensiones del producto si es que aplica
-    largo_input = forms.DecimalField(
-        "Largo del producto en metros", max_digits=3, decimal_places=3
-    )
-    ancho_input = forms.DecimalField(
-        "Ancho del producto", max_digits=3, decimal_places=3
-    )
-    alto_input = forms.DecimalField("Alto del producto", max_digits=3, decimal_places=3)
-    radio_input = forms.DecimalField(
-        "Radio del producto", max_digits=3, decimal_places=3
+    trabajador_input = autocompletar_field(
+        "trabajadores", multiple=True, label="Trabajadores que manufacturaron el producto"
     )
+    # Campo para las dimensiones del producto en metros si es que aplica, que se guardan en milímetros
+    largo_input = MedidaField(label="Largo del producto en metros")
+    ancho_input = MedidaField(label="Ancho del producto en metros")
+    alto_input = MedidaField(label="Alto del producto en metros")
+    radio_input = MedidaField(label="Radio del producto en metros")
 
 
 class RegistroSucursalForm(forms.ModelForm):
@@ -149,14 +93,13 @@ class RegistroSucursalForm(forms.ModelForm):
     """
 
     direccion = forms.CharField(
-        "Dirección de la sucursal", max_length=200, required=True
+        label="Dirección de la sucursal", max_length=200, required=True
     )
     telefono = forms.CharField(
-        "Número de teléfono de la sucursal", max_length=10, required=True
+        label="Número de teléfono de la sucursal", max_length=10, required=True
     )
-    trabajadores = forms.ModelChoiceField(
-        verbose="Trabajadores asociados a la sucursal",
-        queryset=Trabajador.objects.all(),
+    trabajadores = autocompletar_field(
+        "trabajadores", label="Trabajadores asociados a la sucursal"
     )
 
 
@@ -168,27 +111,26 @@ class RegistroSobranteForm(forms.ModelForm):
     """
 
     # Campo para el material que compone el sobrante
-    material_input = forms.ModelChoiceField(
-        "Material que compone el sobrante",
-        queryset=Material.objects.all(),
-        required=True,
+    material_input = autocompletar_field(
+        "materiales", label="Material que compone el sobrante", required=True
     )
 
     # Campo para el número de existencias en inventario
     existencias_input = forms.IntegerField(
-        "Número en inventario", min_value=0, required=True
+        label="Número en inventario", min_value=0, required=True
     )
 
     # Campo para la sucursal que almacena el sobrante
-    sucursal_input = forms.ModelChoiceField(
-        "Sucursal que almacena el sobrante",
+    sucursal_input = OpcionesCacheadasField(
+        label="Sucursal que almacena el sobrante",
         queryset=Sucursal.objects.all(),
+        etiqueta=etiqueta_sucursal,
         required=True,
     )
 
-    # Campos para las dimensiones del sobrante en metros
-    largo_input = forms.DecimalField(max_digits=3, decimal_places=3, required=True)
-    ancho_input = forms.DecimalField(max_digits=3, decimal_places=3, required=True)
+    # Campos para las dimensiones del sobrante en metros, que se guardan en milímetros
+    largo_input = MedidaField(label="Largo del sobrante en metros", required=True)
+    ancho_input = MedidaField(label="Ancho del sobrante en metros", required=True)
 
 class RegistroTrabajador(forms.ModelForm):
     """Formulario para registrar a los trabajadores
@@ -197,4 +139,65 @@ class RegistroTrabajador(forms.ModelForm):
         forms (module): Clase de Django de la que se hereda la funcionalidad de los formularios
     """
     # Campo para el RUT
-    rut_input = forms.
\ No newline at end of file
+    rut_input = RutField(label="RUT del trabajador", required=True)
+
+    # Campo para la sucursal en la que se desempeña el trabajador
+    sucursal_input = OpcionesCacheadasField(
+        label="Sucursal en la que el trabajador se desempeña",
+        queryset=Sucursal.objects.all(),
+        etiqueta=etiqueta_sucursal,
+        required=False,
+    )
+
+    # Campos para los datos de contacto del trabajador
+    direccion_input = forms.CharField(
+        label="Dirección del trabajador", max_length=200, required=False
+    )
+    telefono_input = forms.CharField(
+        label="Teléfono de contacto del trabajador", max_length=20, required=False
+    )
+
+
+class RegistrationForm(forms.Form):
+    """Formulario de registro de usuarios
+
+    Valida que el nombre de usuario esté libre, que las contraseñas coincidan y que la contraseña
+    cumpla con AUTH_PASSWORD_VALIDATORS antes de crear el usuario.
+
+    Args:
+        forms (module): Clase de Django de la que se hereda la funcionalidad de los formularios
+    """
+
+    # Campos para los datos del usuario
+    username = forms.CharField(label="Nombre de usuario", max_length=150)
+    first_name = forms.CharField(label="Nombres", max_length=150)
+    last_name = forms.CharField(label="Apellidos", max_length=150)
+    email = forms.EmailField(label="Correo electrónico")
+
+    # Campos para la contraseña y su confirmación
+    password = forms.CharField(label="Contraseña", widget=forms.PasswordInput)
+    confirm_password = forms.CharField(label="Confirmar contraseña", widget=forms.PasswordInput)
+
+    def clean_username(self):
+        username = self.cleaned_data["username"]
+        if User.objects.filter(username=username).exists():
+            raise forms.ValidationError("El nombre de usuario ya está en uso.")
+        return username
+
+    def clean(self):
+        cleaned_data = super().clean()
+        password = cleaned_data.get("password")
+        if password and password != cleaned_data.get("confirm_password"):
+            self.add_error("confirm_password", "Las contraseñas no coinciden.")
+        elif password:
+            usuario = User(
+                username=cleaned_data.get("username", ""),
+                first_name=cleaned_data.get("first_name", ""),
+                last_name=cleaned_data.get("last_name", ""),
+                email=cleaned_data.get("email", ""),
+            )
+            try:
+                validate_password(password, usuario)
+            except forms.ValidationError as error:
+                self.add_error("password", error)
+        return cleaned_data
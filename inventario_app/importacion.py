@@ -0,0 +1,406 @@
+"""Importación masiva de materiales, trabajadores y productos desde archivos CSV o XLSX.
+
+Los archivos se leen como un flujo de filas que se procesa por bloques. Cada fila se valida con los
+campos de los formularios de registro (y con RutField para los RUT), las llaves foráneas se
+resuelven con mapas en memoria cargados una sola vez y cada bloque se escribe con bulk_create y
+bulk_update dentro de su propia transacción, incluyendo las filas de las tablas intermedias de las
+relaciones muchos a muchos. Como bulk_create y bulk_update no envían señales, cada bloque cambia
+además la versión del modelo (opciones.invalidar) para que las opciones y tarifas en caché de todos
+los procesos se vuelvan a leer. Las existencias de los productos no se escriben directamente: la
+diferencia con las actuales se registra en el libro de movimientos con stock.registrar_movimientos.
+"""
+
+import copy
+import csv
+from collections import namedtuple
+from itertools import islice
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .forms import RegistroMaterialForm, RegistroProductoForm, RegistroTrabajador
+from .models import Material, ProductoHojalateria, Sucursal, Trabajador
+from .opciones import invalidar
+from .stock import Movimiento, registrar_movimientos
+
+# Número de filas por bloque por defecto
+TAMANO_BLOQUE = 5000
+
+# Separador de los valores múltiples dentro de una celda (por ejemplo "1|4|7")
+SEPARADOR_MULTIPLE = "|"
+
+# Error de validación de una fila del archivo
+ErrorFila = namedtuple("ErrorFila", ["linea", "mensaje"])
+
+# Resultado de importar un bloque
+ResultadoBloque = namedtuple("ResultadoBloque", ["creados", "actualizados", "errores"])
+
+
+def leer_filas(ruta):
+    """Recorre las filas de un archivo CSV o XLSX como diccionarios sin cargarlo completo en memoria.
+
+    Args:
+        ruta (str): Ruta del archivo. Los archivos .xlsx requieren openpyxl.
+
+    Yields:
+        tuple: (número de línea, diccionario con los valores de la fila).
+    """
+    ruta = Path(ruta)
+    if ruta.suffix.lower() == ".xlsx":
+        try:
+            from openpyxl import load_workbook
+        except ImportError as exc:
+            raise ImportError("Se necesita openpyxl para importar archivos .xlsx") from exc
+
+        libro = load_workbook(ruta, read_only=True, data_only=True)
+        try:
+            filas = libro.active.iter_rows(values_only=True)
+            encabezados = [str(celda).strip() for celda in next(filas, ())]
+            for linea, valores in enumerate(filas, start=2):
+                yield linea, {
+                    columna: "" if valor is None else str(valor)
+                    for columna, valor in zip(encabezados, valores)
+                }
+        finally:
+            libro.close()
+        return
+
+    with open(ruta, newline="", encoding="utf-8-sig") as archivo:
+        lector = csv.DictReader(archivo)
+        for linea, fila in enumerate(lector, start=2):
+            yield linea, fila
+
+
+def en_bloques(filas, tamano=TAMANO_BLOQUE):
+    """Agrupa un iterable de filas en listas de a lo más tamano elementos."""
+    filas = iter(filas)
+    while True:
+        bloque = list(islice(filas, tamano))
+        if not bloque:
+            return
+        yield bloque
+
+
+def _opcional(campo):
+    """Copia de un campo de formulario que acepta valores vacíos."""
+    campo = copy.deepcopy(campo)
+    campo.required = False
+    return campo
+
+
+def _multiples(valor):
+    return [parte.strip() for parte in (valor or "").split(SEPARADOR_MULTIPLE) if parte.strip()]
+
+
+class Importador:
+    """Base de los importadores de cada tipo de registro.
+
+    Las subclases definen el modelo, los campos de formulario con los que se valida cada columna y
+    cómo se construye una instancia a partir de los valores ya validados.
+    """
+
+    # Modelo que se importa
+    modelo = None
+
+    # Columna del archivo -> campo del formulario de registro que la valida
+    campos = {}
+
+    def __init__(self):
+        self.cargar_mapas()
+
+    def cargar_mapas(self):
+        """Carga los mapas en memoria para resolver llaves foráneas sin consultas por fila."""
+
+    def validar(self, fila):
+        """Valida las columnas de una fila con los campos de formulario.
+
+        Returns:
+            dict: Valores limpios por columna.
+
+        Raises:
+            ValidationError: Si alguna columna no es válida.
+        """
+        limpios = {}
+        errores = []
+        for columna, campo in self.campos.items():
+            try:
+                # csv.DictReader deja en None las columnas que faltan en una fila corta
+                limpios[columna] = campo.clean((fila.get(columna) or "").strip())
+            except ValidationError as error:
+                errores.extend(f"{columna}: {mensaje}" for mensaje in error.messages)
+        if errores:
+            raise ValidationError(errores)
+        return limpios
+
+    def construir(self, limpios, fila):
+        """Crea la instancia del modelo (sin guardar) a partir de los valores validados.
+
+        Returns:
+            tuple: (instancia, relaciones muchos a muchos {campo: [ids]}).
+        """
+        raise NotImplementedError
+
+    def importar_bloque(self, bloque):
+        """Valida y guarda un bloque de filas en una sola transacción.
+
+        Las filas con una columna "id" que ya existe en la base de datos se actualizan con
+        bulk_update; el resto se crea con bulk_create.
+
+        Args:
+            bloque (list): Pares (línea, fila) del archivo.
+
+        Returns:
+            ResultadoBloque: Número de filas creadas y actualizadas, y errores de validación.
+        """
+        errores = []
+        construidos = []
+        for linea, fila in bloque:
+            try:
+                instancia, relaciones = self.construir(self.validar(fila), fila)
+            except ValidationError as error:
+                errores.append(ErrorFila(linea, "; ".join(error.messages)))
+                continue
+            identificador = (fila.get("id") or "").strip()
+            if identificador.isdigit():
+                instancia.pk = int(identificador)
+            construidos.append((instancia, relaciones))
+
+        self.asignar_existentes(construidos)
+        identificadores = [instancia.pk for instancia, _ in construidos if instancia.pk is not None]
+        existentes = set(
+            self.modelo.objects.filter(pk__in=identificadores).values_list("pk", flat=True)
+        )
+        nuevos = [par for par in construidos if par[0].pk not in existentes]
+        actualizados = [par for par in construidos if par[0].pk in existentes]
+
+        with transaction.atomic():
+            self.modelo.objects.bulk_create([instancia for instancia, _ in nuevos])
+            if actualizados:
+                self.modelo.objects.bulk_update(
+                    [instancia for instancia, _ in actualizados], self.campos_actualizables()
+                )
+            self.guardar_relaciones(nuevos, actualizados)
+            self.registrar_existencias(nuevos, actualizados)
+            if construidos:
+                invalidar(self.modelo)
+        return ResultadoBloque(len(nuevos), len(actualizados), errores)
+
+    def asignar_existentes(self, construidos):
+        """Asigna la llave primaria de las filas sin "id" que corresponden a un registro existente.
+
+        Por defecto sólo se usa la columna "id"; las subclases pueden buscar por otra llave única.
+        """
+
+    def campos_actualizables(self):
+        """Nombres de los campos concretos que bulk_update sobrescribe."""
+        return [
+            campo.name
+            for campo in self.modelo._meta.concrete_fields
+            if not campo.primary_key
+        ]
+
+    def registrar_existencias(self, nuevos, actualizados):
+        """Registra en el libro de movimientos las existencias de las filas, dentro de la transacción.
+
+        Por defecto no hace nada; los modelos con existencias las registran con
+        stock.registrar_movimientos en vez de escribirlas directamente.
+        """
+
+    def guardar_relaciones(self, nuevos, actualizados):
+        """Inserta en lote las filas de las tablas intermedias de las relaciones muchos a muchos.
+
+        Las relaciones de los registros actualizados se reemplazan por las del archivo.
+        """
+        pares = nuevos + actualizados
+        campos = {campo for _, relaciones in pares for campo in relaciones}
+        for campo in campos:
+            relacion = getattr(self.modelo, campo)
+            intermedia = relacion.through
+            origen = relacion.field.m2m_field_name()
+            destino = relacion.field.m2m_reverse_field_name()
+            if actualizados:
+                intermedia.objects.filter(
+                    **{f"{origen}__in": [instancia.pk for instancia, _ in actualizados]}
+                ).delete()
+            intermedia.objects.bulk_create(
+                [
+                    intermedia(**{f"{origen}_id": instancia.pk, f"{destino}_id": relacionado})
+                    for instancia, relaciones in pares
+                    for relacionado in relaciones.get(campo, ())
+                ],
+                batch_size=TAMANO_BLOQUE,
+            )
+
+
+class ImportadorMateriales(Importador):
+    """Columnas: composicion, espesor, prepintado, color."""
+
+    modelo = Material
+    campos = {
+        "composicion": RegistroMaterialForm.base_fields["composicion_input"],
+        "espesor": RegistroMaterialForm.base_fields["espesor_input"],
+        "prepintado": RegistroMaterialForm.base_fields["prepintado_input"],
+        "color": RegistroMaterialForm.base_fields["color_input"],
+    }
+
+    def construir(self, limpios, fila):
+        return (
+            Material(
+                composicion=limpios["composicion"],
+                espesor=limpios["espesor"],
+                prepintado=limpios["prepintado"],
+                color=limpios["color"] or None,
+            ),
+            {},
+        )
+
+
+class ImportadorTrabajadores(Importador):
+    """Columnas: usuario (nombre de usuario), rut, sucursal (id), direccion, telefono.
+
+    Las filas sin "id" cuyo RUT ya está registrado actualizan a ese trabajador. Los RUT repetidos
+    sólo se buscan dentro de cada bloque, así que la memoria no crece con el archivo: una fila que
+    repite el RUT de un bloque anterior, ya guardado, actualiza a ese trabajador.
+    """
+
+    modelo = Trabajador
+    campos = {
+        "rut": RegistroTrabajador.base_fields["rut_input"],
+        "direccion": RegistroTrabajador.base_fields["direccion_input"],
+        "telefono": RegistroTrabajador.base_fields["telefono_input"],
+    }
+
+    def cargar_mapas(self):
+        self.usuarios = dict(User.objects.values_list("username", "pk"))
+        self.sucursales = set(Sucursal.objects.values_list("pk", flat=True))
+
+    def importar_bloque(self, bloque):
+        # RUT del bloque en curso
+        self.ruts = set()
+        return super().importar_bloque(bloque)
+
+    def construir(self, limpios, fila):
+        # El RUT es único, así que un bloque no puede traer dos veces al mismo trabajador
+        if limpios["rut"] in self.ruts:
+            raise ValidationError("rut: repetido en el bloque")
+        usuario = self.usuarios.get((fila.get("usuario") or "").strip())
+        if usuario is None:
+            raise ValidationError("usuario: no existe")
+        sucursal = (fila.get("sucursal") or "").strip()
+        if sucursal and (not sucursal.isdigit() or int(sucursal) not in self.sucursales):
+            raise ValidationError("sucursal: no existe")
+        self.ruts.add(limpios["rut"])
+        return (
+            Trabajador(
+                user_id=usuario,
+                sucursal_id=int(sucursal) if sucursal else None,
+                rut=limpios["rut"],
+                direccion=limpios["direccion"] or None,
+                telefono=limpios["telefono"] or None,
+            ),
+            {},
+        )
+
+    def asignar_existentes(self, construidos):
+        sin_id = [instancia for instancia, _ in construidos if instancia.pk is None]
+        existentes = Trabajador.objects.only("pk", "rut").in_bulk_by_rut(
+            instancia.rut for instancia in sin_id
+        )
+        for instancia in sin_id:
+            existente = existentes.get(instancia.rut)
+            if existente is not None:
+                instancia.pk = existente.pk
+
+
+class ImportadorProductos(Importador):
+    """Columnas: categoria, existencias, sucursal (id), materiales (ids), trabajadores (ids), largo,
+    ancho, alto, radio.
+
+    Los materiales y trabajadores de un producto se separan con "|". Las existencias se registran
+    como un movimiento en la sucursal de la fila, contabilizado con el primer material del producto,
+    por la diferencia con las existencias actuales; sin valor en la columna no se modifican.
+    """
+
+    modelo = ProductoHojalateria
+    campos = {
+        "categoria": RegistroProductoForm.base_fields["categoria_input"],
+        "existencias": RegistroProductoForm.base_fields["existencias_input"],
+        "largo": _opcional(RegistroProductoForm.base_fields["largo_input"]),
+        "ancho": _opcional(RegistroProductoForm.base_fields["ancho_input"]),
+        "alto": _opcional(RegistroProductoForm.base_fields["alto_input"]),
+        "radio": _opcional(RegistroProductoForm.base_fields["radio_input"]),
+    }
+
+    # Motivo de los movimientos de existencias registrados por la importación
+    MOTIVO = "Importación"
+
+    def cargar_mapas(self):
+        self.materiales = set(Material.objects.values_list("pk", flat=True))
+        self.trabajadores = set(Trabajador.objects.values_list("pk", flat=True))
+        self.sucursales = set(Sucursal.objects.values_list("pk", flat=True))
+
+    def _resolver(self, fila, columna, existentes):
+        ids = []
+        for valor in _multiples(fila.get(columna)):
+            if not valor.isdigit() or int(valor) not in existentes:
+                raise ValidationError(f"{columna}: {valor} no existe")
+            ids.append(int(valor))
+        return ids
+
+    def construir(self, limpios, fila):
+        materiales = self._resolver(fila, "materiales", self.materiales)
+        if not materiales:
+            raise ValidationError("materiales: se requiere al menos uno")
+        trabajadores = self._resolver(fila, "trabajadores", self.trabajadores)
+        sucursal = (fila.get("sucursal") or "").strip()
+        if sucursal and (not sucursal.isdigit() or int(sucursal) not in self.sucursales):
+            raise ValidationError("sucursal: no existe")
+        if limpios["existencias"] is not None and not sucursal:
+            raise ValidationError("sucursal: se requiere para registrar existencias")
+
+        producto = ProductoHojalateria(
+            categoria=limpios["categoria"],
+            existencias=0,
+            largo=limpios["largo"],
+            ancho=limpios["ancho"],
+            alto=limpios["alto"],
+            radio=limpios["radio"],
+        )
+        # Existencias pedidas por la fila y dónde se registran, para registrar_existencias
+        producto.existencias_importadas = limpios["existencias"]
+        producto.sucursal_importada = int(sucursal) if sucursal else None
+        return producto, {"material": materiales, "Trabajador": trabajadores}
+
+    def campos_actualizables(self):
+        # Las existencias sólo cambian a través del libro de movimientos
+        return [campo for campo in super().campos_actualizables() if campo != "existencias"]
+
+    def registrar_existencias(self, nuevos, actualizados):
+        actuales = dict(
+            ProductoHojalateria.objects.select_for_update()
+            .filter(pk__in=[producto.pk for producto, _ in actualizados])
+            .values_list("pk", "existencias")
+        )
+        registrar_movimientos(
+            Movimiento(
+                sucursal=producto.sucursal_importada,
+                material=relaciones["material"][0],
+                categoria=producto.categoria,
+                cantidad=producto.existencias_importadas - actuales.get(producto.pk, 0),
+                producto=producto.pk,
+                motivo=self.MOTIVO,
+            )
+            for producto, relaciones in nuevos + actualizados
+            if producto.existencias_importadas is not None
+            and producto.existencias_importadas != actuales.get(producto.pk, 0)
+        )
+
+
+# Importadores disponibles por tipo de registro
+IMPORTADORES = {
+    "materiales": ImportadorMateriales,
+    "trabajadores": ImportadorTrabajadores,
+    "productos": ImportadorProductos,
+}
@@ -0,0 +1,160 @@
+import json
+import logging
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from inventario_app.benchmarks import (
+    alertas,
+    busqueda,
+    carga,
+    conexiones,
+    cotizacion,
+    plan_corte,
+    rut,
+    sobrantes,
+    tablero,
+    trabajos,
+)
+from inventario_app.benchmarks.datos import generar_datos
+
+# Benchmarks de componentes: nombre -> función que recibe la escala y devuelve sus resultados
+COMPONENTES = {
+    "rut": lambda escala: rut.run(cantidad=max(escala, 1000)),
+    "rut_busqueda": lambda escala: rut.medir_busqueda(trabajadores=escala),
+    "sobrantes": lambda escala: sobrantes.run(sobrantes=escala, consultas=200),
+    "plan_corte": lambda escala: plan_corte.run(piezas=min(escala, 3000), piezas_pool=escala),
+    "busqueda": lambda escala: busqueda.run(productos=escala, consultas=120),
+    "conexiones": lambda escala: conexiones.run(peticiones=2000),
+    "trabajos": lambda escala: trabajos.run(trabajos=max(escala, 1000)),
+    "cotizacion": lambda escala: cotizacion.run(lineas=max(escala, 10_000)),
+    "alertas": lambda escala: alertas.run(productos=escala),
+    "tablero": lambda escala: tablero.run(suscriptores=(max(escala, 1000),)),
+}
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el rendimiento de las vistas y de los componentes de inventario sobre una base de "
+        "datos de prueba desechable con datos sintéticos, y escribe los resultados en JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--escala",
+            type=int,
+            default=1000,
+            help="Número de usuarios, productos y sobrantes sintéticos (de 1.000 a 1.000.000)",
+        )
+        parser.add_argument("--peticiones", type=int, default=200, help="Peticiones por escenario")
+        parser.add_argument(
+            "--concurrencia", type=int, default=1, help="Peticiones simultáneas por escenario"
+        )
+        parser.add_argument(
+            "--manejador",
+            choices=sorted(carga.MANEJADORES) + ["todos"],
+            default="wsgi",
+            help="Pila con la que se atienden las peticiones (asgi_async usa las vistas asíncronas)",
+        )
+        parser.add_argument(
+            "--escenario",
+            action="append",
+            choices=sorted(carga.ESCENARIOS),
+            help="Escenario de carga a ejecutar (se puede repetir; por defecto, todos)",
+        )
+        parser.add_argument(
+            "--componente",
+            action="append",
+            choices=sorted(COMPONENTES),
+            help="Benchmark de componente a ejecutar (se puede repetir)",
+        )
+        parser.add_argument(
+            "--sin-carga", action="store_true", help="Omite los escenarios de carga HTTP"
+        )
+        parser.add_argument("--semilla", type=int, default=0)
+        parser.add_argument("--salida", help="Archivo JSON de resultados (por defecto, la salida estándar)")
+
+    def handle(self, *args, **options):
+        if options["escala"] < 1 or options["peticiones"] < 1 or options["concurrencia"] < 1:
+            raise CommandError("--escala, --peticiones y --concurrencia deben ser positivos.")
+        manejadores = (
+            tuple(sorted(carga.MANEJADORES)) if options["manejador"] == "todos" else (options["manejador"],)
+        )
+
+        resultados = {
+            "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "base_de_datos": connection.vendor,
+            "escala": options["escala"],
+            "peticiones": options["peticiones"],
+            "concurrencia": options["concurrencia"],
+        }
+
+        # Igual que el ejecutor de pruebas, se trabaja sobre una base de datos de prueba que se
+        # destruye al terminar. Con SQLite se usa un archivo temporal: la base en memoria
+        # compartida bloquea tablas completas y falla de inmediato con peticiones concurrentes.
+        # El entorno de pruebas admite el host "testserver" de los clientes y guarda los correos
+        # en memoria.
+        setup_test_environment()
+        nombre_original = connection.settings_dict["NAME"]
+        if connection.vendor == "sqlite" and not connection.settings_dict["TEST"]["NAME"]:
+            connection.settings_dict["TEST"]["NAME"] = os.path.join(
+                tempfile.gettempdir(), f"tectum_bench_{os.getpid()}.sqlite3"
+            )
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            inicio = time.perf_counter()
+            resultados["filas"] = generar_datos(options["escala"], options["semilla"])
+            resultados["generacion_s"] = round(time.perf_counter() - inicio, 3)
+            self.stderr.write(f"Datos sintéticos generados en {resultados['generacion_s']} s")
+
+            if not options["sin_carga"]:
+                # Los errores 500 se cuentan en el resumen en lugar de imprimir cada traza
+                logging.getLogger("django.request").setLevel(logging.CRITICAL)
+                resultados["carga"] = {}
+                for manejador in manejadores:
+                    resultados["carga"][manejador] = {}
+                    for nombre in options["escenario"] or list(carga.ESCENARIOS):
+                        resumen = carga.MANEJADORES[manejador](
+                            carga.ESCENARIOS[nombre], options["peticiones"], options["concurrencia"]
+                        )
+                        resultados["carga"][manejador][nombre] = resumen
+                        self.stderr.write(
+                            f"{manejador} {nombre}: {resumen['peticiones_por_segundo']} req/s, "
+                            f"p95 {resumen['latencia_ms']['p95']} ms, {resumen['errores']} errores"
+                        )
+
+            resultados["componentes"] = {}
+            for nombre in options["componente"] or ():
+                self.stderr.write(f"Componente {nombre}...")
+                resultados["componentes"][nombre] = COMPONENTES[nombre](options["escala"])
+        finally:
+            connection.creation.destroy_test_db(nombre_original, verbosity=0)
+            teardown_test_environment()
+
+        salida = json.dumps(resultados, indent=2, ensure_ascii=False, default=str)
+        if options["salida"]:
+            with open(options["salida"], "w", encoding="utf-8") as archivo:
+                archivo.write(salida + "\n")
+            self.stderr.write(self.style.SUCCESS(f"Resultados guardados en {options['salida']}"))
+        else:
+            self.stdout.write(salida)
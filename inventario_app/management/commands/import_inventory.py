@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario_app.importacion import IMPORTADORES, TAMANO_BLOQUE, en_bloques, leer_filas
+
+
+class Command(BaseCommand):
+    help = "Importa materiales, trabajadores o productos desde un archivo CSV o XLSX por bloques."
+
+    # Número máximo de errores de validación que se muestran
+    MAXIMO_ERRORES = 50
+
+    def add_arguments(self, parser):
+        parser.add_argument("tipo", choices=sorted(IMPORTADORES), help="Tipo de registro a importar")
+        parser.add_argument("archivo", help="Ruta del archivo .csv o .xlsx")
+        parser.add_argument(
+            "--bloque",
+            type=int,
+            default=TAMANO_BLOQUE,
+            help="Número de filas por bloque y por transacción",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            filas = leer_filas(options["archivo"])
+            importador = IMPORTADORES[options["tipo"]]()
+        except (OSError, ImportError) as exc:
+            raise CommandError(str(exc)) from exc
+
+        creados = actualizados = errores = 0
+        inicio = time.perf_counter()
+        try:
+            for bloque in en_bloques(filas, options["bloque"]):
+                resultado = importador.importar_bloque(bloque)
+                creados += resultado.creados
+                actualizados += resultado.actualizados
+                for error in resultado.errores:
+                    if errores < self.MAXIMO_ERRORES:
+                        self.stderr.write(f"Línea {error.linea}: {error.mensaje}")
+                    errores += 1
+
+                procesadas = creados + actualizados + errores
+                transcurrido = time.perf_counter() - inicio
+                self.stdout.write(
+                    f"{procesadas} filas procesadas ({procesadas / transcurrido:.0f} filas/s)"
+                )
+        except (OSError, ImportError, UnicodeDecodeError) as exc:
+            raise CommandError(str(exc)) from exc
+
+        transcurrido = time.perf_counter() - inicio
+        total = creados + actualizados + errores
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{creados} creados, {actualizados} actualizados, {errores} con errores "
+                f"en {transcurrido:.2f} s ({total / transcurrido if transcurrido else 0:.0f} filas/s)"
+            )
+        )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario_app.preparacion_estaticos import generar_logos, recortar_bootstrap
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera la versión recortada de Bootstrap y las variantes del logo en static/. Se ejecuta "
+        "al cambiar las plantillas o el logo, antes de collectstatic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sin-logos", action="store_true", help="No regenera las variantes del logo"
+        )
+
+    def handle(self, *args, **options):
+        completo, recortado = recortar_bootstrap()
+        self.stdout.write(f"Bootstrap: {completo} -> {recortado} bytes")
+        if options["sin_logos"]:
+            return
+        try:
+            rutas = generar_logos()
+        except ImportError as exc:
+            raise CommandError("Las variantes del logo requieren el paquete Pillow.") from exc
+        for ruta in rutas:
+            self.stdout.write(f"{ruta.name}: {ruta.stat().st_size} bytes")
@@ -0,0 +1,84 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario_app.importacion import en_bloques, leer_filas
+from inventario_app.usuarios import (
+    HASHER_RAPIDO,
+    TAMANO_LOTE,
+    crear_pool,
+    especificacion_de_fila,
+    provisionar_usuarios,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea usuarios en lote desde un archivo CSV o XLSX con las columnas username, password, "
+        "email, first_name, last_name, is_staff e is_superuser."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("archivo", help="Ruta del archivo con los usuarios")
+        parser.add_argument(
+            "--lote", type=int, default=TAMANO_LOTE, help="Número de usuarios por bulk_create"
+        )
+        parser.add_argument(
+            "--procesos",
+            type=int,
+            default=None,
+            help="Procesos para cifrar contraseñas (por defecto uno por CPU; 1 desactiva el pool)",
+        )
+        parser.add_argument(
+            "--hasher-rapido",
+            action="store_true",
+            help=f"Cifra con el hasher '{HASHER_RAPIDO}'; sólo para perfiles de desarrollo y pruebas",
+        )
+
+    def handle(self, *args, **options):
+        algoritmo = "default"
+        if options["hasher_rapido"]:
+            from django.conf import settings
+            from django.contrib.auth.hashers import get_hasher
+
+            if not settings.DEBUG:
+                raise CommandError("El hasher rápido sólo puede usarse con DEBUG activado.")
+            try:
+                get_hasher(HASHER_RAPIDO)
+            except ValueError as exc:
+                raise CommandError(str(exc)) from exc
+            algoritmo = HASHER_RAPIDO
+
+        pool = crear_pool(options["procesos"]) if options["procesos"] != 1 else None
+        creados = omitidos = 0
+        cifrado = insercion = 0.0
+        inicio = time.perf_counter()
+        try:
+            for bloque in en_bloques(leer_filas(options["archivo"]), options["lote"]):
+                especificaciones = []
+                for linea, fila in bloque:
+                    especificacion = especificacion_de_fila(fila)
+                    if especificacion is None:
+                        self.stderr.write(f"Línea {linea}: se requieren username y password")
+                        continue
+                    especificaciones.append(especificacion)
+
+                resultado = provisionar_usuarios(especificaciones, pool, algoritmo)
+                creados += resultado.creados
+                omitidos += resultado.omitidos
+                cifrado += resultado.tiempo_cifrado
+                insercion += resultado.tiempo_insercion
+        except (OSError, ImportError, UnicodeDecodeError) as exc:
+            raise CommandError(str(exc)) from exc
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        total = time.perf_counter() - inicio
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{creados} usuarios creados, {omitidos} omitidos en {total:.2f} s "
+                f"({creados / total if total else 0:.0f} usuarios/s; cifrado {cifrado:.2f} s, "
+                f"inserción {insercion:.2f} s)"
+            )
+        )
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario_app.reportes import RETRASO_SEGURO, TAMANO_BLOQUE, reconstruir, refrescar
+
+
+class Command(BaseCommand):
+    help = (
+        "Suma a los agregados diarios de los reportes los movimientos de inventario registrados "
+        "desde el último refresco."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--bloque", type=int, default=TAMANO_BLOQUE, help="Movimientos por transacción"
+        )
+        parser.add_argument(
+            "--retraso",
+            type=int,
+            default=RETRASO_SEGURO,
+            help="Segundos de antigüedad que debe tener un movimiento para sumarse",
+        )
+        parser.add_argument(
+            "--reconstruir",
+            action="store_true",
+            help="Borra los agregados y los vuelve a calcular desde el primer movimiento",
+        )
+
+    def handle(self, *args, **options):
+        if options["bloque"] < 1 or options["retraso"] < 0:
+            raise CommandError("--bloque debe ser positivo y --retraso no puede ser negativo.")
+        funcion = reconstruir if options["reconstruir"] else refrescar
+        inicio = time.perf_counter()
+        resultado = funcion(options["bloque"], options["retraso"])
+        self.stdout.write(
+            f"{resultado.movimientos} movimientos sumados en {resultado.bloques} bloques "
+            f"({time.perf_counter() - inicio:.2f} s); último movimiento: {resultado.ultimo_movimiento}"
+        )
@@ -0,0 +1,94 @@
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from inventario_app.trabajos import INTERVALO_ESPERA, TAREAS, Worker
+
+
+def _atender(detener, hilos, lote, tipos, intervalo, una_vez):
+    """Atiende la cola con un worker hasta que se activa detener."""
+    worker = Worker(hilos=hilos, lote=lote, tipos=tipos, intervalo=intervalo)
+    worker.detener = detener
+    try:
+        worker.run(una_vez=una_vez)
+    finally:
+        connections.close_all()
+
+
+def _proceso_hijo(*argumentos):
+    # El proceso padre recibe las señales y activa detener
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    _atender(*argumentos)
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta los trabajos en segundo plano de la cola en la base de datos con un pool de "
+        "procesos y de hilos por proceso."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--procesos", type=int, default=1, help="Procesos worker")
+        parser.add_argument("--hilos", type=int, default=4, help="Trabajos simultáneos por proceso")
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=None,
+            help="Trabajos que cada proceso toma por consulta (por defecto, ocho por hilo)",
+        )
+        parser.add_argument(
+            "--tipo",
+            action="append",
+            dest="tipos",
+            choices=sorted(TAREAS),
+            help="Tipo de trabajo que se atiende (se puede repetir; por defecto, todos)",
+        )
+        parser.add_argument(
+            "--intervalo",
+            type=float,
+            default=INTERVALO_ESPERA,
+            help="Segundos de espera cuando la cola está vacía",
+        )
+        parser.add_argument(
+            "--una-vez", action="store_true", help="Termina cuando la cola queda vacía"
+        )
+
+    def handle(self, *args, **options):
+        if options["procesos"] < 1 or options["hilos"] < 1:
+            raise CommandError("--procesos y --hilos deben ser positivos.")
+        argumentos = (
+            options["hilos"],
+            options["lote"],
+            options["tipos"],
+            options["intervalo"],
+            options["una_vez"],
+        )
+        detener = multiprocessing.Event()
+
+        def al_recibir_senal(numero, marco):
+            self.stdout.write("Deteniendo los workers al terminar sus trabajos en curso...")
+            detener.set()
+
+        signal.signal(signal.SIGINT, al_recibir_senal)
+        signal.signal(signal.SIGTERM, al_recibir_senal)
+
+        self.stdout.write(
+            f"{options['procesos']} procesos con {options['hilos']} hilos atendiendo la cola"
+        )
+        if options["procesos"] == 1:
+            _atender(detener, *argumentos)
+            return
+
+        # Los procesos hijos no deben heredar las conexiones abiertas del padre
+        connections.close_all()
+        procesos = [
+            multiprocessing.Process(target=_proceso_hijo, args=(detener, *argumentos))
+            for _ in range(options["procesos"])
+        ]
+        for proceso in procesos:
+            proceso.start()
+        for proceso in procesos:
+            proceso.join()
@@ -0,0 +1,122 @@
+"""Medidas guardadas como enteros: milímetros para largos y micrones para espesores.
+
+Los formularios siguen mostrando y recibiendo metros y centímetros, pero en la base de datos y en
+Python las medidas son enteros, de modo que los filtros de rango, los ordenamientos y las sumas de
+áreas se resuelven con aritmética entera, tanto en SQL como en NumPy, sin pasar por Decimal.
+
+- MedidaModelField: columna entera con la escala de la unidad que ve el usuario.
+- MedidaField: campo de formulario que valida la medida en metros o centímetros y la devuelve entera.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from django import forms
+from django.db import models
+
+# Milímetros por metro: largos, anchos, altos y radios se guardan en milímetros
+MILIMETROS_POR_METRO = 1000
+
+# Micrones por centímetro: el espesor de las planchas se guarda en micrones
+MICRONES_POR_CENTIMETRO = 10_000
+
+# Milímetros cuadrados por metro cuadrado, para las áreas de los reportes
+MILIMETROS2_POR_METRO2 = MILIMETROS_POR_METRO**2
+
+
+def _decimales(escala):
+    """Número de decimales de la unidad visible que caben en la unidad entera (1000 -> 3)."""
+    return len(str(escala)) - 1
+
+
+def a_entero(valor, escala):
+    """Convierte una medida en la unidad visible (Decimal, float o texto) al entero guardado.
+
+    Raises:
+        ValueError: Si el valor no es un número.
+    """
+    try:
+        valor = Decimal(str(valor)) * escala
+    except InvalidOperation:
+        raise ValueError(f"Medida inválida: {valor!r}")
+    return int(valor.to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def a_decimal(valor, escala):
+    """Convierte un entero guardado a Decimal en la unidad visible, sin perder precisión."""
+    if valor is None:
+        return None
+    return (Decimal(valor) / escala).quantize(Decimal(1).scaleb(-_decimales(escala)))
+
+
+def formatear(valor, escala):
+    """Texto de un entero guardado en la unidad visible, sin ceros de más (5000, 10000 -> "0.5")."""
+    return f"{a_decimal(valor, escala).normalize():f}"
+
+
+def a_milimetros(metros):
+    """Convierte una medida en metros (Decimal, float o texto) a milímetros enteros."""
+    return a_entero(metros, MILIMETROS_POR_METRO)
+
+
+def a_metros(milimetros):
+    """Convierte milímetros enteros a metros con tres decimales."""
+    return a_decimal(milimetros, MILIMETROS_POR_METRO)
+
+
+def a_centimetros(micrones):
+    """Convierte micrones enteros a centímetros con cuatro decimales."""
+    return a_decimal(micrones, MICRONES_POR_CENTIMETRO)
+
+
+def a_metros_cuadrados(milimetros2):
+    """Convierte un área en milímetros cuadrados enteros a metros cuadrados."""
+    return a_decimal(milimetros2, MILIMETROS2_POR_METRO2)
+
+
+class MedidaField(forms.DecimalField):
+    """Campo de formulario para una medida en metros o centímetros que se guarda como entero.
+
+    Acepta tantos decimales como permite la unidad entera (tres para metros en milímetros, cuatro
+    para centímetros en micrones) y clean() devuelve el entero. Los valores iniciales enteros se
+    muestran en la unidad visible.
+    """
+
+    def __init__(self, *, escala=MILIMETROS_POR_METRO, **kwargs):
+        self.escala = escala
+        kwargs.setdefault("min_value", 0)
+        kwargs.setdefault("decimal_places", _decimales(escala))
+        super().__init__(**kwargs)
+
+    def prepare_value(self, value):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return a_decimal(value, self.escala)
+        return super().prepare_value(value)
+
+    def clean(self, value):
+        value = super().clean(value)
+        return None if value is None else a_entero(value, self.escala)
+
+
+class MedidaModelField(models.PositiveIntegerField):
+    """Campo de modelo para una medida entera en la unidad menor (milímetros o micrones).
+
+    El valor en Python es siempre el entero, así que las comparaciones, los filtros de rango y las
+    expresiones como F("largo") * F("ancho") son enteras. Sólo el formulario (MedidaField) convierte
+    a la unidad visible según la escala.
+    """
+
+    description = "Medida entera en la unidad menor"
+
+    def __init__(self, *args, escala=MILIMETROS_POR_METRO, **kwargs):
+        self.escala = escala
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.escala != MILIMETROS_POR_METRO:
+            kwargs["escala"] = self.escala
+        return name, path, args, kwargs
+
+    def formfield(self, **kwargs):
+        return super().formfield(**{"form_class": MedidaField, "escala": self.escala, **kwargs})
+
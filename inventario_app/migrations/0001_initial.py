@@ -0,0 +1,75 @@
+# Generated by Django 4.2.2 on 2026-10-18 02:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Material',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('composicion', models.CharField(max_length=50, verbose_name='Elementos de los que está hecha la plancha')),
+                ('espesor', models.DecimalField(decimal_places=3, max_digits=4, verbose_name='Espesor de la plancha en centímetros')),
+                ('prepintado', models.BooleanField(verbose_name='Plancha prepintada o sin pintar')),
+                ('color', models.CharField(blank=True, max_length=50, null=True, verbose_name='Color de la plancha prepintada')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Sucursal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('direccion', models.CharField(max_length=200, verbose_name='Dirección de la sucursal')),
+                ('telefono', models.CharField(max_length=20, verbose_name='Número de teléfono de la sucursal')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Trabajador',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('direccion', models.CharField(blank=True, max_length=200, null=True, verbose_name='Dirección del trabajador')),
+                ('telefono', models.CharField(blank=True, max_length=20, null=True, verbose_name='Teléfono de contacto del trabajador')),
+                ('sucursal', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='inventario_app.sucursal', verbose_name='Sucursal en la que el trabajador se desempeña')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Usuario asociado al trabajador')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='sucursal',
+            name='trabajadores',
+            field=models.ManyToManyField(blank=True, related_name='sucursales_asociadas', to='inventario_app.trabajador', verbose_name='Trabajadores asociados a la sucursal'),
+        ),
+        migrations.CreateModel(
+            name='Sobrante',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('existencias', models.IntegerField(verbose_name='Número en inventario')),
+                ('largo', models.DecimalField(decimal_places=2, max_digits=3)),
+                ('ancho', models.DecimalField(decimal_places=2, max_digits=3)),
+                ('material', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='inventario_app.material', verbose_name='Material del que está hecho la plancha')),
+                ('sucursal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='inventario_app.sucursal', verbose_name='Modelo de la sucursal en la que está el objeto')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProductoHojalateria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('categoria', models.CharField(max_length=100, verbose_name='Tipo de producto')),
+                ('existencias', models.IntegerField(verbose_name='Número disponible en inventario')),
+                ('largo', models.DecimalField(blank=True, decimal_places=3, max_digits=6, null=True)),
+                ('ancho', models.DecimalField(blank=True, decimal_places=3, max_digits=6, null=True)),
+                ('alto', models.DecimalField(blank=True, decimal_places=3, max_digits=6, null=True)),
+                ('radio', models.DecimalField(blank=True, decimal_places=3, max_digits=6, null=True)),
+                ('Trabajador', models.ManyToManyField(to='inventario_app.trabajador', verbose_name='Trabajadores que fabricaron el producto')),
+                ('material', models.ManyToManyField(to='inventario_app.material', verbose_name='Material del que está hecho el producto')),
+            ],
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.2 on 2026-10-18 02:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('categoria', models.CharField(max_length=100, verbose_name='Categoría del total')),
+                ('existencias', models.IntegerField(default=0, verbose_name='Existencias acumuladas')),
+                ('actualizado', models.DateTimeField(auto_now=True, verbose_name='Última actualización')),
+                ('material', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='inventario_app.material', verbose_name='Material del total')),
+                ('sucursal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='inventario_app.sucursal', verbose_name='Sucursal del total')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('categoria', models.CharField(max_length=100, verbose_name='Categoría del movimiento')),
+                ('cantidad', models.IntegerField(verbose_name='Cantidad del movimiento')),
+                ('motivo', models.CharField(blank=True, max_length=200, verbose_name='Motivo del movimiento')),
+                ('creado', models.DateTimeField(auto_now_add=True, verbose_name='Fecha del movimiento')),
+                ('material', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='movimientos_stock', to='inventario_app.material', verbose_name='Material del movimiento')),
+                ('producto', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movimientos_stock', to='inventario_app.productohojalateria', verbose_name='Producto del movimiento')),
+                ('sobrante', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movimientos_stock', to='inventario_app.sobrante', verbose_name='Sobrante del movimiento')),
+                ('sucursal', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='movimientos_stock', to='inventario_app.sucursal', verbose_name='Sucursal del movimiento')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='stocksnapshot',
+            constraint=models.UniqueConstraint(fields=('sucursal', 'material', 'categoria'), name='stocksnapshot_clave_unica'),
+        ),
+        migrations.AddIndex(
+            model_name='stockmovement',
+            index=models.Index(fields=['sucursal', 'material', 'categoria', 'creado'], name='stockmov_clave_creado_idx'),
+        ),
+    ]
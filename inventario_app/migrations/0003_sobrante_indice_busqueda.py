@@ -0,0 +1,17 @@
+# Generated by Django 4.2.2 on 2026-10-18 01:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario_app', '0002_registro_existencias'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sobrante',
+            index=models.Index(fields=['material', 'sucursal', 'largo', 'ancho'], name='sobrante_ajuste_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.2 on 2026-10-18 01:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario_app', '0003_sobrante_indice_busqueda'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='material',
+            index=models.Index(fields=['composicion'], name='material_composicion_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='material',
+            index=models.Index(fields=['prepintado', 'color'], name='material_prepintado_color_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productohojalateria',
+            index=models.Index(fields=['categoria'], name='producto_categoria_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='productohojalateria',
+            index=models.Index(fields=['largo'], name='producto_largo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productohojalateria',
+            index=models.Index(fields=['ancho'], name='producto_ancho_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productohojalateria',
+            index=models.Index(fields=['alto'], name='producto_alto_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productohojalateria',
+            index=models.Index(fields=['radio'], name='producto_radio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productohojalateria',
+            index=models.Index(fields=['existencias'], name='producto_existencias_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockmovement',
+            index=models.Index(fields=['producto', 'sucursal'], name='stockmov_producto_sucursal_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.2 on 2026-10-18 01:49
+
+from django.conf import settings
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('inventario_app', '0004_producto_indices_busqueda'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Trabajo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=100, verbose_name='Tipo de trabajo')),
+                ('argumentos', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Argumentos del trabajo')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('en_curso', 'En curso'), ('completado', 'Completado'), ('fallido', 'Fallido')], default='pendiente', max_length=20, verbose_name='Estado del trabajo')),
+                ('prioridad', models.SmallIntegerField(default=0, verbose_name='Prioridad del trabajo')),
+                ('intentos', models.PositiveSmallIntegerField(default=0, verbose_name='Intentos realizados')),
+                ('max_intentos', models.PositiveSmallIntegerField(default=3, verbose_name='Máximo de intentos')),
+                ('disponible_desde', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Disponible desde')),
+                ('progreso', models.FloatField(default=0, verbose_name='Avance del trabajo')),
+                ('mensaje', models.CharField(blank=True, max_length=200, verbose_name='Mensaje de avance')),
+                ('resultado', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True, verbose_name='Resultado del trabajo')),
+                ('error', models.TextField(blank=True, verbose_name='Error del último intento')),
+                ('worker', models.CharField(blank=True, max_length=100, verbose_name='Worker que ejecuta el trabajo')),
+                ('creado', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('iniciado', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de inicio')),
+                ('terminado', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de término')),
+                ('latido', models.DateTimeField(blank=True, null=True, verbose_name='Último latido del worker')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='trabajos', to=settings.AUTH_USER_MODEL, verbose_name='Usuario que encoló el trabajo')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('estado', 'pendiente')), fields=['-prioridad', 'disponible_desde', 'id'], name='trabajo_pendiente_idx'), models.Index(condition=models.Q(('estado', 'en_curso')), fields=['latido'], name='trabajo_en_curso_idx')],
+            },
+        ),
+    ]
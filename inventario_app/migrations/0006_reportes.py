@@ -0,0 +1,71 @@
+# Generated by Django 4.2.2 on 2026-10-18 01:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario_app', '0005_trabajo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarcaReporte',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='Nombre de los agregados')),
+                ('ultimo_movimiento', models.BigIntegerField(default=0, verbose_name='Último movimiento procesado')),
+                ('actualizado', models.DateTimeField(auto_now=True, verbose_name='Último refresco')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ReporteUsoTrabajador',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField(verbose_name='Día')),
+                ('unidades', models.IntegerField(default=0, verbose_name='Unidades fabricadas')),
+                ('area', models.DecimalField(decimal_places=4, default=0, max_digits=14, verbose_name='Área usada (m²)')),
+                ('material', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventario_app.material', verbose_name='Material')),
+                ('trabajador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventario_app.trabajador', verbose_name='Trabajador')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ReporteStockDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField(verbose_name='Día')),
+                ('categoria', models.CharField(max_length=100, verbose_name='Categoría')),
+                ('entradas', models.IntegerField(default=0, verbose_name='Unidades que entraron')),
+                ('salidas', models.IntegerField(default=0, verbose_name='Unidades que salieron')),
+                ('material', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventario_app.material', verbose_name='Material')),
+                ('sucursal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventario_app.sucursal', verbose_name='Sucursal')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ReporteSobranteDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField(verbose_name='Día')),
+                ('piezas_recuperadas', models.IntegerField(default=0, verbose_name='Piezas recuperadas')),
+                ('area_recuperada', models.DecimalField(decimal_places=4, default=0, max_digits=14, verbose_name='Área recuperada (m²)')),
+                ('piezas_usadas', models.IntegerField(default=0, verbose_name='Piezas reutilizadas')),
+                ('area_usada', models.DecimalField(decimal_places=4, default=0, max_digits=14, verbose_name='Área reutilizada (m²)')),
+                ('material', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventario_app.material', verbose_name='Material')),
+                ('sucursal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventario_app.sucursal', verbose_name='Sucursal')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='reporteusotrabajador',
+            constraint=models.UniqueConstraint(fields=('dia', 'trabajador', 'material'), name='reporteuso_clave_unica'),
+        ),
+        migrations.AddConstraint(
+            model_name='reportestockdiario',
+            constraint=models.UniqueConstraint(fields=('dia', 'sucursal', 'material', 'categoria'), name='reportestock_clave_unica'),
+        ),
+        migrations.AddConstraint(
+            model_name='reportesobrantediario',
+            constraint=models.UniqueConstraint(fields=('dia', 'sucursal', 'material'), name='reportesobrante_clave_unica'),
+        ),
+    ]
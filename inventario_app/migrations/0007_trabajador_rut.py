@@ -0,0 +1,19 @@
+# Generated by Django 4.2.2 on 2026-10-18 01:49
+
+from django.db import migrations
+import inventario_app.rut_field
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario_app', '0006_reportes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trabajador',
+            name='rut',
+            field=inventario_app.rut_field.RutModelField(blank=True, null=True, unique=True, verbose_name='RUT del trabajador'),
+        ),
+    ]
@@ -0,0 +1,116 @@
+# Generated by Django 4.2.2 on 2026-10-18 01:49
+
+from django.db import migrations, models
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+import inventario_app.medidas
+
+
+# Medidas que pasan de decimales en la unidad visible a enteros en la unidad menor:
+# (modelo, campo, escala, decimales de la unidad visible en la columna intermedia, null)
+MEDIDAS = [
+    ('material', 'espesor', 10_000, 4, False),
+    ('productohojalateria', 'alto', 1000, 3, True),
+    ('productohojalateria', 'ancho', 1000, 3, True),
+    ('productohojalateria', 'largo', 1000, 3, True),
+    ('productohojalateria', 'radio', 1000, 3, True),
+    ('reportesobrantediario', 'area_recuperada', 1_000_000, 6, False),
+    ('reportesobrantediario', 'area_usada', 1_000_000, 6, False),
+    ('reporteusotrabajador', 'area', 1_000_000, 6, False),
+    ('sobrante', 'ancho', 1000, 3, False),
+    ('sobrante', 'largo', 1000, 3, False),
+]
+
+
+def _escalar(apps, schema_editor, multiplicar=True):
+    for modelo, campo, escala, _, _ in MEDIDAS:
+        # Al revertir se divide como real: en SQLite la división de enteros trunca
+        expresion = F(campo) * escala if multiplicar else Cast(campo, FloatField()) / escala
+        apps.get_model('inventario_app', modelo)._base_manager.update(**{campo: expresion})
+
+
+def _desescalar(apps, schema_editor):
+    _escalar(apps, schema_editor, multiplicar=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario_app', '0007_trabajador_rut'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='productohojalateria',
+            name='producto_largo_idx',
+        ),
+        # Cada medida se ensancha a un decimal con espacio para el valor escalado, se multiplica
+        # por su escala y se cambia a entero
+        *[
+            migrations.AlterField(
+                model_name=modelo,
+                name=campo,
+                field=models.DecimalField(decimal_places=decimales, max_digits=30, null=null),
+            )
+            for modelo, campo, _, decimales, null in MEDIDAS
+        ],
+        migrations.RunPython(_escalar, _desescalar),
+        migrations.AlterField(
+            model_name='material',
+            name='espesor',
+            field=inventario_app.medidas.MedidaModelField(escala=10000, verbose_name='Espesor de la plancha en centímetros'),
+        ),
+        migrations.AlterField(
+            model_name='productohojalateria',
+            name='alto',
+            field=inventario_app.medidas.MedidaModelField(blank=True, null=True, verbose_name='Alto del producto en metros'),
+        ),
+        migrations.AlterField(
+            model_name='productohojalateria',
+            name='ancho',
+            field=inventario_app.medidas.MedidaModelField(blank=True, null=True, verbose_name='Ancho del producto en metros'),
+        ),
+        migrations.AlterField(
+            model_name='productohojalateria',
+            name='largo',
+            field=inventario_app.medidas.MedidaModelField(blank=True, null=True, verbose_name='Largo del producto en metros'),
+        ),
+        migrations.AlterField(
+            model_name='productohojalateria',
+            name='radio',
+            field=inventario_app.medidas.MedidaModelField(blank=True, null=True, verbose_name='Radio del producto en metros'),
+        ),
+        migrations.AlterField(
+            model_name='reportesobrantediario',
+            name='area_recuperada',
+            field=models.BigIntegerField(default=0, verbose_name='Área recuperada (mm²)'),
+        ),
+        migrations.AlterField(
+            model_name='reportesobrantediario',
+            name='area_usada',
+            field=models.BigIntegerField(default=0, verbose_name='Área reutilizada (mm²)'),
+        ),
+        migrations.AlterField(
+            model_name='reporteusotrabajador',
+            name='area',
+            field=models.BigIntegerField(default=0, verbose_name='Área usada (mm²)'),
+        ),
+        migrations.AlterField(
+            model_name='sobrante',
+            name='ancho',
+            field=inventario_app.medidas.MedidaModelField(verbose_name='Ancho del sobrante en metros'),
+        ),
+        migrations.AlterField(
+            model_name='sobrante',
+            name='largo',
+            field=inventario_app.medidas.MedidaModelField(verbose_name='Largo del sobrante en metros'),
+        ),
+        migrations.AddIndex(
+            model_name='productohojalateria',
+            index=models.Index(fields=['categoria', 'largo'], name='producto_categoria_largo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productohojalateria',
+            index=models.Index(fields=['largo', 'ancho'], name='producto_largo_ancho_idx'),
+        ),
+    ]
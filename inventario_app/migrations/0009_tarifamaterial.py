@@ -0,0 +1,30 @@
+# Generated by Django 4.2.2 on 2026-10-18 01:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario_app', '0008_medidas_enteras'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TarifaMaterial',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('categoria', models.CharField(blank=True, default='', max_length=100, verbose_name='Categoría de producto (vacía para todas)')),
+                ('precio_m2', models.PositiveIntegerField(verbose_name='Precio del metro cuadrado de plancha')),
+                ('mano_obra_unidad', models.PositiveIntegerField(default=0, verbose_name='Mano de obra por pieza')),
+                ('mano_obra_metro', models.PositiveIntegerField(default=0, verbose_name='Mano de obra por metro de largo')),
+                ('actualizado', models.DateTimeField(auto_now=True, verbose_name='Última modificación')),
+                ('material', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tarifas', to='inventario_app.material', verbose_name='Material de la tarifa')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='tarifamaterial',
+            constraint=models.UniqueConstraint(fields=('material', 'categoria'), name='tarifa_material_categoria_unica'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.2 on 2026-10-18 01:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario_app', '0009_tarifamaterial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PuntoReorden',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('categoria', models.CharField(blank=True, max_length=100, verbose_name='Categoría vigilada')),
+                ('minimo', models.PositiveIntegerField(verbose_name='Existencias mínimas')),
+                ('material', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventario_app.material', verbose_name='Material vigilado')),
+                ('producto', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='puntos_reorden', to='inventario_app.productohojalateria', verbose_name='Producto vigilado')),
+                ('sobrante', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='puntos_reorden', to='inventario_app.sobrante', verbose_name='Sobrante vigilado')),
+                ('sucursal', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventario_app.sucursal', verbose_name='Sucursal vigilada')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AlertaStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('anterior', models.IntegerField(verbose_name='Existencias antes del cambio')),
+                ('existencias', models.IntegerField(verbose_name='Existencias después del cambio')),
+                ('minimo', models.PositiveIntegerField(verbose_name='Existencias mínimas al momento de la alerta')),
+                ('creada', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de la alerta')),
+                ('notificada', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de notificación')),
+                ('punto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alertas', to='inventario_app.puntoreorden', verbose_name='Punto de reorden')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='puntoreorden',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(('material', None), ('producto__isnull', False), ('sobrante', None), ('sucursal', None)), models.Q(('material', None), ('producto', None), ('sobrante__isnull', False), ('sucursal', None)), models.Q(('material__isnull', False), ('producto', None), ('sobrante', None), ('sucursal__isnull', False)), _connector='OR'), name='puntoreorden_un_objetivo'),
+        ),
+        migrations.AddIndex(
+            model_name='alertastock',
+            index=models.Index(condition=models.Q(('notificada', None)), fields=['id'], name='alerta_pendiente_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.2 on 2026-10-18 02:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario_app', '0010_alertas_stock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionModelo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=100, unique=True, verbose_name='Etiqueta del modelo')),
+                ('version', models.BigIntegerField(verbose_name='Versión de los datos')),
+            ],
+        ),
+    ]
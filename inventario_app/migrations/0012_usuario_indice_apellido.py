@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('inventario_app', '0011_versionmodelo'),
+    ]
+
+    operations = [
+        # El directorio de usuarios ordena y pagina por cursor sobre (last_name, id); auth_user
+        # pertenece a django.contrib.auth, así que el índice se crea con SQL desde esta app
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS auth_user_apellido_id_idx ON auth_user (last_name, id)',
+            'DROP INDEX IF EXISTS auth_user_apellido_id_idx',
+            elidable=False,
+        ),
+    ]
@@ -1,5 +1,10 @@
-from django.db import models
-from .rut_field import RutField
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models
+from django.utils import timezone
+
+from .medidas import MICRONES_POR_CENTIMETRO, MedidaModelField
+from .rut_field import RutModelField, interpretar_rut
 
 
 class Material(models.Model):
@@ -14,9 +19,9 @@ class Material(models.Model):
     composicion = models.CharField(
         ("Elementos de los que está hecha la plancha"), max_length=50
     )
-    # Campo para el espesor de la plancha en centímetros
-    espesor = models.DecimalField(
-        "Espesor de la plancha en centímetros", max_digits=1, decimal_places=3
+    # Campo para el espesor de la plancha, guardado en micrones y mostrado en centímetros
+    espesor = MedidaModelField(
+        "Espesor de la plancha en centímetros", escala=MICRONES_POR_CENTIMETRO
     )
     # Campo booleano para marcar una plancha como prepintada o no
     prepintado = models.BooleanField(("Plancha prepintada o sin pintar"))
@@ -26,6 +31,61 @@ class Material(models.Model):
         ("Color de la plancha prepintada"), max_length=50, null=True, blank=True
     )
 
+    class Meta:
+        indexes = [
+            # Índices para las facetas y la búsqueda por prefijo del buscador de productos
+            models.Index(
+                fields=["composicion"],
+                name="material_composicion_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+            models.Index(fields=["prepintado", "color"], name="material_prepintado_color_idx"),
+        ]
+
+
+class TrabajadorQuerySet(models.QuerySet):
+    """Consultas de trabajadores por RUT sobre el índice único de la columna rut."""
+
+    def by_rut(self, rut):
+        """Trabajador con un RUT en cualquiera de los formatos aceptados.
+
+        Args:
+            rut (Any): Rut, número sin dígito verificador o texto como "12.345.678-5".
+
+        Returns:
+            Trabajador: El trabajador, o None si el RUT no es válido o no está registrado.
+        """
+        rut = interpretar_rut(rut)
+        if rut is None:
+            return None
+        try:
+            return self.get(rut=rut)
+        except self.model.DoesNotExist:
+            return None
+
+    def in_bulk_by_rut(self, ruts, batch_size=None):
+        """Resuelve una lista de RUTs con una consulta sobre el índice (o una por lote).
+
+        Los RUTs inválidos y los repetidos se ignoran. Igual que in_bulk, la lista se reparte en
+        lotes cuando la base de datos limita el número de parámetros por consulta.
+
+        Args:
+            ruts (Iterable): RUTs en cualquiera de los formatos aceptados.
+            batch_size (int): RUTs por consulta (por defecto, todos o el límite de la base de datos).
+
+        Returns:
+            dict: {"12345678-5": Trabajador} con los RUTs encontrados en forma canónica.
+        """
+        numeros = sorted({rut.numero for rut in map(interpretar_rut, ruts) if rut is not None})
+        if not numeros:
+            return {}
+        tamano = batch_size or connections[self.db].features.max_query_params or len(numeros)
+        encontrados = {}
+        for inicio in range(0, len(numeros), tamano):
+            for trabajador in self.filter(rut__in=numeros[inicio : inicio + tamano]):
+                encontrados[str(trabajador.rut)] = trabajador
+        return encontrados
+
 
 class Trabajador(models.Model):
     """Clase para los trabajadores de la hojalatería
@@ -36,31 +96,33 @@ class Trabajador(models.Model):
 
     # Campo para asociar un modelo de usuario al trabajador
     user = models.ForeignKey(
-        "app.Model",
+        settings.AUTH_USER_MODEL,
         verbose_name=("Usuario asociado al trabajador"),
         on_delete=models.CASCADE,
     )
     
     # Campo para asociar un modelo de sucursal al trabajador
     sucursal = models.ForeignKey(
-        "app.Model",
+        "Sucursal",
         verbose_name=("Sucursal en la que el trabajador se desempeña"),
         on_delete=models.PROTECT,
         null=True,
         blank=True,
     )
     
-    # Campo para registrar el RUT del trabajador
-    rut = RutField()
+    # Campo para registrar el RUT del trabajador, único y guardado como número
+    rut = RutModelField("RUT del trabajador", unique=True, null=True, blank=True)
     direccion = models.CharField(
         ("Dirección del trabajador"), max_length=200, null=True, blank=True
     )
     
     # Campo para registrar un número de contacto del trabajador
     telefono = models.CharField(
-        ("Teléfono de contacto del trabajador"), null=True, blank=True
+        ("Teléfono de contacto del trabajador"), max_length=20, null=True, blank=True
     )
 
+    objects = TrabajadorQuerySet.as_manager()
+
 
 class Sucursal(models.Model):
     """Modelo para las sucursales del negocio
@@ -75,14 +137,14 @@ class Sucursal(models.Model):
 
     # Campo para el teléfono de contacto de la sucursal
     telefono = models.CharField(
-        ("Número de teléfono de la sucursal"), null=False, blank=False
+        ("Número de teléfono de la sucursal"), max_length=20, null=False, blank=False
     )
 
     # Campo para los trabajadores asociados a la sucursal
     trabajadores = models.ManyToManyField(
-        "app.Model",
+        "Trabajador",
+        related_name="sucursales_asociadas",
         verbose_name=("Trabajadores asociados a la sucursal"),
-        null=True,
         blank=True,
     )
 
@@ -108,9 +170,18 @@ class Sobrante(models.Model):
         verbose_name=("Modelo de la sucursal en la que está el objeto"),
         on_delete=models.CASCADE,
     )
-    # Camnpos para las dimensiones del sobrante en metros
-    largo = models.DecimalField(max_digits=3, decimal_places=2)
-    ancho = models.DecimalField(max_digits=3, decimal_places=2)
+    # Campos para las dimensiones del sobrante, guardadas en milímetros y mostradas en metros
+    largo = MedidaModelField("Largo del sobrante en metros")
+    ancho = MedidaModelField("Ancho del sobrante en metros")
+
+    class Meta:
+        indexes = [
+            # Índice para buscar el sobrante que calza con un corte de un material en una sucursal
+            models.Index(
+                fields=["material", "sucursal", "largo", "ancho"],
+                name="sobrante_ajuste_idx",
+            ),
+        ]
 
 
 class ProductoHojalateria(models.Model):
@@ -136,8 +207,511 @@ class ProductoHojalateria(models.Model):
         Trabajador, verbose_name=("Trabajadores que fabricaron el producto")
     )
 
-    # Campo provisorio para las dimensiones del producto en metros
-    largo = models.DecimalField(max_digits=3, decimal_places=3, null=True, blank=True)
-    ancho = models.DecimalField(max_digits=3, decimal_places=3, null=True, blank=True)
-    alto = models.DecimalField(max_digits=3, decimal_places=3, null=True, blank=True)
-    radio = models.DecimalField(max_digits=3, decimal_places=3, null=True, blank=True)
+    # Campos para las dimensiones del producto, guardadas en milímetros y mostradas en metros
+    largo = MedidaModelField("Largo del producto en metros", null=True, blank=True)
+    ancho = MedidaModelField("Ancho del producto en metros", null=True, blank=True)
+    alto = MedidaModelField("Alto del producto en metros", null=True, blank=True)
+    radio = MedidaModelField("Radio del producto en metros", null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Índices para las facetas, los rangos y la búsqueda por prefijo del buscador de productos
+            models.Index(
+                fields=["categoria"],
+                name="producto_categoria_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+            # Índices compuestos para los rangos de largo, solo o con una categoría o un ancho
+            models.Index(fields=["categoria", "largo"], name="producto_categoria_largo_idx"),
+            models.Index(fields=["largo", "ancho"], name="producto_largo_ancho_idx"),
+            models.Index(fields=["ancho"], name="producto_ancho_idx"),
+            models.Index(fields=["alto"], name="producto_alto_idx"),
+            models.Index(fields=["radio"], name="producto_radio_idx"),
+            models.Index(fields=["existencias"], name="producto_existencias_idx"),
+        ]
+
+
+class StockMovement(models.Model):
+    """Registro inmutable de cada entrada o salida de inventario.
+
+    Las existencias nunca se modifican sin dejar un movimiento; StockSnapshot guarda el total
+    acumulado de estos movimientos.
+
+    Args:
+        models(module): Clase de Django de la que se hereda la funcionalidad de los modelos.
+    """
+
+    # Campo para la sucursal en la que ocurre el movimiento
+    sucursal = models.ForeignKey(
+        Sucursal,
+        verbose_name=("Sucursal del movimiento"),
+        on_delete=models.PROTECT,
+        related_name="movimientos_stock",
+    )
+    # Campo para el material del producto o sobrante que se mueve
+    material = models.ForeignKey(
+        Material,
+        verbose_name=("Material del movimiento"),
+        on_delete=models.PROTECT,
+        related_name="movimientos_stock",
+    )
+    # Campo para la categoría del producto, o "sobrante" para el material sobrante
+    categoria = models.CharField("Categoría del movimiento", max_length=100)
+
+    # Campos para el producto o sobrante que origina el movimiento
+    producto = models.ForeignKey(
+        ProductoHojalateria,
+        verbose_name=("Producto del movimiento"),
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="movimientos_stock",
+    )
+    sobrante = models.ForeignKey(
+        Sobrante,
+        verbose_name=("Sobrante del movimiento"),
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="movimientos_stock",
+    )
+
+    # Campo para la cantidad que entra (positiva) o sale (negativa) del inventario
+    cantidad = models.IntegerField("Cantidad del movimiento")
+
+    # Campo para describir el motivo del movimiento
+    motivo = models.CharField("Motivo del movimiento", max_length=200, blank=True)
+
+    # Campo para la fecha en que se registró el movimiento
+    creado = models.DateTimeField("Fecha del movimiento", auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["sucursal", "material", "categoria", "creado"],
+                name="stockmov_clave_creado_idx",
+            ),
+            # Índice para filtrar productos por la sucursal en la que tienen movimientos
+            models.Index(fields=["producto", "sucursal"], name="stockmov_producto_sucursal_idx"),
+        ]
+
+
+class StockSnapshot(models.Model):
+    """Total de existencias materializado por sucursal, material y categoría.
+
+    Se actualiza en la misma transacción que cada StockMovement, por lo que leer un total cuesta
+    una sola fila sin importar el largo del historial.
+
+    Args:
+        models(module): Clase de Django de la que se hereda la funcionalidad de los modelos.
+    """
+
+    # Campos de la clave del total
+    sucursal = models.ForeignKey(
+        Sucursal,
+        verbose_name=("Sucursal del total"),
+        on_delete=models.CASCADE,
+        related_name="stock_snapshots",
+    )
+    material = models.ForeignKey(
+        Material,
+        verbose_name=("Material del total"),
+        on_delete=models.CASCADE,
+        related_name="stock_snapshots",
+    )
+    categoria = models.CharField("Categoría del total", max_length=100)
+
+    # Campo para el total de existencias acumulado
+    existencias = models.IntegerField("Existencias acumuladas", default=0)
+
+    # Campo para la fecha de la última actualización
+    actualizado = models.DateTimeField("Última actualización", auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["sucursal", "material", "categoria"],
+                name="stocksnapshot_clave_unica",
+            ),
+        ]
+
+
+class Trabajo(models.Model):
+    """Trabajo en segundo plano de la cola de inventario_app.trabajos.
+
+    Los workers de "manage.py run_workers" toman los trabajos pendientes por prioridad y los
+    ejecutan fuera del ciclo de petición y respuesta.
+
+    Args:
+        models(module): Clase de Django de la que se hereda la funcionalidad de los modelos.
+    """
+
+    PENDIENTE = "pendiente"
+    EN_CURSO = "en_curso"
+    COMPLETADO = "completado"
+    FALLIDO = "fallido"
+
+    # Opciones para el estado del trabajo
+    ESTADO_CHOICES = (
+        (PENDIENTE, "Pendiente"),
+        (EN_CURSO, "En curso"),
+        (COMPLETADO, "Completado"),
+        (FALLIDO, "Fallido"),
+    )
+
+    # Campo para la tarea registrada que ejecuta el trabajo y sus argumentos
+    tipo = models.CharField("Tipo de trabajo", max_length=100)
+    argumentos = models.JSONField(
+        "Argumentos del trabajo", default=dict, blank=True, encoder=DjangoJSONEncoder
+    )
+
+    # Campo para el estado del trabajo
+    estado = models.CharField(
+        "Estado del trabajo", max_length=20, choices=ESTADO_CHOICES, default=PENDIENTE
+    )
+
+    # Campo para la prioridad: los trabajos con mayor prioridad se toman primero
+    prioridad = models.SmallIntegerField("Prioridad del trabajo", default=0)
+
+    # Campos para los reintentos: intentos hechos, máximo y fecha desde la que se puede volver a tomar
+    intentos = models.PositiveSmallIntegerField("Intentos realizados", default=0)
+    max_intentos = models.PositiveSmallIntegerField("Máximo de intentos", default=3)
+    disponible_desde = models.DateTimeField("Disponible desde", default=timezone.now)
+
+    # Campos para el avance informado por la tarea, entre 0 y 1, y su descripción
+    progreso = models.FloatField("Avance del trabajo", default=0)
+    mensaje = models.CharField("Mensaje de avance", max_length=200, blank=True)
+
+    # Campos para el resultado o el error del último intento
+    resultado = models.JSONField(
+        "Resultado del trabajo", null=True, blank=True, encoder=DjangoJSONEncoder
+    )
+    error = models.TextField("Error del último intento", blank=True)
+
+    # Campo para el worker que tiene tomado el trabajo
+    worker = models.CharField("Worker que ejecuta el trabajo", max_length=100, blank=True)
+
+    # Campo para el usuario que encoló el trabajo, que puede consultar su estado
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        verbose_name=("Usuario que encoló el trabajo"),
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="trabajos",
+    )
+
+    # Campos para las fechas de creación, inicio, término y último latido del worker
+    creado = models.DateTimeField("Fecha de creación", auto_now_add=True)
+    iniciado = models.DateTimeField("Fecha de inicio", null=True, blank=True)
+    terminado = models.DateTimeField("Fecha de término", null=True, blank=True)
+    latido = models.DateTimeField("Último latido del worker", null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Índice parcial para tomar los pendientes en orden sin recorrer los terminados
+            models.Index(
+                fields=["-prioridad", "disponible_desde", "id"],
+                name="trabajo_pendiente_idx",
+                condition=models.Q(estado="pendiente"),
+            ),
+            # Índice para encontrar los trabajos de un worker que dejó de responder
+            models.Index(
+                fields=["latido"],
+                name="trabajo_en_curso_idx",
+                condition=models.Q(estado="en_curso"),
+            ),
+        ]
+
+
+class MarcaReporte(models.Model):
+    """Último movimiento de inventario ya sumado a los agregados de los reportes.
+
+    Hay una fila por cada conjunto de agregados; refrescar los reportes sólo procesa los
+    movimientos con id mayor que su marca.
+
+    Args:
+        models(module): Clase de Django de la que se hereda la funcionalidad de los modelos.
+    """
+
+    # Campo para el nombre del conjunto de agregados
+    nombre = models.CharField("Nombre de los agregados", max_length=50, unique=True)
+
+    # Campo para el id del último StockMovement sumado
+    ultimo_movimiento = models.BigIntegerField("Último movimiento procesado", default=0)
+
+    # Campo para la fecha del último refresco
+    actualizado = models.DateTimeField("Último refresco", auto_now=True)
+
+
+class ReporteStockDiario(models.Model):
+    """Entradas y salidas de inventario por día, sucursal, material y categoría.
+
+    Args:
+        models(module): Clase de Django de la que se hereda la funcionalidad de los modelos.
+    """
+
+    # Campos de la clave del agregado
+    dia = models.DateField("Día")
+    sucursal = models.ForeignKey(
+        Sucursal,
+        verbose_name=("Sucursal"),
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    material = models.ForeignKey(
+        Material,
+        verbose_name=("Material"),
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    categoria = models.CharField("Categoría", max_length=100)
+
+    # Campos para las unidades que entraron y salieron en el día
+    entradas = models.IntegerField("Unidades que entraron", default=0)
+    salidas = models.IntegerField("Unidades que salieron", default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dia", "sucursal", "material", "categoria"],
+                name="reportestock_clave_unica",
+            ),
+        ]
+
+
+class ReporteUsoTrabajador(models.Model):
+    """Productos fabricados por día, trabajador y material, con el área de material que usaron.
+
+    Args:
+        models(module): Clase de Django de la que se hereda la funcionalidad de los modelos.
+    """
+
+    # Campos de la clave del agregado
+    dia = models.DateField("Día")
+    trabajador = models.ForeignKey(
+        Trabajador,
+        verbose_name=("Trabajador"),
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    material = models.ForeignKey(
+        Material,
+        verbose_name=("Material"),
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+
+    # Campos para las unidades fabricadas y su área en milímetros cuadrados
+    unidades = models.IntegerField("Unidades fabricadas", default=0)
+    area = models.BigIntegerField("Área usada (mm²)", default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dia", "trabajador", "material"],
+                name="reporteuso_clave_unica",
+            ),
+        ]
+
+
+class ReporteSobranteDiario(models.Model):
+    """Área de material sobrante recuperada y reutilizada por día, sucursal y material.
+
+    Args:
+        models(module): Clase de Django de la que se hereda la funcionalidad de los modelos.
+    """
+
+    # Campos de la clave del agregado
+    dia = models.DateField("Día")
+    sucursal = models.ForeignKey(
+        Sucursal,
+        verbose_name=("Sucursal"),
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    material = models.ForeignKey(
+        Material,
+        verbose_name=("Material"),
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+
+    # Campos para las piezas y el área en milímetros cuadrados que entraron y salieron del inventario
+    piezas_recuperadas = models.IntegerField("Piezas recuperadas", default=0)
+    area_recuperada = models.BigIntegerField("Área recuperada (mm²)", default=0)
+    piezas_usadas = models.IntegerField("Piezas reutilizadas", default=0)
+    area_usada = models.BigIntegerField("Área reutilizada (mm²)", default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dia", "sucursal", "material"],
+                name="reportesobrante_clave_unica",
+            ),
+        ]
+
+
+class TarifaMaterial(models.Model):
+    """Precios con los que se cotizan los productos de un material y una categoría.
+
+    Una tarifa con categoría vacía se aplica a todas las categorías del material que no tienen
+    una tarifa propia. Los montos están en pesos enteros.
+
+    Args:
+        models(module): Clase de Django de la que se hereda la funcionalidad de los modelos.
+    """
+
+    # Campos para el material y la categoría de producto (de categorias.ARBOL) a los que se aplica
+    material = models.ForeignKey(
+        Material,
+        verbose_name=("Material de la tarifa"),
+        on_delete=models.CASCADE,
+        related_name="tarifas",
+    )
+    categoria = models.CharField(
+        "Categoría de producto (vacía para todas)", max_length=100, blank=True, default=""
+    )
+
+    # Campo para el precio del metro cuadrado de plancha
+    precio_m2 = models.PositiveIntegerField("Precio del metro cuadrado de plancha")
+
+    # Campos para la mano de obra por pieza y por metro de largo de cada pieza
+    mano_obra_unidad = models.PositiveIntegerField("Mano de obra por pieza", default=0)
+    mano_obra_metro = models.PositiveIntegerField("Mano de obra por metro de largo", default=0)
+
+    # Campo para la fecha del último cambio de la tarifa
+    actualizado = models.DateTimeField("Última modificación", auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["material", "categoria"],
+                name="tarifa_material_categoria_unica",
+            ),
+        ]
+
+
+class PuntoReorden(models.Model):
+    """Existencias mínimas de un producto, de un sobrante o de un total de una sucursal.
+
+    Cada punto vigila exactamente uno de: las existencias de un ProductoHojalateria, las de un
+    Sobrante (que ya pertenece a una sucursal) o el total de StockSnapshot de una sucursal, un
+    material y una categoría. Cuando las existencias bajan del mínimo se registra una AlertaStock.
+
+    Args:
+        models(module): Clase de Django de la que se hereda la funcionalidad de los modelos.
+    """
+
+    # Campos para el producto o el sobrante vigilado
+    producto = models.ForeignKey(
+        ProductoHojalateria,
+        verbose_name=("Producto vigilado"),
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="puntos_reorden",
+    )
+    sobrante = models.ForeignKey(
+        Sobrante,
+        verbose_name=("Sobrante vigilado"),
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="puntos_reorden",
+    )
+
+    # Campos para el total de una sucursal, un material y una categoría (ver StockSnapshot)
+    sucursal = models.ForeignKey(
+        Sucursal,
+        verbose_name=("Sucursal vigilada"),
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    material = models.ForeignKey(
+        Material,
+        verbose_name=("Material vigilado"),
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    categoria = models.CharField("Categoría vigilada", max_length=100, blank=True)
+
+    # Campo para las existencias mínimas: se alerta cuando quedan menos
+    minimo = models.PositiveIntegerField("Existencias mínimas")
+
+    class Meta:
+        constraints = [
+            # Un punto vigila un producto, un sobrante o un total, y sólo uno de ellos
+            models.CheckConstraint(
+                check=(
+                    models.Q(producto__isnull=False, sobrante=None, sucursal=None, material=None)
+                    | models.Q(producto=None, sobrante__isnull=False, sucursal=None, material=None)
+                    | models.Q(
+                        producto=None,
+                        sobrante=None,
+                        sucursal__isnull=False,
+                        material__isnull=False,
+                    )
+                ),
+                name="puntoreorden_un_objetivo",
+            ),
+        ]
+
+
+class AlertaStock(models.Model):
+    """Cruce de un punto de reorden: las existencias pasaron de al menos el mínimo a menos.
+
+    Las alertas se registran en la misma transacción que el cambio de existencias y se notifican
+    en lotes con el trabajo notificar_alertas (ver inventario_app.alertas).
+
+    Args:
+        models(module): Clase de Django de la que se hereda la funcionalidad de los modelos.
+    """
+
+    # Campo para el punto de reorden que se cruzó
+    punto = models.ForeignKey(
+        PuntoReorden,
+        verbose_name=("Punto de reorden"),
+        on_delete=models.CASCADE,
+        related_name="alertas",
+    )
+
+    # Campos para las existencias antes y después del cambio y el mínimo vigente
+    anterior = models.IntegerField("Existencias antes del cambio")
+    existencias = models.IntegerField("Existencias después del cambio")
+    minimo = models.PositiveIntegerField("Existencias mínimas al momento de la alerta")
+
+    # Campos para las fechas de la alerta y de su notificación
+    creada = models.DateTimeField("Fecha de la alerta", auto_now_add=True)
+    notificada = models.DateTimeField("Fecha de notificación", null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Índice parcial para tomar las alertas pendientes de notificar
+            models.Index(
+                fields=["id"],
+                name="alerta_pendiente_idx",
+                condition=models.Q(notificada=None),
+            ),
+        ]
+
+
+class VersionModelo(models.Model):
+    """Versión de los datos de un modelo que los procesos guardan en memoria o en la caché.
+
+    Cambia con cada escritura del modelo y en la misma transacción, así que todos los procesos ven
+    la versión nueva junto con los datos nuevos (ver opciones.version).
+
+    Args:
+        models(module): Clase de Django de la que se hereda la funcionalidad de los modelos.
+    """
+
+    # Campo para la etiqueta del modelo ("inventario_app.material")
+    modelo = models.CharField("Etiqueta del modelo", max_length=100, unique=True)
+
+    # Campo para la versión: la hora en nanosegundos de la última escritura
+    version = models.BigIntegerField("Versión de los datos")
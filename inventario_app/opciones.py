@@ -0,0 +1,284 @@
+"""Opciones de los campos de elección respaldados por modelos, en caché y por autocompletado.
+
+Cada modelo con opciones tiene una versión en la base de datos (VersionModelo) que cambia al
+guardar o eliminar una de sus filas, en la misma transacción. Las listas de opciones y las páginas
+de autocompletado se guardan con la versión en la llave, así que una escritura deja obsoletas
+todas sus entradas de una vez sin tener que buscarlas, y las entradas viejas simplemente vencen.
+Como la versión no vive en la caché, un cambio hecho en un proceso se ve en todos los demás aunque
+cada uno tenga su propia caché en memoria. Las escrituras en bloque (bulk_create, bulk_update,
+update) no envían señales y deben llamar a invalidar.
+
+Los campos con muchas filas (trabajadores y materiales) no incluyen sus opciones en el formulario:
+el widget sólo dibuja las opciones seleccionadas y el navegador pide el resto a la vista
+autocomplete, página por página.
+"""
+
+import hashlib
+import time
+from collections import namedtuple
+
+from django import forms
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.urls import reverse
+
+from .medidas import MICRONES_POR_CENTIMETRO, formatear
+from .models import Material, Sucursal, Trabajador, VersionModelo
+
+# Segundos que se conserva una lista de opciones o una página de autocompletado
+CACHE_OPCIONES = 3600
+
+# Prefijos de las llaves de caché de las listas de opciones y el autocompletado
+PREFIJO_OPCIONES = "opciones"
+PREFIJO_AUTOCOMPLETAR = "autocompletar"
+
+# Campos del usuario que forman la etiqueta de un trabajador
+CAMPOS_NOMBRE_USUARIO = {"username", "first_name", "last_name"}
+
+# Resultados por página de autocompletado por defecto y máximo
+TAMANO_PAGINA = 20
+TAMANO_PAGINA_MAXIMO = 100
+
+
+def versiones(*modelos):
+    """Versiones actuales de los datos de varios modelos, leídas con una sola consulta.
+
+    Un modelo que nunca se invalidó tiene versión 0.
+    """
+    etiquetas = [modelo._meta.label_lower for modelo in modelos]
+    leidas = dict(
+        VersionModelo.objects.filter(modelo__in=etiquetas).values_list("modelo", "version")
+    )
+    return tuple(leidas.get(etiqueta, 0) for etiqueta in etiquetas)
+
+
+def version(modelo):
+    """Versión actual de los datos de un modelo."""
+    return versiones(modelo)[0]
+
+
+def invalidar(modelo):
+    """Deja obsoletos los datos de un modelo guardados en memoria o en la caché de cada proceso.
+
+    La versión nueva es la hora en nanosegundos y no un contador: si la transacción se revierte la
+    versión vuelve a la anterior, y la escritura siguiente no repite la que se descartó.
+    """
+    etiqueta = modelo._meta.label_lower
+    nueva = time.time_ns()
+    if not VersionModelo.objects.filter(modelo=etiqueta).update(version=nueva):
+        VersionModelo.objects.update_or_create(modelo=etiqueta, defaults={"version": nueva})
+
+
+def etiqueta_material(material):
+    etiqueta = f"{material.composicion} {formatear(material.espesor, MICRONES_POR_CENTIMETRO)} cm"
+    return f"{etiqueta} {material.color}" if material.color else etiqueta
+
+
+def etiqueta_trabajador(trabajador):
+    return trabajador.user.get_full_name() or trabajador.user.username
+
+
+def etiqueta_sucursal(sucursal):
+    return sucursal.direccion
+
+
+# Modelo que se puede autocompletar: consulta base, campos en los que se busca por prefijo y
+# función que da la etiqueta de cada fila
+Autocompletado = namedtuple("Autocompletado", ["modelo", "consulta", "campos", "etiqueta"])
+
+AUTOCOMPLETADOS = {
+    "materiales": Autocompletado(
+        Material,
+        lambda: Material.objects.only("composicion", "espesor", "color"),
+        ("composicion", "color"),
+        etiqueta_material,
+    ),
+    "trabajadores": Autocompletado(
+        Trabajador,
+        lambda: Trabajador.objects.select_related("user").only(
+            "user__username", "user__first_name", "user__last_name"
+        ),
+        ("user__first_name", "user__last_name", "user__username"),
+        etiqueta_trabajador,
+    ),
+}
+
+
+def autocompletar(nombre, texto="", cursor=None, limite=TAMANO_PAGINA):
+    """Página de opciones de un modelo cuyos campos de búsqueda empiezan con el texto.
+
+    Se pagina por clave primaria, así que cada página cuesta lo mismo sin importar su posición. El
+    resultado se guarda en la caché con la versión del modelo.
+
+    Args:
+        nombre (str): Clave de AUTOCOMPLETADOS.
+        texto (str): Prefijo que se busca, sin distinguir mayúsculas.
+        cursor (int): Clave primaria de la última opción de la página anterior.
+        limite (int): Opciones por página, hasta TAMANO_PAGINA_MAXIMO.
+
+    Returns:
+        dict: {"resultados": [{"id": ..., "texto": ...}], "siguiente": cursor o None}
+    """
+    autocompletado = AUTOCOMPLETADOS[nombre]
+    limite = max(1, min(limite, TAMANO_PAGINA_MAXIMO))
+    texto = texto.strip()
+    firma = hashlib.md5(f"{texto}\0{cursor}\0{limite}".encode(), usedforsecurity=False).hexdigest()
+    llave = f"{PREFIJO_AUTOCOMPLETAR}:{nombre}:{version(autocompletado.modelo)}:{firma}"
+    pagina = cache.get(llave)
+    if pagina is not None:
+        return pagina
+
+    filas = autocompletado.consulta().order_by("pk")
+    if texto:
+        prefijo = Q()
+        for campo in autocompletado.campos:
+            prefijo |= Q(**{f"{campo}__istartswith": texto})
+        filas = filas.filter(prefijo)
+    if cursor is not None:
+        filas = filas.filter(pk__gt=cursor)
+    filas = list(filas[: limite + 1])
+    siguiente = filas[limite - 1].pk if len(filas) > limite else None
+    pagina = {
+        "resultados": [
+            {"id": fila.pk, "texto": autocompletado.etiqueta(fila)} for fila in filas[:limite]
+        ],
+        "siguiente": siguiente,
+    }
+    cache.set(llave, pagina, CACHE_OPCIONES)
+    return pagina
+
+
+def opciones(modelo, consulta=None, etiqueta=str):
+    """Lista de (pk, etiqueta) de todas las filas de un modelo, guardada con su versión.
+
+    Para modelos con pocas filas (sucursales); los que tienen miles usan autocompletar.
+    """
+    llave = f"{PREFIJO_OPCIONES}:{modelo._meta.label_lower}:{version(modelo)}"
+    lista = cache.get(llave)
+    if lista is None:
+        filas = consulta if consulta is not None else modelo.objects.all()
+        lista = [(fila.pk, etiqueta(fila)) for fila in filas.order_by("pk")]
+        cache.set(llave, lista, CACHE_OPCIONES)
+    return lista
+
+
+class OpcionesCacheadas:
+    """Opciones de un OpcionesCacheadasField que se leen de la caché recién al recorrerlas.
+
+    Igual que ModelChoiceIterator, no consulta nada al definir el formulario.
+    """
+
+    def __init__(self, field):
+        self.field = field
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        field = self.field
+        yield from opciones(field.queryset.model, field.queryset, field.label_from_instance)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(len(self))
+
+
+class OpcionesCacheadasField(forms.ModelChoiceField):
+    """ModelChoiceField que dibuja sus opciones desde la caché versionada en lugar de consultar.
+
+    La lista se guarda por modelo, así que el queryset debe incluir todas sus filas. La validación
+    sigue usando el queryset, con una consulta por el valor enviado.
+
+    Args:
+        queryset (QuerySet): Filas del modelo.
+        etiqueta (function): Etiqueta de cada fila (por defecto, str).
+    """
+
+    def __init__(self, queryset, etiqueta=None, **kwargs):
+        super().__init__(queryset, **kwargs)
+        if etiqueta is not None:
+            self.label_from_instance = etiqueta
+
+    def _get_choices(self):
+        return OpcionesCacheadas(self)
+
+    choices = property(_get_choices, forms.ChoiceField._set_choices)
+
+
+class AutocompletarMixin:
+    """Widget que dibuja sólo las opciones seleccionadas y la URL de autocompletado.
+
+    Igual que el autocompletado del admin de Django, las etiquetas de las opciones seleccionadas se
+    obtienen con una consulta filtrada por sus claves primarias.
+    """
+
+    class Media:
+        js = ("js/autocompletar.js",)
+
+    def __init__(self, nombre, attrs=None, choices=()):
+        super().__init__(attrs, choices)
+        self.nombre = nombre
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context["widget"]["attrs"]["data-autocompletar"] = reverse(
+            "autocomplete", args=(self.nombre,)
+        )
+        return context
+
+    def optgroups(self, name, value, attr=None):
+        seleccionados = [str(valor) for valor in value if valor not in ("", None)]
+        opciones_dibujadas = []
+        if seleccionados:
+            etiqueta = AUTOCOMPLETADOS[self.nombre].etiqueta
+            filas = self.choices.queryset.filter(pk__in=seleccionados)
+            for indice, fila in enumerate(filas):
+                opciones_dibujadas.append(
+                    self.create_option(name, fila.pk, etiqueta(fila), True, indice)
+                )
+        return [(None, opciones_dibujadas, 0)]
+
+
+class AutocompletarSelect(AutocompletarMixin, forms.Select):
+    pass
+
+
+class AutocompletarSelectMultiple(AutocompletarMixin, forms.SelectMultiple):
+    pass
+
+
+def autocompletar_field(nombre, multiple=False, **kwargs):
+    """Campo de elección de un modelo de AUTOCOMPLETADOS que se llena con autocompletado."""
+    autocompletado = AUTOCOMPLETADOS[nombre]
+    if multiple:
+        return forms.ModelMultipleChoiceField(
+            queryset=autocompletado.consulta(),
+            widget=AutocompletarSelectMultiple(nombre),
+            **kwargs,
+        )
+    return forms.ModelChoiceField(
+        queryset=autocompletado.consulta(), widget=AutocompletarSelect(nombre), **kwargs
+    )
+
+
+def _invalidar_modelo(sender, **kwargs):
+    invalidar(sender)
+
+
+def _invalidar_trabajadores(sender, created=False, update_fields=None, **kwargs):
+    # La etiqueta de los trabajadores es el nombre de su usuario; un usuario nuevo aún no tiene
+    # trabajador y el inicio de sesión sólo guarda last_login, así que ninguno la cambia
+    if created:
+        return
+    if update_fields is None or not update_fields.isdisjoint(CAMPOS_NOMBRE_USUARIO):
+        invalidar(Trabajador)
+
+
+for modelo in (Material, Trabajador, Sucursal):
+    post_save.connect(_invalidar_modelo, sender=modelo, dispatch_uid="inventario_app.opciones")
+    post_delete.connect(_invalidar_modelo, sender=modelo, dispatch_uid="inventario_app.opciones")
+post_save.connect(_invalidar_trabajadores, sender=User, dispatch_uid="inventario_app.opciones")
+post_delete.connect(_invalidar_trabajadores, sender=User, dispatch_uid="inventario_app.opciones")
@@ -0,0 +1,341 @@
+"""Planificación del corte de planchas de Material en piezas de ProductoHojalateria.
+
+Resuelve el problema de corte en dos dimensiones con cortes de guillotina: las piezas se ordenan de
+mayor a menor área y cada una se coloca en el rectángulo libre en el que sobra menos material,
+girándola 90° si es necesario. Al colocar una pieza en la esquina de un rectángulo, el resto se
+divide en dos rectángulos nuevos a lo largo del eje con menos sobrante.
+
+Hay dos motores con exactamente las mismas decisiones: empaquetar_python, la versión de referencia,
+y empaquetar_numpy, que evalúa todos los rectángulos libres a la vez con arreglos de NumPy. Los
+pedidos grandes se dividen en bloques que se resuelven en paralelo en un pool de procesos.
+
+Todas las medidas están en milímetros enteros, igual que en ProductoHojalateria y Sobrante.
+"""
+
+import math
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+from django.db import transaction
+
+from .models import Sobrante
+from .stock import CATEGORIA_SOBRANTE, Movimiento, registrar_movimientos
+
+# Medidas de la plancha estándar en milímetros (largo, ancho)
+PLANCHA_ESTANDAR = (3000, 1000)
+
+# Lado mínimo en milímetros para que un resto se guarde como Sobrante
+MINIMO_SOBRANTE = 100
+
+# Número de piezas a partir del cual el pedido se divide en bloques que se resuelven en paralelo
+TAMANO_BLOQUE = 2000
+
+# Colocación de una pieza en una plancha, con la esquina (x, y) y las medidas ya giradas si corresponde
+Colocacion = namedtuple("Colocacion", ["pieza", "plancha", "x", "y", "largo", "ancho", "rotada"])
+
+# Rectángulo de una plancha que quedó sin usar
+Resto = namedtuple("Resto", ["plancha", "x", "y", "largo", "ancho"])
+
+# Resultado de la planificación
+PlanCorte = namedtuple(
+    "PlanCorte", ["planchas", "colocaciones", "restos", "sin_colocar", "aprovechamiento"]
+)
+
+
+def _ordenar(piezas):
+    """Ordena las piezas (indice, largo, ancho) de mayor a menor área, con el índice como desempate."""
+    return sorted(piezas, key=lambda pieza: (-pieza[1] * pieza[2], pieza[0]))
+
+
+def _dividir(x, y, largo, ancho, usado_largo, usado_ancho):
+    """Divide el resto de un rectángulo libre después de colocar una pieza en su esquina.
+
+    Returns:
+        tuple: Dos rectángulos (x, y, largo, ancho); pueden tener un lado igual a cero.
+    """
+    resto_largo = largo - usado_largo
+    resto_ancho = ancho - usado_ancho
+    if resto_largo < resto_ancho:
+        return (
+            (x + usado_largo, y, resto_largo, usado_ancho),
+            (x, y + usado_ancho, largo, resto_ancho),
+        )
+    return (
+        (x + usado_largo, y, resto_largo, ancho),
+        (x, y + usado_ancho, usado_largo, resto_ancho),
+    )
+
+
+def _aprovechamiento(colocaciones, planchas, plancha):
+    if not planchas:
+        return 0.0
+    usado = sum(colocacion.largo * colocacion.ancho for colocacion in colocaciones)
+    return usado / (planchas * plancha[0] * plancha[1])
+
+
+def empaquetar_python(piezas, plancha=PLANCHA_ESTANDAR):
+    """Motor de referencia en Python puro.
+
+    Args:
+        piezas (list): Tuplas (indice, largo, ancho) en milímetros.
+        plancha (tuple): Medidas (largo, ancho) de la plancha en milímetros.
+
+    Returns:
+        PlanCorte: Plan con las planchas usadas, colocaciones y restos.
+    """
+    orden = _ordenar(piezas)
+    if not orden:
+        return PlanCorte(0, [], [], [], 0.0)
+    plancha_largo, plancha_ancho = plancha
+
+    # Los rectángulos con un lado menor al lado más corto de todas las piezas nunca se usarán
+    minimo = min(min(largo, ancho) for _, largo, ancho in orden)
+
+    libres = []
+    descartados = []
+    colocaciones = []
+    sin_colocar = []
+    planchas = 0
+
+    for indice, largo, ancho in orden:
+        area = largo * ancho
+        mejor = None
+        for posicion, (_, _, _, libre_largo, libre_ancho) in enumerate(libres):
+            sobra = libre_largo * libre_ancho - area
+            if mejor is not None and sobra >= mejor[0]:
+                continue
+            if libre_largo >= largo and libre_ancho >= ancho:
+                mejor = (sobra, posicion, False)
+            elif libre_largo >= ancho and libre_ancho >= largo:
+                mejor = (sobra, posicion, True)
+
+        if mejor is None:
+            if plancha_largo >= largo and plancha_ancho >= ancho:
+                rotada = False
+            elif plancha_largo >= ancho and plancha_ancho >= largo:
+                rotada = True
+            else:
+                sin_colocar.append(indice)
+                continue
+            libres.append((planchas, 0, 0, plancha_largo, plancha_ancho))
+            planchas += 1
+            mejor = (None, len(libres) - 1, rotada)
+
+        _, posicion, rotada = mejor
+        numero, x, y, libre_largo, libre_ancho = libres.pop(posicion)
+        usado_largo, usado_ancho = (ancho, largo) if rotada else (largo, ancho)
+        colocaciones.append(Colocacion(indice, numero, x, y, usado_largo, usado_ancho, rotada))
+
+        for rx, ry, rl, ra in _dividir(x, y, libre_largo, libre_ancho, usado_largo, usado_ancho):
+            if rl <= 0 or ra <= 0:
+                continue
+            if min(rl, ra) < minimo:
+                descartados.append(Resto(numero, rx, ry, rl, ra))
+            else:
+                libres.append((numero, rx, ry, rl, ra))
+
+    restos = sorted(descartados + [Resto(*libre) for libre in libres])
+    colocaciones.sort()
+    sin_colocar.sort()
+    return PlanCorte(
+        planchas, colocaciones, restos, sin_colocar, _aprovechamiento(colocaciones, planchas, plancha)
+    )
+
+
+def empaquetar_numpy(piezas, plancha=PLANCHA_ESTANDAR):
+    """Motor vectorizado: evalúa todos los rectángulos libres en cada paso con arreglos de NumPy.
+
+    Los rectángulos usados se marcan como inactivos en lugar de eliminarse, por lo que los activos
+    conservan el mismo orden que la lista de la versión de referencia y los empates se resuelven igual.
+
+    Args:
+        piezas (list): Tuplas (indice, largo, ancho) en milímetros.
+        plancha (tuple): Medidas (largo, ancho) de la plancha en milímetros.
+
+    Returns:
+        PlanCorte: El mismo plan que entrega empaquetar_python.
+    """
+    orden = _ordenar(piezas)
+    if not orden:
+        return PlanCorte(0, [], [], [], 0.0)
+    plancha_largo, plancha_ancho = plancha
+    minimo = min(min(largo, ancho) for _, largo, ancho in orden)
+
+    # Cada pieza agrega como máximo una plancha y dos rectángulos libres
+    capacidad = 3 * len(orden)
+    libres = np.zeros((capacidad, 5), dtype=np.int64)
+    activos = np.zeros(capacidad, dtype=bool)
+    total = 0
+
+    descartados = []
+    colocaciones = []
+    sin_colocar = []
+    planchas = 0
+    sin_espacio = np.iinfo(np.int64).max
+
+    for indice, largo, ancho in orden:
+        posicion = None
+        if total:
+            libre_largo = libres[:total, 3]
+            libre_ancho = libres[:total, 4]
+            normal = (libre_largo >= largo) & (libre_ancho >= ancho)
+            girada = (libre_largo >= ancho) & (libre_ancho >= largo)
+            calza = activos[:total] & (normal | girada)
+            if calza.any():
+                sobra = np.where(calza, libre_largo * libre_ancho, sin_espacio)
+                posicion = int(np.argmin(sobra))
+                rotada = not normal[posicion]
+
+        if posicion is None:
+            if plancha_largo >= largo and plancha_ancho >= ancho:
+                rotada = False
+            elif plancha_largo >= ancho and plancha_ancho >= largo:
+                rotada = True
+            else:
+                sin_colocar.append(indice)
+                continue
+            libres[total] = (planchas, 0, 0, plancha_largo, plancha_ancho)
+            activos[total] = True
+            posicion = total
+            total += 1
+            planchas += 1
+
+        activos[posicion] = False
+        numero, x, y, libre_largo, libre_ancho = (int(valor) for valor in libres[posicion])
+        usado_largo, usado_ancho = (ancho, largo) if rotada else (largo, ancho)
+        colocaciones.append(Colocacion(indice, numero, x, y, usado_largo, usado_ancho, rotada))
+
+        for rx, ry, rl, ra in _dividir(x, y, libre_largo, libre_ancho, usado_largo, usado_ancho):
+            if rl <= 0 or ra <= 0:
+                continue
+            if min(rl, ra) < minimo:
+                descartados.append(Resto(numero, rx, ry, rl, ra))
+            else:
+                libres[total] = (numero, rx, ry, rl, ra)
+                activos[total] = True
+                total += 1
+
+    restos = sorted(
+        descartados + [Resto(*(int(valor) for valor in fila)) for fila in libres[:total][activos[:total]]]
+    )
+    colocaciones.sort()
+    sin_colocar.sort()
+    return PlanCorte(
+        planchas, colocaciones, restos, sin_colocar, _aprovechamiento(colocaciones, planchas, plancha)
+    )
+
+
+# Motores disponibles para planificar_cortes
+MOTORES = {
+    "python": empaquetar_python,
+    "numpy": empaquetar_numpy,
+}
+
+
+def _unir(planes, plancha):
+    """Une los planes de varios bloques renumerando las planchas de cada uno."""
+    colocaciones = []
+    restos = []
+    sin_colocar = []
+    planchas = 0
+    for plan in planes:
+        colocaciones.extend(c._replace(plancha=c.plancha + planchas) for c in plan.colocaciones)
+        restos.extend(r._replace(plancha=r.plancha + planchas) for r in plan.restos)
+        sin_colocar.extend(plan.sin_colocar)
+        planchas += plan.planchas
+    colocaciones.sort()
+    sin_colocar.sort()
+    return PlanCorte(
+        planchas, colocaciones, restos, sin_colocar, _aprovechamiento(colocaciones, planchas, plancha)
+    )
+
+
+def planificar_cortes(
+    medidas, plancha=PLANCHA_ESTANDAR, motor="numpy", procesos=None, tamano_bloque=TAMANO_BLOQUE
+):
+    """Planifica el corte de una lista de piezas en planchas estándar.
+
+    Si el pedido tiene más de tamano_bloque piezas, se reparte en bloques (alternando las piezas
+    para que cada bloque mezcle tamaños) que se resuelven en paralelo en un pool de procesos.
+
+    Args:
+        medidas (list): Pares (largo, ancho) de cada pieza en milímetros.
+        plancha (tuple): Medidas (largo, ancho) de la plancha en milímetros.
+        motor (str): "numpy" o "python".
+        procesos (int): Número de procesos del pool; 1 desactiva el paralelismo.
+        tamano_bloque (int): Número máximo de piezas por bloque.
+
+    Returns:
+        PlanCorte: Plan del pedido completo; el campo pieza de cada colocación es el índice en medidas.
+    """
+    empaquetar = MOTORES[motor]
+    piezas = [(indice, int(largo), int(ancho)) for indice, (largo, ancho) in enumerate(medidas)]
+    if len(piezas) <= tamano_bloque or procesos == 1:
+        return empaquetar(piezas, plancha)
+
+    numero_bloques = math.ceil(len(piezas) / tamano_bloque)
+    ordenadas = _ordenar(piezas)
+    bloques = [ordenadas[inicio::numero_bloques] for inicio in range(numero_bloques)]
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        planes = list(pool.map(empaquetar, bloques, repeat(plancha)))
+    return _unir(planes, plancha)
+
+
+def medidas_de_productos(productos):
+    """Obtiene las medidas (largo, ancho) de los productos que las tienen definidas.
+
+    Args:
+        productos (Iterable[ProductoHojalateria]): Productos a cortar.
+
+    Returns:
+        list: Pares (largo, ancho) en milímetros, en el mismo orden que los productos.
+    """
+    return [
+        (producto.largo, producto.ancho)
+        for producto in productos
+        if producto.largo is not None and producto.ancho is not None
+    ]
+
+
+def guardar_sobrantes(plan, material, sucursal, minimo=MINIMO_SOBRANTE):
+    """Guarda los restos del plan como Sobrante con un solo bulk_create.
+
+    Los restos con las mismas medidas se agrupan en una sola fila y su cantidad se registra en el
+    libro de movimientos de inventario.
+
+    Args:
+        plan (PlanCorte): Plan de corte ya calculado.
+        material (Material): Material de las planchas.
+        sucursal (Sucursal): Sucursal en la que quedan los sobrantes.
+        minimo (int): Lado mínimo en milímetros de un resto para guardarlo.
+
+    Returns:
+        list: Los Sobrante creados.
+    """
+    medidas = Counter(
+        (max(resto.largo, resto.ancho), min(resto.largo, resto.ancho))
+        for resto in plan.restos
+        if min(resto.largo, resto.ancho) >= minimo
+    )
+    if not medidas:
+        return []
+
+    with transaction.atomic():
+        sobrantes = Sobrante.objects.bulk_create(
+            Sobrante(material=material, sucursal=sucursal, existencias=0, largo=largo, ancho=ancho)
+            for largo, ancho in medidas
+        )
+        registrar_movimientos(
+            Movimiento(
+                sucursal=sucursal,
+                material=material,
+                categoria=CATEGORIA_SOBRANTE,
+                cantidad=medidas[(sobrante.largo, sobrante.ancho)],
+                sobrante=sobrante,
+                motivo="Plan de corte",
+            )
+            for sobrante in sobrantes
+        )
+    return sobrantes
@@ -0,0 +1,173 @@
+"""Preparación de los archivos estáticos antes de collectstatic: Bootstrap recortado y logos.
+
+Bootstrap se guarda completo en vendor/bootstrap (sin servirse) para poder regenerar la versión
+recortada sin acceso a internet. El recorte conserva las reglas cuyos selectores sólo usan clases
+que aparecen en las plantillas y en los scripts de la aplicación, además de los estilos base por
+elemento y las variables de :root.
+"""
+
+import re
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent
+
+# Bootstrap completo y su versión recortada que se sirve
+BOOTSTRAP_COMPLETO = APP_DIR / "vendor" / "bootstrap" / "bootstrap.min.css"
+BOOTSTRAP_RECORTADO = APP_DIR / "static" / "css" / "bootstrap.min.css"
+
+# Logo original y anchos, en píxeles, de sus variantes (1x, 2x y 3x del tamaño en la barra)
+LOGO = APP_DIR / "static" / "img" / "logo.webp"
+ANCHOS_LOGO = (48, 96, 144)
+
+# Clases que los componentes agregan desde JavaScript y no aparecen en las plantillas
+CLASES_DINAMICAS = {"show", "collapsing", "collapsed"}
+
+# Reglas @ cuyo contenido son más reglas, que se recortan recursivamente
+REGLAS_ANIDADAS = ("@media", "@supports", "@container", "@layer")
+
+_CLASE = re.compile(r"\.(-?[_a-zA-Z][_a-zA-Z0-9-]*)")
+_NOT = re.compile(r":not\([^()]*\)")
+_ATRIBUTO_CLASS = re.compile(r"""class\s*=\s*["']([^"']*)["']""")
+_CLASES_JS = re.compile(r"""(?:className\s*=\s*|classList\.\w+\()\s*["']([^"']*)["']""")
+_KEYFRAMES = re.compile(r"@keyframes\s+([\w-]+)")
+
+
+def clases_usadas():
+    """Clases CSS de las plantillas y de los scripts de la aplicación.
+
+    Las etiquetas de plantilla dentro de un atributo class se ignoran; sus clases literales, si las
+    tienen, se toman igual.
+    """
+    clases = set(CLASES_DINAMICAS)
+    for plantilla in (APP_DIR / "templates").rglob("*.html"):
+        for atributo in _ATRIBUTO_CLASS.findall(plantilla.read_text(encoding="utf-8")):
+            atributo = re.sub(r"{[%{].*?[%}]}", " ", atributo)
+            clases.update(atributo.split())
+    for script in (APP_DIR / "static").rglob("*.js"):
+        for atributo in _CLASES_JS.findall(script.read_text(encoding="utf-8")):
+            clases.update(atributo.split())
+    return clases
+
+
+def _bloques(css):
+    """Separa una hoja de estilos en (preludio, cuerpo) de primer nivel; cuerpo es None en las
+    sentencias que terminan en punto y coma (@charset, @import)."""
+    inicio = profundidad = 0
+    cadena = None
+    preludio = None
+    posicion = 0
+    while posicion < len(css):
+        caracter = css[posicion]
+        if cadena:
+            if caracter == "\\":
+                posicion += 1
+            elif caracter == cadena:
+                cadena = None
+        elif css.startswith("/*", posicion):
+            fin = css.find("*/", posicion + 2)
+            posicion = len(css) if fin == -1 else fin + 1
+        elif caracter in "\"'":
+            cadena = caracter
+        elif caracter == "{":
+            if profundidad == 0:
+                preludio = css[inicio:posicion]
+                inicio = posicion + 1
+            profundidad += 1
+        elif caracter == "}":
+            profundidad -= 1
+            if profundidad == 0:
+                yield preludio.strip(), css[inicio:posicion]
+                inicio = posicion + 1
+        elif caracter == ";" and profundidad == 0:
+            yield css[inicio:posicion].strip(), None
+            inicio = posicion + 1
+        posicion += 1
+
+
+def _separar_selectores(preludio):
+    selectores = []
+    inicio = profundidad = 0
+    for posicion, caracter in enumerate(preludio):
+        if caracter == "(":
+            profundidad += 1
+        elif caracter == ")":
+            profundidad -= 1
+        elif caracter == "," and profundidad == 0:
+            selectores.append(preludio[inicio:posicion])
+            inicio = posicion + 1
+    selectores.append(preludio[inicio:])
+    return selectores
+
+
+def _selector_usado(selector, clases):
+    # Las clases dentro de :not() no tienen que estar presentes para que la regla aplique
+    return set(_CLASE.findall(_NOT.sub("", selector))) <= clases
+
+
+def _recortar(css, clases):
+    partes = []
+    for preludio, cuerpo in _bloques(css):
+        # Se quitan los comentarios que quedan antes del preludio, salvo el de la licencia
+        comentario, _, preludio = preludio.rpartition("*/")
+        if "/*!" in comentario:
+            partes.append(comentario[comentario.index("/*!") :] + "*/")
+        if cuerpo is None:
+            partes.append(f"{preludio};")
+        elif preludio.startswith(REGLAS_ANIDADAS):
+            interior = _recortar(cuerpo, clases)
+            if interior:
+                partes.append(f"{preludio}{{{interior}}}")
+        elif preludio.startswith("@"):
+            partes.append(f"{preludio}{{{cuerpo}}}")
+        else:
+            selectores = [s for s in _separar_selectores(preludio) if _selector_usado(s, clases)]
+            if selectores:
+                partes.append(f"{','.join(selectores)}{{{cuerpo}}}")
+    return "".join(partes)
+
+
+def recortar_css(css, clases):
+    """Quita de una hoja de estilos las reglas de clases que no se usan.
+
+    Args:
+        css (str): Hoja de estilos (minificada o no).
+        clases (set): Clases que se usan.
+
+    Returns:
+        str: Hoja de estilos recortada, sin las animaciones que ya nadie referencia.
+    """
+    recortado = _recortar(css, clases)
+    for nombre in set(_KEYFRAMES.findall(recortado)):
+        if len(re.findall(rf"\b{re.escape(nombre)}\b", recortado)) == 1:
+            recortado = re.sub(
+                rf"@keyframes\s+{re.escape(nombre)}\{{(?:[^{{}}]*\{{[^{{}}]*\}})*[^{{}}]*\}}",
+                "",
+                recortado,
+            )
+    return recortado
+
+
+def recortar_bootstrap():
+    """Escribe la versión recortada de Bootstrap y devuelve los tamaños (completo, recortado)."""
+    completo = BOOTSTRAP_COMPLETO.read_text(encoding="utf-8")
+    recortado = recortar_css(completo, clases_usadas())
+    BOOTSTRAP_RECORTADO.write_text(recortado, encoding="utf-8")
+    return len(completo.encode()), len(recortado.encode())
+
+
+def generar_logos():
+    """Escribe logo-<ancho>.webp para cada ancho de ANCHOS_LOGO y devuelve sus rutas.
+
+    Requiere Pillow, que sólo se usa al preparar los estáticos.
+    """
+    from PIL import Image
+
+    rutas = []
+    with Image.open(LOGO) as original:
+        for ancho in ANCHOS_LOGO:
+            alto = round(original.height * ancho / original.width)
+            variante = original.resize((ancho, alto), Image.LANCZOS)
+            ruta = LOGO.with_name(f"{LOGO.stem}-{ancho}{LOGO.suffix}")
+            variante.save(ruta, "WEBP", quality=85, method=6)
+            rutas.append(ruta)
+    return rutas
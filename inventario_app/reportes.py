@@ -0,0 +1,345 @@
+"""Reportes de inventario sobre agregados diarios que se mantienen de forma incremental.
+
+Los tres reportes (existencias por sucursal, uso de material por trabajador y área de sobrantes
+recuperada) salen del libro de movimientos (StockMovement). En lugar de recorrerlo en cada
+consulta, refrescar() suma a las tablas Reporte* sólo los movimientos posteriores a la marca
+guardada en MarcaReporte, por bloques y cada bloque en su propia transacción junto con la marca.
+Las vistas leen sólo los agregados de una ventana de días, así que su costo no crece con el
+historial.
+
+- ReporteStockDiario: entradas y salidas por día, sucursal, material y categoría.
+- ReporteUsoTrabajador: unidades de producto que entran al inventario, acreditadas a cada
+  trabajador del producto, con el área de material (largo × ancho, en mm²) que usaron.
+- ReporteSobranteDiario: piezas y área de sobrantes que entran (recuperadas) y salen (reutilizadas).
+
+Los trabajadores y las medidas de un producto se leen al sumar sus movimientos; cambios
+posteriores no modifican los días ya sumados salvo que se reconstruyan los reportes.
+"""
+
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from .medidas import MICRONES_POR_CENTIMETRO, a_metros_cuadrados, formatear
+from .models import (
+    MarcaReporte,
+    ProductoHojalateria,
+    ReporteSobranteDiario,
+    ReporteStockDiario,
+    ReporteUsoTrabajador,
+    StockMovement,
+    StockSnapshot,
+)
+from .stock import CATEGORIA_SOBRANTE
+
+# Nombre de la marca de los agregados de inventario en MarcaReporte
+MARCA_INVENTARIO = "inventario"
+
+# Movimientos que se suman por transacción
+TAMANO_BLOQUE = 5000
+
+# Segundos de antigüedad que debe tener un movimiento para sumarse. Los ids se asignan antes del
+# commit, así que un movimiento de una transacción aún abierta puede tener un id menor que otro ya
+# visible; esperar este margen evita saltarlo.
+RETRASO_SEGURO = 60
+
+# Días que muestran los reportes por defecto y como máximo
+DIAS_POR_DEFECTO = 30
+DIAS_MAXIMO = 366
+
+# Filas máximas del ranking de uso de material por trabajador
+MAXIMO_TRABAJADORES = 50
+
+# Agregado que se mantiene: modelo, campos de la clave y campos que se suman
+Agregado = namedtuple("Agregado", ["modelo", "clave", "valores"])
+
+AGREGADOS = {
+    "stock": Agregado(
+        ReporteStockDiario, ("dia", "sucursal_id", "material_id", "categoria"), ("entradas", "salidas")
+    ),
+    "uso": Agregado(
+        ReporteUsoTrabajador, ("dia", "trabajador_id", "material_id"), ("unidades", "area")
+    ),
+    "sobrantes": Agregado(
+        ReporteSobranteDiario,
+        ("dia", "sucursal_id", "material_id"),
+        ("piezas_recuperadas", "area_recuperada", "piezas_usadas", "area_usada"),
+    ),
+}
+
+# Resultado de un refresco
+ResultadoRefresco = namedtuple("ResultadoRefresco", ["movimientos", "bloques", "ultimo_movimiento"])
+
+# Campos de StockMovement que se leen para sumar un bloque
+CAMPOS_MOVIMIENTO = (
+    "pk",
+    "creado",
+    "sucursal_id",
+    "material_id",
+    "categoria",
+    "cantidad",
+    "producto_id",
+    "sobrante_id",
+    "producto__largo",
+    "producto__ancho",
+    "sobrante__largo",
+    "sobrante__ancho",
+)
+
+def _dia(fecha):
+    return timezone.localtime(fecha).date() if timezone.is_aware(fecha) else fecha.date()
+
+
+def _area(largo, ancho, cantidad):
+    """Área en milímetros cuadrados de cantidad piezas de largo × ancho milímetros."""
+    if largo is None or ancho is None:
+        return 0
+    return largo * ancho * abs(cantidad)
+
+
+def _trabajadores_por_producto(productos):
+    """Trabajadores de cada producto con una sola consulta a la tabla intermedia."""
+    intermedia = ProductoHojalateria.Trabajador.through
+    trabajadores = defaultdict(list)
+    for producto_id, trabajador_id in intermedia.objects.filter(
+        productohojalateria_id__in=productos
+    ).values_list("productohojalateria_id", "trabajador_id"):
+        trabajadores[producto_id].append(trabajador_id)
+    return trabajadores
+
+
+def acumular(movimientos):
+    """Suma un bloque de movimientos por la clave de cada agregado.
+
+    Args:
+        movimientos (list): Diccionarios con CAMPOS_MOVIMIENTO.
+
+    Returns:
+        dict: {nombre de AGREGADOS: {clave: [valores]}}
+    """
+    stock = defaultdict(lambda: [0, 0])
+    uso = defaultdict(lambda: [0, 0])
+    sobrantes = defaultdict(lambda: [0, 0, 0, 0])
+    fabricados = {m["producto_id"] for m in movimientos if m["producto_id"] and m["cantidad"] > 0}
+    trabajadores = _trabajadores_por_producto(fabricados) if fabricados else {}
+
+    for movimiento in movimientos:
+        dia = _dia(movimiento["creado"])
+        cantidad = movimiento["cantidad"]
+        sucursal, material = movimiento["sucursal_id"], movimiento["material_id"]
+        fila = stock[(dia, sucursal, material, movimiento["categoria"])]
+        if cantidad > 0:
+            fila[0] += cantidad
+        else:
+            fila[1] -= cantidad
+
+        if movimiento["producto_id"] in fabricados and cantidad > 0:
+            area = _area(movimiento["producto__largo"], movimiento["producto__ancho"], cantidad)
+            for trabajador in trabajadores.get(movimiento["producto_id"], ()):
+                fila = uso[(dia, trabajador, material)]
+                fila[0] += cantidad
+                fila[1] += area
+
+        if movimiento["sobrante_id"] is not None and cantidad:
+            area = _area(movimiento["sobrante__largo"], movimiento["sobrante__ancho"], cantidad)
+            fila = sobrantes[(dia, sucursal, material)]
+            if cantidad > 0:
+                fila[0] += cantidad
+                fila[1] += area
+            else:
+                fila[2] -= cantidad
+                fila[3] += area
+
+    return {"stock": stock, "uso": uso, "sobrantes": sobrantes}
+
+
+def _sumar(agregado, acumulados):
+    """Suma los valores acumulados a las filas del agregado, creando las que faltan.
+
+    Debe ejecutarse con la marca bloqueada, de modo que nadie más escribe los agregados.
+    """
+    if not acumulados:
+        return
+    filtros = {
+        f"{campo}__in": {clave[posicion] for clave in acumulados}
+        for posicion, campo in enumerate(agregado.clave)
+    }
+    existentes = {
+        tuple(getattr(fila, campo) for campo in agregado.clave): fila
+        for fila in agregado.modelo.objects.filter(**filtros)
+    }
+    actualizadas = []
+    nuevas = []
+    for clave, valores in acumulados.items():
+        fila = existentes.get(clave)
+        if fila is None:
+            campos = {**dict(zip(agregado.clave, clave)), **dict(zip(agregado.valores, valores))}
+            nuevas.append(agregado.modelo(**campos))
+            continue
+        for campo, valor in zip(agregado.valores, valores):
+            setattr(fila, campo, getattr(fila, campo) + valor)
+        actualizadas.append(fila)
+    agregado.modelo.objects.bulk_update(actualizadas, agregado.valores)
+    agregado.modelo.objects.bulk_create(nuevas)
+
+
+def refrescar(tamano_bloque=TAMANO_BLOQUE, retraso=RETRASO_SEGURO):
+    """Suma a los agregados los movimientos registrados desde el último refresco.
+
+    Cada bloque se suma en una transacción que también avanza la marca, así que un refresco
+    interrumpido continúa donde quedó y dos refrescos simultáneos no suman dos veces lo mismo.
+
+    Args:
+        tamano_bloque (int): Movimientos por transacción.
+        retraso (int): Segundos de antigüedad que debe tener un movimiento para sumarse.
+
+    Returns:
+        ResultadoRefresco: Movimientos sumados, bloques y id del último movimiento sumado.
+    """
+    limite = timezone.now() - timedelta(seconds=retraso)
+    sumados = bloques = 0
+    ultimo = None
+    while True:
+        with transaction.atomic():
+            marca, _ = MarcaReporte.objects.select_for_update().get_or_create(
+                nombre=MARCA_INVENTARIO
+            )
+            movimientos = list(
+                StockMovement.objects.filter(pk__gt=marca.ultimo_movimiento)
+                .order_by("pk")
+                .values(*CAMPOS_MOVIMIENTO)[:tamano_bloque]
+            )
+            # Se detiene en el primer movimiento más nuevo que el margen, para no saltar los
+            # anteriores a él que aún no son visibles
+            for posicion, movimiento in enumerate(movimientos):
+                if movimiento["creado"] >= limite:
+                    movimientos = movimientos[:posicion]
+                    break
+            ultimo = marca.ultimo_movimiento
+            if not movimientos:
+                break
+            for nombre, acumulados in acumular(movimientos).items():
+                _sumar(AGREGADOS[nombre], acumulados)
+            marca.ultimo_movimiento = ultimo = movimientos[-1]["pk"]
+            marca.save(update_fields=["ultimo_movimiento", "actualizado"])
+        sumados += len(movimientos)
+        bloques += 1
+        if len(movimientos) < tamano_bloque:
+            break
+    return ResultadoRefresco(sumados, bloques, ultimo)
+
+
+def reconstruir(tamano_bloque=TAMANO_BLOQUE, retraso=RETRASO_SEGURO):
+    """Borra los agregados y los vuelve a sumar desde el primer movimiento.
+
+    Recorre el historial completo; sólo es necesario para reflejar cambios en los trabajadores o
+    las medidas de productos ya sumados.
+
+    Returns:
+        ResultadoRefresco: El resultado de refrescar desde cero.
+    """
+    with transaction.atomic():
+        MarcaReporte.objects.select_for_update().filter(nombre=MARCA_INVENTARIO).update(
+            ultimo_movimiento=0
+        )
+        for agregado in AGREGADOS.values():
+            agregado.modelo.objects.all().delete()
+    return refrescar(tamano_bloque, retraso)
+
+
+def ventana(dias=DIAS_POR_DEFECTO):
+    """Fechas (desde, hasta) de los últimos dias días, incluido hoy."""
+    dias = max(1, min(dias, DIAS_MAXIMO))
+    hasta = _dia(timezone.now())
+    return hasta - timedelta(days=dias - 1), hasta
+
+
+def reporte(dias=DIAS_POR_DEFECTO):
+    """Datos de la página de reportes, leídos sólo de los agregados y de los totales.
+
+    Cada sección es una consulta agrupada sobre a lo más DIAS_MAXIMO días de agregados (o sobre
+    StockSnapshot, que tiene una fila por clave), así que el costo no depende del largo del
+    historial.
+
+    Args:
+        dias (int): Días de la ventana, hasta DIAS_MAXIMO.
+
+    Returns:
+        dict: Ventana, fecha del último refresco y filas de cada sección. Las existencias por
+        sucursal incluyen las entradas y salidas de la ventana; las áreas se suman en milímetros
+        cuadrados y se entregan en metros cuadrados.
+    """
+    desde, hasta = ventana(dias)
+    marca = MarcaReporte.objects.filter(nombre=MARCA_INVENTARIO).values("actualizado").first()
+    es_sobrante = Q(categoria=CATEGORIA_SOBRANTE)
+
+    existencias = (
+        StockSnapshot.objects.values("sucursal_id", "sucursal__direccion")
+        .annotate(
+            productos=Sum("existencias", filter=~es_sobrante, default=0),
+            sobrantes=Sum("existencias", filter=es_sobrante, default=0),
+        )
+        .order_by("sucursal__direccion", "sucursal_id")
+    )
+    movimientos = {
+        fila["sucursal_id"]: fila
+        for fila in ReporteStockDiario.objects.filter(dia__range=(desde, hasta))
+        .values("sucursal_id")
+        .annotate(entradas=Sum("entradas"), salidas=Sum("salidas"))
+        .order_by()
+    }
+    existencias = [
+        {**fila, **movimientos.get(fila["sucursal_id"], {"entradas": 0, "salidas": 0})}
+        for fila in existencias
+    ]
+    uso = (
+        ReporteUsoTrabajador.objects.filter(dia__range=(desde, hasta))
+        .values(
+            "trabajador_id",
+            "trabajador__user__first_name",
+            "trabajador__user__last_name",
+            "trabajador__user__username",
+            "material_id",
+            "material__composicion",
+            "material__espesor",
+            "material__color",
+        )
+        .annotate(unidades=Sum("unidades"), area=Sum("area"))
+        .order_by("-area", "-unidades", "trabajador_id", "material_id")[:MAXIMO_TRABAJADORES]
+    )
+    sobrantes = (
+        ReporteSobranteDiario.objects.filter(dia__range=(desde, hasta))
+        .values("dia")
+        .annotate(
+            piezas_recuperadas=Sum("piezas_recuperadas"),
+            area_recuperada=Sum("area_recuperada"),
+            piezas_usadas=Sum("piezas_usadas"),
+            area_usada=Sum("area_usada"),
+        )
+        .order_by("dia")
+    )
+    return {
+        "desde": desde,
+        "hasta": hasta,
+        "actualizado": marca["actualizado"] if marca else None,
+        "existencias": existencias,
+        "uso": [
+            {
+                **fila,
+                "material__espesor": formatear(fila["material__espesor"], MICRONES_POR_CENTIMETRO),
+                "area": a_metros_cuadrados(fila["area"]),
+            }
+            for fila in uso
+        ],
+        "sobrantes": [
+            {
+                **fila,
+                "area_recuperada": a_metros_cuadrados(fila["area_recuperada"]),
+                "area_usada": a_metros_cuadrados(fila["area_usada"]),
+            }
+            for fila in sobrantes
+        ],
+    }
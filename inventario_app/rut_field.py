@@ -1,35 +1,142 @@
 import re
-from typing import Any, Optional, Sequence, Type, Union
+from collections import namedtuple
+from functools import lru_cache
+from itertools import cycle
+from typing import Any, Iterable, Optional, Sequence, Tuple, Type, Union
+
+import numpy as np
 from django.core.exceptions import ValidationError
 from django.db import models
 from django import forms
 from django.forms.widgets import Widget
 
 
+# Pesos del módulo 11 para el número del RUT rellenado con ceros a la izquierda hasta 8 dígitos.
+# Equivale a recorrer el número desde la derecha con los factores 2, 3, 4, 5, 6, 7, 2, 3.
+PESOS_RUT = np.array((3, 2, 7, 6, 5, 4, 3, 2), dtype=np.int64)
+
+# Potencias de 10 para separar el número del RUT en sus 8 dígitos
+POTENCIAS_RUT = 10 ** np.arange(7, -1, -1, dtype=np.int64)
+
+# Dígito verificador según el valor de (11 - suma % 11) % 11
+DIGITOS_VERIFICADORES = np.array(tuple("0123456789K"))
+
+# Largo máximo de un RUT aceptado, en formato "12.345.678-5"
+LARGO_MAXIMO_RUT = 12
+
+# Columnas del número del RUT alineado a la derecha, con o sin puntos ("12.345.678")
+ANCHO_NUMERO = 10
+
+# Columnas de los puntos en el número alineado a la derecha ("12.345.678")
+COLUMNAS_PUNTOS = np.isin(np.arange(ANCHO_NUMERO), (2, 6))
+
+# Potencias de 10 de cada columna del número alineado a la derecha, sin puntos y con puntos
+POTENCIAS_SIN_PUNTOS = 10 ** np.arange(ANCHO_NUMERO - 1, -1, -1, dtype=np.int64)
+POTENCIAS_CON_PUNTOS = np.array((10**7, 10**6, 0, 10**5, 10**4, 10**3, 0, 100, 10, 1), dtype=np.int64)
+
+# Patrón del formato estricto "12345678-9" usado por is_valid_rut
+RUT_PATTERN = re.compile(r"^\d{7,8}-[0-9kK]$")
+
+# Patrón de los formatos aceptados en formularios: "12.345.678-5", "12345678-5" o "123456785"
+RUT_INPUT_PATTERN = re.compile(
+    r"(?P<numero>\d{1,2}\.\d{3}\.\d{3}|\d{7,8})-?(?P<digito>[0-9kK])", re.ASCII
+)
+
+# Factores de ponderación del módulo 11, aplicados desde el dígito de la derecha
+PESOS_MODULO_11 = (2, 3, 4, 5, 6, 7)
+
+# Dígito verificador según el valor de (11 - suma % 11) % 11, como tupla para la ruta individual
+VERIFICADORES = tuple("0123456789K")
+
+# Número máximo de entradas distintas que se recuerdan ya normalizadas
+RUT_CACHE_MAXSIZE = 4096
+
+
+def digito_verificador(numero):
+    """Calcula el dígito verificador de un número de RUT con aritmética entera.
+
+    Args:
+        numero (int): Número del RUT sin dígito verificador (12345678).
+
+    Returns:
+        str: Dígito verificador ("0" a "9" o "K").
+    """
+    total = 0
+    indice = 0
+    while numero:
+        numero, digito = divmod(numero, 10)
+        total += digito * PESOS_MODULO_11[indice]
+        indice = indice + 1 if indice < 5 else 0
+    return VERIFICADORES[(11 - total % 11) % 11]
+
+
+@lru_cache(maxsize=RUT_CACHE_MAXSIZE)
+def normalizar_rut(valor):
+    """Convierte un RUT ingresado en cualquiera de los formatos aceptados a su forma canónica.
+
+    El resultado queda en una caché LRU de tamaño limitado, por lo que los valores que se repiten
+    (reenvíos de formularios, guardados en el admin) no se vuelven a validar.
+
+    Args:
+        valor (str): RUT como "12.345.678-5", "12345678-5" o "123456785".
+
+    Returns:
+        str: RUT en formato "12345678-5" con la K en mayúscula, o None si no es válido.
+    """
+    coincidencia = RUT_INPUT_PATTERN.fullmatch(valor.strip())
+    if coincidencia is None:
+        return None
+    numero = int(coincidencia["numero"].replace(".", ""))
+    digito = coincidencia["digito"].upper()
+    if digito_verificador(numero) != digito:
+        return None
+    return f"{numero}-{digito}"
+
+
 class RutValidator:
     """Esta clase es un validador personalizado que se utiliza para verificar si un valor de RUT dado es válido."""
 
     def __call__(self, value):
         """Se llama cuando se invoca el validador en un valor de RUT.
 
-        Comprueba que el RUT sea válido al verificar el formato con is_valid_rut y el código verificador con modulo_11.
-        Si el RUT no es válido, lanza una excepción de ValidationError.
+        Comprueba el formato y el código verificador a través de normalize, que acepta RUTs con
+        puntos, con guión o sin separadores. Si el RUT no es válido, lanza una excepción de ValidationError.
 
         Args:
             value (str): El valor de RUT a ser validado.
 
+        Returns:
+            str: El RUT en su forma canónica "12345678-5".
+
         Raises:
             ValidationError: Si el RUT no es válido.
 
         Example:
             >>> validator = RutValidator()
-            >>> validator("12345678-9")  # RUT válido
-            >>> validator("98765432-K")  # RUT válido
-            >>> validator("12345678-5")  # RUT inválido, se lanza una excepción
+            >>> validator("12345678-5")  # RUT válido
+            >>> validator("12.345.678-5")  # RUT válido
+            >>> validator("10000013k")  # RUT válido
+            >>> validator("12345678-9")  # RUT inválido, se lanza una excepción
         """
 
-        if not (self.is_valid_rut(value) and self.modulo_11(value)):
-            raise ValidationError("RUT inválido")
+        normalizado = self.normalize(value)
+        if normalizado is None:
+            raise ValidationError("RUT inválido", code="invalid")
+        return normalizado
+
+    @staticmethod
+    def normalize(value):
+        """Entrega la forma canónica de un RUT o None si no es válido.
+
+        Args:
+            value (Any): El valor de RUT ingresado.
+
+        Returns:
+            str: El RUT en formato "12345678-5", o None si el valor no es un RUT válido.
+        """
+        if not isinstance(value, str):
+            return None
+        return normalizar_rut(value)
 
     @staticmethod
     def is_valid_rut(rut):
@@ -51,8 +158,7 @@ class RutValidator:
         Returns:
             bool: True si el RUT es válido, False si no lo es.
         """
-        rut_pattern = r"^\d{7,8}-[0-9kK]$"
-        return bool(re.match(rut_pattern, rut))
+        return bool(RUT_PATTERN.match(rut))
 
     @staticmethod
     def modulo_11(rut):
@@ -65,55 +171,119 @@ class RutValidator:
             bool: True si el dígito verificador es correcto y False en el caso contrario
         """
 
-        # Variable que almacena el resultado de la verificación
-        digit_check = False
-
         # Separador de número y dígito verificador (12345678-9 = [12345678, 9])
-        lista_rut = rut.split("-", 1)
-
-        # Número del RUT (12345678)
-        numero_rut = lista_rut[0]
-
-        # Dígito verificador del RUT (9)
-        digito_rut = lista_rut[1]
-
-        # Fáctor inicial de ponderación del cálculo para código de control
-        factor = 2
-
-        # Total inicial de la suma del producto del dígito del número del RUT con el factor ponderación
-        total = 0
-
-        # Cálculo del total del RUT utilizando el método del módulo 10
-        for digit in reversed(numero_rut):
-            total += int(digit) * factor
-            factor = (factor + 1) % 8 or 2
-
-        # Cálculo del módulo del RUT
-        divisor = 11
-        modulo_rut = total % divisor
-
-        # Verificación del dígito ingresado
-        verificaciones = {
-            "0": 11,
-            "1": 0,
-            "2": 9,
-            "3": 8,
-            "4": 7,
-            "5": 6,
-            "6": 5,
-            "7": 4,
-            "8": 3,
-            "9": 2,
-            "k": 10,
-        }
+        numero_rut, digito_rut = rut.split("-", 1)
+
+        # Suma del producto de cada dígito, desde la derecha, con su factor de ponderación
+        total = sum(
+            int(digit) * factor for digit, factor in zip(reversed(numero_rut), cycle(PESOS_MODULO_11))
+        )
 
         # Prueba lógica del dígito verificador
-        if verificaciones.get(digito_rut.lower()) == modulo_rut:
-            digit_check = True
-        return digit_check
+        return digito_rut.upper() == VERIFICADORES[(11 - total % 11) % 11]
+
+    @staticmethod
+    def compute_check_digits(numeros):
+        """Calcula en bloque los dígitos verificadores de un arreglo de números de RUT.
+
+        Cada número se descompone en una matriz de 8 dígitos que se multiplica por el vector de pesos
+        del módulo 11, sin recorrer los dígitos en Python.
+
+        Args:
+            numeros (array-like): Números de RUT sin dígito verificador (12345678).
+
+        Returns:
+            numpy.ndarray: Dígitos verificadores como texto ("0" a "9" o "K").
+
+        Example:
+            >>> RutValidator.compute_check_digits([12345678, 10000013])
+            array(['5', 'K'], dtype='<U1')
+        """
+        numeros = np.asarray(numeros, dtype=np.int64)
+        digitos = (numeros[..., np.newaxis] // POTENCIAS_RUT) % 10
+        total = digitos @ PESOS_RUT
+        return DIGITOS_VERIFICADORES[(11 - total % 11) % 11]
+
+    @classmethod
+    def validate_many(cls, ruts: Iterable[Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """Valida un lote de RUTs con operaciones vectorizadas de NumPy.
+
+        Entrega exactamente el mismo resultado que normalize para cada valor: acepta "12.345.678-5",
+        "12345678-5" y "123456785", ignora los espacios al inicio y al final y considera inválidos
+        los valores que no son texto y los dígitos fuera de ASCII.
+
+        Args:
+            ruts (Iterable): RUTs a validar.
+
+        Returns:
+            tuple: (validos, normalizados), donde validos es un arreglo booleano por fila y
+            normalizados contiene el RUT en formato "12345678-9" con la K en mayúscula, o None
+            para las filas inválidas.
+
+        Example:
+            >>> validos, normalizados = RutValidator.validate_many(["12.345.678-5", "1000005k", "1-9"])
+            >>> validos.tolist()
+            [True, True, False]
+        """
+        ruts = list(ruts)
+        total = len(ruts)
+        validos = np.zeros(total, dtype=bool)
+        normalizados = np.full(total, None, dtype=object)
+        if not total:
+            return validos, normalizados
+
+        # Los espacios se quitan con str.strip, igual que en normalizar_rut. Los textos más largos
+        # que el formato quedan truncados en la matriz y NumPy descarta los caracteres nulos finales,
+        # así que el largo se toma del texto original
+        limpios = [rut.strip() if isinstance(rut, str) else "" for rut in ruts]
+        largos = np.fromiter(map(len, limpios), dtype=np.int64, count=total)
+        textos = np.array(limpios, dtype=f"<U{LARGO_MAXIMO_RUT}")
+
+        # Matriz de puntos de código Unicode de ancho fijo (una fila por RUT)
+        codigos = textos.view(np.uint32).reshape(total, LARGO_MAXIMO_RUT).astype(np.int64)
+        filas = np.arange(total)
+
+        # El último carácter es el verificador, precedido opcionalmente por un guión
+        ultimos = np.clip(largos - 1, 0, LARGO_MAXIMO_RUT - 1)
+        verificador = codigos[filas, ultimos]
+        verificador = np.where(verificador == ord("k"), ord("K"), verificador)
+        con_guion = codigos[filas, np.clip(ultimos - 1, 0, None)] == ord("-")
+        largos_numero = largos - 1 - con_guion
+
+        # Caracteres del número alineados a la derecha en ANCHO_NUMERO columnas; las columnas que
+        # sobran a la izquierda se rellenan con "0"
+        posiciones = largos_numero[:, np.newaxis] - ANCHO_NUMERO + np.arange(ANCHO_NUMERO)
+        caracteres = np.take_along_axis(
+            codigos, np.clip(posiciones, 0, LARGO_MAXIMO_RUT - 1), axis=1
+        )
+        caracteres = np.where(posiciones >= 0, caracteres, ord("0"))
+        es_digito = (caracteres >= ord("0")) & (caracteres <= ord("9"))
+
+        # "12345678" o "1234567", o bien "12.345.678" o "1.234.567"
+        sin_puntos = ((largos_numero == 7) | (largos_numero == 8)) & es_digito.all(axis=1)
+        con_puntos = ((largos_numero == 9) | (largos_numero == 10)) & np.where(
+            COLUMNAS_PUNTOS, caracteres == ord("."), es_digito
+        ).all(axis=1)
+
+        formato = (
+            (largos <= LARGO_MAXIMO_RUT)
+            & (sin_puntos | con_puntos)
+            & (((verificador >= ord("0")) & (verificador <= ord("9"))) | (verificador == ord("K")))
+        )
+
+        digitos = np.where(es_digito, caracteres - ord("0"), 0)
+        numeros = np.where(con_puntos, digitos @ POTENCIAS_CON_PUNTOS, digitos @ POTENCIAS_SIN_PUNTOS)
+        esperados = cls.compute_check_digits(numeros).view(np.uint32).astype(np.int64)
+        validos = formato & (esperados == verificador)
+
+        if validos.any():
+            normalizados[validos] = np.char.add(
+                np.char.add(numeros[validos].astype(str), "-"),
+                verificador[validos].astype(np.uint32).view("<U1"),
+            )
+        return validos, normalizados
 
 
-from django import forms
 
 class RutField(forms.Field):
     def __init__(self, *args, **kwargs):
@@ -122,4 +292,86 @@ class RutField(forms.Field):
 
     def clean(self, value):
         # Aquí puedes realizar la validación y limpieza del valor del RUT
-        # Si es válido, puedes devolver el valor limpio, de lo contrario, levanta una ValidationError
\ No newline at end of file
+        # Si es válido, puedes devolver el valor limpio, de lo contrario, levanta una ValidationError
+        value = super().clean(value)
+        if value in self.empty_values:
+            return value
+        return RutValidator()(value)
+
+
+class Rut(namedtuple("Rut", ["numero", "digito"])):
+    """RUT separado en su número (12345678) y su dígito verificador ("5"); se muestra como "12345678-5"."""
+
+    __slots__ = ()
+
+    def __str__(self):
+        return f"{self.numero}-{self.digito}"
+
+
+def interpretar_rut(valor):
+    """Convierte un RUT en cualquiera de los formatos aceptados a Rut.
+
+    Args:
+        valor (Any): Rut, número sin dígito verificador (int) o texto como "12.345.678-5",
+            "12345678-5" o "123456785".
+
+    Returns:
+        Rut: El RUT, o None si el valor no es un RUT válido.
+    """
+    if isinstance(valor, Rut):
+        return valor
+    if isinstance(valor, int) and not isinstance(valor, bool):
+        return Rut(valor, digito_verificador(valor)) if 0 < valor < 10**8 else None
+    if isinstance(valor, str):
+        normalizado = normalizar_rut(valor)
+        if normalizado is not None:
+            numero, digito = normalizado.split("-")
+            return Rut(int(numero), digito)
+    return None
+
+
+class RutModelField(models.Field):
+    """Campo de modelo para un RUT, guardado como el número entero sin dígito verificador.
+
+    El dígito verificador se deduce del número con el módulo 11, así que no necesita columna: se
+    valida al guardar y se vuelve a calcular al leer. Acepta los mismos formatos que RutField,
+    tanto al asignar el valor como en los filtros (rut="12.345.678-5"), y al guardar deja en la
+    instancia el Rut normalizado. Con unique=True la columna entera tiene un índice B-tree único.
+    """
+
+    description = "RUT guardado como su número entero"
+
+    default_error_messages = {"invalid": "RUT inválido"}
+
+    def get_internal_type(self):
+        return "PositiveIntegerField"
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return Rut(value, digito_verificador(value))
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        rut = interpretar_rut(value)
+        if rut is None:
+            raise ValidationError(self.error_messages["invalid"], code="invalid")
+        return rut
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        rut = self.to_python(value)
+        return None if rut is None else rut.numero
+
+    def pre_save(self, model_instance, add):
+        rut = self.to_python(getattr(model_instance, self.attname))
+        setattr(model_instance, self.attname, rut)
+        return rut
+
+    def value_to_string(self, obj):
+        rut = self.value_from_object(obj)
+        return "" if rut is None else str(rut)
+
+    def formfield(self, **kwargs):
+        return super().formfield(**{"form_class": RutField, **kwargs})
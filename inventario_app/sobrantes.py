@@ -0,0 +1,145 @@
+"""Búsqueda del material sobrante que mejor calza con un corte.
+
+Las consultas se apoyan en el índice compuesto (material, sucursal, largo, ancho) de Sobrante, de
+modo que sólo se leen los sobrantes del material y la sucursal pedidos que son lo bastante grandes.
+Los cortes pueden girarse 90°, por lo que un sobrante sirve si calza en cualquiera de las dos
+orientaciones. Las medidas están en milímetros enteros, así que las áreas se comparan y se ordenan
+con aritmética entera, también en la base de datos.
+"""
+
+from bisect import bisect_left, insort
+from collections import namedtuple
+
+from django.db.models import BigIntegerField, ExpressionWrapper, F, Q
+from django.db.models.functions import Cast
+
+from .models import Sobrante
+
+# Asignación de un corte de la lista al sobrante del que se obtiene
+Asignacion = namedtuple("Asignacion", ["corte", "sobrante_id", "rotado"])
+
+# Resultado de asignar una lista de cortes: asignaciones y los índices de los cortes que no calzaron
+ResultadoAsignacion = namedtuple("ResultadoAsignacion", ["asignaciones", "sin_asignar"])
+
+
+def _calza(largo, ancho, corte_largo, corte_ancho):
+    """Indica si un corte calza en un rectángulo y si para ello hay que girarlo.
+
+    Returns:
+        tuple: (calza, rotado)
+    """
+    if largo >= corte_largo and ancho >= corte_ancho:
+        return True, False
+    if largo >= corte_ancho and ancho >= corte_largo:
+        return True, True
+    return False, False
+
+
+def buscar_sobrantes(material, sucursal, largo, ancho, limite=10):
+    """Busca los sobrantes en los que calza un corte de largo x ancho, del más ajustado al más holgado.
+
+    Args:
+        material (Material): Material del corte.
+        sucursal (Sucursal): Sucursal en la que se busca.
+        largo (int): Largo del corte en milímetros.
+        ancho (int): Ancho del corte en milímetros.
+        limite (int): Número máximo de candidatos.
+
+    Returns:
+        list: Sobrantes ordenados por el área que sobra después del corte. Cada uno trae los
+        atributos area_restante, en milímetros cuadrados, y rotado (True si el corte debe girarse
+        para calzar).
+    """
+    largo, ancho = int(largo), int(ancho)
+    candidatos = (
+        Sobrante.objects.filter(
+            Q(largo__gte=largo, ancho__gte=ancho) | Q(largo__gte=ancho, ancho__gte=largo),
+            material=material,
+            sucursal=sucursal,
+            existencias__gt=0,
+        )
+        .annotate(
+            area_restante=ExpressionWrapper(
+                Cast("largo", BigIntegerField()) * F("ancho") - largo * ancho,
+                output_field=BigIntegerField(),
+            )
+        )
+        .order_by("area_restante", "id")[:limite]
+    )
+    resultado = list(candidatos)
+    for sobrante in resultado:
+        sobrante.rotado = not (sobrante.largo >= largo and sobrante.ancho >= ancho)
+    return resultado
+
+
+def asignar_cortes(material, sucursal, cortes):
+    """Asigna una lista de cortes a los sobrantes disponibles con una pasada voraz de empaquetado.
+
+    Los cortes se procesan del más grande al más pequeño y cada uno toma el rectángulo libre de
+    menor área en el que calza. El resto de ese rectángulo se divide con un corte de guillotina en
+    dos rectángulos que vuelven a quedar disponibles para los cortes siguientes. Las existencias de
+    un sobrante cuentan como planchas independientes.
+
+    Args:
+        material (Material): Material de los cortes.
+        sucursal (Sucursal): Sucursal cuyos sobrantes se usan.
+        cortes (list): Pares (largo, ancho) en milímetros.
+
+    Returns:
+        ResultadoAsignacion: Asignaciones por corte e índices de los cortes que no calzaron.
+    """
+    cortes = [(int(largo), int(ancho)) for largo, ancho in cortes]
+    if not cortes:
+        return ResultadoAsignacion([], [])
+
+    # Un sobrante sólo puede servir si sus dos lados son al menos el lado menor del corte más pequeño
+    minimo = min(min(corte) for corte in cortes)
+    disponibles = (
+        Sobrante.objects.filter(
+            material=material,
+            sucursal=sucursal,
+            existencias__gt=0,
+            largo__gte=minimo,
+            ancho__gte=minimo,
+        )
+        .values_list("id", "largo", "ancho", "existencias")
+        .iterator()
+    )
+
+    # Rectángulos libres ordenados por área: (área, largo, ancho, id del sobrante)
+    libres = []
+    for sobrante_id, largo, ancho, existencias in disponibles:
+        libres.extend([(largo * ancho, largo, ancho, sobrante_id)] * min(existencias, len(cortes)))
+    libres.sort()
+
+    asignaciones = []
+    sin_asignar = []
+    orden = sorted(range(len(cortes)), key=lambda i: cortes[i][0] * cortes[i][1], reverse=True)
+    for indice in orden:
+        corte_largo, corte_ancho = cortes[indice]
+        posicion = bisect_left(libres, (corte_largo * corte_ancho,))
+        while posicion < len(libres):
+            _, largo, ancho, sobrante_id = libres[posicion]
+            calza, rotado = _calza(largo, ancho, corte_largo, corte_ancho)
+            if calza:
+                break
+            posicion += 1
+        else:
+            sin_asignar.append(indice)
+            continue
+
+        del libres[posicion]
+        asignaciones.append(Asignacion(indice, sobrante_id, rotado))
+
+        # División de guillotina del resto, conservando el rectángulo más grande posible
+        usado_largo, usado_ancho = (corte_ancho, corte_largo) if rotado else (corte_largo, corte_ancho)
+        horizontal = ((largo - usado_largo, ancho), (usado_largo, ancho - usado_ancho))
+        vertical = ((largo, ancho - usado_ancho), (largo - usado_largo, usado_ancho))
+        division = max(horizontal, vertical, key=lambda partes: max(a * b for a, b in partes))
+        for resto_largo, resto_ancho in division:
+            if resto_largo > 0 and resto_ancho > 0:
+                insort(libres, (resto_largo * resto_ancho, resto_largo, resto_ancho, sobrante_id))
+
+    asignaciones.sort()
+    sin_asignar.sort()
+    return ResultadoAsignacion(asignaciones, sin_asignar)
@@ -0,0 +1,47 @@
+// Autocompletado de los campos con data-autocompletar (inventario_app/opciones.py).
+// Agrega un campo de texto antes de cada select y, al escribir, reemplaza las opciones no
+// seleccionadas por la primera página de resultados de la vista autocomplete.
+(function () {
+  "use strict";
+
+  var ESPERA_MS = 250;
+
+  function cargar(select, texto) {
+    var url = select.dataset.autocompletar + "?q=" + encodeURIComponent(texto);
+    fetch(url, { credentials: "same-origin" })
+      .then(function (respuesta) { return respuesta.json(); })
+      .then(function (pagina) {
+        Array.prototype.slice.call(select.options).forEach(function (opcion) {
+          if (!opcion.selected) {
+            opcion.remove();
+          }
+        });
+        var presentes = new Set(
+          Array.prototype.map.call(select.options, function (opcion) { return opcion.value; })
+        );
+        pagina.resultados.forEach(function (resultado) {
+          if (!presentes.has(String(resultado.id))) {
+            select.add(new Option(resultado.texto, resultado.id));
+          }
+        });
+      });
+  }
+
+  function preparar(select) {
+    var entrada = document.createElement("input");
+    var temporizador = null;
+    entrada.type = "search";
+    entrada.className = "form-control mb-1";
+    entrada.placeholder = "Buscar…";
+    entrada.addEventListener("input", function () {
+      clearTimeout(temporizador);
+      temporizador = setTimeout(function () { cargar(select, entrada.value); }, ESPERA_MS);
+    });
+    select.parentNode.insertBefore(entrada, select);
+    cargar(select, "");
+  }
+
+  document.addEventListener("DOMContentLoaded", function () {
+    document.querySelectorAll("select[data-autocompletar]").forEach(preparar);
+  });
+})();
@@ -0,0 +1,19 @@
+// Despliegue del menú de navegación en pantallas pequeñas, en reemplazo del componente Collapse
+// de Bootstrap, que es el único de sus scripts que usan las plantillas.
+(function () {
+  "use strict";
+
+  document.addEventListener("click", function (evento) {
+    var boton = evento.target.closest('[data-bs-toggle="collapse"]');
+    if (!boton) {
+      return;
+    }
+    var destino = document.querySelector(boton.getAttribute("data-bs-target"));
+    if (!destino) {
+      return;
+    }
+    var abierto = destino.classList.toggle("show");
+    boton.classList.toggle("collapsed", !abierto);
+    boton.setAttribute("aria-expanded", abierto ? "true" : "false");
+  });
+})();
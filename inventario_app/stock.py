@@ -0,0 +1,215 @@
+"""Registro de movimientos de inventario y mantención de los totales materializados.
+
+Toda modificación de existencias de ProductoHojalateria o Sobrante debe pasar por estas funciones:
+cada una agrega filas al libro de movimientos (StockMovement) y actualiza en la misma transacción
+el total correspondiente de StockSnapshot con expresiones F(), de modo que varios procesos pueden
+escribir a la vez sin perder actualizaciones. Al terminar, dentro de la misma transacción, se envía
+la señal existencias_cambiadas con las variaciones de cada producto, sobrante y total.
+"""
+
+from collections import defaultdict, namedtuple
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.dispatch import Signal
+
+from .models import ProductoHojalateria, Sobrante, StockMovement, StockSnapshot
+
+# Categoría con la que se registran los movimientos de material sobrante
+CATEGORIA_SOBRANTE = "sobrante"
+
+# Señal enviada por registrar_movimientos dentro de su transacción, después de actualizar las
+# existencias, con las variaciones sumadas por llave: productos ({id: cantidad}), sobrantes
+# ({id: cantidad}) y totales ({(sucursal_id, material_id, categoria): cantidad}), y las filas de
+# StockMovement creadas (movimientos)
+existencias_cambiadas = Signal()
+
+# Movimiento pendiente de registrar; producto y sobrante son opcionales
+Movimiento = namedtuple(
+    "Movimiento",
+    ["sucursal", "material", "categoria", "cantidad", "producto", "sobrante", "motivo"],
+    defaults=(None, None, ""),
+)
+
+
+def _id(objeto):
+    """Devuelve la llave primaria de un modelo, o el valor tal cual si ya es una llave."""
+    return getattr(objeto, "pk", objeto)
+
+
+def registrar_movimientos(movimientos):
+    """Registra un lote de movimientos y actualiza los totales afectados en una sola transacción.
+
+    Los totales se bloquean con select_for_update en un orden fijo por clave para evitar bloqueos
+    mutuos entre transacciones concurrentes, y se incrementan con F() para no perder escrituras.
+
+    Args:
+        movimientos (Iterable[Movimiento]): Movimientos a registrar.
+
+    Returns:
+        list: Las filas de StockMovement creadas.
+    """
+    filas = [
+        StockMovement(
+            sucursal_id=_id(movimiento.sucursal),
+            material_id=_id(movimiento.material),
+            categoria=movimiento.categoria,
+            cantidad=movimiento.cantidad,
+            producto_id=_id(movimiento.producto),
+            sobrante_id=_id(movimiento.sobrante),
+            motivo=movimiento.motivo,
+        )
+        for movimiento in movimientos
+    ]
+    if not filas:
+        return filas
+
+    # Suma de las cantidades por clave del total y por producto o sobrante
+    por_clave = defaultdict(int)
+    por_producto = defaultdict(int)
+    por_sobrante = defaultdict(int)
+    for fila in filas:
+        por_clave[(fila.sucursal_id, fila.material_id, fila.categoria)] += fila.cantidad
+        if fila.producto_id is not None:
+            por_producto[fila.producto_id] += fila.cantidad
+        if fila.sobrante_id is not None:
+            por_sobrante[fila.sobrante_id] += fila.cantidad
+
+    with transaction.atomic():
+        StockMovement.objects.bulk_create(filas)
+
+        for (sucursal_id, material_id, categoria), cantidad in sorted(por_clave.items()):
+            snapshot, _ = StockSnapshot.objects.select_for_update().get_or_create(
+                sucursal_id=sucursal_id, material_id=material_id, categoria=categoria
+            )
+            StockSnapshot.objects.filter(pk=snapshot.pk).update(
+                existencias=F("existencias") + cantidad
+            )
+
+        for producto_id, cantidad in sorted(por_producto.items()):
+            ProductoHojalateria.objects.filter(pk=producto_id).update(
+                existencias=F("existencias") + cantidad
+            )
+        for sobrante_id, cantidad in sorted(por_sobrante.items()):
+            Sobrante.objects.filter(pk=sobrante_id).update(
+                existencias=F("existencias") + cantidad
+            )
+
+        existencias_cambiadas.send(
+            sender=StockMovement,
+            productos=dict(por_producto),
+            sobrantes=dict(por_sobrante),
+            totales=dict(por_clave),
+            movimientos=filas,
+        )
+    return filas
+
+
+def registrar_movimiento_producto(producto, sucursal, material, cantidad, motivo=""):
+    """Registra una entrada o salida de un producto de hojalatería en una sucursal.
+
+    Args:
+        producto (ProductoHojalateria): Producto que se mueve.
+        sucursal (Sucursal): Sucursal en la que ocurre el movimiento.
+        material (Material): Material del producto con el que se contabiliza el movimiento.
+        cantidad (int): Unidades que entran (positivas) o salen (negativas).
+        motivo (str): Descripción opcional del movimiento.
+
+    Returns:
+        StockMovement: El movimiento registrado.
+    """
+    return registrar_movimientos(
+        [
+            Movimiento(
+                sucursal=sucursal,
+                material=material,
+                categoria=producto.categoria,
+                cantidad=cantidad,
+                producto=producto,
+                motivo=motivo,
+            )
+        ]
+    )[0]
+
+
+def registrar_movimiento_sobrante(sobrante, cantidad, motivo=""):
+    """Registra una entrada o salida de material sobrante en su sucursal.
+
+    Args:
+        sobrante (Sobrante): Sobrante que se mueve.
+        cantidad (int): Unidades que entran (positivas) o salen (negativas).
+        motivo (str): Descripción opcional del movimiento.
+
+    Returns:
+        StockMovement: El movimiento registrado.
+    """
+    return registrar_movimientos(
+        [
+            Movimiento(
+                sucursal=sobrante.sucursal_id,
+                material=sobrante.material_id,
+                categoria=CATEGORIA_SOBRANTE,
+                cantidad=cantidad,
+                sobrante=sobrante,
+                motivo=motivo,
+            )
+        ]
+    )[0]
+
+
+def existencias(sucursal, material, categoria):
+    """Total de existencias de una clave, leído de una sola fila de StockSnapshot.
+
+    Returns:
+        int: Existencias acumuladas, o 0 si la clave no tiene movimientos.
+    """
+    total = (
+        StockSnapshot.objects.filter(
+            sucursal_id=_id(sucursal), material_id=_id(material), categoria=categoria
+        )
+        .values_list("existencias", flat=True)
+        .first()
+    )
+    return total or 0
+
+
+def existencias_por_sucursal(sucursal):
+    """Totales de existencias de una sucursal agrupados por material y categoría.
+
+    Returns:
+        dict: {(material_id, categoria): existencias}
+    """
+    return {
+        (material_id, categoria): total
+        for material_id, categoria, total in StockSnapshot.objects.filter(
+            sucursal_id=_id(sucursal)
+        ).values_list("material_id", "categoria", "existencias")
+    }
+
+
+def reconstruir_snapshots():
+    """Recalcula todos los totales desde el libro de movimientos.
+
+    Sólo es necesario para reparar datos cargados sin pasar por este módulo; recorre el historial
+    completo, por lo que no debe usarse en el camino de las peticiones.
+
+    Returns:
+        int: Número de totales reconstruidos.
+    """
+    totales = (
+        StockMovement.objects.values("sucursal_id", "material_id", "categoria")
+        .annotate(total=Sum("cantidad"))
+        .order_by()
+    )
+    with transaction.atomic():
+        StockSnapshot.objects.all().delete()
+        StockSnapshot.objects.bulk_create(
+            StockSnapshot(
+                sucursal_id=fila["sucursal_id"],
+                material_id=fila["material_id"],
+                categoria=fila["categoria"],
+                existencias=fila["total"],
+            )
+            for fila in totales
+        )
+    return len(totales)
@@ -0,0 +1,382 @@
+"""Tablero de existencias en vivo: variaciones por sucursal enviadas con Server-Sent Events.
+
+Cada lote de stock.registrar_movimientos se resume, por sucursal, en un evento con la variación de
+cada producto y sobrante y el id del último movimiento. El evento se codifica una sola vez en el
+formato de SSE y el Difusor del proceso lo reparte a todas las conexiones abiertas de la sucursal.
+Cada conexión tiene una cola acotada (TECTUM_TABLERO["COLA"]): un cliente lento que la llena se
+descarta y se le pide reconectarse, sin que los demás esperen por él.
+
+Los eventos llegan al difusor de una de dos formas, según TECTUM_TABLERO["LOCAL"]:
+
+- Modo local: se publican al confirmarse la transacción y sólo en el proceso que escribió. Sirve
+  con un único proceso (desarrollo); con varios workers cada uno ve sólo sus escrituras. Es el
+  único modo con otros motores de base de datos, como SQLite.
+- PostgreSQL: el evento se envía con pg_notify dentro de la transacción, que sólo lo entrega si
+  se confirma, y cada proceso escucha el canal CANAL con una única conexión asíncrona, abierta con
+  la primera suscripción. Así las escrituras de cualquier proceso, incluso WSGI, llegan a todos.
+
+Al reconectarse, el navegador envía Last-Event-ID y se repiten desde el libro de movimientos los
+que se perdieron, hasta MAXIMO_REPETICION; si son más, se le pide recargar el tablero.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Q
+
+from .models import StockMovement
+from .stock import existencias_cambiadas
+
+logger = logging.getLogger("inventario_app.tablero")
+
+# Canal de PostgreSQL por el que se envían los eventos entre procesos
+CANAL = "tectum_existencias"
+
+# Bytes máximos de un aviso de pg_notify (PostgreSQL admite hasta 8000)
+MAXIMO_NOTIFICACION = 7900
+
+# Movimientos que se repiten como máximo al reconectarse un cliente
+MAXIMO_REPETICION = 1000
+
+# Segundos de espera antes de reabrir la conexión de escucha después de un error
+ESPERA_RECONEXION = 1
+
+# Valores por defecto de settings.TECTUM_TABLERO
+TABLERO_POR_DEFECTO = {
+    "LOCAL": False,
+    # Eventos pendientes por conexión antes de descartarla
+    "COLA": 64,
+    # Segundos sin eventos tras los que se envía un comentario para mantener viva la conexión
+    "LATIDO": 15,
+    # Segundos que dura cada conexión antes de que el navegador se reconecte
+    "DURACION": 300,
+    # Milisegundos que el navegador espera antes de reconectarse
+    "REINTENTO": 3000,
+}
+
+
+def opcion(nombre):
+    """Valor de settings.TECTUM_TABLERO, o su valor por defecto."""
+    return getattr(settings, "TECTUM_TABLERO", {}).get(nombre, TABLERO_POR_DEFECTO[nombre])
+
+
+def modo_local():
+    """Si los eventos sólo se publican en el proceso que escribe (ver el docstring del módulo)."""
+    return opcion("LOCAL") or connections[DEFAULT_DB_ALIAS].vendor != "postgresql"
+
+
+def codificar(datos, tipo="existencias", id=None):
+    """Mensaje SSE listo para enviar, con los datos en JSON compacto."""
+    cabecera = "" if id is None else f"id: {id}\n"
+    cuerpo = json.dumps(datos, separators=(",", ":"))
+    return f"{cabecera}event: {tipo}\ndata: {cuerpo}\n\n".encode()
+
+
+# Mensajes fijos: pedir al navegador recargar el tablero y mantener viva la conexión
+RECARGAR = codificar({}, "recargar")
+LATIDO = b": latido\n\n"
+
+
+def preparar(evento):
+    """Evento del difusor (id, mensaje SSE) a partir de las variaciones de una sucursal."""
+    if evento.get("recargar"):
+        return (evento.get("id"), RECARGAR)
+    return (evento.get("id"), codificar(evento, id=evento.get("id")))
+
+
+class Suscripcion:
+    """Conexión de un cliente a los eventos de una sucursal, con su cola acotada."""
+
+    __slots__ = ("sucursal", "loop", "cola", "descartada")
+
+    def __init__(self, sucursal, loop, tamano):
+        self.sucursal = sucursal
+        self.loop = loop
+        self.cola = asyncio.Queue(tamano)
+        self.descartada = False
+
+
+class Difusor:
+    """Reparte cada evento a las suscripciones de su sucursal en este proceso.
+
+    Las suscripciones se agrupan por event loop; publicar() se puede llamar desde cualquier hilo y
+    agenda el reparto en cada loop con una sola llamada, no una por suscripción. Cuando la cola de
+    una suscripción está llena, la suscripción se descarta: se vacía su cola y se deja en ella
+    None para que su flujo pida al cliente reconectarse. Los latidos los reparte un solo
+    temporizador por loop a las colas vacías, en lugar de un temporizador por conexión.
+    """
+
+    def __init__(self, tamano_cola=None):
+        self.tamano_cola = tamano_cola
+        self._suscripciones = {}
+        self._lock = threading.Lock()
+        self._latiendo = set()
+        self.descartadas = 0
+
+    def suscribir(self, sucursal):
+        """Abre una suscripción en el event loop en curso."""
+        loop = asyncio.get_running_loop()
+        suscripcion = Suscripcion(sucursal, loop, self.tamano_cola or opcion("COLA"))
+        with self._lock:
+            self._suscripciones.setdefault(loop, defaultdict(set))[sucursal].add(suscripcion)
+            latir = loop not in self._latiendo
+            self._latiendo.add(loop)
+        if latir:
+            loop.call_later(opcion("LATIDO"), self._latir, loop)
+        return suscripcion
+
+    def cancelar(self, suscripcion):
+        """Cierra una suscripción; no hace nada si ya estaba cerrada."""
+        with self._lock:
+            por_sucursal = self._suscripciones.get(suscripcion.loop)
+            if por_sucursal is None:
+                return
+            grupo = por_sucursal.get(suscripcion.sucursal)
+            if grupo is not None:
+                grupo.discard(suscripcion)
+                if not grupo:
+                    del por_sucursal[suscripcion.sucursal]
+            if not por_sucursal:
+                del self._suscripciones[suscripcion.loop]
+
+    def suscriptores(self, sucursal=None):
+        """Número de suscripciones abiertas, de una sucursal o de todas."""
+        with self._lock:
+            return sum(
+                len(grupo)
+                for por_sucursal in self._suscripciones.values()
+                for clave, grupo in por_sucursal.items()
+                if sucursal is None or clave == sucursal
+            )
+
+    def publicar(self, sucursal, evento):
+        """Entrega un evento (id, mensaje SSE) a las suscripciones de la sucursal.
+
+        Args:
+            sucursal (int): Id de la sucursal, o None para todas las suscripciones.
+            evento (tuple): (id del último movimiento o None, mensaje codificado).
+        """
+        with self._lock:
+            loops = [
+                loop
+                for loop, por_sucursal in self._suscripciones.items()
+                if sucursal is None or sucursal in por_sucursal
+            ]
+        try:
+            actual = asyncio.get_running_loop()
+        except RuntimeError:
+            actual = None
+        for loop in loops:
+            if loop is actual:
+                self._repartir(loop, sucursal, evento)
+            elif not loop.is_closed():
+                loop.call_soon_threadsafe(self._repartir, loop, sucursal, evento)
+
+    def _repartir(self, loop, sucursal, evento):
+        with self._lock:
+            por_sucursal = self._suscripciones.get(loop, {})
+            if sucursal is None:
+                suscripciones = [s for grupo in por_sucursal.values() for s in grupo]
+            else:
+                suscripciones = list(por_sucursal.get(sucursal, ()))
+        for suscripcion in suscripciones:
+            try:
+                suscripcion.cola.put_nowait(evento)
+            except asyncio.QueueFull:
+                self._descartar(suscripcion)
+
+    def _latir(self, loop):
+        with self._lock:
+            por_sucursal = self._suscripciones.get(loop)
+            if por_sucursal is None:
+                self._latiendo.discard(loop)
+                return
+            suscripciones = [s for grupo in por_sucursal.values() for s in grupo]
+        for suscripcion in suscripciones:
+            if suscripcion.cola.empty():
+                suscripcion.cola.put_nowait((None, LATIDO))
+        loop.call_later(opcion("LATIDO"), self._latir, loop)
+
+    def _descartar(self, suscripcion):
+        self.cancelar(suscripcion)
+        suscripcion.descartada = True
+        self.descartadas += 1
+        while not suscripcion.cola.empty():
+            suscripcion.cola.get_nowait()
+        suscripcion.cola.put_nowait(None)
+
+    async def flujo(self, suscripcion, repeticion=(), ultimo=0):
+        """Cuerpo text/event-stream de una suscripción, que la cierra al terminar.
+
+        Args:
+            suscripcion (Suscripcion): Suscripción abierta con suscribir().
+            repeticion (list): Eventos perdidos desde Last-Event-ID (ver repetir), o None si eran
+                demasiados y el cliente debe recargar.
+            ultimo (int): Id del último movimiento que ya tiene el cliente; los eventos anteriores
+                que lleguen a la cola se omiten.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            yield f"retry: {opcion('REINTENTO')}\n\n".encode()
+            if repeticion is None:
+                yield RECARGAR
+                return
+            for id, mensaje in repeticion:
+                yield mensaje
+                ultimo = max(ultimo, id or 0)
+            # Django 4.2 no avisa cuando el cliente se desconecta de una respuesta en streaming, así
+            # que cada conexión se cierra después de DURACION segundos (revisados al menos en cada
+            # latido) y el navegador se reconecta
+            fin = loop.time() + opcion("DURACION")
+            while loop.time() < fin:
+                eventos = [await suscripcion.cola.get()]
+                # Los eventos acumulados se envían juntos, en una sola escritura al cliente
+                while not suscripcion.cola.empty():
+                    eventos.append(suscripcion.cola.get_nowait())
+                mensajes = []
+                for evento in eventos:
+                    if evento is None:
+                        yield b"".join(mensajes) + RECARGAR
+                        return
+                    id, mensaje = evento
+                    if id is None or id > ultimo:
+                        mensajes.append(mensaje)
+                if mensajes:
+                    yield b"".join(mensajes)
+        finally:
+            self.cancelar(suscripcion)
+
+
+# Difusor de este proceso
+difusor = Difusor()
+
+# Tarea de escucha de PostgreSQL por event loop
+_escuchas = {}
+
+
+def suscribir(sucursal):
+    """Abre una suscripción a la sucursal y, fuera del modo local, la escucha del proceso."""
+    if not modo_local():
+        loop = asyncio.get_running_loop()
+        tarea = _escuchas.get(loop)
+        if tarea is None or tarea.done():
+            _escuchas[loop] = loop.create_task(_escuchar())
+    return difusor.suscribir(sucursal)
+
+
+def _parametros_conexion():
+    datos = connections[DEFAULT_DB_ALIAS].settings_dict
+    parametros = {
+        "dbname": datos["NAME"],
+        "user": datos["USER"],
+        "password": datos["PASSWORD"],
+        "host": datos["HOST"],
+        "port": datos["PORT"],
+    }
+    return {nombre: valor for nombre, valor in parametros.items() if valor}
+
+
+async def _escuchar():
+    """Recibe los avisos de CANAL y los publica en el difusor mientras viva el proceso.
+
+    Si la conexión se pierde se reabre, y se pide recargar a todas las suscripciones porque los
+    avisos enviados mientras tanto no se reciben.
+    """
+    import psycopg
+
+    reconectada = False
+    while True:
+        try:
+            async with await psycopg.AsyncConnection.connect(
+                autocommit=True, **_parametros_conexion()
+            ) as conexion:
+                await conexion.execute(f"LISTEN {CANAL}")
+                if reconectada:
+                    difusor.publicar(None, (None, RECARGAR))
+                async for aviso in conexion.notifies():
+                    evento = json.loads(aviso.payload)
+                    difusor.publicar(evento["sucursal"], preparar(evento))
+        except (psycopg.Error, OSError):
+            logger.exception("Se perdió la escucha de %s; se reintenta", CANAL)
+        reconectada = True
+        await asyncio.sleep(ESPERA_RECONEXION)
+
+
+def resumir(movimientos):
+    """Variaciones de productos y sobrantes por sucursal de un lote de movimientos.
+
+    Args:
+        movimientos (Iterable): Objetos con pk, sucursal_id, producto_id, sobrante_id y cantidad.
+
+    Returns:
+        dict: {sucursal: {"sucursal", "id", "productos": {id: cantidad}, "sobrantes": {...}}}
+    """
+    eventos = {}
+    for fila in movimientos:
+        if fila.producto_id is None and fila.sobrante_id is None:
+            continue
+        evento = eventos.get(fila.sucursal_id)
+        if evento is None:
+            evento = eventos[fila.sucursal_id] = {
+                "sucursal": fila.sucursal_id,
+                "id": None,
+                "productos": defaultdict(int),
+                "sobrantes": defaultdict(int),
+            }
+        if fila.producto_id is not None:
+            evento["productos"][fila.producto_id] += fila.cantidad
+        if fila.sobrante_id is not None:
+            evento["sobrantes"][fila.sobrante_id] += fila.cantidad
+        if fila.pk is not None:
+            evento["id"] = max(evento["id"] or 0, fila.pk)
+    return eventos
+
+
+def repetir(sucursal, ultimo):
+    """Eventos de una sucursal posteriores al movimiento ultimo, leídos del libro de movimientos.
+
+    Returns:
+        list: Un evento con todas las variaciones, ninguno si no hay movimientos nuevos, o None si
+        son más de MAXIMO_REPETICION.
+    """
+    filas = list(
+        StockMovement.objects.filter(pk__gt=ultimo, sucursal_id=sucursal)
+        .filter(Q(producto__isnull=False) | Q(sobrante__isnull=False))
+        .order_by("pk")
+        .values_list("pk", "sucursal_id", "producto_id", "sobrante_id", "cantidad", named=True)[
+            : MAXIMO_REPETICION + 1
+        ]
+    )
+    if len(filas) > MAXIMO_REPETICION:
+        return None
+    return [preparar(evento) for evento in resumir(filas).values()]
+
+
+def _publicar_local(eventos):
+    for sucursal, evento in eventos.items():
+        difusor.publicar(sucursal, preparar(evento))
+
+
+def _publicar(sender, movimientos=(), **kwargs):
+    eventos = resumir(movimientos)
+    if not eventos:
+        return
+    if modo_local():
+        transaction.on_commit(lambda: _publicar_local(eventos))
+        return
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        for evento in eventos.values():
+            aviso = json.dumps(evento, separators=(",", ":"))
+            if len(aviso.encode()) > MAXIMO_NOTIFICACION:
+                aviso = json.dumps(
+                    {"sucursal": evento["sucursal"], "id": evento["id"], "recargar": True}
+                )
+            cursor.execute("SELECT pg_notify(%s, %s)", [CANAL, aviso])
+
+
+existencias_cambiadas.connect(_publicar, dispatch_uid="inventario_app.tablero")
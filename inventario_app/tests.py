@@ -1,3 +1,939 @@
-from django.test import TestCase
+import csv
+import json
+import math
+import os
+import random
+import tempfile
+import time
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import F
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from tectum import autenticacion, perfilado
+
+from . import (
+    alertas,
+    opciones,
+    plan_corte,
+    reportes,
+    sobrantes,
+    stock,
+    tablero,
+    trabajos,
+    views,
+)
+from .cotizacion import MAXIMO_CANTIDAD, MAXIMO_MEDIDA, cotizar
+from .importacion import (
+    ImportadorMateriales,
+    ImportadorProductos,
+    ImportadorTrabajadores,
+    leer_filas,
+)
+from .rut_field import Rut, RutValidator, digito_verificador
+from .models import (
+    AlertaStock,
+    Material,
+    ProductoHojalateria,
+    PuntoReorden,
+    ReporteUsoTrabajador,
+    Sobrante,
+    StockMovement,
+    StockSnapshot,
+    Sucursal,
+    TarifaMaterial,
+    Trabajador,
+    Trabajo,
+    VersionModelo,
+)
+
+
+def crear_inventario():
+    """Material, sucursal, producto y sobrante mínimos para las pruebas de existencias."""
+    material = Material.objects.create(composicion="Zinc", espesor=5000, prepintado=False)
+    sucursal = Sucursal.objects.create(direccion="Sucursal de prueba", telefono="0")
+    producto = ProductoHojalateria.objects.create(categoria="canal", existencias=0)
+    sobrante = Sobrante.objects.create(
+        material=material, sucursal=sucursal, largo=1000, ancho=500, existencias=0
+    )
+    return material, sucursal, producto, sobrante
+
+
+class LibroMovimientosTests(TestCase):
+    """Libro de movimientos (StockMovement) y totales materializados (StockSnapshot)."""
+
+    def setUp(self):
+        self.material, self.sucursal, self.producto, self.sobrante = crear_inventario()
+
+    def test_lote_actualiza_totales_y_existencias(self):
+        stock.registrar_movimientos(
+            [
+                stock.Movimiento(self.sucursal, self.material, "canal", 10, producto=self.producto),
+                stock.Movimiento(self.sucursal, self.material, "canal", -3, producto=self.producto),
+                stock.Movimiento(self.sucursal, self.material, "bajada", 4),
+            ]
+        )
+        self.assertEqual(StockMovement.objects.count(), 3)
+        self.assertEqual(stock.existencias(self.sucursal, self.material, "canal"), 7)
+        self.assertEqual(
+            stock.existencias_por_sucursal(self.sucursal),
+            {(self.material.pk, "canal"): 7, (self.material.pk, "bajada"): 4},
+        )
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.existencias, 7)
+
+    def test_movimiento_de_sobrante(self):
+        stock.registrar_movimiento_sobrante(self.sobrante, 2)
+        self.sobrante.refresh_from_db()
+        self.assertEqual(self.sobrante.existencias, 2)
+        self.assertEqual(
+            stock.existencias(self.sucursal, self.material, stock.CATEGORIA_SOBRANTE), 2
+        )
+
+    def test_clave_sin_movimientos(self):
+        self.assertEqual(stock.existencias(self.sucursal, self.material, "canal"), 0)
+
+    def test_reconstruir_coincide_con_los_totales(self):
+        stock.registrar_movimiento_producto(self.producto, self.sucursal, self.material, 5)
+        stock.registrar_movimiento_producto(self.producto, self.sucursal, self.material, -2)
+        stock.registrar_movimiento_sobrante(self.sobrante, 3)
+        campos = ("sucursal", "material", "categoria", "existencias")
+        antes = set(StockSnapshot.objects.values_list(*campos))
+        StockSnapshot.objects.update(existencias=0)
+
+        self.assertEqual(stock.reconstruir_snapshots(), 2)
+        self.assertEqual(set(StockSnapshot.objects.values_list(*campos)), antes)
+
+
+class ImportacionProductosTests(TestCase):
+    """Importación de productos: dimensiones opcionales y existencias por el libro de movimientos."""
+
+    def setUp(self):
+        self.material, self.sucursal, _, _ = crear_inventario()
+
+    def fila(self, **valores):
+        fila = {"categoria": "canal", "materiales": str(self.material.pk)}
+        fila.update(valores)
+        return fila
+
+    def test_dimensiones_vacias_y_existencias_en_el_libro(self):
+        resultado = ImportadorProductos().importar_bloque(
+            [(2, self.fila(existencias="5", sucursal=str(self.sucursal.pk), largo="1.5"))]
+        )
+        self.assertEqual(resultado.errores, [])
+        producto = ProductoHojalateria.objects.get(largo=1500)
+        self.assertIsNone(producto.ancho)
+        self.assertEqual(producto.existencias, 5)
+        movimiento = StockMovement.objects.get(producto=producto)
+        self.assertEqual(movimiento.cantidad, 5)
+        self.assertEqual(stock.existencias(self.sucursal, self.material, "canal"), 5)
+
+    def test_actualizacion_registra_la_diferencia(self):
+        importador = ImportadorProductos()
+        importador.importar_bloque([(2, self.fila(existencias="5", sucursal=str(self.sucursal.pk)))])
+        producto = StockMovement.objects.get().producto
+        importador.importar_bloque(
+            [(2, self.fila(id=str(producto.pk), existencias="2", sucursal=str(self.sucursal.pk)))]
+        )
+        producto.refresh_from_db()
+        self.assertEqual(producto.existencias, 2)
+        self.assertEqual(
+            sorted(StockMovement.objects.values_list("cantidad", flat=True)), [-3, 5]
+        )
+        self.assertEqual(stock.existencias(self.sucursal, self.material, "canal"), 2)
+
+    def test_existencias_sin_sucursal(self):
+        resultado = ImportadorProductos().importar_bloque([(2, self.fila(existencias="5"))])
+        self.assertEqual(resultado.creados, 0)
+        self.assertIn("sucursal", resultado.errores[0].mensaje)
+
+    def test_fila_corta(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as archivo:
+            archivo.write("categoria,materiales,existencias,sucursal,largo\n")
+            archivo.write(f"canal,{self.material.pk},3,{self.sucursal.pk},2\n")
+            archivo.write("canal\n")
+        self.addCleanup(os.remove, archivo.name)
+        resultado = ImportadorProductos().importar_bloque(list(leer_filas(archivo.name)))
+        self.assertEqual(resultado.creados, 1)
+        self.assertEqual(len(resultado.errores), 1)
+        self.assertEqual(resultado.errores[0].linea, 3)
+        self.assertIn("materiales", resultado.errores[0].mensaje)
+
+    def test_bloque_invalida_las_opciones(self):
+        # bulk_create no envía post_save: la versión la cambia el propio importador
+        antes = opciones.opciones(Material)
+        fila = {"composicion": "Zinc galvanizado", "espesor": "0.4", "prepintado": ""}
+        resultado = ImportadorMateriales().importar_bloque([(2, fila)])
+        self.assertEqual(resultado.creados, 1)
+        despues = opciones.opciones(Material)
+        self.assertEqual(len(despues), len(antes) + 1)
+
+
+class BusquedaEntradasInvalidasTests(TestCase):
+    """Los parámetros inválidos de la búsqueda responden 400 con el error, nunca 500."""
+
+    def setUp(self):
+        crear_inventario()
+        self.client.force_login(User.objects.create_user("buscador", password="clave"))
+
+    def buscar(self, **parametros):
+        return self.client.get(reverse("product_search"), parametros)
+
+    def test_valores_no_finitos(self):
+        for valor in ("nan", "NaN", "Infinity", "-inf", "sNaN"):
+            with self.subTest(valor=valor):
+                respuesta = self.buscar(largo_min=valor)
+                self.assertEqual(respuesta.status_code, 400)
+                self.assertIn("largo_min", respuesta.json()["errores"][0])
+
+    def test_valores_enormes(self):
+        for parametros in ({"largo_min": "1e30"}, {"existencias_max": "-1e30"}):
+            with self.subTest(**parametros):
+                respuesta = self.buscar(**parametros)
+                self.assertEqual(respuesta.status_code, 200)
+                self.assertEqual(respuesta.json()["resultados"], [])
+
+    def test_valor_no_numerico(self):
+        respuesta = self.buscar(existencias_max="muchos")
+        self.assertEqual(respuesta.status_code, 400)
+
+    def test_valores_validos(self):
+        respuesta = self.buscar(largo_min="0.5", largo_max="1e3")
+        self.assertEqual(respuesta.status_code, 200)
+
+
+@override_settings(
+    TECTUM_PRESUPUESTO_CONSULTAS={**settings.TECTUM_PRESUPUESTO_CONSULTAS, "FALLAR": True},
+    STORAGES={
+        **settings.STORAGES,
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    },
+)
+class PresupuestoConsultasTests(TestCase):
+    """Las vistas con presupuesto no lo exceden, con la sesión y el usuario recién cargados o en caché."""
+
+    def setUp(self):
+        # La conexión de las pruebas se abre antes que el middleware de perfilado, que sólo mide
+        # las conexiones que ve abiertas o que se abren después
+        perfilado.instalar()
+        self.material, self.sucursal, self.producto, _ = crear_inventario()
+        usuario = User.objects.create_user("presupuesto", password="clave")
+        self.producto.material.add(self.material)
+        self.producto.Trabajador.add(Trabajador.objects.create(user=usuario))
+        TarifaMaterial.objects.create(material=self.material, categoria="canal", precio_m2=1000)
+        stock.registrar_movimiento_producto(self.producto, self.sucursal, self.material, 3)
+        self.client.force_login(usuario)
+        self.async_client.force_login(usuario)
+
+    def test_vistas_con_presupuesto(self):
+        cotizacion = json.dumps(
+            {"lineas": [{"material": self.material.pk, "categoria": "canal", "largo": 2,
+                         "ancho": 0.3, "cantidad": 4}]}
+        )
+        peticiones = {
+            "welcome": lambda url: self.client.get(url),
+            "user_list": lambda url: self.client.get(url),
+            "product_search": lambda url: self.client.get(url, {"categoria": "canal"}),
+            "reports": lambda url: self.client.get(url),
+            "quote": lambda url: self.client.post(
+                url, cotizacion, content_type="application/json"
+            ),
+        }
+        for nombre, peticion in peticiones.items():
+            with self.subTest(vista=nombre):
+                # La primera petición carga la sesión y el usuario desde la base de datos
+                cache.clear()
+                for _ in range(2):
+                    self.assertEqual(peticion(reverse(nombre)).status_code, 200)
+
+    @override_settings(ROOT_URLCONF="tectum.urls_async")
+    async def test_vistas_asincronas_con_presupuesto(self):
+        for nombre, argumentos in (
+            ("welcome", ()),
+            ("user_list", ()),
+            ("product_search", ()),
+            ("stock_events", (self.sucursal.pk,)),
+        ):
+            with self.subTest(vista=nombre):
+                await sync_to_async(cache.clear)()
+                respuesta = await self.async_client.get(reverse(nombre, args=argumentos))
+                self.assertEqual(respuesta.status_code, 200)
+                respuesta.close()
+
+
+class CacheUsuariosTests(TestCase):
+    """El usuario y la sesión en caché sólo se permiten con una caché compartida por los procesos."""
+
+    def cache_compartida(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        backend = "django.core.cache.backends.filebased.FileBasedCache"
+        return override_settings(CACHES={"default": {"BACKEND": backend, "LOCATION": directorio.name}})
+
+    @override_settings(
+        AUTHENTICATION_BACKENDS=["tectum.autenticacion.CachedModelBackend"],
+        SESSION_ENGINE=autenticacion.SESIONES_EN_CACHE,
+    )
+    def test_revision_de_la_cache(self):
+        errores = autenticacion.revisar_cache_compartida(None)
+        self.assertEqual([error.id for error in errores], ["tectum.E001", "tectum.E002"])
+        with self.cache_compartida():
+            self.assertEqual(autenticacion.revisar_cache_compartida(None), [])
+
+    def test_usuario_desactivado(self):
+        usuario = User.objects.create_user("cacheado", password="secreta")
+        with self.cache_compartida():
+            self.assertEqual(autenticacion.CachedModelBackend().get_user(usuario.pk), usuario)
+            usuario.is_active = False
+            usuario.save()
+            # Otro proceso con la misma caché ya no encuentra al usuario guardado
+            self.assertIsNone(autenticacion.CachedModelBackend().get_user(usuario.pk))
+
+
+class LatidosWorkerTests(TransactionTestCase):
+    """Un worker de un hilo envía latidos mientras ejecuta sus trabajos en el mismo hilo."""
+
+    def test_latidos_durante_un_trabajo_en_linea(self):
+        latidos = []
+
+        def lenta(contexto):
+            latidos.append(Trabajo.objects.get(pk=contexto.trabajo.pk).latido)
+            time.sleep(0.3)
+            latidos.append(Trabajo.objects.get(pk=contexto.trabajo.pk).latido)
+
+        with mock.patch.dict(trabajos.TAREAS, {"lenta": lenta}), mock.patch.object(
+            trabajos, "INTERVALO_LATIDO", 0.05
+        ):
+            trabajo = trabajos.encolar("lenta")
+            self.assertEqual(trabajos.Worker(hilos=1).ejecutar_lote(), 1)
+
+        self.assertGreater(latidos[1], latidos[0])
+        trabajo.refresh_from_db()
+        self.assertEqual(trabajo.estado, Trabajo.COMPLETADO)
+
+
+class RutTrabajadorTests(TestCase):
+    """El RUT se guarda como número y se recupera igual desde cualquiera de sus formatos."""
+
+    def setUp(self):
+        usuario = User.objects.create_user("rut")
+        self.trabajador = Trabajador.objects.create(user=usuario, rut="12.345.678-5")
+        self.con_k = Trabajador.objects.create(user=usuario, rut="10000013-k")
+
+    def test_guardar_y_leer(self):
+        self.assertEqual(self.trabajador.rut, Rut(12345678, "5"))
+        self.trabajador.refresh_from_db()
+        self.con_k.refresh_from_db()
+        self.assertEqual(self.trabajador.rut, Rut(12345678, "5"))
+        self.assertEqual(str(self.con_k.rut), "10000013-K")
+        self.assertEqual(Trabajador.objects.get(rut="12345678-5"), self.trabajador)
+
+    def test_by_rut_en_cada_formato(self):
+        for rut in ("12.345.678-5", "12345678-5", "123456785", " 12345678-5 ", 12345678,
+                    Rut(12345678, "5")):
+            with self.subTest(rut=rut):
+                self.assertEqual(Trabajador.objects.by_rut(rut), self.trabajador)
+        self.assertEqual(Trabajador.objects.by_rut("10.000.013-k"), self.con_k)
+
+    def test_by_rut_invalido_o_no_registrado(self):
+        for rut in ("12345678-4", "abc", "", None, 0, 10**8, "11111111-1"):
+            with self.subTest(rut=rut):
+                self.assertIsNone(Trabajador.objects.by_rut(rut))
+
+    def test_in_bulk_by_rut(self):
+        ruts = ["12.345.678-5", "123456785", "10000013K", "12345678-4", "11111111-1", None]
+        esperado = {"12345678-5": self.trabajador, "10000013-K": self.con_k}
+        self.assertEqual(Trabajador.objects.in_bulk_by_rut(ruts), esperado)
+        self.assertEqual(Trabajador.objects.in_bulk_by_rut(ruts, batch_size=1), esperado)
+        self.assertEqual(Trabajador.objects.in_bulk_by_rut(["abc"]), {})
+
+    def test_rut_repetido_por_bloque(self):
+        User.objects.create_user("importado")
+        fila = {"usuario": "importado", "rut": "11.111.111-1"}
+        importador = ImportadorTrabajadores()
+        resultado = importador.importar_bloque([(2, fila), (3, dict(fila, direccion="Otra"))])
+        self.assertEqual((resultado.creados, len(resultado.errores)), (1, 1))
+        # En un bloque posterior el RUT ya está guardado y la fila lo actualiza
+        resultado = importador.importar_bloque([(4, dict(fila, direccion="Nueva"))])
+        self.assertEqual((resultado.creados, resultado.actualizados), (0, 1))
+        self.assertEqual(Trabajador.objects.by_rut("11111111-1").direccion, "Nueva")
+
+
+class ValidacionRutEnBloqueTests(SimpleTestCase):
+    """validate_many entrega lo mismo que la validación individual (normalize) para cada valor."""
+
+    def assertIgualQueNormalize(self, ruts):
+        validos, normalizados = RutValidator.validate_many(ruts)
+        esperados = [RutValidator.normalize(rut) for rut in ruts]
+        self.assertEqual(normalizados.tolist(), esperados)
+        self.assertEqual(validos.tolist(), [rut is not None for rut in esperados])
+
+    def test_formatos_aceptados(self):
+        ruts = ["12.345.678-5", "123456785", " 12345678-5", "12345678-5\n", "1.000.005-k", "1000005K"]
+        validos, normalizados = RutValidator.validate_many(ruts)
+        self.assertTrue(validos.all())
+        self.assertEqual(set(normalizados), {"12345678-5", "1000005-K"})
+        self.assertIgualQueNormalize(ruts)
+
+    def test_formatos_rechazados(self):
+        ruts = ["12.3456.78-5", "12345678--5", "12 345 678-5", "12345678-5\x00", "123456789-2", ""]
+        self.assertFalse(RutValidator.validate_many(ruts)[0].any())
+        self.assertIgualQueNormalize(ruts)
+
+    def test_digitos_verificadores_extremos(self):
+        # 10000013 termina en K, 1000006 en 0 y 1000004 en 1; también ceros a la izquierda
+        ruts = [
+            "10000013-K", "10000013-k", "10000013k", "10000013-0", "1000006-0", "1000006-K",
+            "1000004-1", "1000004-2", "01000006-0", "00000000-0", "0.000.000-0", "0000000-1",
+            "1-9", "abc", "12345678-", "-5", "k", "１２３４５６７８-5", "12345678-5 extra",
+            None, 12345678, b"12345678-5",
+        ]
+        self.assertIgualQueNormalize(ruts)
+
+    def test_entradas_al_azar(self):
+        azar = random.Random(20240601)
+        caracteres = "0123456789kK.- \t"
+        ruts = []
+        for _ in range(5000):
+            numero = azar.randrange(10**8)
+            # La mitad con el dígito verificador correcto y la otra mitad al azar
+            digito = azar.choice((digito_verificador(numero), azar.choice("0123456789kK")))
+            texto = str(numero).zfill(azar.choice((0, 7, 8)))
+            if len(texto) >= 7 and azar.random() < 0.3:
+                texto = f"{texto[:-6]}.{texto[-6:-3]}.{texto[-3:]}"
+            ruts.append(texto + azar.choice(("-", "")) + azar.choice((digito, digito.lower())))
+            ruts.append("".join(azar.choices(caracteres, k=azar.randrange(14))))
+        self.assertIgualQueNormalize(ruts)
+
+
+class CotizacionEntradasInvalidasTests(TestCase):
+    """Las líneas fuera de rango o no finitas se informan como errores de la línea, nunca 500."""
+
+    def setUp(self):
+        self.material, _, _, _ = crear_inventario()
+        TarifaMaterial.objects.create(
+            material=self.material,
+            categoria="canal",
+            precio_m2=2**31 - 1,
+            mano_obra_unidad=2**31 - 1,
+            mano_obra_metro=2**31 - 1,
+        )
+        self.client.force_login(User.objects.create_user("cotizador"))
+
+    def linea(self, **valores):
+        linea = {"material": self.material.pk, "categoria": "canal", "largo": 1, "ancho": 1}
+        linea.update(valores)
+        return linea
+
+    def test_errores_por_linea(self):
+        casos = {
+            "medidas no pueden superar": self.linea(largo=1e7, ancho=1e7),
+            "cantidad no puede superar": self.linea(cantidad=10**20),
+            "material desconocido": self.linea(material=10**20),
+            "números finitos": self.linea(largo=float("nan")),
+            "deben ser números": self.linea(cantidad=float("inf")),
+        }
+        resultado = cotizar([self.linea(), *casos.values()])
+        self.assertEqual([linea["linea"] for linea in resultado["lineas"]], [0])
+        errores = {error["linea"]: error["error"] for error in resultado["errores"]}
+        for numero, mensaje in enumerate(casos, 1):
+            with self.subTest(mensaje=mensaje):
+                self.assertIn(mensaje, errores[numero])
+
+    def test_infinito_en_la_vista(self):
+        cuerpo = '{"lineas": [{"material": %d, "categoria": "canal", "largo": Infinity, "ancho": NaN}]}'
+        respuesta = self.client.post(
+            reverse("quote"), cuerpo % self.material.pk, content_type="application/json"
+        )
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn("finitos", respuesta.json()["errores"][0]["error"])
+
+    def test_montos_en_los_limites_no_se_desbordan(self):
+        precio = 2**31 - 1
+        largo = MAXIMO_MEDIDA * 1000
+        plancha = self.linea(largo=MAXIMO_MEDIDA, ancho=MAXIMO_MEDIDA, cantidad=MAXIMO_CANTIDAD)
+        cilindro = dict(plancha, ancho=None, radio=MAXIMO_MEDIDA)
+        resultado = cotizar([plancha, cilindro] * 2)
+        self.assertEqual(resultado["errores"], [])
+
+        mano_obra = precio * MAXIMO_CANTIDAD + (precio * largo * MAXIMO_CANTIDAD + 500) // 1000
+        esperados = []
+        for area in (largo * largo, round(2 * math.pi * largo * largo)):
+            material = (area * MAXIMO_CANTIDAD * precio + 500_000) // 1_000_000
+            esperados.append((material, mano_obra))
+        obtenidos = [(linea["material"], linea["mano_obra"]) for linea in resultado["lineas"]]
+        self.assertEqual(obtenidos, esperados * 2)
+        self.assertEqual(resultado["totales"]["total"], 2 * sum(map(sum, esperados)))
+
+
+class TablaTarifasTests(TestCase):
+    """Las tarifas en memoria se vuelven a leer cuando cambia su versión en la base de datos."""
+
+    def setUp(self):
+        self.material, _, _, _ = crear_inventario()
+        self.tarifa = TarifaMaterial.objects.create(
+            material=self.material, categoria="canal", precio_m2=1000
+        )
+
+    def precio(self):
+        linea = {"material": self.material.pk, "categoria": "canal", "largo": 1, "ancho": 1}
+        return cotizar([linea])["lineas"][0]["material"]
+
+    def test_tarifa_guardada(self):
+        self.assertEqual(self.precio(), 1000)
+        self.tarifa.precio_m2 = 2000
+        self.tarifa.save()
+        self.assertEqual(self.precio(), 2000)
+
+    def test_version_cambiada_por_otro_proceso(self):
+        self.assertEqual(self.precio(), 1000)
+        # Otro proceso cambia la tarifa y la versión en la base de datos sin pasar por la caché
+        # de éste; mientras la versión no cambie se sigue usando la tabla en memoria
+        TarifaMaterial.objects.filter(pk=self.tarifa.pk).update(precio_m2=2000)
+        self.assertEqual(self.precio(), 1000)
+        VersionModelo.objects.filter(modelo="inventario_app.tarifamaterial").update(
+            version=F("version") + 1
+        )
+        self.assertEqual(self.precio(), 2000)
+
+
+class AlertasStockTests(TestCase):
+    """Una alerta por cada vez que las existencias pasan de al menos el mínimo a menos de él."""
+
+    def setUp(self):
+        self.material, self.sucursal, self.producto, self.sobrante = crear_inventario()
+
+    def mover(self, cantidad):
+        stock.registrar_movimiento_producto(self.producto, self.sucursal, self.material, cantidad)
+
+    def cruces(self, **filtro):
+        return list(
+            AlertaStock.objects.filter(**filtro)
+            .order_by("id")
+            .values_list("anterior", "existencias", "minimo")
+        )
+
+    def test_cruces_de_un_producto(self):
+        punto = PuntoReorden.objects.create(producto=self.producto, minimo=5)
+        # 10, 6 y 5 no están bajo el mínimo; 4 lo cruza, 2 ya estaba bajo él y 12 lo recupera
+        # hasta que 3 lo vuelve a cruzar
+        for cantidad in (10, -4, -1, -1, -2, 10, -9):
+            self.mover(cantidad)
+        self.assertEqual(self.cruces(punto=punto), [(5, 4, 5), (12, 3, 5)])
+
+    def test_lote_que_cruza_y_vuelve(self):
+        punto = PuntoReorden.objects.create(producto=self.producto, minimo=5)
+        self.mover(10)
+        # La variación neta del lote es la que cuenta: 10 - 8 + 6 = 8, sin alerta
+        stock.registrar_movimientos(
+            [
+                stock.Movimiento(self.sucursal, self.material, "canal", -8, producto=self.producto),
+                stock.Movimiento(self.sucursal, self.material, "canal", 6, producto=self.producto),
+            ]
+        )
+        self.assertEqual(self.cruces(punto=punto), [])
+
+    def test_total_y_sobrante(self):
+        total = PuntoReorden.objects.create(
+            sucursal=self.sucursal, material=self.material, categoria="canal", minimo=3
+        )
+        sobrante = PuntoReorden.objects.create(sobrante=self.sobrante, minimo=1)
+        self.mover(3)
+        self.mover(-1)
+        stock.registrar_movimiento_sobrante(self.sobrante, 1)
+        stock.registrar_movimiento_sobrante(self.sobrante, -1)
+        self.assertEqual(self.cruces(punto=total), [(3, 2, 3)])
+        self.assertEqual(self.cruces(punto=sobrante), [(1, 0, 1)])
+
+    def test_puntos_creados_despues_de_leerlos(self):
+        self.mover(10)
+        self.assertEqual(alertas.puntos(), {})
+        creado = PuntoReorden.objects.create(producto=self.producto, minimo=8)
+        self.assertEqual(alertas.puntos(), {("producto", self.producto.pk): [(creado.pk, 8)]})
+        # Otro proceso crea un punto con bulk_create y cambia la versión en la base de datos
+        PuntoReorden.objects.bulk_create([PuntoReorden(producto=self.producto, minimo=5)])
+        VersionModelo.objects.filter(modelo="inventario_app.puntoreorden").update(
+            version=F("version") + 1
+        )
+        otro = PuntoReorden.objects.get(minimo=5)
+        self.mover(-6)
+        self.assertEqual(self.cruces(punto=creado), [(10, 4, 8)])
+        self.assertEqual(self.cruces(punto=otro), [(10, 4, 5)])
+
+    def test_guardar_el_producto(self):
+        punto = PuntoReorden.objects.create(producto=self.producto, minimo=2)
+        self.producto.existencias = 5
+        self.producto.save()
+        producto = ProductoHojalateria.objects.get(pk=self.producto.pk)
+        producto.existencias = 1
+        producto.save()
+        self.assertEqual(self.cruces(punto=punto), [(5, 1, 2)])
+
+    def test_una_notificacion_por_ventana(self):
+        PuntoReorden.objects.create(producto=self.producto, minimo=5)
+        PuntoReorden.objects.create(producto=self.producto, minimo=2)
+        self.mover(5)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mover(-3)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mover(-1)
+        # Cada cruce se confirma por separado y sólo el primero encola la notificación
+        self.assertEqual(self.cruces(), [(5, 2, 5), (2, 1, 2)])
+        pendientes = Trabajo.objects.filter(tipo="notificar_alertas", estado=Trabajo.PENDIENTE)
+        self.assertEqual(pendientes.count(), 1)
+
+        with self.assertLogs("inventario_app.alertas", "WARNING") as registro:
+            self.assertEqual(alertas.notificar(), 2)
+        self.assertEqual(len(registro.output), 2)
+        self.assertFalse(AlertaStock.objects.filter(notificada=None).exists())
+
+
+class PlanCorteTests(TestCase):
+    """Los dos motores de corte dan el mismo plan y los restos quedan en el libro de movimientos."""
+
+    def piezas(self, semilla, cantidad):
+        azar = random.Random(semilla)
+        # Incluye piezas que sólo caben giradas y piezas más grandes que la plancha
+        return [
+            (indice, azar.randint(50, 3200), azar.randint(50, 1100))
+            for indice in range(cantidad)
+        ]
+
+    def test_motores_equivalentes(self):
+        for semilla in range(20):
+            piezas = self.piezas(semilla, 60)
+            with self.subTest(semilla=semilla):
+                self.assertEqual(
+                    plan_corte.empaquetar_numpy(piezas), plan_corte.empaquetar_python(piezas)
+                )
+        self.assertEqual(plan_corte.empaquetar_numpy([]), plan_corte.empaquetar_python([]))
+
+    def test_bloques_en_paralelo(self):
+        medidas = [(largo, ancho) for _, largo, ancho in self.piezas(7, 90)]
+        plan = plan_corte.planificar_cortes(medidas, procesos=2, tamano_bloque=25)
+        colocadas = [colocacion.pieza for colocacion in plan.colocaciones]
+        self.assertEqual(sorted(colocadas + plan.sin_colocar), list(range(len(medidas))))
+        # Cada plancha renumerada pertenece a un solo bloque: sus piezas no se superponen
+        for colocacion in plan.colocaciones:
+            self.assertLess(colocacion.plancha, plan.planchas)
+            for otra in plan.colocaciones:
+                if otra.plancha == colocacion.plancha and otra.pieza != colocacion.pieza:
+                    self.assertTrue(
+                        otra.x >= colocacion.x + colocacion.largo
+                        or colocacion.x >= otra.x + otra.largo
+                        or otra.y >= colocacion.y + colocacion.ancho
+                        or colocacion.y >= otra.y + otra.ancho
+                    )
+        piezas = [(indice, largo, ancho) for indice, (largo, ancho) in enumerate(medidas)]
+        secuencial = plan_corte.planificar_cortes(medidas, procesos=1)
+        self.assertEqual(secuencial, plan_corte.empaquetar_numpy(piezas))
+
+    def test_guardar_sobrantes_en_los_totales(self):
+        material, sucursal, _, _ = crear_inventario()
+        plan = plan_corte.empaquetar_numpy(self.piezas(3, 40))
+        guardables = [
+            resto for resto in plan.restos
+            if min(resto.largo, resto.ancho) >= plan_corte.MINIMO_SOBRANTE
+        ]
+        self.assertTrue(guardables)
+        guardados = plan_corte.guardar_sobrantes(plan, material, sucursal)
+        existencias = Sobrante.objects.filter(pk__in=[sobrante.pk for sobrante in guardados])
+        self.assertEqual(sum(existencias.values_list("existencias", flat=True)), len(guardables))
+        # crear_inventario deja un sobrante sin existencias en la misma clave
+        self.assertEqual(
+            stock.existencias(sucursal, material, stock.CATEGORIA_SOBRANTE), len(guardables)
+        )
+        sin_restos = plan._replace(restos=[])
+        self.assertEqual(plan_corte.guardar_sobrantes(sin_restos, material, sucursal), [])
+
+
+class SobrantesTests(TestCase):
+    """Búsqueda y asignación de cortes en sobrantes, con y sin giro."""
+
+    def setUp(self):
+        self.material, self.sucursal, _, self.justo = crear_inventario()
+        Sobrante.objects.filter(pk=self.justo.pk).update(existencias=1)
+        self.grande = Sobrante.objects.create(
+            material=self.material, sucursal=self.sucursal, largo=2000, ancho=800, existencias=1
+        )
+        # Sin existencias o en otra sucursal no se ofrecen
+        Sobrante.objects.create(
+            material=self.material, sucursal=self.sucursal, largo=1000, ancho=500, existencias=0
+        )
+        otra = Sucursal.objects.create(direccion="Otra sucursal", telefono="0")
+        Sobrante.objects.create(
+            material=self.material, sucursal=otra, largo=1000, ancho=500, existencias=3
+        )
+
+    def buscar(self, largo, ancho):
+        encontrados = sobrantes.buscar_sobrantes(self.material, self.sucursal, largo, ancho)
+        return [(sobrante.pk, sobrante.area_restante, sobrante.rotado) for sobrante in encontrados]
+
+    def test_buscar_calce_exacto(self):
+        self.assertEqual(
+            self.buscar(1000, 500),
+            [(self.justo.pk, 0, False), (self.grande.pk, 1_100_000, False)],
+        )
+
+    def test_buscar_calce_girado(self):
+        self.assertEqual(
+            self.buscar(500, 1000),
+            [(self.justo.pk, 0, True), (self.grande.pk, 1_100_000, True)],
+        )
+
+    def test_buscar_corte_mas_grande_que_todos(self):
+        self.assertEqual(self.buscar(2100, 500), [])
+        self.assertEqual(self.buscar(900, 900), [])
+
+    def test_asignar_cortes(self):
+        resultado = sobrantes.asignar_cortes(
+            self.material, self.sucursal, [(1000, 500), (500, 1000), (3000, 100), (900, 900)]
+        )
+        # El primer corte toma el sobrante justo; el segundo, igual pero girado, toma el grande
+        self.assertEqual(
+            resultado.asignaciones,
+            [
+                sobrantes.Asignacion(0, self.justo.pk, False),
+                sobrantes.Asignacion(1, self.grande.pk, True),
+            ],
+        )
+        self.assertEqual(resultado.sin_asignar, [2, 3])
+        self.assertEqual(sobrantes.asignar_cortes(self.material, self.sucursal, []), ([], []))
+
+
+class ReportesTests(TestCase):
+    """Los agregados incrementales coinciden con una reconstrucción desde el libro de movimientos."""
+
+    def setUp(self):
+        self.material, self.sucursal, self.producto, self.sobrante = crear_inventario()
+        ProductoHojalateria.objects.filter(pk=self.producto.pk).update(largo=2000, ancho=500)
+        self.producto.refresh_from_db()
+        usuario = User.objects.create_user("reportes")
+        self.trabajadores = [
+            Trabajador.objects.create(user=usuario, rut="12.345.678-5"),
+            Trabajador.objects.create(user=usuario, rut="10000013-K"),
+        ]
+        self.producto.Trabajador.set(self.trabajadores)
+
+    def mover(self, producto=0, sobrante=0):
+        if producto:
+            stock.registrar_movimiento_producto(
+                self.producto, self.sucursal, self.material, producto
+            )
+        if sobrante:
+            stock.registrar_movimiento_sobrante(self.sobrante, sobrante)
+
+    def agregados(self):
+        return {
+            nombre: set(
+                agregado.modelo.objects.values_list(*agregado.clave, *agregado.valores)
+            )
+            for nombre, agregado in reportes.AGREGADOS.items()
+        }
+
+    def test_refrescar_suma_una_sola_vez(self):
+        self.mover(producto=5, sobrante=3)
+        self.mover(producto=-2, sobrante=-1)
+        self.assertEqual(reportes.refrescar(retraso=0).movimientos, 4)
+        esperados = self.agregados()
+        self.assertEqual(reportes.refrescar(retraso=0).movimientos, 0)
+        self.assertEqual(self.agregados(), esperados)
+
+        dia = reportes.ventana(1)[1]
+        sucursal, material = self.sucursal.pk, self.material.pk
+        self.assertEqual(
+            esperados["stock"],
+            {
+                (dia, sucursal, material, "canal", 5, 2),
+                (dia, sucursal, material, stock.CATEGORIA_SOBRANTE, 3, 1),
+            },
+        )
+        # Cada trabajador del producto recibe las unidades fabricadas, no las salidas
+        self.assertEqual(
+            esperados["uso"],
+            {(dia, trabajador.pk, material, 5, 5 * 2000 * 500) for trabajador in self.trabajadores},
+        )
+        self.assertEqual(
+            esperados["sobrantes"],
+            {(dia, sucursal, material, 3, 3 * 1000 * 500, 1, 1000 * 500)},
+        )
+
+    def test_reconstruir_igual_que_incremental(self):
+        self.mover(producto=4, sobrante=2)
+        reportes.refrescar(retraso=0)
+        # Los bloques siguientes actualizan las filas ya creadas
+        self.mover(producto=3, sobrante=-1)
+        self.mover(producto=-1, sobrante=4)
+        resultado = reportes.refrescar(tamano_bloque=1, retraso=0)
+        self.assertEqual((resultado.movimientos, resultado.bloques), (4, 4))
+        incrementales = self.agregados()
+
+        self.assertEqual(reportes.reconstruir(retraso=0).movimientos, 6)
+        self.assertEqual(self.agregados(), incrementales)
+        self.assertEqual(
+            ReporteUsoTrabajador.objects.filter(trabajador=self.trabajadores[0]).get().unidades, 7
+        )
+
+
+class TableroTests(TestCase):
+    """Difusor y repetición del tablero en vivo, en modo local (SQLite o TECTUM_TABLERO["LOCAL"])."""
+
+    def setUp(self):
+        self.material, self.sucursal, self.producto, self.sobrante = crear_inventario()
+        stock.registrar_movimiento_producto(self.producto, self.sucursal, self.material, 5)
+        self.visto = StockMovement.objects.latest("pk").pk
+        stock.registrar_movimiento_producto(self.producto, self.sucursal, self.material, -2)
+        stock.registrar_movimiento_sobrante(self.sobrante, 3)
+        # Sin producto ni sobrante no aparece en el tablero
+        stock.registrar_movimientos([stock.Movimiento(self.sucursal, self.material, "bajada", 4)])
+
+    def datos(self, mensaje):
+        linea = next(linea for linea in mensaje.decode().splitlines() if linea.startswith("data: "))
+        return json.loads(linea[len("data: "):])
+
+    async def test_cliente_lento_recibe_recargar(self):
+        difusor = tablero.Difusor(tamano_cola=2)
+        rapida = difusor.suscribir(1)
+        lenta = difusor.suscribir(1)
+        otra_sucursal = difusor.suscribir(2)
+        recibidos = []
+        for numero in range(1, 5):
+            difusor.publicar(1, (numero, f"evento {numero}".encode()))
+            recibidos.append(rapida.cola.get_nowait())
+
+        # La lenta llenó su cola con el tercer evento y se descartó sin detener a la rápida
+        self.assertEqual([id for id, _ in recibidos], [1, 2, 3, 4])
+        self.assertTrue(lenta.descartada)
+        self.assertFalse(rapida.descartada)
+        self.assertEqual((difusor.descartadas, difusor.suscriptores(1)), (1, 1))
+        self.assertTrue(otra_sucursal.cola.empty())
+
+        flujo = difusor.flujo(lenta)
+        self.assertTrue((await anext(flujo)).startswith(b"retry: "))
+        self.assertEqual(await anext(flujo), tablero.RECARGAR)
+        with self.assertRaises(StopAsyncIteration):
+            await anext(flujo)
+
+    def test_resumir(self):
+        eventos = tablero.resumir(StockMovement.objects.order_by("pk"))
+        self.assertEqual(
+            eventos,
+            {
+                self.sucursal.pk: {
+                    "sucursal": self.sucursal.pk,
+                    "id": StockMovement.objects.filter(sobrante=self.sobrante).get().pk,
+                    "productos": {self.producto.pk: 3},
+                    "sobrantes": {self.sobrante.pk: 3},
+                }
+            },
+        )
+
+    async def test_repetir_desde_last_event_id(self):
+        repeticion = await sync_to_async(tablero.repetir)(self.sucursal.pk, self.visto)
+        self.assertEqual(len(repeticion), 1)
+        id, mensaje = repeticion[0]
+        self.assertEqual(self.datos(mensaje)["productos"], {str(self.producto.pk): -2})
+        self.assertEqual(await sync_to_async(tablero.repetir)(self.sucursal.pk, id), [])
+
+        difusor = tablero.Difusor()
+        suscripcion = difusor.suscribir(self.sucursal.pk)
+        # Un evento ya repetido que llega tarde a la cola se omite; uno nuevo se envía
+        difusor.publicar(self.sucursal.pk, (id, b"repetido"))
+        difusor.publicar(self.sucursal.pk, (id + 1, b"nuevo"))
+        flujo = difusor.flujo(suscripcion, repeticion, self.visto)
+        self.assertTrue((await anext(flujo)).startswith(b"retry: "))
+        self.assertEqual(await anext(flujo), mensaje)
+        self.assertEqual(await anext(flujo), b"nuevo")
+        await flujo.aclose()
+        self.assertEqual(difusor.suscriptores(), 0)
+
+    async def test_repeticion_demasiado_larga(self):
+        with mock.patch.object(tablero, "MAXIMO_REPETICION", 1):
+            repeticion = await sync_to_async(tablero.repetir)(self.sucursal.pk, 0)
+        self.assertIsNone(repeticion)
+        difusor = tablero.Difusor()
+        flujo = difusor.flujo(difusor.suscribir(self.sucursal.pk), repeticion)
+        self.assertTrue((await anext(flujo)).startswith(b"retry: "))
+        self.assertEqual(await anext(flujo), tablero.RECARGAR)
+        with self.assertRaises(StopAsyncIteration):
+            await anext(flujo)
+        self.assertEqual(difusor.suscriptores(), 0)
+
+
+@override_settings(
+    STORAGES={
+        **settings.STORAGES,
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    },
+)
+class DirectorioUsuariosTests(TestCase):
+    """Paginación por cursor (keyset) del directorio de usuarios y exportación en streaming."""
+
+    def setUp(self):
+        # Apellidos repetidos para que el id desempate el orden entre páginas
+        for numero, apellido in enumerate(("Soto", "Araya", "Soto", "Díaz", "Araya", "Soto")):
+            User.objects.create_user(f"usuario{numero}", last_name=apellido)
+        User.objects.create_user("personal", last_name="Araya", is_staff=True)
+        self.client.force_login(User.objects.get(username="usuario0"))
+        self.esperados = list(
+            User.objects.filter(is_staff=False)
+            .order_by("last_name", "id")
+            .values_list("username", flat=True)
+        )
+
+    def pagina(self, cursor=None):
+        parametros = {} if cursor is None else {"cursor": cursor}
+        respuesta = self.client.get(reverse("user_list"), parametros)
+        self.assertEqual(respuesta.status_code, 200)
+        contexto = respuesta.context
+        return [usuario.username for usuario in contexto["users"]], contexto["next_cursor"]
+
+    def test_paginas_estables(self):
+        vistos = []
+        cursor = None
+        with mock.patch.object(views, "USER_LIST_PAGE_SIZE", 2):
+            while True:
+                usuarios, cursor = self.pagina(cursor)
+                vistos.extend(usuarios)
+                if cursor is None:
+                    break
+            # Un usuario nuevo antes del cursor no desplaza las páginas siguientes
+            primera, siguiente = self.pagina()
+            User.objects.create_user("nuevo", last_name="Aguilar")
+            self.assertEqual(self.pagina(siguiente)[0], self.esperados[2:4])
+        self.assertEqual(vistos, self.esperados)
+        self.assertEqual(primera, self.esperados[:2])
+
+    def test_cursor_alterado_vuelve_a_la_primera_pagina(self):
+        with mock.patch.object(views, "USER_LIST_PAGE_SIZE", 2):
+            _, cursor = self.pagina()
+            firma_cambiada = cursor[:-1] + ("a" if cursor[-1] != "a" else "b")
+            # Cursor bien firmado pero con otro salt, como uno armado a mano
+            otro_salt = signing.dumps(["Zúñiga", 10**6], salt="otro", compress=True)
+            for valor in (firma_cambiada, otro_salt, "basura"):
+                with self.subTest(cursor=valor):
+                    self.assertEqual(self.pagina(valor)[0], self.esperados[:2])
+
+    def test_exportar_csv(self):
+        respuesta = self.client.get(reverse("user_export", args=("csv",)))
+        self.assertTrue(respuesta.streaming)
+        self.assertIn("usuarios.csv", respuesta["Content-Disposition"])
+        filas = list(csv.reader(b"".join(respuesta.streaming_content).decode().splitlines()))
+        self.assertEqual(filas[0], list(views.USER_LIST_FIELDS))
+        self.assertEqual([fila[2] for fila in filas[1:]], self.esperados)
+
+    def test_exportar_ndjson(self):
+        respuesta = self.client.get(reverse("user_export", args=("ndjson",)))
+        self.assertTrue(respuesta.streaming)
+        lineas = b"".join(respuesta.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(linea)["username"] for linea in lineas], self.esperados)
+        self.assertEqual(json.loads(lineas[0])["last_name"], "Araya")
+        self.assertEqual(
+            self.client.get(reverse("user_export", args=("xml",))).status_code, 404
+        )
@@ -0,0 +1,469 @@
+"""Cola de trabajos en segundo plano sobre la base de datos de la aplicación.
+
+Las operaciones lentas (importaciones, planes de corte, exportaciones y creación masiva de usuarios)
+se encolan como filas de Trabajo y las ejecutan los workers de "manage.py run_workers", sin Redis ni
+otro intermediario. Cada worker toma los pendientes por lotes con una sola transacción (con
+SELECT ... FOR UPDATE SKIP LOCKED en PostgreSQL, de modo que varios workers no se bloquean entre
+sí), los ejecuta en un pool de hilos y marca los completados con un solo UPDATE por lote.
+
+Las tareas se registran con el decorador tarea y reciben un Contexto para informar su avance:
+
+    @tarea("mi_tarea")
+    def mi_tarea(contexto, **argumentos):
+        contexto.progreso(0.5, "Mitad")
+        return {"resultado": ...}
+
+Un trabajo que falla se reintenta con una espera exponencial hasta max_intentos; ErrorPermanente lo
+marca como fallido sin reintentos. Los trabajos de un worker que deja de enviar latidos vuelven a
+la cola (ver liberar_abandonados).
+"""
+
+import os
+import socket
+import tempfile
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+from itertools import count
+
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Trabajo
+
+# Tareas registradas: tipo -> función
+TAREAS = {}
+
+# Segundos entre consultas a la cola cuando no hay trabajos pendientes
+INTERVALO_ESPERA = 0.5
+
+# Trabajos que un worker toma por consulta por cada hilo, si no se indica el lote
+TRABAJOS_POR_HILO = 8
+
+# Segundos entre latidos de un worker y sin latidos tras los que sus trabajos se consideran abandonados
+INTERVALO_LATIDO = 15
+TIEMPO_ABANDONO = 120
+
+# Espera antes de un reintento: ESPERA_REINTENTO * 2^(intentos - 1) segundos, hasta ESPERA_MAXIMA
+ESPERA_REINTENTO = 5
+ESPERA_MAXIMA = 600
+
+# Segundos mínimos entre dos escrituras del avance de un mismo trabajo
+INTERVALO_PROGRESO = 0.5
+
+# Largo máximo del error que se guarda en el trabajo
+LARGO_ERROR = 4000
+
+_numeros_worker = count()
+
+
+class ErrorPermanente(Exception):
+    """Error de una tarea que no se corrige reintentando (por ejemplo, argumentos inválidos)."""
+
+
+def tarea(tipo):
+    """Registra una función como la tarea que ejecuta los trabajos de un tipo."""
+
+    def decorador(funcion):
+        TAREAS[tipo] = funcion
+        return funcion
+
+    return decorador
+
+
+def _nuevo_trabajo(tipo, argumentos, prioridad, max_intentos, usuario, disponible_desde):
+    if tipo not in TAREAS:
+        raise ValueError(f"No hay una tarea registrada para el tipo {tipo!r}")
+    return Trabajo(
+        tipo=tipo,
+        argumentos=argumentos or {},
+        prioridad=prioridad,
+        max_intentos=max_intentos,
+        usuario=usuario,
+        disponible_desde=disponible_desde or timezone.now(),
+    )
+
+
+def encolar(tipo, argumentos=None, prioridad=0, max_intentos=3, usuario=None, disponible_desde=None):
+    """Agrega un trabajo a la cola.
+
+    Args:
+        tipo (str): Tipo de tarea registrado con el decorador tarea.
+        argumentos (dict): Argumentos de la tarea; deben poder guardarse como JSON.
+        prioridad (int): Los trabajos con mayor prioridad se toman primero.
+        max_intentos (int): Intentos antes de marcar el trabajo como fallido.
+        usuario (User): Usuario que puede consultar el estado del trabajo.
+        disponible_desde (datetime): Fecha desde la que el trabajo se puede ejecutar.
+
+    Returns:
+        Trabajo: El trabajo creado.
+
+    Raises:
+        ValueError: Si no hay una tarea registrada para el tipo.
+    """
+    trabajo = _nuevo_trabajo(tipo, argumentos, prioridad, max_intentos, usuario, disponible_desde)
+    trabajo.save()
+    return trabajo
+
+
+def encolar_muchos(tipo, lista_argumentos, prioridad=0, max_intentos=3, usuario=None):
+    """Agrega varios trabajos del mismo tipo con un solo bulk_create.
+
+    Returns:
+        list: Los trabajos creados.
+    """
+    return Trabajo.objects.bulk_create(
+        [
+            _nuevo_trabajo(tipo, argumentos, prioridad, max_intentos, usuario, None)
+            for argumentos in lista_argumentos
+        ]
+    )
+
+
+def tomar(worker, cantidad, tipos=None):
+    """Toma hasta cantidad trabajos pendientes y los marca en curso para un worker.
+
+    En PostgreSQL las filas se eligen con SELECT ... FOR UPDATE SKIP LOCKED, de modo que los workers
+    no esperan a los demás. En otras bases de datos se eligen y marcan con un solo UPDATE con
+    subconsulta, que la base de datos serializa.
+
+    Returns:
+        list: Los trabajos tomados, por prioridad.
+    """
+    ahora = timezone.now()
+    pendientes = Trabajo.objects.filter(estado=Trabajo.PENDIENTE, disponible_desde__lte=ahora)
+    if tipos:
+        pendientes = pendientes.filter(tipo__in=tipos)
+    pendientes = pendientes.order_by("-prioridad", "disponible_desde", "id")
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            ids = list(
+                pendientes.select_for_update(skip_locked=True).values_list("pk", flat=True)[
+                    :cantidad
+                ]
+            )
+            if not ids:
+                return []
+            elegidos = Trabajo.objects.filter(pk__in=ids)
+        else:
+            elegidos = Trabajo.objects.filter(pk__in=pendientes.values("pk")[:cantidad])
+        tomados = elegidos.update(
+            estado=Trabajo.EN_CURSO,
+            worker=worker,
+            intentos=F("intentos") + 1,
+            iniciado=ahora,
+            latido=ahora,
+        )
+        if not tomados:
+            return []
+        # Un worker termina su lote antes de tomar otro, así que sus trabajos en curso son éstos
+        en_curso = Trabajo.objects.filter(worker=worker, estado=Trabajo.EN_CURSO)
+        return list(en_curso.order_by("-prioridad", "disponible_desde", "id"))
+
+
+def liberar_abandonados(tiempo_abandono=TIEMPO_ABANDONO):
+    """Devuelve a la cola los trabajos de workers que dejaron de enviar latidos.
+
+    Cuentan como un intento: los que ya agotaron sus intentos se marcan como fallidos.
+
+    Returns:
+        int: Número de trabajos liberados o marcados como fallidos.
+    """
+    limite = timezone.now() - timedelta(seconds=tiempo_abandono)
+    abandonados = Trabajo.objects.filter(estado=Trabajo.EN_CURSO, latido__lt=limite)
+    error = "El worker dejó de responder mientras ejecutaba el trabajo"
+    with transaction.atomic():
+        reintentos = abandonados.filter(intentos__lt=F("max_intentos")).update(
+            estado=Trabajo.PENDIENTE, worker="", error=error, disponible_desde=timezone.now()
+        )
+        fallidos = abandonados.update(
+            estado=Trabajo.FALLIDO, worker="", error=error, terminado=timezone.now()
+        )
+    return reintentos + fallidos
+
+
+class Contexto:
+    """Acceso de una tarea a su trabajo para informar el avance."""
+
+    def __init__(self, trabajo):
+        self.trabajo = trabajo
+        self._ultimo_progreso = 0.0
+
+    def progreso(self, fraccion, mensaje=""):
+        """Guarda el avance del trabajo (entre 0 y 1), a lo más cada INTERVALO_PROGRESO segundos.
+
+        El último avance (fracción 1) siempre se guarda.
+        """
+        ahora = time.monotonic()
+        if fraccion < 1 and ahora - self._ultimo_progreso < INTERVALO_PROGRESO:
+            return
+        self._ultimo_progreso = ahora
+        self.trabajo.progreso = max(0.0, min(1.0, fraccion))
+        self.trabajo.mensaje = mensaje[:200]
+        Trabajo.objects.filter(pk=self.trabajo.pk).update(
+            progreso=self.trabajo.progreso, mensaje=self.trabajo.mensaje, latido=timezone.now()
+        )
+
+
+def ejecutar(trabajo):
+    """Ejecuta la tarea de un trabajo tomado y deja en él el estado final (sin guardarlo).
+
+    Los fallidos se guardan aquí, porque pueden volver a la cola; los completados los guarda el
+    worker por lotes.
+
+    Returns:
+        Trabajo: El mismo trabajo.
+    """
+    try:
+        funcion = TAREAS.get(trabajo.tipo)
+        if funcion is None:
+            raise ErrorPermanente(f"No hay una tarea registrada para el tipo {trabajo.tipo!r}")
+        trabajo.resultado = funcion(Contexto(trabajo), **trabajo.argumentos)
+    except Exception as exc:
+        trabajo.error = traceback.format_exc()[-LARGO_ERROR:]
+        ahora = timezone.now()
+        if isinstance(exc, ErrorPermanente) or trabajo.intentos >= trabajo.max_intentos:
+            trabajo.estado = Trabajo.FALLIDO
+            trabajo.terminado = ahora
+        else:
+            espera = min(ESPERA_MAXIMA, ESPERA_REINTENTO * 2 ** (trabajo.intentos - 1))
+            trabajo.estado = Trabajo.PENDIENTE
+            trabajo.disponible_desde = ahora + timedelta(seconds=espera)
+        trabajo.worker = ""
+        trabajo.save(update_fields=["estado", "error", "terminado", "disponible_desde", "worker"])
+    else:
+        trabajo.estado = Trabajo.COMPLETADO
+        trabajo.progreso = 1.0
+        trabajo.error = ""
+        trabajo.terminado = timezone.now()
+    finally:
+        close_old_connections()
+    return trabajo
+
+
+def nombre_worker():
+    """Identificador único de un worker: máquina, proceso y número dentro del proceso."""
+    return f"{socket.gethostname()}:{os.getpid()}:{next(_numeros_worker)}"
+
+
+class Worker:
+    """Toma trabajos de la cola y los ejecuta en un pool de hilos.
+
+    Args:
+        hilos (int): Trabajos que se ejecutan a la vez.
+        lote (int): Trabajos que se toman por consulta (por defecto, ocho por hilo).
+        tipos (list): Tipos de trabajo que atiende este worker (por defecto, todos).
+        intervalo (float): Segundos de espera cuando la cola está vacía.
+    """
+
+    # Campos que se guardan al completar un lote
+    CAMPOS_COMPLETADO = ["estado", "progreso", "resultado", "error", "terminado"]
+
+    def __init__(self, hilos=4, lote=None, tipos=None, intervalo=INTERVALO_ESPERA):
+        self.nombre = nombre_worker()
+        self.hilos = hilos
+        self.lote = lote or hilos * TRABAJOS_POR_HILO
+        self.tipos = tipos
+        self.intervalo = intervalo
+        self.detener = threading.Event()
+        self.pool = ThreadPoolExecutor(hilos, thread_name_prefix="trabajo") if hilos > 1 else None
+        self._ultimo_latido = time.monotonic()
+
+    def latir(self, forzar=False):
+        """Actualiza el latido de los trabajos en curso de este worker (un UPDATE)."""
+        if not forzar and time.monotonic() - self._ultimo_latido < INTERVALO_LATIDO:
+            return
+        self._ultimo_latido = time.monotonic()
+        Trabajo.objects.filter(worker=self.nombre, estado=Trabajo.EN_CURSO).update(
+            latido=timezone.now()
+        )
+
+    def _latir_hasta(self, terminado):
+        """Envía un latido cada INTERVALO_LATIDO segundos hasta que se activa terminado."""
+        try:
+            while not terminado.wait(INTERVALO_LATIDO):
+                self.latir(forzar=True)
+        finally:
+            connection.close()
+
+    def ejecutar_lote(self):
+        """Toma un lote de trabajos, los ejecuta y guarda los completados.
+
+        Returns:
+            int: Número de trabajos tomados.
+        """
+        trabajos = tomar(self.nombre, self.lote, self.tipos)
+        if not trabajos:
+            return 0
+        if self.pool is None:
+            # Los trabajos se ejecutan en este hilo, así que los latidos se envían desde otro
+            terminado = threading.Event()
+            latidos = threading.Thread(
+                target=self._latir_hasta, args=(terminado,), name="latidos", daemon=True
+            )
+            latidos.start()
+            try:
+                terminados = [ejecutar(trabajo) for trabajo in trabajos]
+            finally:
+                terminado.set()
+                latidos.join()
+        else:
+            pendientes = {self.pool.submit(ejecutar, trabajo) for trabajo in trabajos}
+            terminados = []
+            while pendientes:
+                listos, pendientes = wait(pendientes, INTERVALO_LATIDO, FIRST_COMPLETED)
+                terminados.extend(futuro.result() for futuro in listos)
+                self.latir()
+        completados = [t for t in terminados if t.estado == Trabajo.COMPLETADO]
+        Trabajo.objects.bulk_update(completados, self.CAMPOS_COMPLETADO)
+        return len(trabajos)
+
+    def run(self, una_vez=False):
+        """Atiende la cola hasta que se llama a detener.set() o, con una_vez, hasta vaciarla.
+
+        Returns:
+            int: Número de trabajos ejecutados.
+        """
+        ejecutados = 0
+        liberar_abandonados()
+        try:
+            while not self.detener.is_set():
+                tomados = self.ejecutar_lote()
+                ejecutados += tomados
+                if tomados:
+                    continue
+                if una_vez:
+                    break
+                close_old_connections()
+                if time.monotonic() - self._ultimo_latido >= INTERVALO_LATIDO:
+                    self._ultimo_latido = time.monotonic()
+                    liberar_abandonados()
+                self.detener.wait(self.intervalo)
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown()
+        return ejecutados
+
+
+@tarea("eco")
+def eco(contexto, **argumentos):
+    """Devuelve sus argumentos; sirve para comprobar los workers y medir la cola."""
+    return argumentos
+
+
+@tarea("importar_inventario")
+def importar_inventario(contexto, tipo, archivo, bloque=None):
+    """Importa un archivo CSV o XLSX con el importador del tipo indicado (ver importacion.py)."""
+    from .importacion import IMPORTADORES, TAMANO_BLOQUE, en_bloques, leer_filas
+
+    if tipo not in IMPORTADORES:
+        raise ErrorPermanente(f"Tipo de importación desconocido: {tipo}")
+    importador = IMPORTADORES[tipo]()
+    creados = actualizados = 0
+    errores = []
+    for numero, filas in enumerate(en_bloques(leer_filas(archivo), bloque or TAMANO_BLOQUE), 1):
+        resultado = importador.importar_bloque(filas)
+        creados += resultado.creados
+        actualizados += resultado.actualizados
+        errores.extend(resultado.errores)
+        contexto.progreso(0, f"{numero} bloques importados")
+    return {
+        "creados": creados,
+        "actualizados": actualizados,
+        "errores": len(errores),
+        "primeros_errores": [{"linea": e.linea, "mensaje": e.mensaje} for e in errores[:50]],
+    }
+
+
+@tarea("provisionar_usuarios")
+def provisionar_usuarios_archivo(contexto, archivo, lote=None):
+    """Crea los usuarios de un archivo CSV o XLSX (ver usuarios.provisionar_usuarios)."""
+    from .importacion import en_bloques, leer_filas
+    from .usuarios import TAMANO_LOTE, especificacion_de_fila, provisionar_usuarios
+
+    creados = omitidos = invalidas = 0
+    for filas in en_bloques(leer_filas(archivo), lote or TAMANO_LOTE):
+        especificaciones = [especificacion_de_fila(fila) for _, fila in filas]
+        validas = [especificacion for especificacion in especificaciones if especificacion]
+        invalidas += len(especificaciones) - len(validas)
+        resultado = provisionar_usuarios(validas)
+        creados += resultado.creados
+        omitidos += resultado.omitidos
+        contexto.progreso(0, f"{creados} usuarios creados")
+    return {"creados": creados, "omitidos": omitidos, "filas_invalidas": invalidas}
+
+
+@tarea("plan_corte")
+def plan_corte(contexto, productos, material, sucursal, motor="numpy"):
+    """Planifica el corte de productos y guarda los restos como sobrantes (ver plan_corte.py)."""
+    from .models import Material, ProductoHojalateria, Sucursal
+    from .plan_corte import guardar_sobrantes, medidas_de_productos, planificar_cortes
+
+    try:
+        material = Material.objects.get(pk=material)
+        sucursal = Sucursal.objects.get(pk=sucursal)
+    except (Material.DoesNotExist, Sucursal.DoesNotExist) as exc:
+        raise ErrorPermanente(str(exc)) from exc
+    medidas = medidas_de_productos(ProductoHojalateria.objects.filter(pk__in=productos))
+    contexto.progreso(0.1, f"{len(medidas)} piezas")
+    plan = planificar_cortes(medidas, motor=motor)
+    contexto.progreso(0.8, f"{plan.planchas} planchas")
+    sobrantes = guardar_sobrantes(plan, material, sucursal)
+    return {
+        "planchas": plan.planchas,
+        "piezas": len(medidas),
+        "sin_colocar": len(plan.sin_colocar),
+        "aprovechamiento": plan.aprovechamiento,
+        "sobrantes": [sobrante.pk for sobrante in sobrantes],
+    }
+
+
+@tarea("exportar_usuarios")
+def exportar_usuarios(contexto, formato="csv"):
+    """Escribe el directorio de usuarios en el almacenamiento por defecto (ver views.user_export)."""
+    from django.core.files import File
+    from django.core.files.storage import default_storage
+
+    from .views import USER_EXPORT_FORMATS, user_directory_queryset
+
+    if formato not in USER_EXPORT_FORMATS:
+        raise ErrorPermanente(f"Formato de exportación no soportado: {formato}")
+    stream, _, extension = USER_EXPORT_FORMATS[formato]
+    total = user_directory_queryset().count() or 1
+    # El archivo se escribe en disco por partes, igual que la respuesta de user_export
+    with tempfile.TemporaryFile() as temporal:
+        for numero, parte in enumerate(stream()):
+            temporal.write(parte.encode())
+            if numero % 1000 == 0:
+                contexto.progreso(numero / total, f"{numero} usuarios")
+        temporal.seek(0)
+        nombre = default_storage.save(f"exportaciones/usuarios.{extension}", File(temporal))
+    return {"archivo": nombre, "url": default_storage.url(nombre)}
+
+
+@tarea("reconstruir_existencias")
+def reconstruir_existencias(contexto):
+    """Recalcula los totales de existencias desde el libro de movimientos (ver stock.py)."""
+    from .stock import reconstruir_snapshots
+
+    return {"totales": reconstruir_snapshots()}
+
+
+@tarea("refrescar_reportes")
+def refrescar_reportes(contexto, reconstruir=False):
+    """Suma a los agregados de los reportes los movimientos nuevos (ver reportes.py)."""
+    from . import reportes
+
+    resultado = reportes.reconstruir() if reconstruir else reportes.refrescar()
+    return resultado._asdict()
+
+
+@tarea("notificar_alertas")
+def notificar_alertas(contexto):
+    """Notifica juntas las alertas de existencias bajas acumuladas (ver alertas.py)."""
+    from . import alertas
+
+    return {"notificadas": alertas.notificar()}
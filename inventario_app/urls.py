@@ -9,4 +9,10 @@ urlpatterns = [
     path('accounts/logout', views.logout_view, name='logout'),
     path('welcome/', views.welcome, name='welcome'),
     path('users/', views.user_list, name='user_list'),
+    path('users/export/<str:formato>/', views.user_export, name='user_export'),
+    path('inventario/productos/buscar/', views.product_search, name='product_search'),
+    path('inventario/autocompletar/<str:modelo>/', views.autocomplete, name='autocomplete'),
+    path('inventario/cotizar/', views.quote, name='quote'),
+    path('reportes/', views.reports, name='reports'),
+    path('trabajos/<int:pk>/', views.job_status, name='job_status'),
 ]
@@ -0,0 +1,28 @@
+"""Rutas de la aplicación con las vistas de lectura asíncronas (despliegue ASGI)."""
+
+from django.urls import path
+
+from . import vistas_async
+from .urls import urlpatterns as rutas_sincronas
+
+# Vistas que se reemplazan por su versión asíncrona, por nombre de URL
+VISTAS_ASINCRONAS = {
+    "welcome": vistas_async.welcome,
+    "user_list": vistas_async.user_list,
+    "user_export": vistas_async.user_export,
+    "product_search": vistas_async.product_search,
+}
+
+urlpatterns = [
+    path(str(ruta.pattern), VISTAS_ASINCRONAS[ruta.name], name=ruta.name)
+    if ruta.name in VISTAS_ASINCRONAS
+    else ruta
+    for ruta in rutas_sincronas
+] + [
+    # Sólo bajo ASGI: cada conexión SSE ocuparía un hilo completo en WSGI
+    path(
+        "inventario/tablero/<int:sucursal>/eventos/",
+        vistas_async.stock_events,
+        name="stock_events",
+    ),
+]
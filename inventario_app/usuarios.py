@@ -0,0 +1,133 @@
+"""Creación masiva de usuarios con el cifrado de contraseñas repartido en un pool de procesos.
+
+User.objects.create_user cifra la contraseña y ejecuta un INSERT por cada usuario. Aquí las
+contraseñas de cada lote se cifran en paralelo y los usuarios se insertan con bulk_create.
+"""
+
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+
+# Número de usuarios por lote de inserción por defecto
+TAMANO_LOTE = 1000
+
+# Algoritmo rápido para perfiles de desarrollo y pruebas (debe estar en PASSWORD_HASHERS)
+HASHER_RAPIDO = "md5"
+
+# Valores de las columnas booleanas que se consideran verdaderos
+VERDADEROS = {"1", "true", "si", "sí", "yes", "x"}
+
+# Resultado del aprovisionamiento con los tiempos de cada etapa en segundos
+ResultadoAprovisionamiento = namedtuple(
+    "ResultadoAprovisionamiento", ["creados", "omitidos", "tiempo_cifrado", "tiempo_insercion"]
+)
+
+
+def _iniciar_proceso(modulo_settings):
+    """Configura Django en los procesos del pool cuando no heredan la configuración del padre."""
+    import django
+    from django.conf import settings
+
+    if not settings.configured:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", modulo_settings)
+        django.setup()
+
+
+def _cifrar(contrasena, algoritmo):
+    return make_password(contrasena, hasher=algoritmo)
+
+
+def crear_pool(procesos=None):
+    """Crea el pool de procesos para cifrar contraseñas."""
+    return ProcessPoolExecutor(
+        max_workers=procesos,
+        initializer=_iniciar_proceso,
+        initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", "tectum.settings"),),
+    )
+
+
+def cifrar_contrasenas(contrasenas, pool=None, algoritmo="default"):
+    """Cifra una lista de contraseñas, en paralelo si se entrega un pool.
+
+    Args:
+        contrasenas (list): Contraseñas en texto plano.
+        pool (ProcessPoolExecutor): Pool de procesos; sin pool se cifra en el proceso actual.
+        algoritmo (str): Nombre del hasher de PASSWORD_HASHERS o "default".
+
+    Returns:
+        list: Contraseñas cifradas en el mismo orden.
+    """
+    cifrar = partial(_cifrar, algoritmo=algoritmo)
+    if pool is None:
+        return [cifrar(contrasena) for contrasena in contrasenas]
+    trozo = max(1, len(contrasenas) // (4 * (os.cpu_count() or 1)))
+    return list(pool.map(cifrar, contrasenas, chunksize=trozo))
+
+
+def especificacion_de_fila(fila):
+    """Convierte una fila del archivo de usuarios en la especificación de provisionar_usuarios.
+
+    Returns:
+        dict: La fila con is_staff e is_superuser como booleanos, o None si le falta el nombre de
+        usuario o la contraseña.
+    """
+    if not fila.get("username") or not fila.get("password"):
+        return None
+    fila["is_staff"] = (fila.get("is_staff") or "").strip().lower() in VERDADEROS
+    fila["is_superuser"] = (fila.get("is_superuser") or "").strip().lower() in VERDADEROS
+    return fila
+
+
+def provisionar_usuarios(especificaciones, pool=None, algoritmo="default"):
+    """Crea un lote de usuarios con un solo bulk_create.
+
+    Los nombres de usuario que ya existen se omiten.
+
+    Args:
+        especificaciones (list): Diccionarios con username, password y opcionalmente email,
+            first_name, last_name, is_staff e is_superuser.
+        pool (ProcessPoolExecutor): Pool de procesos para cifrar las contraseñas.
+        algoritmo (str): Nombre del hasher de PASSWORD_HASHERS o "default".
+
+    Returns:
+        ResultadoAprovisionamiento: Usuarios creados y omitidos, y el tiempo de cada etapa.
+    """
+    nombres = [especificacion["username"] for especificacion in especificaciones]
+    existentes = set(User.objects.filter(username__in=nombres).values_list("username", flat=True))
+    nuevos = []
+    for especificacion in especificaciones:
+        if especificacion["username"] not in existentes:
+            existentes.add(especificacion["username"])
+            nuevos.append(especificacion)
+
+    inicio = time.perf_counter()
+    cifradas = cifrar_contrasenas(
+        [especificacion["password"] for especificacion in nuevos], pool, algoritmo
+    )
+    tiempo_cifrado = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    User.objects.bulk_create(
+        [
+            User(
+                username=especificacion["username"],
+                email=User.objects.normalize_email(especificacion.get("email") or ""),
+                first_name=especificacion.get("first_name") or "",
+                last_name=especificacion.get("last_name") or "",
+                is_staff=bool(especificacion.get("is_staff")),
+                is_superuser=bool(especificacion.get("is_superuser")),
+                password=cifrada,
+            )
+            for especificacion, cifrada in zip(nuevos, cifradas)
+        ]
+    )
+    tiempo_insercion = time.perf_counter() - inicio
+
+    return ResultadoAprovisionamiento(
+        len(nuevos), len(especificaciones) - len(nuevos), tiempo_cifrado, tiempo_insercion
+    )
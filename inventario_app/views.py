@@ -1,57 +1,64 @@
+import csv
+import json
+
+from django.conf import settings
 from django.contrib import messages
-from django.contrib.auth import logout, login, authenticate
+from django.contrib.auth import logout, login
 from django.contrib.auth.models import User
 from django.contrib.auth.views import LoginView
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.hashers import check_password
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect
 from django.urls import reverse_lazy
+from django.views.decorators.http import require_POST
 from django.views.generic import CreateView
+from .busqueda import _entero, buscar_productos
+from .cache import pagina_publica
+from .cotizacion import cotizar
 from .forms import RegistrationForm
+from .models import Trabajo
+from .opciones import AUTOCOMPLETADOS, TAMANO_PAGINA, autocompletar
+from .reportes import DIAS_MAXIMO, DIAS_POR_DEFECTO, reporte
 
 
+@pagina_publica("landing.html", "base.html")
 def landing_page(request):
     return render(request, "landing.html")
 
 
 def register(request):
+    """Registra un usuario e inicia su sesión.
+
+    create_user cifra la contraseña una sola vez y guarda al usuario con un único INSERT. La sesión
+    se inicia directamente con el usuario creado, sin volver a verificar la contraseña con
+    authenticate.
+    """
     if request.method == "POST":
         form = RegistrationForm(request.POST)
         if form.is_valid():
-            # Procesar los datos del formulario si es válido
-            username = form.cleaned_data["username"]
-            first_name = form.cleaned_data["first_name"]
-            last_name = form.cleaned_data["last_name"]
-            email = form.cleaned_data["email"]
-            password = form.cleaned_data["password"]
-            confirm_password = form.cleaned_data["password"]
-
-            # Verificando las contraseñas
-            if password != confirm_password:
-                messages.error(request, "Views: Las contraseñas no coinciden.")
-            else: 
-                # Crear un nuevo usuario
-                new_user = User.objects.create_user(
-                    username=username,
-                    first_name=first_name,
-                    last_name=last_name,
-                    email=email,
-                    password=password,
-                )
-
-                # Guardar al usuario en la base de datos
-                new_user.save()
-
-                # Iniciando sesión con el nuevo usuario
-                user = authenticate(request, username=username, password=password)
-                if user is not None:
-                    login(request, user)
-
-                    # Redirigir a la página de bienvenida después del registro
-                    return redirect("welcome")
-
-        else:
-            print(form.errors)
+            # Crear un nuevo usuario
+            new_user = User.objects.create_user(
+                username=form.cleaned_data["username"],
+                first_name=form.cleaned_data["first_name"],
+                last_name=form.cleaned_data["last_name"],
+                email=form.cleaned_data["email"],
+                password=form.cleaned_data["password"],
+            )
+
+            # Iniciando sesión con el nuevo usuario
+            login(request, new_user, backend=settings.AUTHENTICATION_BACKENDS[0])
+
+            # Redirigir a la página de bienvenida después del registro
+            return redirect("welcome")
+
+        # Mostrar los errores de validación con los mensajes de la plantilla
+        for errors in form.errors.values():
+            for error in errors:
+                messages.error(request, error)
     else:
         form = RegistrationForm()
     return render(request, "registration.html", {"form": form})
@@ -77,11 +84,251 @@ def logout_view(request):
     logout(request)
     return redirect("landing")
 
+# Columnas que se muestran en el directorio de usuarios
+USER_LIST_FIELDS = ("first_name", "last_name", "username", "email")
+
+# Número de usuarios por página del directorio
+USER_LIST_PAGE_SIZE = 50
+
+# Número de filas que se leen desde la base de datos por cada bloque de la exportación
+USER_EXPORT_CHUNK_SIZE = 2000
+
+# Salt para firmar los cursores de paginación
+USER_CURSOR_SALT = "inventario_app.user_list"
+
+
+def user_directory_queryset():
+    """Consulta base del directorio de usuarios.
+
+    Filtra al personal (is_staff) en la base de datos, selecciona sólo las columnas que se muestran
+    y ordena de forma estable por (last_name, id) para poder paginar por cursor, con el índice
+    auth_user_apellido_id_idx de la migración 0012_usuario_indice_apellido.
+
+    Returns:
+        QuerySet: Usuarios que no son parte del personal, ordenados por apellido e id.
+    """
+    return (
+        User.objects.filter(is_staff=False)
+        .only(*USER_LIST_FIELDS)
+        .order_by("last_name", "id")
+    )
+
+
+def encode_user_cursor(user):
+    """Genera el cursor firmado que apunta a la fila siguiente a un usuario.
+
+    Args:
+        user (User): Último usuario de la página actual.
+
+    Returns:
+        str: Cursor opaco para el parámetro "cursor" de la URL.
+    """
+    return signing.dumps([user.last_name, user.pk], salt=USER_CURSOR_SALT, compress=True)
+
+
+def decode_user_cursor(cursor):
+    """Recupera el par (last_name, id) de un cursor generado por encode_user_cursor.
+
+    Args:
+        cursor (str): Cursor recibido en la URL.
+
+    Returns:
+        tuple: (last_name, id) o None si el cursor no existe o fue alterado.
+    """
+    if not cursor:
+        return None
+    try:
+        last_name, pk = signing.loads(cursor, salt=USER_CURSOR_SALT)
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+    return last_name, pk
+
+
+def user_list_page(request):
+    """Consulta de una página del directorio a partir del cursor de la URL.
+
+    En lugar de OFFSET se filtra por la posición (last_name, id) del último usuario de la página
+    anterior, por lo que el costo de cada página no crece con el tamaño de la tabla.
+
+    Returns:
+        tuple: (QuerySet con una fila más que el tamaño de página, posición del cursor o None)
+    """
+    users = user_directory_queryset()
+
+    position = decode_user_cursor(request.GET.get("cursor"))
+    if position is not None:
+        last_name, pk = position
+        users = users.filter(
+            Q(last_name__gt=last_name) | Q(last_name=last_name, id__gt=pk)
+        )
+
+    # Se pide una fila extra para saber si existe una página siguiente
+    return users[: USER_LIST_PAGE_SIZE + 1], position
+
+
+def user_list_context(page, position):
+    """Contexto de la plantilla del directorio a partir de las filas leídas por user_list_page."""
+    next_cursor = None
+    if len(page) > USER_LIST_PAGE_SIZE:
+        page = page[:USER_LIST_PAGE_SIZE]
+        next_cursor = encode_user_cursor(page[-1])
+
+    return {
+        "users": page,
+        "next_cursor": next_cursor,
+        "is_first_page": position is None,
+    }
+
+
 @login_required
 def user_list(request):
-    if not request.user.is_authenticated:
-        messages.error(request, 'Necesitas iniciar sesión para ver esta página.')
-        return redirect('login')
-    
-    users = User.objects.all()
-    return render(request, "user_list.html", ({"users": users}))
+    """Directorio de usuarios paginado por cursor (keyset)."""
+    users, position = user_list_page(request)
+    return render(request, "user_list.html", user_list_context(list(users), position))
+
+
+class Echo:
+    """Objeto con la interfaz de escritura de un archivo que devuelve el valor en lugar de guardarlo."""
+
+    def write(self, value):
+        return value
+
+
+def _user_rows():
+    """Recorre el directorio por bloques sin cargar la tabla completa en memoria."""
+    return (
+        user_directory_queryset()
+        .values_list(*USER_LIST_FIELDS)
+        .iterator(chunk_size=USER_EXPORT_CHUNK_SIZE)
+    )
+
+
+def _stream_user_csv():
+    writer = csv.writer(Echo())
+    yield writer.writerow(USER_LIST_FIELDS)
+    for row in _user_rows():
+        yield writer.writerow(row)
+
+
+def _stream_user_ndjson():
+    for row in _user_rows():
+        yield json.dumps(dict(zip(USER_LIST_FIELDS, row)), ensure_ascii=False) + "\n"
+
+
+# Formatos de exportación disponibles: (generador, content type, extensión)
+USER_EXPORT_FORMATS = {
+    "csv": (_stream_user_csv, "text/csv; charset=utf-8", "csv"),
+    "ndjson": (_stream_user_ndjson, "application/x-ndjson; charset=utf-8", "ndjson"),
+}
+
+
+@login_required
+def user_export(request, formato):
+    """Exporta el directorio de usuarios completo como CSV o NDJSON.
+
+    La respuesta se transmite por partes con StreamingHttpResponse, de modo que la memoria usada
+    se mantiene constante sin importar el número de usuarios.
+
+    Args:
+        formato (str): "csv" o "ndjson".
+
+    Raises:
+        Http404: Si el formato no está soportado.
+    """
+    if formato not in USER_EXPORT_FORMATS:
+        raise Http404("Formato de exportación no soportado")
+    stream, content_type, extension = USER_EXPORT_FORMATS[formato]
+    response = StreamingHttpResponse(stream(), content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="usuarios.{extension}"'
+    return response
+
+
+@login_required
+def product_search(request):
+    """Búsqueda de productos en JSON con filtros por faceta, rangos de dimensiones y prefijo de texto.
+
+    Los parámetros aceptados se describen en busqueda.filtrar_productos.
+    """
+    try:
+        resultado = buscar_productos(request.GET)
+    except ValidationError as error:
+        return JsonResponse({"errores": error.messages}, status=400)
+    return JsonResponse(resultado)
+
+
+@login_required
+@require_POST
+def quote(request):
+    """Cotización en JSON de un pedido enviado como {"lineas": [...]} en el cuerpo de la petición.
+
+    El formato de las líneas y de la respuesta se describe en cotizacion.cotizar. Las líneas con
+    errores se informan en "errores" sin impedir que se coticen las demás.
+    """
+    try:
+        pedido = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({"errores": ["El cuerpo debe ser JSON"]}, status=400)
+    try:
+        resultado = cotizar(pedido.get("lineas") if isinstance(pedido, dict) else None)
+    except ValidationError as error:
+        return JsonResponse({"errores": error.messages}, status=400)
+    return JsonResponse(resultado)
+
+
+@login_required
+def autocomplete(request, modelo):
+    """Opciones de trabajadores o materiales para los campos con autocompletado, en JSON.
+
+    Acepta q (prefijo que se busca), cursor (valor "siguiente" de la página anterior) y limite.
+
+    Raises:
+        Http404: Si el modelo no admite autocompletado.
+    """
+    if modelo not in AUTOCOMPLETADOS:
+        raise Http404("Modelo sin autocompletado")
+    try:
+        cursor = _entero(request.GET, "cursor")
+        limite = _entero(request.GET, "limite") or TAMANO_PAGINA
+    except ValidationError as error:
+        return JsonResponse({"errores": error.messages}, status=400)
+    return JsonResponse(autocompletar(modelo, request.GET.get("q", ""), cursor, limite))
+
+
+@login_required
+def reports(request):
+    """Reportes de existencias por sucursal, uso de material por trabajador y sobrantes recuperados.
+
+    Sólo lee los agregados diarios que mantiene "manage.py refresh_reports", en una ventana de
+    días (parámetro dias), así que su costo no depende del largo del historial.
+    """
+    try:
+        dias = _entero(request.GET, "dias") or DIAS_POR_DEFECTO
+    except ValidationError:
+        dias = DIAS_POR_DEFECTO
+    dias = min(max(dias, 1), DIAS_MAXIMO)
+    contexto = reporte(dias)
+    contexto.update({"dias": dias, "dias_maximo": DIAS_MAXIMO})
+    return render(request, "reportes.html", contexto)
+
+
+# Campos de un trabajo que devuelve job_status
+JOB_STATUS_FIELDS = (
+    "id", "tipo", "estado", "progreso", "mensaje", "intentos", "max_intentos", "resultado", "error",
+    "creado", "iniciado", "terminado", "usuario_id",
+)
+
+
+@login_required
+def job_status(request, pk):
+    """Estado y avance de un trabajo en segundo plano, en JSON.
+
+    Sólo puede consultarlo el usuario que lo encoló o el personal.
+
+    Raises:
+        Http404: Si el trabajo no existe o pertenece a otro usuario.
+    """
+    trabajo = Trabajo.objects.filter(pk=pk).values(*JOB_STATUS_FIELDS).first()
+    if trabajo is None or not (request.user.is_staff or trabajo["usuario_id"] == request.user.pk):
+        raise Http404("Trabajo no encontrado")
+    del trabajo["usuario_id"]
+    return JsonResponse(trabajo)
@@ -0,0 +1,148 @@
+"""Versiones asíncronas de las vistas de lectura para el despliegue ASGI.
+
+Bajo ASGI cada vista síncrona ocupa un hilo del adaptador sync_to_async mientras dura la petición.
+Estas vistas leen con el ORM asíncrono (async for, aiterator) y sólo pasan por un hilo para
+resolver el usuario de la sesión, de modo que un mismo proceso atiende muchos clientes lentos a la
+vez. Se activan con tectum.urls_async (ver TECTUM_VISTAS_ASINCRONAS en settings).
+
+El tablero de existencias en vivo (stock_events) sólo existe aquí: cada cliente mantiene abierta una
+respuesta text/event-stream, que bajo WSGI ocuparía un hilo por conexión.
+
+La landing page se mantiene síncrona: su respuesta para visitantes anónimos sale de la caché de
+páginas (cache.pagina_publica), cuyos decoradores en Django 4.2 sólo admiten vistas síncronas.
+"""
+
+import csv
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.core.exceptions import ValidationError
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import render
+
+from . import tablero, views
+from .busqueda import buscar_productos
+
+
+async def usuario_autenticado(request):
+    """Resuelve request.user en un hilo y devuelve si la sesión está iniciada.
+
+    El usuario es un objeto perezoso que consulta la sesión y la tabla de usuarios al usarse por
+    primera vez; después de esta llamada queda cargado y las plantillas pueden leerlo sin consultas.
+    """
+    return await sync_to_async(lambda: request.user.is_authenticated)()
+
+
+def login_requerido(vista):
+    """Equivalente asíncrono de login_required."""
+
+    @wraps(vista)
+    async def envoltura(request, *args, **kwargs):
+        if not await usuario_autenticado(request):
+            return redirect_to_login(request.get_full_path())
+        return await vista(request, *args, **kwargs)
+
+    return envoltura
+
+
+@login_requerido
+async def welcome(request):
+    return render(request, "welcome.html")
+
+
+@login_requerido
+async def user_list(request):
+    """Directorio de usuarios paginado por cursor; ver views.user_list_page."""
+    users, position = views.user_list_page(request)
+    page = [user async for user in users]
+    return render(request, "user_list.html", views.user_list_context(page, position))
+
+
+async def _user_rows():
+    """Recorre el directorio por bloques con el cursor asíncrono del ORM.
+
+    Se iteran instancias (con only) y no values_list, porque en Django 4.2 aiterator ejecuta la
+    consulta de values_list fuera del hilo síncrono y falla con SynchronousOnlyOperation.
+    """
+    users = views.user_directory_queryset()
+    async for user in users.aiterator(chunk_size=views.USER_EXPORT_CHUNK_SIZE):
+        yield tuple(getattr(user, field) for field in views.USER_LIST_FIELDS)
+
+
+async def _stream_user_csv():
+    writer = csv.writer(views.Echo())
+    yield writer.writerow(views.USER_LIST_FIELDS)
+    async for row in _user_rows():
+        yield writer.writerow(row)
+
+
+async def _stream_user_ndjson():
+    async for row in _user_rows():
+        yield json.dumps(dict(zip(views.USER_LIST_FIELDS, row)), ensure_ascii=False) + "\n"
+
+
+# Formatos de exportación disponibles: (generador asíncrono, content type, extensión)
+USER_EXPORT_FORMATS = {
+    "csv": (_stream_user_csv, "text/csv; charset=utf-8", "csv"),
+    "ndjson": (_stream_user_ndjson, "application/x-ndjson; charset=utf-8", "ndjson"),
+}
+
+
+@login_requerido
+async def user_export(request, formato):
+    """Exporta el directorio de usuarios como CSV o NDJSON con un iterador asíncrono.
+
+    Raises:
+        Http404: Si el formato no está soportado.
+    """
+    if formato not in USER_EXPORT_FORMATS:
+        raise Http404("Formato de exportación no soportado")
+    stream, content_type, extension = USER_EXPORT_FORMATS[formato]
+    response = StreamingHttpResponse(stream(), content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="usuarios.{extension}"'
+    return response
+
+
+@login_requerido
+async def product_search(request):
+    """Búsqueda de productos en JSON; ver busqueda.filtrar_productos.
+
+    La búsqueda completa (página, prefetch y facetas) se ejecuta en un solo paso por un hilo en
+    lugar de uno por consulta.
+    """
+    try:
+        resultado = await sync_to_async(buscar_productos)(request.GET)
+    except ValidationError as error:
+        return JsonResponse({"errores": error.messages}, status=400)
+    return JsonResponse(resultado)
+
+
+@login_requerido
+async def stock_events(request, sucursal):
+    """Variaciones de existencias de una sucursal en vivo, como Server-Sent Events; ver tablero.
+
+    Si el navegador se reconecta con Last-Event-ID, primero se envían los movimientos perdidos.
+    La suscripción se abre antes de leerlos para no perder los que lleguen mientras tanto.
+    """
+    try:
+        ultimo = int(request.headers.get("Last-Event-ID", ""))
+    except ValueError:
+        ultimo = None
+    suscripcion = tablero.suscribir(sucursal)
+    try:
+        repeticion = (
+            await sync_to_async(tablero.repetir)(sucursal, ultimo) if ultimo is not None else ()
+        )
+    except BaseException:
+        tablero.difusor.cancelar(suscripcion)
+        raise
+    response = StreamingHttpResponse(
+        tablero.difusor.flujo(suscripcion, repeticion, ultimo or 0),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    # Evita que nginx acumule los eventos antes de enviarlos
+    response["X-Accel-Buffering"] = "no"
+    return response
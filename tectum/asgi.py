@@ -3,6 +3,11 @@ ASGI config for django_test project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Las vistas de lectura se sirven en su versión asíncrona (TECTUM_VISTAS_ASINCRONAS), por ejemplo:
+
+    uvicorn tectum.asgi:application --workers 2
+    daphne tectum.asgi:application
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
@@ -11,6 +16,7 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_test.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tectum.settings')
+os.environ.setdefault('TECTUM_VISTAS_ASINCRONAS', '1')
 
 application = get_asgi_application()
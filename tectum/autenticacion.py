@@ -0,0 +1,93 @@
+"""Autenticación de bajo costo: cifrado de contraseñas ajustable y usuario de la sesión en caché.
+
+PBKDF2PasswordHasher toma el número de iteraciones de settings.TECTUM_PBKDF2_ITERACIONES, de modo
+que cada entorno elige su costo. Como mantiene el algoritmo "pbkdf2_sha256", las contraseñas
+guardadas con otro número de iteraciones se siguen verificando y Django las vuelve a cifrar con
+los parámetros actuales la próxima vez que el usuario inicia sesión.
+
+CachedModelBackend guarda en la caché el usuario de cada sesión, así que las páginas autenticadas
+no consultan la tabla de usuarios en cada petición. La entrada se invalida al guardar o eliminar
+el usuario; los cambios hechos con QuerySet.update() no pasan por las señales y se ven al vencer
+CACHE_USUARIOS. La invalidación sólo llega a los demás procesos si la caché es compartida: con
+la caché en memoria de cada proceso, un usuario desactivado o con la contraseña cambiada seguiría
+autenticado en los otros. Por eso revisar_cache_compartida falla si CachedModelBackend o las
+sesiones "cached_db" se usan con LocMemCache. Los receptores y la revisión se registran al
+iniciar la aplicación (InventarioAppConfig.ready), también en los procesos que no autentican.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import PBKDF2PasswordHasher as PBKDF2PasswordHasherBase
+from django.core import checks
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models.signals import post_delete, post_save
+
+# Segundos que se conserva un usuario en la caché
+CACHE_USUARIOS = 300
+
+# Prefijo de las llaves de caché de los usuarios
+PREFIJO_USUARIOS = "usuario_sesion"
+
+# Motor de sesiones que lee las sesiones desde la caché
+SESIONES_EN_CACHE = "django.contrib.sessions.backends.cached_db"
+
+
+class PBKDF2PasswordHasher(PBKDF2PasswordHasherBase):
+    """PBKDF2-SHA256 con el número de iteraciones definido en la configuración del entorno."""
+
+    @property
+    def iterations(self):
+        return getattr(settings, "TECTUM_PBKDF2_ITERACIONES", PBKDF2PasswordHasherBase.iterations)
+
+
+def llave_usuario(user_id):
+    return f"{PREFIJO_USUARIOS}:{user_id}"
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend que lee el usuario de la sesión desde la caché."""
+
+    def get_user(self, user_id):
+        llave = llave_usuario(user_id)
+        user = cache.get(llave)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(llave, user, CACHE_USUARIOS)
+        return user if self.user_can_authenticate(user) else None
+
+
+@checks.register(checks.Tags.security, checks.Tags.caches)
+def revisar_cache_compartida(app_configs, **kwargs):
+    """Exige una caché compartida por todos los procesos para el usuario y la sesión en caché."""
+    if not isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache):
+        return []
+    errores = []
+    if "tectum.autenticacion.CachedModelBackend" in settings.AUTHENTICATION_BACKENDS:
+        errores.append(
+            checks.Error(
+                "CachedModelBackend necesita una caché compartida por todos los procesos.",
+                hint="Configure TECTUM_CACHE_DIR o use django.contrib.auth.backends.ModelBackend.",
+                id="tectum.E001",
+            )
+        )
+    if settings.SESSION_ENGINE == SESIONES_EN_CACHE:
+        errores.append(
+            checks.Error(
+                'Las sesiones "cached_db" necesitan una caché compartida por todos los procesos.',
+                hint="Configure TECTUM_CACHE_DIR o use TECTUM_SESIONES=db.",
+                id="tectum.E002",
+            )
+        )
+    return errores
+
+
+def invalidar_usuario(sender, instance, **kwargs):
+    """Elimina de la caché el usuario guardado o eliminado (incluye el cambio de contraseña)."""
+    cache.delete(llave_usuario(instance.pk))
+
+
+post_save.connect(invalidar_usuario, sender=get_user_model(), dispatch_uid="tectum.autenticacion")
+post_delete.connect(invalidar_usuario, sender=get_user_model(), dispatch_uid="tectum.autenticacion")
@@ -0,0 +1,202 @@
+"""Enrutamiento de consultas a réplicas de lectura y presupuesto de consultas por vista.
+
+ReplicaRouter envía las lecturas a una de las réplicas de settings.TECTUM_REPLICAS y las escrituras
+a la base de datos principal. Cuando una petición escribe, el resto de sus lecturas se hacen en la
+principal (lectura de lo propio escrito) y EnrutadorMiddleware deja una cookie para que las
+peticiones siguientes del mismo navegador también lo hagan durante TECTUM_RETRASO_REPLICAS
+segundos, el retraso de replicación que se tolera. Las lecturas dentro de una transacción de la
+principal también se hacen en ella.
+
+EnrutadorMiddleware además compara las consultas SQL de cada vista con su presupuesto, definido
+con el decorador presupuesto_consultas o por nombre de URL en settings.TECTUM_PRESUPUESTO_CONSULTAS.
+Sólo se cuentan las consultas desde process_view, con la sesión y el usuario ya cargados:
+
+    POR_DEFECTO: consultas permitidas a las vistas sin presupuesto propio (None, sin límite).
+    VISTAS: {nombre de URL: consultas permitidas}.
+    FALLAR: si exceder el presupuesto lanza PresupuestoExcedido en lugar de sólo registrar una
+        advertencia en el logger "tectum.consultas" (settings.DEBUG).
+
+Las consultas se cuentan con la medición de tectum.perfilado, así que PerfiladoMiddleware debe estar
+antes en MIDDLEWARE.
+"""
+
+import logging
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .perfilado import medicion_actual
+
+logger = logging.getLogger("tectum.consultas")
+
+# Cookie que fija a la base de datos principal las peticiones que siguen a una escritura
+COOKIE_PRIMARIA = "tectum_primaria"
+
+# Estado de enrutamiento de la petición en curso (o del hilo, fuera de una petición)
+_estado_actual = ContextVar("estado_enrutador", default=None)
+
+
+class PresupuestoExcedido(Exception):
+    """Una vista ejecutó más consultas SQL que las de su presupuesto."""
+
+
+class Estado:
+    """Si las lecturas deben ir a la principal y si hubo escrituras en la petición en curso.
+
+    Es un objeto mutable y no un valor del ContextVar para que las escrituras hechas en los hilos de
+    sync_to_async, que trabajan sobre una copia del contexto, fijen también la petición.
+    """
+
+    __slots__ = ("fijada", "escribio")
+
+    def __init__(self, fijada=False):
+        self.fijada = fijada
+        self.escribio = False
+
+
+def _estado():
+    estado = _estado_actual.get()
+    if estado is None:
+        # Fuera de una petición (comandos, workers) el estado dura lo que el contexto del hilo
+        estado = Estado()
+        _estado_actual.set(estado)
+    return estado
+
+
+@contextmanager
+def usar_primaria():
+    """Envía a la base de datos principal las lecturas hechas dentro del bloque."""
+    token = _estado_actual.set(Estado(fijada=True))
+    try:
+        yield
+    finally:
+        _estado_actual.reset(token)
+
+
+class ReplicaRouter:
+    """Lecturas a las réplicas y escrituras a la principal (ver el docstring del módulo)."""
+
+    def __init__(self):
+        self.replicas = list(getattr(settings, "TECTUM_REPLICAS", ()))
+        self.bases = {DEFAULT_DB_ALIAS, *self.replicas}
+
+    def db_for_read(self, model, **hints):
+        if not self.replicas:
+            return None
+        estado = _estado_actual.get()
+        if estado is not None and estado.fijada:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(self.replicas)
+
+    def db_for_write(self, model, **hints):
+        estado = _estado()
+        estado.fijada = estado.escribio = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Las réplicas tienen los mismos datos que la principal
+        if obj1._state.db in self.bases and obj2._state.db in self.bases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+def presupuesto_consultas(consultas):
+    """Decorador que fija el número máximo de consultas SQL de una vista (síncrona o asíncrona)."""
+
+    def decorador(vista):
+        vista.presupuesto_consultas = consultas
+        return vista
+
+    return decorador
+
+
+def configuracion(clave, por_defecto=None):
+    return getattr(settings, "TECTUM_PRESUPUESTO_CONSULTAS", {}).get(clave, por_defecto)
+
+
+class EnrutadorMiddleware:
+    """Fija a la principal las peticiones que escriben y vigila el presupuesto de consultas."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.es_asincrono = iscoroutinefunction(get_response)
+        if self.es_asincrono:
+            markcoroutinefunction(self)
+        self.retraso = getattr(settings, "TECTUM_RETRASO_REPLICAS", 5)
+        self.por_defecto = configuracion("POR_DEFECTO")
+        self.vistas = configuracion("VISTAS", {})
+        self.fallar = configuracion("FALLAR", settings.DEBUG)
+
+    def __call__(self, request):
+        if self.es_asincrono:
+            return self.__acall__(request)
+        estado = Estado(fijada=COOKIE_PRIMARIA in request.COOKIES)
+        token = _estado_actual.set(estado)
+        try:
+            response = self.get_response(request)
+        finally:
+            _estado_actual.reset(token)
+        return self.terminar(request, response, estado)
+
+    async def __acall__(self, request):
+        estado = Estado(fijada=COOKIE_PRIMARIA in request.COOKIES)
+        token = _estado_actual.set(estado)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _estado_actual.reset(token)
+        return self.terminar(request, response, estado)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        presupuesto = getattr(view_func, "presupuesto_consultas", None)
+        if presupuesto is None:
+            presupuesto = self.vistas.get(request.resolver_match.view_name, self.por_defecto)
+        request.presupuesto_consultas = presupuesto
+        medicion = medicion_actual()
+        if presupuesto is None or medicion is None:
+            return
+        # La sesión y el usuario se cargan de forma perezosa, normalmente dentro de la vista
+        # (login_required); se cargan aquí para que el presupuesto cuente sólo las consultas de la
+        # vista y no las de los middleware
+        if hasattr(request, "user"):
+            bool(request.user)
+        request.consultas_previas = medicion.consultas
+
+    def terminar(self, request, response, estado):
+        if estado.escribio and self.retraso:
+            response.set_cookie(COOKIE_PRIMARIA, "1", max_age=self.retraso, httponly=True)
+        self.revisar_presupuesto(request)
+        return response
+
+    def revisar_presupuesto(self, request):
+        """Compara las consultas de la petición con el presupuesto de su vista.
+
+        Raises:
+            PresupuestoExcedido: Si se excedió el presupuesto y FALLAR está activo.
+        """
+        presupuesto = getattr(request, "presupuesto_consultas", None)
+        medicion = medicion_actual()
+        if presupuesto is None or medicion is None:
+            return
+        consultas = medicion.consultas - getattr(request, "consultas_previas", 0)
+        if consultas <= presupuesto:
+            return
+        mensaje = (
+            f"{request.resolver_match.view_name} ejecutó {consultas} consultas SQL "
+            f"(presupuesto: {presupuesto})"
+        )
+        if self.fallar:
+            raise PresupuestoExcedido(mensaje)
+        logger.warning(mensaje, extra={"request": request})
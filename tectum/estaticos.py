@@ -0,0 +1,205 @@
+"""Archivos estáticos con nombres con hash, versiones comprimidas y servidor dentro del proceso.
+
+ComprimidoManifestStaticFilesStorage agrega el hash del contenido al nombre de cada archivo (como
+ManifestStaticFilesStorage) y, al terminar collectstatic, escribe junto a los archivos de texto
+sus versiones .gz y .br (esta última sólo si está instalado el paquete brotli).
+
+EstaticosMiddleware sirve STATIC_ROOT sin pasar por las vistas: indexa los archivos una sola vez
+al iniciar el proceso, elige la versión comprimida según Accept-Encoding y marca los archivos con
+hash como inmutables por un año, de modo que los navegadores no vuelven a pedirlos. Los archivos
+pequeños se guardan en memoria.
+"""
+
+import gzip
+import mimetypes
+import os
+from collections import namedtuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Extensiones de los archivos que se comprimen; las imágenes ya vienen comprimidas
+EXTENSIONES_COMPRIMIBLES = (".css", ".js", ".map", ".svg", ".txt", ".json", ".html", ".xml")
+
+# Una versión comprimida sólo se guarda si ahorra al menos esta fracción del tamaño original
+AHORRO_MINIMO = 0.05
+
+# Cache-Control de los archivos con hash en el nombre y del resto
+CACHE_INMUTABLE = "public, max-age=31536000, immutable"
+CACHE_SIN_HASH = "public, max-age=60"
+
+# Tamaño máximo, en bytes, de los archivos que se guardan en memoria
+MAXIMO_EN_MEMORIA = 256 * 1024
+
+# Tipos de contenido que no son text/* y se envían con charset
+TIPOS_UTF8 = ("application/javascript", "application/json")
+
+# Codificaciones que se buscan, en orden de preferencia: (Content-Encoding, extensión)
+CODIFICACIONES = (("br", ".br"), ("gzip", ".gz"))
+
+
+class ComprimidoManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage que además escribe las versiones .gz y .br de cada archivo."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        procesados = []
+        for original, procesado, fue_procesado in super().post_process(paths, dry_run, **options):
+            if procesado and not isinstance(fue_procesado, Exception):
+                procesados.append(procesado)
+            yield original, procesado, fue_procesado
+        if dry_run:
+            return
+        # Se comprimen los nombres sin hash y con hash
+        for nombre in {*paths, *procesados}:
+            if nombre.endswith(EXTENSIONES_COMPRIMIBLES) and self.exists(nombre):
+                self.comprimir(nombre)
+
+    def comprimir(self, nombre):
+        with self.open(nombre) as archivo:
+            contenido = archivo.read()
+        variantes = [(".gz", gzip.compress(contenido, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variantes.append((".br", brotli.compress(contenido, quality=11)))
+        for extension, comprimido in variantes:
+            ruta = self.path(nombre + extension)
+            if len(comprimido) <= len(contenido) * (1 - AHORRO_MINIMO):
+                with open(ruta, "wb") as archivo:
+                    archivo.write(comprimido)
+            elif os.path.exists(ruta):
+                os.remove(ruta)
+
+
+# Versión de un archivo estático lista para servirse; contenido es None si se lee del disco
+Variante = namedtuple("Variante", ["ruta", "tamano", "etag", "contenido"])
+
+# Archivo estático indexado: tipo, Cache-Control y variantes por codificación ("" sin comprimir)
+Estatico = namedtuple("Estatico", ["tipo", "cache_control", "variantes"])
+
+
+def _variante(ruta, codificacion):
+    estado = os.stat(ruta)
+    contenido = None
+    if estado.st_size <= MAXIMO_EN_MEMORIA:
+        with open(ruta, "rb") as archivo:
+            contenido = archivo.read()
+    sufijo = f"-{codificacion}" if codificacion else ""
+    etag = f'"{estado.st_size:x}-{int(estado.st_mtime):x}{sufijo}"'
+    return Variante(ruta, estado.st_size, etag, contenido)
+
+
+def indexar(raiz, hasheados):
+    """Indexa los archivos de STATIC_ROOT por su nombre relativo.
+
+    Args:
+        raiz (str): Directorio de collectstatic.
+        hasheados (set): Nombres con hash del manifiesto, que se sirven como inmutables.
+
+    Returns:
+        dict: {nombre: Estatico}
+    """
+    indice = {}
+    extensiones = tuple(extension for _, extension in CODIFICACIONES)
+    for directorio, _, archivos in os.walk(raiz):
+        for archivo in archivos:
+            if archivo.endswith(extensiones):
+                continue
+            ruta = os.path.join(directorio, archivo)
+            nombre = os.path.relpath(ruta, raiz).replace(os.sep, "/")
+            variantes = {"": _variante(ruta, "")}
+            for codificacion, extension in CODIFICACIONES:
+                if os.path.exists(ruta + extension):
+                    variantes[codificacion] = _variante(ruta + extension, codificacion)
+            tipo, _ = mimetypes.guess_type(nombre)
+            if tipo and (tipo.startswith("text/") or tipo in TIPOS_UTF8):
+                tipo += "; charset=utf-8"
+            cache_control = CACHE_INMUTABLE if nombre in hasheados else CACHE_SIN_HASH
+            indice[nombre] = Estatico(tipo or "application/octet-stream", cache_control, variantes)
+    return indice
+
+
+def _hasheados(storage):
+    # Con otro storage no hay manifiesto y ningún archivo se considera inmutable
+    return set(getattr(storage, "hashed_files", {}).values())
+
+
+class EstaticosMiddleware:
+    """Sirve los archivos de STATIC_ROOT con compresión y caché del navegador de larga duración.
+
+    Se activa con settings.TECTUM_SERVIR_ESTATICOS (por defecto, fuera de DEBUG) y sólo conoce los
+    archivos que existían al iniciar el proceso, así que después de collectstatic hay que
+    reiniciar el servidor.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "TECTUM_SERVIR_ESTATICOS", not settings.DEBUG):
+            raise MiddlewareNotUsed
+        if not settings.STATIC_ROOT or not os.path.isdir(settings.STATIC_ROOT):
+            raise MiddlewareNotUsed
+        from django.contrib.staticfiles.storage import staticfiles_storage
+
+        self.get_response = get_response
+        self.es_asincrono = iscoroutinefunction(get_response)
+        if self.es_asincrono:
+            markcoroutinefunction(self)
+        self.prefijo = settings.STATIC_URL
+        self.indice = indexar(settings.STATIC_ROOT, _hasheados(staticfiles_storage))
+
+    def __call__(self, request):
+        if self.es_asincrono:
+            return self.__acall__(request)
+        response = self.servir(request)
+        if response is None:
+            response = self.get_response(request)
+        return response
+
+    async def __acall__(self, request):
+        response = self.servir(request)
+        if response is None:
+            response = await self.get_response(request)
+        return response
+
+    def servir(self, request):
+        """Respuesta con el archivo estático pedido, o None si la ruta no es de un estático."""
+        if request.method not in ("GET", "HEAD") or not request.path.startswith(self.prefijo):
+            return None
+        estatico = self.indice.get(request.path[len(self.prefijo) :])
+        if estatico is None:
+            return None
+
+        aceptadas = {
+            codificacion.split(";")[0].strip()
+            for codificacion in request.headers.get("Accept-Encoding", "").split(",")
+        }
+        codificacion = next(
+            (c for c, _ in CODIFICACIONES if c in estatico.variantes and c in aceptadas), ""
+        )
+        variante = estatico.variantes[codificacion]
+
+        if request.headers.get("If-None-Match") == variante.etag:
+            response = HttpResponseNotModified()
+        elif request.method == "HEAD":
+            response = HttpResponse(content_type=estatico.tipo)
+        elif variante.contenido is not None:
+            response = HttpResponse(variante.contenido, content_type=estatico.tipo)
+        else:
+            response = FileResponse(open(variante.ruta, "rb"), content_type=estatico.tipo)
+        if request.method == "HEAD" or variante.contenido is None:
+            response["Content-Length"] = variante.tamano
+        response["ETag"] = variante.etag
+        response["Cache-Control"] = estatico.cache_control
+        if len(estatico.variantes) > 1:
+            response["Vary"] = "Accept-Encoding"
+        if codificacion:
+            response["Content-Encoding"] = codificacion
+        return response
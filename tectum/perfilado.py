@@ -0,0 +1,301 @@
+"""Medición del costo de cada petición: consultas SQL, tiempo de base de datos, plantillas y vista.
+
+PerfiladoMiddleware mide cada petición y agrega los resultados a un histograma en memoria con las
+últimas mediciones de cada nombre de URL. Los tiempos se envían en la cabecera Server-Timing y los
+percentiles se consultan en la vista metricas (sólo personal). Opcionalmente, una fracción de las
+peticiones se ejecuta bajo cProfile y se guardan las funciones más costosas.
+
+Configuración en settings.TECTUM_PERFILADO (todas las claves son opcionales):
+
+    VENTANA: mediciones que se conservan por nombre de URL (1000).
+    SERVER_TIMING: si se agrega la cabecera Server-Timing (True).
+    MUESTREO_CPROFILE: fracción de peticiones que se perfilan con cProfile, entre 0 y 1 (0).
+    PERFILES: número de perfiles de cProfile que se conservan (20).
+    FUNCIONES: funciones que se guardan de cada perfil (25).
+"""
+
+import cProfile
+import io
+import pstats
+import random
+import threading
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import JsonResponse
+from django.template.backends.django import Template
+
+from .postgresql_pool import estadisticas_pools
+
+# Valores por defecto de settings.TECTUM_PERFILADO
+CONFIGURACION = {
+    "VENTANA": 1000,
+    "SERVER_TIMING": True,
+    "MUESTREO_CPROFILE": 0,
+    "PERFILES": 20,
+    "FUNCIONES": 25,
+}
+
+# Percentiles que se informan por cada métrica
+PERCENTILES = (50, 95, 99)
+
+# Nombre con el que se agrupan las peticiones que no resolvieron ninguna URL
+SIN_RUTA = "<sin ruta>"
+
+# Medición de la petición en curso; se propaga a los hilos de sync_to_async
+_medicion_actual = ContextVar("medicion_perfilado", default=None)
+
+# cProfile admite un solo perfilador activo a la vez por intérprete
+_cprofile = threading.Lock()
+
+
+def configuracion(clave):
+    """Valor de una clave de settings.TECTUM_PERFILADO, o su valor por defecto."""
+    return getattr(settings, "TECTUM_PERFILADO", {}).get(clave, CONFIGURACION[clave])
+
+
+class Medicion:
+    """Tiempos acumulados (en segundos) de una petición."""
+
+    __slots__ = ("inicio", "inicio_vista", "fin_vista", "consultas", "db", "plantillas")
+
+    def __init__(self):
+        self.inicio = perf_counter()
+        self.inicio_vista = None
+        self.fin_vista = None
+        self.consultas = 0
+        self.db = 0.0
+        self.plantillas = 0.0
+
+    @property
+    def vista(self):
+        if self.inicio_vista is None:
+            return 0.0
+        return (self.fin_vista or perf_counter()) - self.inicio_vista
+
+
+def medicion_actual():
+    """Medición de la petición en curso, o None fuera de PerfiladoMiddleware."""
+    return _medicion_actual.get()
+
+
+def _percentil(ordenados, percentil):
+    if not ordenados:
+        return None
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * percentil / 100))]
+
+
+class Histograma:
+    """Ventana móvil con las últimas mediciones de cada nombre de URL.
+
+    Las mediciones se guardan como tuplas en un deque de largo fijo por nombre, así que registrar
+    cuesta O(1) y la memoria está acotada. Los percentiles se calculan sólo al consultarlos.
+    """
+
+    # Métricas de cada medición, en el orden en que se guardan
+    METRICAS = ("total", "vista", "db", "plantillas", "consultas")
+
+    def __init__(self, ventana):
+        self.ventana = ventana
+        self.mediciones = defaultdict(lambda: deque(maxlen=self.ventana))
+        self.lock = threading.Lock()
+
+    def registrar(self, nombre, total, medicion):
+        fila = (total, medicion.vista, medicion.db, medicion.plantillas, medicion.consultas)
+        with self.lock:
+            self.mediciones[nombre].append(fila)
+
+    def resumen(self):
+        """Percentiles por nombre de URL y métrica; los tiempos se informan en milisegundos.
+
+        Returns:
+            dict: {nombre: {"peticiones": n, metrica: {"p50": ..., "p95": ..., "p99": ...}}}
+        """
+        with self.lock:
+            copias = {nombre: list(filas) for nombre, filas in self.mediciones.items()}
+
+        resumen = {}
+        for nombre, filas in sorted(copias.items()):
+            datos = {"peticiones": len(filas)}
+            for posicion, metrica in enumerate(self.METRICAS):
+                escala = 1 if metrica == "consultas" else 1000
+                ordenados = sorted(fila[posicion] * escala for fila in filas)
+                datos[metrica] = {
+                    f"p{percentil}": _percentil(ordenados, percentil) for percentil in PERCENTILES
+                }
+            resumen[nombre] = datos
+        return resumen
+
+    def reiniciar(self):
+        with self.lock:
+            self.mediciones.clear()
+
+
+# Histograma y perfiles de cProfile del proceso
+histograma = Histograma(configuracion("VENTANA"))
+perfiles = deque(maxlen=configuracion("PERFILES"))
+
+
+def _medir_consulta(execute, sql, params, many, context):
+    """Envoltura de ejecución de consultas que suma su número y duración a la medición en curso."""
+    medicion = _medicion_actual.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+    inicio = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicion.db += perf_counter() - inicio
+        medicion.consultas += 1
+
+
+def _instalar_en_conexion(connection, **kwargs):
+    if _medir_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_medir_consulta)
+
+
+def _instalar_en_plantillas():
+    """Envuelve Template.render del motor de Django para sumar el tiempo de renderizado.
+
+    Se mide sólo la plantilla de nivel superior: las que se incluyen o extienden se renderizan dentro
+    de ella y no se cuentan dos veces. El tiempo incluye las consultas que la plantilla dispara.
+    """
+    original = Template.render
+    if getattr(original, "perfilado", False):
+        return
+
+    @wraps(original)
+    def render(self, context=None, request=None):
+        medicion = _medicion_actual.get()
+        if medicion is None:
+            return original(self, context, request)
+        inicio = perf_counter()
+        try:
+            return original(self, context, request)
+        finally:
+            medicion.plantillas += perf_counter() - inicio
+
+    render.perfilado = True
+    Template.render = render
+
+
+def instalar():
+    """Registra la medición de consultas en todas las conexiones y la de plantillas en el motor.
+
+    La envoltura de consultas queda instalada de forma permanente con connection.execute_wrapper y
+    sólo mide cuando hay una petición en curso, lo que también cubre las conexiones que se abren en
+    los hilos de las vistas asíncronas.
+    """
+    connection_created.connect(_instalar_en_conexion, dispatch_uid="tectum.perfilado")
+    for connection in connections.all(initialized_only=True):
+        _instalar_en_conexion(connection)
+    _instalar_en_plantillas()
+
+
+def _guardar_perfil(nombre, perfil):
+    salida = io.StringIO()
+    estadisticas = pstats.Stats(perfil, stream=salida)
+    estadisticas.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(configuracion("FUNCIONES"))
+    perfiles.append({"url": nombre, "estadisticas": salida.getvalue()})
+
+
+class PerfiladoMiddleware:
+    """Mide cada petición y publica los tiempos en Server-Timing y en el histograma del proceso.
+
+    Debe ir al principio de MIDDLEWARE para que el tiempo total incluya al resto de los middleware.
+    Con el muestreo de cProfile desactivado el costo por petición es de unas pocas lecturas del reloj
+    y una llamada extra por consulta SQL.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.es_asincrono = iscoroutinefunction(get_response)
+        if self.es_asincrono:
+            markcoroutinefunction(self)
+        self.server_timing = configuracion("SERVER_TIMING")
+        self.muestreo = configuracion("MUESTREO_CPROFILE")
+        instalar()
+
+    def __call__(self, request):
+        if self.es_asincrono:
+            return self.__acall__(request)
+        medicion = Medicion()
+        token = _medicion_actual.set(medicion)
+        try:
+            if self.muestreo and random.random() < self.muestreo and _cprofile.acquire(False):
+                try:
+                    perfil = cProfile.Profile()
+                    response = perfil.runcall(self.get_response, request)
+                finally:
+                    _cprofile.release()
+                _guardar_perfil(self.nombre(request), perfil)
+            else:
+                response = self.get_response(request)
+        finally:
+            _medicion_actual.reset(token)
+        return self.terminar(request, response, medicion)
+
+    async def __acall__(self, request):
+        # cProfile no sigue a las corrutinas entre un await y otro, así que aquí no se muestrea
+        medicion = Medicion()
+        token = _medicion_actual.set(medicion)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _medicion_actual.reset(token)
+        return self.terminar(request, response, medicion)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        medicion = _medicion_actual.get()
+        if medicion is not None:
+            medicion.inicio_vista = perf_counter()
+
+    def nombre(self, request):
+        resolver_match = getattr(request, "resolver_match", None)
+        if resolver_match is None:
+            return SIN_RUTA
+        return resolver_match.view_name or SIN_RUTA
+
+    def terminar(self, request, response, medicion):
+        fin = perf_counter()
+        if medicion.inicio_vista is not None:
+            medicion.fin_vista = fin
+        total = fin - medicion.inicio
+        histograma.registrar(self.nombre(request), total, medicion)
+        if self.server_timing:
+            metricas = (
+                f'db;dur={medicion.db * 1000:.2f};desc="{medicion.consultas} consultas"',
+                f"plantillas;dur={medicion.plantillas * 1000:.2f}",
+                f"vista;dur={medicion.vista * 1000:.2f}",
+                f"total;dur={total * 1000:.2f}",
+            )
+            anteriores = response.get("Server-Timing")
+            response["Server-Timing"] = ", ".join(
+                (anteriores,) + metricas if anteriores else metricas
+            )
+        return response
+
+
+@staff_member_required
+def metricas(request):
+    """Percentiles por nombre de URL y, con ?perfiles=1, los últimos perfiles de cProfile.
+
+    Incluye las estadísticas de los pools de conexiones abiertos (espera y conexiones en uso). Con
+    ?reiniciar=1 se vacía el histograma después de leerlo.
+    """
+    datos = {"urls": histograma.resumen(), "pools": estadisticas_pools()}
+    if request.GET.get("perfiles"):
+        datos["perfiles"] = list(perfiles)
+    if request.GET.get("reiniciar"):
+        histograma.reiniciar()
+    return JsonResponse(datos, json_dumps_params={"ensure_ascii": False})
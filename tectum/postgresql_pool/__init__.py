@@ -0,0 +1,25 @@
+"""Backend de PostgreSQL con un pool de conexiones de psycopg_pool (ver base.py).
+
+Este módulo sólo guarda el registro de los pools abiertos para poder leer sus estadísticas sin
+importar psycopg.
+"""
+
+# Pools abiertos por (alias, base de datos)
+pools = {}
+
+
+def estadisticas_pools():
+    """Estadísticas de los pools de conexiones abiertos en este proceso.
+
+    Returns:
+        dict: {alias: estadísticas de psycopg_pool más "en_uso" (conexiones prestadas)}. Los
+        tiempos de espera de psycopg_pool (requests_wait_ms) son acumulados desde que se abrió
+        el pool.
+    """
+    resultado = {}
+    for (alias, nombre), pool in list(pools.items()):
+        estadisticas = pool.get_stats()
+        estadisticas["en_uso"] = estadisticas["pool_size"] - estadisticas["pool_available"]
+        estadisticas["base_de_datos"] = nombre
+        resultado[alias] = estadisticas
+    return resultado
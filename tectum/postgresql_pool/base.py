@@ -0,0 +1,125 @@
+"""Backend de PostgreSQL que toma las conexiones de un pool de psycopg_pool.
+
+Cada hilo de Django pide una conexión al pool al empezar a usar la base de datos y la devuelve al
+cerrarla al final de la petición, así que el costo del handshake TCP y de la autenticación se paga
+sólo al crecer el pool. Las conexiones se revisan antes de prestarse (check_connection).
+
+Se configura con ENGINE "tectum.postgresql_pool" y los parámetros del pool en OPTIONS["pool"]
+(min_size, max_size, timeout, max_idle, max_lifetime). Requiere psycopg 3 y psycopg-pool;
+CONN_MAX_AGE debe ser 0 porque el pool ya conserva las conexiones abiertas.
+"""
+
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel, is_psycopg3
+from django.utils.asyncio import async_unsafe
+
+from . import pools
+
+# Valores por defecto de OPTIONS["pool"]
+POOL_POR_DEFECTO = {
+    "min_size": 2,
+    "max_size": 10,
+    # Segundos que se espera una conexión libre antes de fallar
+    "timeout": 10,
+    # Segundos que una conexión ociosa sobre min_size se conserva, y vida máxima de cada una
+    "max_idle": 600,
+    "max_lifetime": 3600,
+}
+
+_lock = threading.Lock()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, settings_dict, alias=DEFAULT_DB_ALIAS):
+        super().__init__(settings_dict, alias)
+        if not is_psycopg3:
+            raise ImproperlyConfigured("tectum.postgresql_pool requiere psycopg 3.")
+        if settings_dict.get("CONN_MAX_AGE"):
+            raise ImproperlyConfigured(
+                "tectum.postgresql_pool no admite CONN_MAX_AGE; el pool conserva las conexiones."
+            )
+
+    @property
+    def pool(self):
+        """Pool de la base de datos de esta conexión, creado la primera vez que se usa.
+
+        Las conexiones sin base de datos (creación de la base de pruebas) no usan el pool.
+        """
+        if self.alias == NO_DB_ALIAS:
+            return None
+        llave = (self.alias, self.settings_dict["NAME"])
+        pool = pools.get(llave)
+        if pool is None:
+            with _lock:
+                pool = pools.get(llave)
+                if pool is None:
+                    pool = pools[llave] = self._crear_pool()
+        return pool
+
+    def _crear_pool(self):
+        try:
+            from psycopg_pool import ConnectionPool
+        except ImportError as exc:
+            raise ImproperlyConfigured(
+                "tectum.postgresql_pool requiere el paquete psycopg-pool."
+            ) from exc
+
+        opciones = {**POOL_POR_DEFECTO, **self.settings_dict["OPTIONS"].get("pool", {})}
+        pool = ConnectionPool(
+            kwargs=self.get_connection_params(),
+            check=ConnectionPool.check_connection,
+            name=self.alias,
+            open=False,
+            **opciones,
+        )
+        pool.open()
+        return pool
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop("pool", None)
+        return conn_params
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+
+        options = self.settings_dict["OPTIONS"]
+        try:
+            self.isolation_level = IsolationLevel(
+                options.get("isolation_level", IsolationLevel.READ_COMMITTED)
+            )
+        except ValueError:
+            raise ImproperlyConfigured(
+                f"Nivel de aislamiento inválido: {options['isolation_level']}. "
+                f"Use uno de los valores de psycopg.IsolationLevel."
+            )
+        connection = pool.getconn()
+        if "isolation_level" in options:
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        # psycopg_pool marca las conexiones prestadas con el pool del que salieron
+        pool = getattr(self.connection, "_pool", None)
+        if pool is None:
+            return super()._close()
+        # La conexión vuelve al pool en lugar de cerrarse; psycopg_pool revierte una transacción
+        # que haya quedado abierta.
+        with self.wrap_database_errors:
+            pool.putconn(self.connection)
+
+
+def cerrar_pools():
+    """Cierra todos los pools del proceso (por ejemplo, al terminar un worker)."""
+    with _lock:
+        for pool in pools.values():
+            pool.close()
+        pools.clear()
@@ -41,7 +41,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Archivos estáticos de STATIC_ROOT, antes del perfilado porque no pasan por las vistas
+    'tectum.estaticos.EstaticosMiddleware',
+    # Primero de los que atienden vistas, para que el tiempo total incluya a los demás middleware
+    'tectum.perfilado.PerfiladoMiddleware',
+    # Después del perfilado, cuya medición usa para contar las consultas de cada vista
+    'tectum.enrutador.EnrutadorMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -50,7 +57,10 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'tectum.urls'
+# Vistas de lectura asíncronas; tectum/asgi.py las activa al servir con uvicorn o daphne
+VISTAS_ASINCRONAS = os.environ.get('TECTUM_VISTAS_ASINCRONAS') == '1'
+
+ROOT_URLCONF = 'tectum.urls_async' if VISTAS_ASINCRONAS else 'tectum.urls'
 
 TEMPLATES = [
     {
@@ -70,6 +80,8 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'tectum.wsgi.application'
 
+ASGI_APPLICATION = 'tectum.asgi.application'
+
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
@@ -85,6 +97,119 @@ DATABASES = {
     }
 }
 
+if os.environ.get('TECTUM_POOL') == '1':
+    # Pool de conexiones de psycopg (tectum/postgresql_pool); las conexiones vuelven al pool al
+    # terminar cada petición, por lo que CONN_MAX_AGE queda en 0
+    DATABASES['default']['ENGINE'] = 'tectum.postgresql_pool'
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.environ.get('TECTUM_POOL_MIN', 2)),
+            'max_size': int(os.environ.get('TECTUM_POOL_MAX', 10)),
+            'timeout': float(os.environ.get('TECTUM_POOL_TIMEOUT', 10)),
+        },
+    }
+elif not VISTAS_ASINCRONAS:
+    # Conexiones persistentes por hilo, revisadas al comenzar cada petición. Bajo ASGI cada
+    # petición puede correr en un hilo distinto, así que ahí sólo se reutilizan con el pool.
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('TECTUM_CONN_MAX_AGE', 60))
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+if os.environ.get('TECTUM_SQLITE'):
+    # Base de datos SQLite local, sin servicios externos (desarrollo y "manage.py bench")
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['TECTUM_SQLITE'],
+    }
+
+# Réplicas de lectura separadas por comas: servidores de PostgreSQL con los mismos parámetros que
+# la principal o, con TECTUM_SQLITE, archivos que hacen de réplica
+TECTUM_REPLICAS = []
+for numero, replica in enumerate(filter(None, os.environ.get('TECTUM_REPLICAS', '').split(',')), 1):
+    alias = f'replica_{numero}'
+    ubicacion = 'NAME' if DATABASES['default']['ENGINE'].endswith('sqlite3') else 'HOST'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        ubicacion: replica.strip(),
+        # En las pruebas las réplicas apuntan a la base de datos de prueba principal
+        'TEST': {'MIRROR': 'default'},
+    }
+    TECTUM_REPLICAS.append(alias)
+
+if TECTUM_REPLICAS:
+    DATABASE_ROUTERS = ['tectum.enrutador.ReplicaRouter']
+
+# Segundos que las lecturas de un navegador siguen yendo a la principal después de escribir
+TECTUM_RETRASO_REPLICAS = int(os.environ.get('TECTUM_RETRASO_REPLICAS', 5))
+
+# Correos que reciben las alertas de existencias bajas (inventario_app/alertas.py), separados por comas
+TECTUM_ALERTAS_STOCK = [
+    correo.strip() for correo in os.environ.get('TECTUM_ALERTAS_STOCK', '').split(',') if correo.strip()
+]
+
+# Tablero de existencias en vivo (inventario_app/tablero.py). En modo local los eventos sólo llegan
+# a las conexiones del proceso que escribió; si no, se reparten entre procesos con LISTEN/NOTIFY
+TECTUM_TABLERO = {
+    'LOCAL': os.environ.get('TECTUM_TABLERO_LOCAL', '1' if os.environ.get('TECTUM_SQLITE') else '0') == '1',
+    'COLA': int(os.environ.get('TECTUM_TABLERO_COLA', 64)),
+    'LATIDO': 15,
+    'DURACION': 300,
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tectum',
+        'OPTIONS': {
+            # Al llegar al máximo de entradas se descarta un tercio de ellas
+            'MAX_ENTRIES': 1000,
+            'CULL_FREQUENCY': 3,
+        },
+    }
+}
+
+if os.environ.get('TECTUM_CACHE_DIR'):
+    # Caché en archivos, compartida por todos los procesos del servidor
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ['TECTUM_CACHE_DIR'],
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+            'CULL_FREQUENCY': 3,
+        },
+    }
+
+# La caché en memoria es propia de cada proceso: lo que sólo se invalida en la caché (usuarios y
+# sesiones) se guarda en ella únicamente si la comparten todos los procesos del servidor
+TECTUM_CACHE_COMPARTIDA = CACHES['default']['BACKEND'] != 'django.core.cache.backends.locmem.LocMemCache'
+
+
+# Perfilado de peticiones (tectum/perfilado.py)
+
+TECTUM_PERFILADO = {
+    # Mediciones que se conservan por nombre de URL para calcular los percentiles
+    'VENTANA': 1000,
+    'SERVER_TIMING': True,
+    # Fracción de peticiones que se ejecutan bajo cProfile (0 lo desactiva)
+    'MUESTREO_CPROFILE': float(os.environ.get('TECTUM_MUESTREO_CPROFILE', 0)),
+}
+
+# Consultas SQL permitidas por vista (tectum/enrutador.py); en DEBUG exceder el presupuesto falla
+TECTUM_PRESUPUESTO_CONSULTAS = {
+    'POR_DEFECTO': 50,
+    'VISTAS': {
+        'welcome': 3,
+        'user_list': 4,
+        'product_search': 8,
+        'reports': 8,
+        'quote': 5,
+        'stock_events': 3,
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -105,6 +230,52 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# https://docs.djangoproject.com/en/4.2/topics/auth/passwords/
+
+PASSWORD_HASHERS = [
+    # PBKDF2-SHA256 con las iteraciones de TECTUM_PBKDF2_ITERACIONES (tectum/autenticacion.py)
+    'tectum.autenticacion.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+if DEBUG:
+    # Hasher rápido para los usuarios de desarrollo creados con "provision_users --hasher-rapido"
+    PASSWORD_HASHERS.append('django.contrib.auth.hashers.MD5PasswordHasher')
+
+# Costo del cifrado de contraseñas de este entorno. Al iniciar sesión, las contraseñas guardadas
+# con otro número de iteraciones se vuelven a cifrar de forma transparente.
+TECTUM_PBKDF2_ITERACIONES = int(os.environ.get('TECTUM_PBKDF2_ITERACIONES', 600000))
+
+# Con una caché compartida, el usuario de cada sesión se lee desde ella en lugar de consultarlo en
+# cada petición (tectum/autenticacion.py)
+AUTHENTICATION_BACKENDS = [
+    'tectum.autenticacion.CachedModelBackend'
+    if TECTUM_CACHE_COMPARTIDA
+    else 'django.contrib.auth.backends.ModelBackend'
+]
+
+
+# Sessions
+# https://docs.djangoproject.com/en/4.2/topics/http/sessions/
+
+# "cached_db" lee la sesión desde la caché y la escribe también en la base de datos, así que sólo
+# es el motor por defecto con una caché compartida; "cookies" guarda la sesión firmada (no cifrada)
+# en el navegador y no puede invalidarse desde el servidor.
+MOTORES_SESION = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+SESSION_ENGINE = MOTORES_SESION[
+    os.environ.get('TECTUM_SESIONES', 'cached_db' if TECTUM_CACHE_COMPARTIDA else 'db')
+]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -122,6 +293,22 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Destino de collectstatic, que escribe los archivos con hash y sus versiones .gz y .br
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'tectum.estaticos.ComprimidoManifestStaticFilesStorage',
+    },
+}
+
+# Servir STATIC_ROOT desde el mismo proceso (tectum.estaticos.EstaticosMiddleware); por defecto
+# fuera de DEBUG, donde runserver ya sirve los archivos originales
+TECTUM_SERVIR_ESTATICOS = os.environ.get('TECTUM_SERVIR_ESTATICOS', str(int(not DEBUG))) == '1'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
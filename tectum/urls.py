@@ -17,7 +17,11 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from . import perfilado
+
 urlpatterns = [
+    # Antes de admin/ para que no la capture la vista comodín del sitio de administración
+    path('admin/perfilado/', perfilado.metricas, name='perfilado'),
     path('admin/', admin.site.urls),
-    path('', include('test_app.urls')),
+    path('', include('inventario_app.urls')),
 ]
@@ -0,0 +1,14 @@
+"""Rutas del despliegue ASGI: las mismas de tectum.urls con las vistas de lectura asíncronas.
+
+Se usa como ROOT_URLCONF cuando TECTUM_VISTAS_ASINCRONAS=1 (ver tectum/asgi.py).
+"""
+from django.contrib import admin
+from django.urls import path, include
+
+from . import perfilado
+
+urlpatterns = [
+    path('admin/perfilado/', perfilado.metricas, name='perfilado'),
+    path('admin/', admin.site.urls),
+    path('', include('inventario_app.urls_async')),
+]